@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Home feed benchmark: follow-list query vs the fan-out inbox.
+
+Builds a power-law social graph (followers of the user ranked r are
+proportional to r^-alpha, and follow-list sizes are heavy-tailed too),
+posts activities, then measures both sides of fan-out-on-write
+(1763000000_activity_feed_inbox.sql):
+
+  write amplification  inbox rows written per activity (1 + the actor's
+                       followers) and per late follow (the followee's
+                       public history), counted on the server, plus
+                       single-activity insert latency by actor follower count
+  read latency         --pages pages of --page-size items for the readers
+                       following the most users plus a random sample:
+                         follow-list  ActivityService's old path: the
+                                      user_follows select, then activity_feed
+                                      with user_id IN (...), paged by offset
+                         inbox        get_activity_feed() paged by cursor
+                       and the public feed paged by offset vs by cursor
+
+Every page is checked to be identical on both paths, and a few readers'
+feeds are walked to the end by cursor and compared with the feed computed
+from the seeded rows (no duplicates, nothing missing).
+
+Without --url the benchmark starts the in-process stand-in from
+local_supabase.py. Benchmark accounts are named
+feed-bench-<n>@example.com; their follows, profiles and activity are
+deleted afterwards unless --keep is given.
+
+Usage:
+    python3 activity_feed_benchmark.py
+    python3 activity_feed_benchmark.py --users 1000 --activities 20000 --alpha 1.1
+    python3 activity_feed_benchmark.py --url http://127.0.0.1:54321 --service-key $SUPABASE_SERVICE_ROLE_KEY
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from load_test import percentile
+from supabase_client import ANON_KEY, AsyncSupabaseClient
+
+DEFAULT_USERS = 300
+DEFAULT_ACTIVITIES = 5000
+DEFAULT_ALPHA = 1.2
+DEFAULT_MEAN_FOLLOWS = 20
+DEFAULT_READERS = 20
+DEFAULT_PAGES = 3
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_REPEAT = 3
+DEFAULT_WRITE_SAMPLE = 200
+LATE_FOLLOWS = 50
+WALKED_READERS = 5
+HISTORY_DAYS = 30
+BENCH_PASSWORD = "bench-password-123"
+ACTIVITY_TYPES = ("goal_completed", "task_completed", "milestone_reached", "streak_achieved",
+                  "goal_shared", "team_joined", "comment_added", "achievement_unlocked")
+FOLLOWER_BUCKETS = ((0, 9), (10, 99), (100, None))
+
+
+def bench_email(index):
+    return f"feed-bench-{index}@example.com"
+
+
+def bench_id(index):
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, bench_email(index)))
+
+
+class Admin:
+    """Service-role calls used to seed, count and clean up the benchmark accounts"""
+
+    def __init__(self, client, service_key):
+        self.client = client
+        self.service_key = service_key
+
+    async def call(self, method, path, **kwargs):
+        response = await self.client.request(method, path, self.service_key, **kwargs)
+        if response.status_code not in (200, 201, 204, 206, 422):
+            raise RuntimeError(f"{method} {path} returned {response.status_code}: {response.text[:200]}")
+        return response
+
+    async def ensure_users(self, count):
+        for index in range(count):
+            await self.call("POST", "/auth/v1/admin/users", json={
+                "id": bench_id(index), "email": bench_email(index), "password": BENCH_PASSWORD,
+                "email_confirm": True})
+        await self.insert("user_profiles", [
+            {"id": bench_id(i), "username": f"feed_bench_{i}", "display_name": f"Feed bench {i}",
+             "is_public": True, "allow_followers": True, "show_activity": True}
+            for i in range(count)], upsert=True)
+
+    async def insert(self, table, rows, upsert=False, chunk=1000):
+        prefer = "return=minimal" + (",resolution=merge-duplicates" if upsert else "")
+        for offset in range(0, len(rows), chunk):
+            await self.call("POST", f"/rest/v1/{table}", prefer=prefer, json=rows[offset:offset + chunk])
+
+    async def count(self, table, column, ids):
+        total = 0
+        for offset in range(0, len(ids), 100):
+            response = await self.call("HEAD", f"/rest/v1/{table}", prefer="count=exact", params={
+                column: f"in.({','.join(ids[offset:offset + 100])})", "limit": 1})
+            total += int(response.headers.get("content-range", "*/0").rsplit("/", 1)[1])
+        return total
+
+    async def cleanup(self, user_ids):
+        for offset in range(0, len(user_ids), 100):
+            ids = f"in.({','.join(user_ids[offset:offset + 100])})"
+            await self.call("DELETE", "/rest/v1/activity_feed", params={"user_id": ids})
+            await self.call("DELETE", "/rest/v1/user_follows", params={"follower_id": ids})
+            await self.call("DELETE", "/rest/v1/user_profiles", params={"id": ids})
+
+
+# ---- synthetic graph and activity ----
+
+def power_law_graph(users, alpha, mean_follows, rng):
+    """{follower: [followees]}: popularity ~ rank^-alpha, follow-list sizes heavy-tailed around the mean"""
+    weights = [(rank + 1) ** -alpha for rank in range(users)]
+    ranked = list(range(users))
+    rng.shuffle(ranked)  # popularity is unrelated to account index
+    graph = {}
+    for follower in range(users):
+        size = min(users - 1, max(1, int(rng.paretovariate(2.0) * mean_follows / 2)))
+        chosen = set()
+        while len(chosen) < size:
+            for followee in rng.choices(ranked, weights=weights, k=size - len(chosen)):
+                if followee != follower:
+                    chosen.add(followee)
+        graph[follower] = sorted(chosen)
+    return graph
+
+
+def synthetic_activities(users, count, alpha, now, rng):
+    """Activity rows with distinct timestamps over HISTORY_DAYS; posting volume is power-law too"""
+    weights = [(rank + 1) ** -(alpha / 2) for rank in range(users)]
+    actors = list(range(users))
+    rng.shuffle(actors)
+    rows = []
+    for actor in rng.choices(actors, weights=weights, k=count):
+        moment = now - timedelta(microseconds=rng.randrange(HISTORY_DAYS * 86_400_000_000))
+        rows.append({
+            "id": str(uuid.uuid4()), "user_id": bench_id(actor), "activity_type": rng.choice(ACTIVITY_TYPES),
+            "metadata": {"benchmark": True}, "is_public": rng.random() < 0.9,
+            "created_at": moment.isoformat(timespec="microseconds"),
+        })
+    return rows
+
+
+def expected_feed(reader, graph, activities):
+    """Public activity by the reader and everyone they follow, newest first, by id on ties"""
+    authors = {bench_id(reader)} | {bench_id(f) for f in graph[reader]}
+    rows = [a for a in activities if a["is_public"] and a["user_id"] in authors]
+    rows.sort(key=lambda a: (datetime.fromisoformat(a["created_at"]), a["id"]), reverse=True)
+    return [a["id"] for a in rows]
+
+
+# ---- reads ----
+
+class Timer:
+    def __init__(self):
+        self.samples = collections.defaultdict(list)
+
+    async def measure(self, name, call):
+        started = time.perf_counter()
+        result = await call
+        self.samples[name].append((time.perf_counter() - started) * 1000)
+        return result
+
+
+def checked(response):
+    if response.status_code >= 400:
+        raise RuntimeError(f"{response.request.url.path} returned {response.status_code}: {response.text[:200]}")
+    return response.json()
+
+
+async def follow_list_pages(client, token, user_id, pages, page_size):
+    """ActivityService.getActivityFeed before the inbox, one request pair per page, offset-paged"""
+    following = checked(await client.request("GET", "/rest/v1/user_follows", token, params={
+        "select": "following_id", "follower_id": f"eq.{user_id}"}))
+    ids = ",".join([user_id] + [f["following_id"] for f in following])
+    result = []
+    for page in range(pages):
+        result.append(checked(await client.request("GET", "/rest/v1/activity_feed", token, params={
+            "select": "*", "user_id": f"in.({ids})", "is_public": "eq.true",
+            "order": "created_at.desc,id.desc", "limit": page_size, "offset": page * page_size})))
+    return result
+
+
+async def inbox_page(client, token, user_id, page_size, cursor):
+    return checked(await client.rpc("get_activity_feed", {
+        "p_user_id": user_id, "p_limit": page_size,
+        "p_before_created_at": cursor[0] if cursor else None,
+        "p_before_id": cursor[1] if cursor else None}, token))
+
+
+def cursor_of(page):
+    return (page[-1]["created_at"], page[-1]["id"]) if page else None
+
+
+async def measure_reader(client, timer, token, user_id, pages, page_size):
+    """Time one reader's first `pages` pages on both paths; True when every page matches"""
+    started = time.perf_counter()
+    legacy = await follow_list_pages(client, token, user_id, 1, page_size)
+    timer.samples["follow-list page 1"].append((time.perf_counter() - started) * 1000)
+    if pages > 1:
+        legacy = await timer.measure(f"follow-list pages 1-{pages}",
+                                     follow_list_pages(client, token, user_id, pages, page_size))
+
+    inbox, cursor = [], None
+    for page in range(pages):
+        rows = await timer.measure(f"inbox page {page + 1}" if page == 0 else "inbox page 2+",
+                                   inbox_page(client, token, user_id, page_size, cursor))
+        inbox.append(rows)
+        cursor = cursor_of(rows)
+    return [[r["id"] for r in p] for p in legacy] == [[r["id"] for r in p] for p in inbox]
+
+
+async def walk_feed(client, token, user_id, page_size):
+    ids, cursor = [], None
+    while True:
+        page = await inbox_page(client, token, user_id, page_size, cursor)
+        ids += [row["id"] for row in page]
+        if len(page) < page_size:
+            return ids
+        cursor = cursor_of(page)
+
+
+async def measure_public(client, timer, token, pages, page_size):
+    """Public feed page `pages`: offset vs cursor (the cursor walk is timed per page)"""
+    cursor = None
+    for page in range(pages):
+        params = {"select": "*", "is_public": "eq.true", "order": "created_at.desc,id.desc", "limit": page_size}
+        if cursor:
+            params["or"] = f'(created_at.lt."{cursor[0]}",and(created_at.eq."{cursor[0]}",id.lt.{cursor[1]}))'
+        rows = checked(await timer.measure("public cursor page", client.request(
+            "GET", "/rest/v1/activity_feed", token, params=params)))
+        cursor = cursor_of(rows)
+    offset_rows = checked(await timer.measure(f"public offset page {pages}", client.request(
+        "GET", "/rest/v1/activity_feed", token, params={
+            "select": "*", "is_public": "eq.true", "order": "created_at.desc,id.desc",
+            "limit": page_size, "offset": (pages - 1) * page_size})))
+    return [r["id"] for r in offset_rows] == [r["id"] for r in rows]
+
+
+# ---- run ----
+
+def bucket_name(low, high):
+    return f"{low}+" if high is None else f"{low}-{high}"
+
+
+async def run(url, anon_key, service_key, args):
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    user_ids = [bench_id(i) for i in range(args.users)]
+    graph = power_law_graph(args.users, args.alpha, args.mean_follows, rng)
+    followers = collections.Counter(followee for followees in graph.values() for followee in followees)
+
+    # the last LATE_FOLLOWS edges are added after the activity, to measure the follow backfill
+    edges = [(f, e) for f, followees in graph.items() for e in followees]
+    rng.shuffle(edges)
+    late = edges[-LATE_FOLLOWS:] if len(edges) > LATE_FOLLOWS else []
+    early = edges[:len(edges) - len(late)]
+    activities = synthetic_activities(args.users, args.activities, args.alpha, now, rng)
+    sample = activities[:args.write_sample]
+    bulk = activities[args.write_sample:]
+    result = {"users": args.users, "follows": len(edges), "activities": len(activities)}
+
+    async with AsyncSupabaseClient(url, anon_key) as client:
+        admin = Admin(client, service_key)
+        await admin.ensure_users(args.users)
+        await admin.cleanup(user_ids)
+        try:
+            await admin.insert("user_follows", [
+                {"follower_id": bench_id(f), "following_id": bench_id(e)} for f, e in early])
+            await admin.insert("activity_feed", bulk)
+
+            # single-activity writes, as ActivityService.createActivity makes them
+            by_bucket = collections.defaultdict(list)
+            early_followers = collections.Counter(bench_id(e) for _, e in early)
+            for row in sample:
+                started = time.perf_counter()
+                await admin.call("POST", "/rest/v1/activity_feed", prefer="return=minimal", json=row)
+                elapsed = (time.perf_counter() - started) * 1000
+                n = early_followers[row["user_id"]]
+                for low, high in FOLLOWER_BUCKETS:
+                    if n >= low and (high is None or n <= high):
+                        by_bucket[bucket_name(low, high)].append(elapsed)
+            inbox_rows = await admin.count("activity_feed_inbox", "owner_id", user_ids)
+
+            await admin.insert("user_follows", [
+                {"follower_id": bench_id(f), "following_id": bench_id(e)} for f, e in late], chunk=1)
+            backfill_rows = await admin.count("activity_feed_inbox", "owner_id", user_ids) - inbox_rows
+
+            public = sum(1 for a in activities if a["is_public"])
+            fan_out = sorted(1 + early_followers[a["user_id"]] for a in activities if a["is_public"])
+            result["writes"] = {
+                "public_activities": public,
+                "inbox_rows": inbox_rows,
+                "rows_per_activity": round(inbox_rows / max(public, 1), 2),
+                "fan_out_p50": percentile(fan_out, 50),
+                "fan_out_p99": percentile(fan_out, 99),
+                "fan_out_max": fan_out[-1] if fan_out else 0,
+                "late_follows": len(late),
+                "backfill_rows_per_follow": round(backfill_rows / max(len(late), 1), 2),
+                "insert_ms_by_followers": {
+                    name: {"n": len(v), "p50": round(percentile(sorted(v), 50), 2),
+                           "p95": round(percentile(sorted(v), 95), 2)}
+                    for name, v in sorted(by_bucket.items())},
+            }
+
+            # readers: the biggest follow lists plus a random sample
+            heavy = sorted(graph, key=lambda r: len(graph[r]), reverse=True)[:args.readers // 2]
+            others = [r for r in graph if r not in heavy]
+            readers = heavy + rng.sample(others, min(len(others), args.readers - len(heavy)))
+            timer = Timer()
+            matched = walked_ok = 0
+            for position, reader in enumerate(readers):
+                session = checked(await client.sign_in(bench_email(reader), BENCH_PASSWORD))
+                token = session["access_token"]
+                for _ in range(args.repeat):
+                    matched += await measure_reader(client, timer, token, bench_id(reader), args.pages, args.page_size)
+                if position < WALKED_READERS:
+                    walked = await walk_feed(client, token, bench_id(reader), args.page_size)
+                    walked_ok += walked == expected_feed(reader, graph, activities)
+            public_ok = await measure_public(client, timer, token, args.pages * 4, args.page_size)
+
+            result["readers"] = {
+                "count": len(readers),
+                "following_p50": statistics.median(len(graph[r]) for r in readers),
+                "following_max": max(len(graph[r]) for r in readers),
+            }
+            result["reads_ms"] = {
+                name: {"n": len(v), "p50": round(percentile(sorted(v), 50), 2),
+                       "p95": round(percentile(sorted(v), 95), 2)}
+                for name, v in timer.samples.items()}
+            result["checks"] = {
+                "pages_match": matched == len(readers) * args.repeat,
+                "walked_feeds_match": walked_ok == min(WALKED_READERS, len(readers)),
+                "public_cursor_matches_offset": public_ok,
+            }
+        finally:
+            if not args.keep:
+                await admin.cleanup(user_ids)
+    result["follower_distribution"] = {
+        "max": max(followers.values(), default=0),
+        "p50": statistics.median(followers.get(i, 0) for i in range(args.users)),
+    }
+    return result
+
+
+def print_result(result):
+    writes = result["writes"]
+    print(f"\n  Graph: {result['users']:,} users, {result['follows']:,} follows "
+          f"(followers p50 {result['follower_distribution']['p50']}, max {result['follower_distribution']['max']}), "
+          f"{result['activities']:,} activities")
+    print("\n  Write amplification")
+    print(f"    inbox rows per public activity: {writes['rows_per_activity']} "
+          f"(fan-out p50 {writes['fan_out_p50']}, p99 {writes['fan_out_p99']}, max {writes['fan_out_max']})")
+    print(f"    inbox rows per late follow:     {writes['backfill_rows_per_follow']} ({writes['late_follows']} follows)")
+    for name, stats in writes["insert_ms_by_followers"].items():
+        print(f"    insert, actor with {name:>6} followers: p50 {stats['p50']:8.2f} ms  "
+              f"p95 {stats['p95']:8.2f} ms  (n={stats['n']})")
+    readers = result["readers"]
+    print(f"\n  Read latency ({readers['count']} readers, following p50 {readers['following_p50']}, "
+          f"max {readers['following_max']})")
+    for name, stats in result["reads_ms"].items():
+        print(f"    {name:<24} p50 {stats['p50']:8.2f} ms  p95 {stats['p95']:8.2f} ms  (n={stats['n']})")
+    print()
+    for name, ok in result["checks"].items():
+        print(f"  {'✓' if ok else '✗'} {name.replace('_', ' ')}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the fan-out activity feed inbox")
+    parser.add_argument("--url", help="Supabase URL (default: start local_supabase in-process)")
+    parser.add_argument("--anon-key", default=ANON_KEY)
+    parser.add_argument("--service-key", default=os.environ.get("SUPABASE_SERVICE_ROLE_KEY"))
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS)
+    parser.add_argument("--activities", type=int, default=DEFAULT_ACTIVITIES)
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="power-law exponent of popularity")
+    parser.add_argument("--mean-follows", type=int, default=DEFAULT_MEAN_FOLLOWS)
+    parser.add_argument("--readers", type=int, default=DEFAULT_READERS)
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES)
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--write-sample", type=int, default=DEFAULT_WRITE_SAMPLE)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark rows")
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    server = None
+    url, service_key = args.url, args.service_key
+    if url is None:
+        from local_supabase import SERVICE_ROLE_KEY, LocalSupabase
+        server = LocalSupabase().start()
+        url, service_key = server.url, SERVICE_ROLE_KEY
+    elif not service_key:
+        parser.error("--url needs --service-key or SUPABASE_SERVICE_ROLE_KEY")
+
+    print("=" * 80)
+    print(f"ACTIVITY FEED: follow-list query vs fan-out inbox against {url}")
+    print("=" * 80)
+    try:
+        result = asyncio.run(run(url, args.anon_key, service_key, args))
+    finally:
+        if server is not None:
+            server.stop()
+    print_result(result)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+    return all(result["checks"].values())
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Parallel, streaming, cache-aware deployment asset verifier.
+
+For every deployment URL (checked concurrently) this:
+
+  - fetches index.html and collects every referenced asset (script, link,
+    img), then crawls JS/CSS bodies for further references, which picks up
+    lazy chunks such as html2canvas.esm-*.js, purify.es-*.js and index.es-*.js
+  - streams each asset, hashing it (SHA-256) and scanning it for references
+    in constant memory, without ever holding a whole bundle
+  - records status, Content-Encoding, compressed (on-the-wire) and decoded
+    size, Cache-Control, ETag / Last-Modified and latency
+  - re-requests with If-None-Match / If-Modified-Since and expects a 304
+  - checks that the Supabase project ref is embedded in at least one JS chunk
+
+Usage:
+    python3 asset_verifier.py https://god7aypl3xkb.space.minimax.io https://jecpj8btabxn.space.minimax.io
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import time
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+PROJECT_REF = b"poadoavnqqtdkqnpszaw"
+USER_AGENT = "Mozilla/5.0 (Goals Tracker asset verifier)"
+DEFAULT_CONCURRENCY = 16
+CHUNK_SIZE = 64 * 1024
+ONE_YEAR = 365 * 24 * 3600
+
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "br, gzip, deflate"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# References inside JS/CSS: dynamic imports ("./chunk.js"), Vite asset URLs and CSS url(...)
+REFERENCE_RE = re.compile(
+    rb"""(?:["'(]|url\()\s*((?:\./|/assets/|assets/|/images/)[A-Za-z0-9_.~%/-]+\.(?:js|mjs|css|png|jpe?g|webp|svg|gif|woff2?|ttf))"""
+    rb"""(?![\w.])"""  # the whole extension: x.json is not x.js, x.css.map is not x.css
+)
+# Vite content hash in file names, e.g. index-DqGh-wly.js
+HASHED_NAME_RE = re.compile(r"[.-][A-Za-z0-9_-]{8}\.[a-z0-9]+$")
+# Longest reference we keep across chunk boundaries
+SCAN_OVERLAP = 512
+
+
+class AssetLinkParser(HTMLParser):
+    """Collect asset URLs from <script src>, <link href> and <img src>"""
+
+    def __init__(self):
+        super().__init__()
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ("script", "img", "source") and attrs.get("src"):
+            self.links.append(attrs["src"])
+        elif tag == "link" and attrs.get("href"):
+            self.links.append(attrs["href"])
+
+
+def parse_cache_control(value):
+    directives = {}
+    for part in (value or "").split(","):
+        key, _, arg = part.strip().partition("=")
+        if key:
+            directives[key.lower()] = arg.strip('"')
+    return directives
+
+
+def _max_age(directives):
+    value = directives.get("s-maxage") or directives.get("max-age") or "0"
+    return int(value) if value.isdigit() else 0
+
+
+def cache_findings(path, headers):
+    """Warnings about caching headers for one asset"""
+    findings = []
+    directives = parse_cache_control(headers.get("cache-control"))
+    if HASHED_NAME_RE.search(path):
+        if _max_age(directives) < ONE_YEAR and "immutable" not in directives:
+            findings.append("hashed asset not cached long-term (want max-age>=31536000 or immutable)")
+    elif path.endswith((".html", "/")) and "no-cache" not in directives and _max_age(directives) > 300:
+        findings.append("HTML cached for more than 5 minutes without revalidation")
+    if not headers.get("etag") and not headers.get("last-modified"):
+        findings.append("no ETag or Last-Modified; conditional requests impossible")
+    return findings
+
+
+class AssetResult:
+    """Measurements for one fetched asset"""
+
+    def __init__(self, url):
+        self.url = url
+        self.path = urlsplit(url).path
+        self.status = None
+        self.content_type = None
+        self.content_encoding = None
+        self.cache_control = None
+        self.etag = None
+        self.last_modified = None
+        self.size = 0
+        self.compressed_size = 0
+        self.sha256 = None
+        self.ttfb_ms = None
+        self.latency_ms = None
+        self.conditional_status = None
+        self.conditional_ms = None
+        self.contains_project_ref = False
+        self.references = set()
+        self.findings = []
+        self.error = None
+        self.body = None
+
+    @property
+    def ok(self):
+        return self.error is None and self.status == 200
+
+    def to_dict(self):
+        data = {k: v for k, v in vars(self).items() if k not in ("references", "body")}
+        data["references"] = sorted(self.references)
+        return data
+
+
+async def stream_asset(client, url, scan=False, keep_body=False):
+    """GET `url`, hashing and (optionally) scanning the body chunk by chunk
+
+    Only small documents (index.html) should use keep_body; bundles are
+    never buffered.
+    """
+    result = AssetResult(url)
+    body = [] if keep_body else None
+    started = time.perf_counter()
+    digest = hashlib.sha256()
+    tail = b""
+    try:
+        async with client.stream("GET", url) as response:
+            result.ttfb_ms = (time.perf_counter() - started) * 1000
+            result.status = response.status_code
+            headers = response.headers
+            result.content_type = headers.get("content-type")
+            result.content_encoding = headers.get("content-encoding")
+            result.cache_control = headers.get("cache-control")
+            result.etag = headers.get("etag")
+            result.last_modified = headers.get("last-modified")
+            async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                digest.update(chunk)
+                result.size += len(chunk)
+                if body is not None:
+                    body.append(chunk)
+                if scan:
+                    window = tail + chunk
+                    if not result.contains_project_ref and PROJECT_REF in window:
+                        result.contains_project_ref = True
+                    for match in REFERENCE_RE.finditer(window):
+                        # one ending with the window may go on in the next chunk (x.js|on); rescanned there
+                        if match.end() < len(window):
+                            result.references.add(match.group(1).decode("ascii", "replace"))
+                    tail = window[-SCAN_OVERLAP:]
+            for match in REFERENCE_RE.finditer(tail):
+                result.references.add(match.group(1).decode("ascii", "replace"))
+            result.compressed_size = response.num_bytes_downloaded
+    except httpx.HTTPError as e:
+        result.error = f"{type(e).__name__}: {e}"
+        return result
+    result.latency_ms = (time.perf_counter() - started) * 1000
+    result.sha256 = digest.hexdigest()
+    result.findings = cache_findings(result.path, headers)
+    if body is not None:
+        result.body = b"".join(body)
+    return result
+
+
+async def revalidate(client, result):
+    """Conditional re-request; a well-behaved server answers 304 without a body"""
+    headers = {}
+    if result.etag:
+        headers["If-None-Match"] = result.etag
+    elif result.last_modified:
+        headers["If-Modified-Since"] = result.last_modified
+    else:
+        return
+    started = time.perf_counter()
+    try:
+        response = await client.get(result.url, headers=headers)
+    except httpx.HTTPError as e:
+        result.findings.append(f"conditional request failed: {type(e).__name__}")
+        return
+    result.conditional_ms = (time.perf_counter() - started) * 1000
+    result.conditional_status = response.status_code
+    if response.status_code != 304:
+        result.findings.append(f"conditional request returned {response.status_code}, expected 304")
+
+
+async def verify_deployment(client, url, semaphore):
+    """Fetch index.html, crawl every asset it (transitively) references and verify each"""
+    base = url.rstrip("/") + "/"
+    report = {"deployment": url, "assets": [], "error": None}
+
+    async with semaphore:
+        page = await stream_asset(client, base, keep_body=True)
+        if page.ok:
+            await revalidate(client, page)
+    if not page.ok:
+        report["error"] = page.error or f"index.html returned {page.status}"
+        return report
+    html = page.body.decode("utf-8", "replace")
+    report["root_div"] = '<div id="root">' in html
+    report["index"] = page
+
+    parser = AssetLinkParser()
+    parser.feed(html)
+    seen = set()
+    pending = []
+
+    def enqueue(link, parent):
+        absolute = urljoin(parent, link)
+        if urlsplit(absolute).netloc != urlsplit(base).netloc or absolute in seen:
+            return
+        seen.add(absolute)
+        pending.append(asyncio.create_task(check(absolute)))
+
+    async def check(asset_url):
+        async with semaphore:
+            scan = asset_url.endswith((".js", ".mjs", ".css"))
+            result = await stream_asset(client, asset_url, scan=scan)
+            if result.ok:
+                await revalidate(client, result)
+        for reference in result.references:
+            enqueue(reference, asset_url)
+        return result
+
+    for link in parser.links:
+        enqueue(link, base)
+    while pending:
+        done = pending[:]
+        pending.clear()
+        report["assets"].extend(await asyncio.gather(*done))
+
+    report["assets"].sort(key=lambda a: a.path)
+    report["project_ref_embedded"] = any(a.contains_project_ref for a in report["assets"])
+    return report
+
+
+async def verify_deployments(urls, concurrency=DEFAULT_CONCURRENCY, timeout=30.0):
+    semaphore = asyncio.Semaphore(concurrency)
+    headers = {"User-Agent": USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(headers=headers, timeout=timeout, limits=limits, follow_redirects=True) as client:
+        return await asyncio.gather(*(verify_deployment(client, url, semaphore) for url in urls))
+
+
+def _kb(n):
+    return f"{n / 1024:.1f}"
+
+
+def print_report(report):
+    print(f"\nTesting: {report['deployment']}")
+    print("=" * 110)
+    if report["error"]:
+        print(f"✗ Failed to load page: {report['error']}")
+        return False
+    index = report["index"]
+    print(f"✓ HTML loaded: {index.size} bytes  (status {index.status}, {index.latency_ms:.0f} ms)")
+    print("✓ Root div found" if report["root_div"] else "✗ Root div NOT found")
+    print("✓ Supabase URL embedded in JS" if report["project_ref_embedded"] else "✗ Supabase URL NOT found in JS")
+
+    print(f"\n  {'Asset':<42}{'St':>4}{'Size KB':>10}{'Wire KB':>10}{'Enc':>6}{'ms':>8}{'304':>5}  Cache-Control")
+    print("  " + "-" * 106)
+    ok = report["root_div"] and report["project_ref_embedded"]
+    for asset in report["assets"]:
+        if asset.error:
+            print(f"  {asset.path:<42} ✗ {asset.error}")
+            ok = False
+            continue
+        revalidated = {304: "yes", None: "-"}.get(asset.conditional_status, "no")
+        print(f"  {asset.path[-42:]:<42}{asset.status:>4}{_kb(asset.size):>10}{_kb(asset.compressed_size):>10}"
+              f"{(asset.content_encoding or '-'):>6}{asset.latency_ms:>8.0f}{revalidated:>5}  {asset.cache_control or '-'}")
+        for finding in asset.findings:
+            print(f"  {'':<42}⚠ {finding}")
+        ok = ok and asset.ok
+    total = sum(a.size for a in report["assets"])
+    wire = sum(a.compressed_size for a in report["assets"])
+    print(f"\n  {len(report['assets'])} assets, {_kb(total)} KB decoded, {_kb(wire)} KB on the wire")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify deployment assets concurrently")
+    parser.add_argument("urls", nargs="+", help="deployment URLs")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--json", dest="json_path", help="write the full report to this file")
+    args = parser.parse_args(argv)
+
+    reports = asyncio.run(verify_deployments(args.urls, args.concurrency))
+    all_ok = all([print_report(report) for report in reports])
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump([serializable(r) for r in reports], f, indent=2)
+    return all_ok
+
+
+def serializable(report):
+    data = dict(report)
+    data["assets"] = [a.to_dict() for a in report["assets"]]
+    if "index" in data:
+        data["index"] = data["index"].to_dict()
+    return data
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Declarative auth config for every project: plan, then apply only the diff.
+
+Reads a desired-state file:
+
+    {
+      "defaults": {"mailer_autoconfirm": true},
+      "projects": {
+        "poadoavnqqtdkqnpszaw": {"mailer_allow_unverified_email_sign_ins": true},
+        "<another ref>": {}
+      }
+    }
+
+and for every project, concurrently:
+
+  1. GETs /v1/projects/{ref}/config/auth from the Management API
+  2. diffs it key by key against defaults + the project's own keys. Keys
+     are normalized to the API's lower snake_case, so MAILER_AUTOCONFIRM,
+     mailerAutoconfirm and mailer_autoconfirm are the same setting (the old
+     scripts PATCHed upper-case keys and read lower-case ones). Keys the
+     API does not return are reported as unknown and block that project
+  3. with --apply, PATCHes only the keys that differ and checks the
+     response shows the new values
+
+Write-only settings (secrets such as smtp_pass) come back as null, so they
+are compared by the SHA-256 of the last value applied. That digest is kept
+in a snapshot file together with the digest of the desired state and the
+time the project was last seen in sync; a project whose desired state has
+not changed since it was last in sync (within --max-age) is skipped without
+a request. --refresh ignores the snapshots, and so does --check: a snapshot
+only records the last time the project was seen in sync, not that nobody
+has changed it since.
+
+The Management API token comes from SUPABASE_ACCESS_TOKEN (or
+--access-token); there is no default.
+
+Requests are bounded by --concurrency, and 429/5xx responses are retried
+with backoff (Retry-After when given).
+
+Replaces check_auth_config.py (--show), update_auth_config.py,
+fix_supabase_auth_config.py and update_auth_allow_unverified.py (--set
+... --apply), which are now thin wrappers.
+
+Usage:
+    python3 auth_config.py                                  # plan for auth_config.json
+    python3 auth_config.py --apply
+    python3 auth_config.py --desired fleet.json --apply --concurrency 16
+    python3 auth_config.py --project <ref> --set mailer_autoconfirm=true --apply
+    python3 auth_config.py --project <ref> --show mailer_autoconfirm,disable_signup
+    python3 auth_config.py --check                          # exit 1 when any project drifted
+    SUPABASE_API_URL=http://127.0.0.1:54321 python3 auth_config.py --refresh
+"""
+import argparse
+import asyncio
+import collections
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+API_URL = os.environ.get("SUPABASE_API_URL", "https://api.supabase.com")
+ACCESS_TOKEN = os.environ.get("SUPABASE_ACCESS_TOKEN")
+DEFAULT_PROJECT = "poadoavnqqtdkqnpszaw"
+DESIRED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "auth_config.json")
+SNAPSHOT_PATH = os.environ.get(
+    "SUPABASE_AUTH_CONFIG_SNAPSHOTS",
+    os.path.join(os.path.expanduser("~"), ".cache", "goals_tracker", "auth_config_snapshots.json"),
+)
+DEFAULT_CONCURRENCY = 8
+DEFAULT_MAX_AGE = 3600  # seconds a snapshot lets an unchanged project be skipped
+MAX_ATTEMPTS = 4
+SECRET_KEY = re.compile(r"(secret|secrets|_pass|password|auth_token|api_key)$")
+
+# one differing key; before/after are None for secrets, which are never printed
+Change = collections.namedtuple("Change", "key before after secret")
+
+# outcome per project: status is skipped | in_sync | drift | applied | blocked | failed
+Result = collections.namedtuple("Result", "ref status changes unknown message")
+
+
+class ConfigError(Exception):
+    """The desired-state file or a --set value cannot be used"""
+
+
+def normalize_key(key):
+    """MAILER_AUTOCONFIRM / mailerAutoconfirm / mailer_autoconfirm -> mailer_autoconfirm"""
+    key = re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1", key.strip()) if not key.isupper() else key.strip()
+    return key.lower()
+
+
+def normalize(settings, origin):
+    normalized = {}
+    for key, value in settings.items():
+        name = normalize_key(key)
+        if name in normalized and normalized[name] != value:
+            raise ConfigError(f"{origin}: {key} conflicts with another spelling of {name}")
+        normalized[name] = value
+    return normalized
+
+
+def parse_value(text):
+    """--set values are JSON when they parse (true, 3600, null, "x"), plain strings otherwise"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def load_desired(path, projects=None, overrides=None):
+    """{ref: {key: value}} from the desired-state file, narrowed to `projects`, with --set overrides"""
+    document = {}
+    if path and os.path.exists(path):
+        with open(path) as f:
+            document = json.load(f)
+    elif path and not projects:
+        raise ConfigError(f"{path} does not exist")
+    defaults = normalize(document.get("defaults") or {}, "defaults")
+    listed = document.get("projects") or {}
+    refs = projects or list(listed)
+    if not refs:
+        raise ConfigError("no projects: add them to the desired-state file or pass --project")
+    extra = normalize(overrides or {}, "--set")
+    desired = {}
+    for ref in refs:
+        settings = dict(defaults)
+        settings.update(normalize(listed.get(ref) or {}, ref))
+        settings.update(extra)
+        desired[ref] = settings
+    return desired
+
+
+def digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def same(current, wanted):
+    if isinstance(current, bool) or isinstance(wanted, bool):
+        return current is wanted
+    if isinstance(current, (int, float)) and isinstance(wanted, (int, float)):
+        return current == wanted
+    if current in (None, "") and wanted in (None, ""):
+        return True
+    return current == wanted
+
+
+def diff(current, wanted, secret_digests):
+    """(changes, unknown keys) turning `current` into `wanted`"""
+    changes, unknown = [], []
+    for key, value in sorted(wanted.items()):
+        if key not in current:
+            unknown.append(key)
+        elif SECRET_KEY.search(key):
+            if secret_digests.get(key) != digest(value):
+                changes.append(Change(key, None, None, True))
+        elif not same(current[key], value):
+            changes.append(Change(key, current[key], value, False))
+    return changes, unknown
+
+
+# ---- snapshots ----
+
+class SnapshotStore:
+    """Per-project digests of the last desired state seen in sync, in one JSON file"""
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = path
+        self.snapshots = {}
+        if path:
+            try:
+                with open(path) as f:
+                    self.snapshots = json.load(f)
+            except (OSError, ValueError):
+                self.snapshots = {}
+
+    def key(self, api_url, ref):
+        return f"{api_url}|{ref}"
+
+    def get(self, api_url, ref):
+        return self.snapshots.get(self.key(api_url, ref)) or {}
+
+    def fresh(self, api_url, ref, wanted, max_age):
+        snapshot = self.get(api_url, ref)
+        return (snapshot.get("desired") == digest(wanted)
+                and time.time() - snapshot.get("in_sync_at", 0) < max_age)
+
+    def record(self, api_url, ref, wanted, config, secret_digests):
+        self.snapshots[self.key(api_url, ref)] = {
+            "desired": digest(wanted),
+            "config": digest(config),
+            "secrets": secret_digests,
+            "in_sync_at": time.time(),
+        }
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", prefix=".auth-config-")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.snapshots, f, indent=1, sort_keys=True)
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, self.path)
+
+
+# ---- Management API ----
+
+class ManagementApi:
+    """GET/PATCH of /v1/projects/{ref}/config/auth with bounded concurrency and retries"""
+
+    def __init__(self, api_url=API_URL, access_token=ACCESS_TOKEN, concurrency=DEFAULT_CONCURRENCY):
+        self.api_url = api_url.rstrip("/")
+        self.http = httpx.AsyncClient(base_url=self.api_url, timeout=30.0, headers={
+            "Authorization": f"Bearer {access_token}", "Content-Type": "application/json"})
+        self.gate = asyncio.Semaphore(concurrency)
+        self.requests = 0
+
+    async def close(self):
+        await self.http.aclose()
+
+    async def call(self, method, ref, body=None):
+        """Parsed JSON body; raises RuntimeError with the status and message otherwise"""
+        path = f"/v1/projects/{ref}/config/auth"
+        for attempt in range(MAX_ATTEMPTS):
+            async with self.gate:
+                self.requests += 1
+                try:
+                    response = await self.http.request(method, path, json=body)
+                except httpx.HTTPError as e:
+                    response, error = None, f"{type(e).__name__}: {e}"
+            if response is not None:
+                if response.status_code == 200:
+                    return response.json()
+                error = f"{method} returned {response.status_code}: {response.text[:200]}"
+                if response.status_code != 429 and response.status_code < 500:
+                    break
+            if attempt + 1 < MAX_ATTEMPTS:
+                retry_after = response.headers.get("retry-after") if response is not None else None
+                await asyncio.sleep(float(retry_after) if retry_after and retry_after.isdigit() else 0.5 * 2 ** attempt)
+        raise RuntimeError(error)
+
+
+async def reconcile(api, snapshots, ref, wanted, apply, refresh, max_age, allow_unknown):
+    if not refresh and snapshots.fresh(api.api_url, ref, wanted, max_age):
+        return Result(ref, "skipped", [], [], "unchanged since last seen in sync")
+    try:
+        current = await api.call("GET", ref)
+    except RuntimeError as e:
+        return Result(ref, "failed", [], [], str(e))
+    secret_digests = snapshots.get(api.api_url, ref).get("secrets", {})
+    changes, unknown = diff(current, wanted, secret_digests)
+    known = {k: v for k, v in wanted.items() if k not in unknown}
+    if unknown and not allow_unknown:
+        return Result(ref, "blocked", changes, unknown, "unknown keys; fix them or pass --allow-unknown")
+    if not changes:
+        snapshots.record(api.api_url, ref, wanted, current, secret_digests)
+        return Result(ref, "in_sync", [], unknown, None)
+    if not apply:
+        return Result(ref, "drift", changes, unknown, None)
+
+    try:
+        updated = await api.call("PATCH", ref, {c.key: known[c.key] for c in changes})
+    except RuntimeError as e:
+        return Result(ref, "failed", changes, unknown, str(e))
+    missed = [c.key for c in changes if not c.secret and not same(updated.get(c.key), known[c.key])]
+    if missed:
+        return Result(ref, "failed", changes, unknown, f"PATCH accepted but not applied: {', '.join(missed)}")
+    secret_digests = dict(secret_digests)
+    secret_digests.update({c.key: digest(known[c.key]) for c in changes if c.secret})
+    snapshots.record(api.api_url, ref, wanted, updated, secret_digests)
+    return Result(ref, "applied", changes, unknown, None)
+
+
+async def run(desired, args):
+    snapshots = SnapshotStore(args.snapshots)
+    api = ManagementApi(args.api_url, args.access_token, args.concurrency)
+    try:
+        results = await asyncio.gather(*(
+            reconcile(api, snapshots, ref, wanted, args.apply, args.refresh, args.max_age, args.allow_unknown)
+            for ref, wanted in desired.items()))
+    finally:
+        await api.close()
+    snapshots.save()
+    return results, api.requests
+
+
+async def show(refs, keys, args):
+    api = ManagementApi(args.api_url, args.access_token, args.concurrency)
+    try:
+        configs = await asyncio.gather(*(api.call("GET", ref) for ref in refs), return_exceptions=True)
+    finally:
+        await api.close()
+    ok = True
+    for ref, config in zip(refs, configs):
+        print(f"\n  {ref}")
+        if isinstance(config, Exception):
+            print(f"    ✗ {config}")
+            ok = False
+            continue
+        for key in keys or sorted(config):
+            print(f"    {key}: {config.get(key, '(not returned)')}")
+    return ok
+
+
+# ---- output ----
+
+def format_value(value):
+    return json.dumps(value) if not isinstance(value, str) else repr(value)
+
+
+def print_results(results, apply, requests, elapsed):
+    counts = collections.Counter(r.status for r in results)
+    for result in sorted(results, key=lambda r: r.ref):
+        mark = "✗" if result.status in ("failed", "blocked") else "✓" if result.status != "drift" else "~"
+        label = {"skipped": "skipped", "in_sync": "in sync", "drift": f"{len(result.changes)} to change",
+                 "applied": f"{len(result.changes)} changed", "blocked": "blocked", "failed": "failed"}
+        print(f"\n  {mark} {result.ref:<24} {label[result.status]}" + (f": {result.message}" if result.message else ""))
+        for change in result.changes:
+            if change.secret:
+                print(f"      ~ {change.key}: (secret, differs from the last value applied)")
+            else:
+                print(f"      ~ {change.key}: {format_value(change.before)} -> {format_value(change.after)}")
+        for key in result.unknown:
+            print(f"      ? {key}: not a setting of this project's auth config")
+    keys = sum(len(r.changes) for r in results if r.status in ("drift", "applied"))
+    verb = "changed" if apply else "to change"
+    print(f"\n  {len(results)} projects: {counts['applied'] + counts['drift']} {verb} ({keys} keys), "
+          f"{counts['in_sync']} in sync, {counts['skipped']} skipped, "
+          f"{counts['blocked'] + counts['failed']} failed; {requests} requests in {elapsed:.2f} s")
+    if not apply and counts["drift"]:
+        print("  Plan only: re-run with --apply to PATCH these keys")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan and apply auth config for many Supabase projects")
+    parser.add_argument("--desired", default=DESIRED_PATH,
+                        help="desired-state JSON (default: auth_config.json; '' for --set values only)")
+    parser.add_argument("--project", action="append", dest="projects",
+                        help="limit to this project ref (repeatable; refs need not be in the file)")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="desired value on top of the file (JSON value: true, 3600, \"text\")")
+    parser.add_argument("--apply", action="store_true", help="PATCH the differences (default: plan only)")
+    parser.add_argument("--check", action="store_true",
+                        help="fetch every project (implies --refresh); exit 1 when any is not in sync")
+    parser.add_argument("--show", metavar="KEYS", nargs="?", const="",
+                        help="print the current values of comma-separated KEYS (all keys when empty)")
+    parser.add_argument("--refresh", action="store_true", help="ignore snapshots and fetch every project")
+    parser.add_argument("--allow-unknown", action="store_true", help="apply known keys even if some are unknown")
+    parser.add_argument("--max-age", type=float, default=DEFAULT_MAX_AGE,
+                        help="seconds a snapshot lets an unchanged project be skipped")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--api-url", default=API_URL, help="Management API (default: SUPABASE_API_URL)")
+    parser.add_argument("--access-token", default=ACCESS_TOKEN, help="default: SUPABASE_ACCESS_TOKEN")
+    parser.add_argument("--snapshots", default=SNAPSHOT_PATH, help="snapshot file ('' disables snapshots)")
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    args = parser.parse_args(argv)
+    if not args.access_token:
+        parser.error("set SUPABASE_ACCESS_TOKEN or pass --access-token")
+    # drift made outside this tool is invisible to the snapshots
+    args.refresh = args.refresh or args.check
+
+    overrides = {}
+    for item in args.set:
+        key, sep, value = item.partition("=")
+        if not sep or not key.strip():
+            parser.error(f"--set expects KEY=VALUE, got {item!r}")
+        overrides[key] = parse_value(value)
+
+    if args.show is not None:
+        try:
+            refs = args.projects or list(load_desired(args.desired or None))
+        except (ConfigError, ValueError) as e:
+            parser.error(str(e))
+        keys = [normalize_key(k) for k in args.show.split(",") if k.strip()]
+        print("=" * 80)
+        print(f"AUTH CONFIG: {len(refs)} projects at {args.api_url}")
+        print("=" * 80)
+        return asyncio.run(show(refs, keys, args))
+
+    try:
+        desired = load_desired(args.desired or None, args.projects, overrides)
+    except (ConfigError, ValueError) as e:
+        parser.error(str(e))
+
+    print("=" * 80)
+    print(f"AUTH CONFIG {'APPLY' if args.apply else 'PLAN'}: {len(desired)} projects at {args.api_url}")
+    print("=" * 80)
+    started = time.perf_counter()
+    results, requests = asyncio.run(run(desired, args))
+    print_results(results, args.apply, requests, time.perf_counter() - started)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+                "apply": args.apply,
+                "projects": [{
+                    "ref": r.ref, "status": r.status, "message": r.message, "unknown": r.unknown,
+                    "changes": [{"key": c.key, "before": c.before, "after": c.after, "secret": c.secret}
+                                for c in r.changes],
+                } for r in results],
+            }, f, indent=2)
+    failed = any(r.status in ("failed", "blocked") for r in results)
+    drifted = any(r.status == "drift" for r in results)
+    return not failed and not (args.check and drifted)
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
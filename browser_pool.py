@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Shared Playwright browser pool for the browser checks.
+
+Chromium is launched once per process; every check gets its own isolated
+BrowserContext (cookies, storage and cache are not shared), and a
+semaphore bounds how many contexts are open at the same time. A
+deployment x viewport matrix runs concurrently on top of that.
+
+    async with BrowserPool(workers=4) as pool:
+        async with pool.page("https://example.space.minimax.io") as run:
+            await run.page.goto(run.url)
+            print(run.errors)
+
+        results = await pool.run_matrix(DEPLOYMENTS, ["desktop", "mobile"], check)
+"""
+import asyncio
+import contextlib
+import time
+
+from playwright.async_api import async_playwright
+
+DEFAULT_WORKERS = 4
+VIEWPORTS = {
+    "desktop": {"width": 1280, "height": 720},
+    "tablet": {"width": 768, "height": 1024},
+    "mobile": {"width": 390, "height": 844},
+}
+
+
+class PageRun:
+    """One page in its own context, with the errors and console output it produced"""
+
+    def __init__(self, page, url, viewport_name, viewport):
+        self.page = page
+        self.context = page.context
+        self.url = url
+        self.viewport_name = viewport_name
+        self.viewport = viewport
+        self.errors = []
+        self.console_messages = []
+        page.on("pageerror", lambda err: self.errors.append(f"PAGE ERROR: {err}"))
+        page.on("console", lambda msg: self.console_messages.append(f"[{msg.type}] {msg.text}"))
+
+    @property
+    def label(self):
+        return f"{self.url} [{self.viewport_name}]"
+
+
+class BrowserPool:
+    """Launches Chromium once and hands out isolated contexts, at most `workers` at a time"""
+
+    def __init__(self, workers=DEFAULT_WORKERS, headless=True, launch_args=None):
+        self.workers = workers
+        self.headless = headless
+        self.launch_args = launch_args or []
+        self.semaphore = asyncio.Semaphore(workers)
+        self._playwright = None
+        self.browser = None
+
+    async def start(self):
+        if self.browser is None:
+            self._playwright = await async_playwright().start()
+            self.browser = await self._playwright.chromium.launch(headless=self.headless, args=self.launch_args)
+        return self
+
+    async def close(self):
+        if self.browser is not None:
+            await self.browser.close()
+            self.browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    @contextlib.asynccontextmanager
+    async def page(self, url, viewport="desktop", **context_options):
+        """Yield a PageRun in a fresh context; `viewport` is a VIEWPORTS key or a size dict"""
+        if isinstance(viewport, str):
+            viewport_name, size = viewport, VIEWPORTS[viewport]
+        else:
+            viewport_name, size = f"{viewport['width']}x{viewport['height']}", viewport
+        async with self.semaphore:
+            context = await self.browser.new_context(viewport=size, **context_options)
+            try:
+                page = await context.new_page()
+                yield PageRun(page, url, viewport_name, size)
+            finally:
+                await context.close()
+
+    async def run_matrix(self, deployments, viewports, check):
+        """Run `await check(run)` for every deployment x viewport pair concurrently
+
+        Returns one dict per pair with the check's return value (or the
+        exception it raised), the page errors and the wall-clock duration.
+        """
+        async def one(url, viewport):
+            started = time.perf_counter()
+            async with self.page(url, viewport) as run:
+                try:
+                    result, error = await check(run), None
+                except Exception as e:
+                    result, error = None, f"{type(e).__name__}: {e}"
+                return {
+                    "url": url,
+                    "viewport": run.viewport_name,
+                    "result": result,
+                    "error": error,
+                    "page_errors": list(run.errors),
+                    "seconds": time.perf_counter() - started,
+                }
+
+        jobs = [one(url, viewport) for url in deployments for viewport in viewports]
+        return await asyncio.gather(*jobs)
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Bundle size analyzer and budget gate for the Vite build in goals_trackter/dist.
+
+For every chunk in dist/assets this reports:
+
+  - raw, gzip and brotli sizes, and whether it loads at startup (referenced
+    from index.html) or lazily
+  - per-module / per-package contribution, attributed byte by byte from the
+    chunk's sourcemap (V3 "mappings")
+  - modules that end up duplicated in more than one chunk
+
+It also walks the static import graph of goals_trackter/src to show which
+src/components/*Screen.tsx pull heavy dependencies (recharts, jsPDF, ...)
+into the entry chunk, and through which import chain.
+
+Per-chunk budgets and a stored baseline gate the build: any chunk over
+budget, or growing more than --max-growth percent (gzip) over the
+baseline, fails the run. Chunk sizes are also recorded in the
+perf_store.py history (deployment "build:<dist dir>").
+
+Sourcemaps are not part of the deployed build; produce them without the
+//# sourceMappingURL comment with:
+
+    cd goals_trackter && pnpm exec vite build --sourcemap hidden
+
+Without .map files, package presence in the entry chunk is only detected
+by marker strings and per-module contribution is skipped.
+
+Usage:
+    python3 bundle_analyzer.py --budgets budgets.json --baseline bundle_baseline.json
+    python3 bundle_analyzer.py --update-baseline
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+from collections import defaultdict, deque
+from html.parser import HTMLParser
+
+from perf_store import add_store_arguments, metric_samples, record_samples
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DIST_DIR = os.path.join(HERE, "goals_trackter", "dist")
+SRC_DIR = os.path.join(HERE, "goals_trackter", "src")
+BASELINE_PATH = "bundle_baseline.json"
+DEFAULT_MAX_GROWTH = 5.0  # percent, gzip
+
+# Budgets (KB) apply to every chunk unless overridden under "chunks": {"<name>": {...}},
+# where <name> is the file name without its content hash, e.g. "index.js".
+# The entry allowance is its current size so it only catches growth; lower it as it gets split.
+DEFAULT_BUDGETS = {
+    "raw_kb": 500,
+    "gzip_kb": 160,
+    "chunks": {
+        "index.js": {"raw_kb": 1600, "gzip_kb": 450},
+    },
+}
+
+# Dependencies that should never be on the startup path
+HEAVY_PACKAGES = ("recharts", "jspdf", "html2canvas", "react-big-calendar", "papaparse", "date-fns", "dompurify")
+# Packages contributing more than this to the entry chunk are reported as heavy too (needs sourcemaps)
+HEAVY_THRESHOLD_KB = 50
+
+# Strings that survive minification, used when a chunk has no sourcemap
+PACKAGE_MARKERS = {
+    "recharts": b"recharts-wrapper",
+    "jspdf": b"jsPDF",
+    "html2canvas": b"html2canvas",
+    "react-big-calendar": b"rbc-calendar",
+    "dompurify": b"DOMPurify",
+    "@supabase/supabase-js": b"supabase-js",
+}
+
+HASH_RE = re.compile(r"-[A-Za-z0-9_-]{8}(?=\.[a-z0-9]+$)")
+IMPORT_RE = re.compile(
+    r"""^\s*(?:import|export)\s+(type\s+)?(?:[\w*{}\s,$]+?\s+from\s+)?['"]([^'"]+)['"]""",
+    re.MULTILINE,
+)
+DYNAMIC_IMPORT_RE = re.compile(r"""\bimport\(\s*['"]([^'"]+)['"]\s*\)""")
+SOURCE_EXTENSIONS = (".tsx", ".ts", ".jsx", ".js")
+VLQ_CHARS = {c: i for i, c in enumerate("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/")}
+
+
+def chunk_name(filename):
+    """Stable chunk key: file name without the Vite content hash"""
+    return HASH_RE.sub("", filename)
+
+
+def compressed_sizes(data):
+    sizes = {"raw": len(data), "gzip": len(gzip.compress(data, 9))}
+    if brotli is not None:
+        sizes["brotli"] = len(brotli.compress(data, quality=11))
+    return sizes
+
+
+class EntryParser(HTMLParser):
+    """Collect the assets index.html loads at startup"""
+
+    def __init__(self):
+        super().__init__()
+        self.initial = set()
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "script" and attrs.get("src"):
+            self.initial.add(os.path.basename(attrs["src"]))
+        elif tag == "link" and attrs.get("rel") in ("stylesheet", "modulepreload") and attrs.get("href"):
+            self.initial.add(os.path.basename(attrs["href"]))
+
+
+# -- sourcemaps -----------------------------------------------------------------
+
+def decode_vlq(segment):
+    values, shift, value = [], 0, 0
+    for char in segment:
+        digit = VLQ_CHARS[char]
+        value += (digit & 31) << shift
+        if digit & 32:
+            shift += 5
+            continue
+        values.append(-(value >> 1) if value & 1 else value >> 1)
+        shift = value = 0
+    return values
+
+
+def module_name(source):
+    """Normalise a sourcemap source to "pkg:<package>/<path>" or a src-relative path"""
+    source = source.replace("\\", "/")
+    if "node_modules/" in source:
+        tail = source.rsplit("node_modules/", 1)[1]
+        return "pkg:" + tail
+    if "/src/" in source or source.startswith("src/"):
+        return "src/" + source.split("src/", 1)[1]
+    return source.lstrip("./")
+
+
+def package_of(module):
+    if not module.startswith("pkg:"):
+        return os.path.dirname(module) or module
+    parts = module[4:].split("/")
+    return "/".join(parts[:2]) if parts[0].startswith("@") else parts[0]
+
+
+def attribute_bytes(code, sourcemap):
+    """Bytes of generated `code` per source module, from the sourcemap's segments"""
+    sources = [module_name(s) for s in sourcemap["sources"]]
+    contribution = defaultdict(int)
+    source_index = 0
+    for line, mappings in zip(code.split("\n"), sourcemap["mappings"].split(";")):
+        column = 0
+        spans = []
+        for segment in filter(None, mappings.split(",")):
+            fields = decode_vlq(segment)
+            column += fields[0]
+            if len(fields) >= 4:
+                source_index += fields[1]
+                spans.append((column, sources[source_index]))
+            else:
+                spans.append((column, None))
+        if not spans:
+            contribution["(unmapped)"] += len(line.encode())
+            continue
+        contribution["(unmapped)"] += len(line[:spans[0][0]].encode())
+        for (start, source), (end, _) in zip(spans, spans[1:] + [(len(line), None)]):
+            contribution[source or "(unmapped)"] += len(line[start:end].encode())
+    return dict(contribution)
+
+
+# -- dist -----------------------------------------------------------------------
+
+def analyze_dist(dist_dir=DIST_DIR):
+    """Size every chunk in dist/assets and attribute its bytes to modules where a sourcemap exists"""
+    initial = set()
+    index_path = os.path.join(dist_dir, "index.html")
+    if os.path.exists(index_path):
+        parser = EntryParser()
+        with open(index_path, encoding="utf-8") as f:
+            parser.feed(f.read())
+        initial = parser.initial
+
+    assets_dir = os.path.join(dist_dir, "assets")
+    chunks = {}
+    for filename in sorted(os.listdir(assets_dir)):
+        if not filename.endswith((".js", ".css")):
+            continue
+        with open(os.path.join(assets_dir, filename), "rb") as f:
+            data = f.read()
+        chunk = {
+            "file": filename,
+            "initial": filename in initial,
+            "sizes": compressed_sizes(data),
+            "modules": None,
+            "markers": sorted(pkg for pkg, marker in PACKAGE_MARKERS.items() if marker in data),
+        }
+        map_path = os.path.join(assets_dir, filename + ".map")
+        if os.path.exists(map_path):
+            with open(map_path, encoding="utf-8") as f:
+                chunk["modules"] = attribute_bytes(data.decode("utf-8", "replace"), json.load(f))
+        chunks[chunk_name(filename)] = chunk
+    return chunks
+
+
+def packages(modules):
+    totals = defaultdict(int)
+    for module, size in modules.items():
+        totals[package_of(module)] += size
+    return dict(totals)
+
+
+def duplicated_modules(chunks):
+    """Modules present in more than one chunk -> list of chunk names"""
+    owners = defaultdict(list)
+    for name, chunk in chunks.items():
+        for module in chunk["modules"] or ():
+            if not module.startswith("("):
+                owners[module].append(name)
+    return {module: names for module, names in owners.items() if len(names) > 1}
+
+
+# -- src import graph -------------------------------------------------------------
+
+def resolve(specifier, importer, src_dir):
+    """Resolve an import to a src file path or a package name (None for assets)"""
+    if specifier.startswith("@/"):
+        base = os.path.join(src_dir, specifier[2:])
+    elif specifier.startswith("."):
+        base = os.path.normpath(os.path.join(os.path.dirname(importer), specifier))
+    else:
+        parts = specifier.split("/")
+        return "pkg:" + ("/".join(parts[:2]) if specifier.startswith("@") else parts[0])
+    if base.endswith((".css", ".svg", ".png", ".jpg")):
+        return None
+    candidates = [base] if base.endswith(SOURCE_EXTENSIONS) else []
+    candidates += [base + ext for ext in SOURCE_EXTENSIONS]
+    candidates += [os.path.join(base, "index" + ext) for ext in SOURCE_EXTENSIONS]
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def import_graph(src_dir=SRC_DIR):
+    """{file: {"static": [targets], "dynamic": [targets]}}; type-only imports are erased and skipped"""
+    graph = {}
+    for root, _, files in os.walk(src_dir):
+        for filename in files:
+            if not filename.endswith(SOURCE_EXTENSIONS):
+                continue
+            path = os.path.join(root, filename)
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            static = [resolve(spec, path, src_dir) for type_only, spec in IMPORT_RE.findall(text) if not type_only]
+            dynamic = [resolve(spec, path, src_dir) for spec in DYNAMIC_IMPORT_RE.findall(text)]
+            graph[path] = {"static": [t for t in static if t], "dynamic": [t for t in dynamic if t]}
+    return graph
+
+
+def static_chains(graph, start):
+    """BFS over static imports from `start`; returns {node: parent} for chain reconstruction"""
+    parents = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for target in graph.get(node, {}).get("static", ()):
+            if target not in parents:
+                parents[target] = node
+                queue.append(target)
+    return parents
+
+
+def chain_to(parents, node, src_dir):
+    chain = []
+    while node is not None:
+        chain.append(node[4:] if node.startswith("pkg:") else os.path.relpath(node, src_dir))
+        node = parents[node]
+    return list(reversed(chain))
+
+
+def screen_dependencies(heavy, src_dir=SRC_DIR):
+    """For each *Screen.tsx: whether it is in the entry chunk and which heavy packages it pulls in"""
+    graph = import_graph(src_dir)
+    entry = os.path.join(src_dir, "main.tsx")
+    in_entry = static_chains(graph, entry)
+    screens = {}
+    components = os.path.join(src_dir, "components")
+    for filename in sorted(os.listdir(components)):
+        if not filename.endswith("Screen.tsx"):
+            continue
+        path = os.path.join(components, filename)
+        parents = static_chains(graph, path)
+        pulled = {pkg: chain_to(parents, "pkg:" + pkg, src_dir) for pkg in heavy if "pkg:" + pkg in parents}
+        screens[filename[:-4]] = {
+            "in_entry": path in in_entry,
+            "entry_chain": chain_to(in_entry, path, src_dir) if path in in_entry else None,
+            "heavy": pulled,
+        }
+    return screens
+
+
+# -- gates ------------------------------------------------------------------------
+
+def check_budgets(chunks, budgets):
+    """Return human-readable violations for every chunk over its budget"""
+    violations = []
+    defaults = {k: v for k, v in budgets.items() if k != "chunks"}
+    for name, chunk in chunks.items():
+        limits = dict(defaults)
+        limits.update(budgets.get("chunks", {}).get(name, {}))
+        for metric, limit in limits.items():
+            size = chunk["sizes"].get(metric[:-3])
+            if size is not None and size / 1024 > limit:
+                violations.append(f"{name} {metric} = {size / 1024:.1f} > {limit}")
+    return violations
+
+
+def baseline_record(chunks):
+    return {
+        name: {"sizes": chunk["sizes"], "packages": packages(chunk["modules"]) if chunk["modules"] else None}
+        for name, chunk in chunks.items()
+    }
+
+
+def diff_baseline(chunks, baseline, max_growth=DEFAULT_MAX_GROWTH):
+    """Per-chunk and per-package deltas against the baseline; returns (lines, regressions)"""
+    lines, regressions = [], []
+    for name, chunk in chunks.items():
+        before = baseline.get(name)
+        if before is None:
+            lines.append(f"  + {name:<28} new chunk, {chunk['sizes']['gzip'] / 1024:.1f} KB gzip")
+            if chunk["initial"]:
+                regressions.append(f"{name} is a new startup chunk")
+            continue
+        old, new = before["sizes"]["gzip"], chunk["sizes"]["gzip"]
+        growth = (new - old) * 100.0 / old if old else 0.0
+        lines.append(f"    {name:<28} gzip {old / 1024:8.1f} -> {new / 1024:8.1f} KB ({growth:+.1f}%)")
+        if growth > max_growth:
+            regressions.append(f"{name} grew {growth:.1f}% gzip (limit {max_growth}%)")
+        if before.get("packages") and chunk["modules"]:
+            now = packages(chunk["modules"])
+            for pkg in sorted(set(now) | set(before["packages"])):
+                delta = now.get(pkg, 0) - before["packages"].get(pkg, 0)
+                if abs(delta) >= 1024:
+                    lines.append(f"      {pkg:<40} {delta / 1024:+8.1f} KB")
+    for name in sorted(set(baseline) - set(chunks)):
+        lines.append(f"  - {name:<28} removed")
+    return lines, regressions
+
+
+# -- report -----------------------------------------------------------------------
+
+def _kb(n):
+    return f"{n / 1024:.1f}" if n is not None else "-"
+
+
+def print_report(chunks, screens, duplicates, top):
+    print("=" * 90)
+    print("BUNDLE SIZES")
+    print("=" * 90)
+    print(f"  {'Chunk':<28}{'Load':>9}{'Raw KB':>10}{'Gzip KB':>10}{'Brotli KB':>11}  Sourcemap")
+    for name, chunk in sorted(chunks.items(), key=lambda item: -item[1]["sizes"]["raw"]):
+        sizes = chunk["sizes"]
+        print(f"  {name:<28}{'startup' if chunk['initial'] else 'lazy':>9}{_kb(sizes['raw']):>10}"
+              f"{_kb(sizes['gzip']):>10}{_kb(sizes.get('brotli')):>11}  {'yes' if chunk['modules'] else 'no'}")
+    if brotli is None:
+        print("  (brotli module not installed; brotli sizes skipped)")
+
+    for name, chunk in chunks.items():
+        if not chunk["modules"]:
+            continue
+        total = chunk["sizes"]["raw"]
+        print(f"\n  {name}: top packages")
+        for pkg, size in sorted(packages(chunk["modules"]).items(), key=lambda item: -item[1])[:top]:
+            print(f"    {pkg:<44}{_kb(size):>10} KB {size * 100.0 / total:6.1f}%")
+        print(f"  {name}: top modules")
+        for module, size in sorted(chunk["modules"].items(), key=lambda item: -item[1])[:top]:
+            print(f"    {module[-60:]:<60}{_kb(size):>10} KB")
+
+    if not any(chunk["modules"] for chunk in chunks.values()):
+        print("\n  No sourcemaps found; rebuild with `vite build --sourcemap hidden` for per-module sizes.")
+        for name, chunk in chunks.items():
+            if chunk["markers"]:
+                print(f"  {name}: contains {', '.join(chunk['markers'])} (marker match)")
+
+    if duplicates:
+        print("\nDUPLICATED MODULES")
+        for module, names in sorted(duplicates.items()):
+            print(f"  {module[-60:]:<60} in {', '.join(names)}")
+
+    print("\nSCREENS -> HEAVY DEPENDENCIES IN THE ENTRY CHUNK")
+    for screen, info in screens.items():
+        if not info["in_entry"]:
+            print(f"  {screen:<28} lazy / not imported")
+            continue
+        if not info["heavy"]:
+            print(f"  {screen:<28} entry, no heavy dependencies")
+            continue
+        print(f"  {screen:<28} entry, pulls {', '.join(sorted(info['heavy']))}")
+        for pkg, chain in sorted(info["heavy"].items()):
+            print(f"    {pkg}: {' -> '.join(chain)}")
+
+
+def heavy_packages(chunks):
+    """HEAVY_PACKAGES plus anything over HEAVY_THRESHOLD_KB in a startup chunk"""
+    heavy = set(HEAVY_PACKAGES)
+    for chunk in chunks.values():
+        if chunk["initial"] and chunk["modules"]:
+            heavy.update(pkg for pkg, size in packages(chunk["modules"]).items()
+                         if not pkg.startswith("(") and size > HEAVY_THRESHOLD_KB * 1024)
+    return sorted(heavy)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze the Vite bundle and enforce size budgets")
+    parser.add_argument("--dist", default=DIST_DIR)
+    parser.add_argument("--src", default=SRC_DIR)
+    parser.add_argument("--budgets", help="JSON file with budgets (see DEFAULT_BUDGETS)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON to diff against")
+    parser.add_argument("--update-baseline", action="store_true", help="write the current sizes as the baseline")
+    parser.add_argument("--max-growth", type=float, default=DEFAULT_MAX_GROWTH, help="allowed gzip growth in percent")
+    parser.add_argument("--top", type=int, default=15, help="modules/packages listed per chunk")
+    parser.add_argument("--json", dest="json_path", help="write the full analysis to this file")
+    add_store_arguments(parser)
+    args = parser.parse_args(argv)
+
+    budgets = dict(DEFAULT_BUDGETS)
+    if args.budgets:
+        with open(args.budgets) as f:
+            budgets.update(json.load(f))
+
+    chunks = analyze_dist(args.dist)
+    duplicates = duplicated_modules(chunks)
+    screens = screen_dependencies(heavy_packages(chunks), args.src)
+    print_report(chunks, screens, duplicates, args.top)
+
+    all_passed = True
+    violations = check_budgets(chunks, budgets)
+    print("\nBUDGETS")
+    for violation in violations:
+        print(f"  ✗ Budget exceeded: {violation}")
+    if violations:
+        all_passed = False
+    else:
+        print("  ✓ All chunks within budget")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(baseline_record(chunks), f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            lines, regressions = diff_baseline(chunks, json.load(f), args.max_growth)
+        print(f"\nBASELINE DIFF ({args.baseline})")
+        print("\n".join(lines))
+        for regression in regressions:
+            print(f"  ✗ Regression: {regression}")
+        if regressions:
+            all_passed = False
+
+    samples = [sample for name, chunk in chunks.items()
+               for sample in metric_samples(name, {f"{kind}_bytes": size for kind, size in chunk["sizes"].items()})]
+    initial = [chunk["sizes"] for chunk in chunks.values() if chunk["initial"]]
+    samples += metric_samples("startup", {f"{kind}_bytes": sum(sizes[kind] for sizes in initial)
+                                          for kind in (initial[0] if initial else {})})
+    print()
+    record_samples(args, "bundle_analyzer", f"build:{os.path.abspath(args.dist)}", samples)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"chunks": chunks, "duplicates": duplicates, "screens": screens,
+                       "violations": violations}, f, indent=2)
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
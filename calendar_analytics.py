@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Calendar analytics for all users in one pass, with CalendarService's rules.
+
+CalendarService (goals_trackter/src/lib/calendarService.ts) works on one
+user's events in the browser and calls `new Date(...)` again on every
+comparison; findConflicts re-filters the whole sorted list for each event
+(O(n²)). Here the events of every user are loaded once into NumPy columns
+(user code, event type, start as int64 epoch milliseconds, the task's
+is_complete), sorted once by (user, start), and each result is a mask or a
+group-by over that order:
+
+  heatmap    getHeatmapData: completed tasks per UTC day, completed_at in [start, end]
+  upcoming   getUpcomingEvents: start in [now, now + days], by start
+  overdue    getOverdueEvents: open tasks due on a day before today, by start
+  counts     getEventCountByType
+  conflicts  findConflicts: an event and the other tasks on its day when
+             there are 3 or more of them, one group per event not already
+             in a group
+
+The events are the ones getAllEvents emits: goal deadlines, task due dates
+plus the next 10 occurrences of recurring tasks (next_occurrence() from
+recurring_tasks_worker.py), and achieved milestones. CalendarService has no
+habit events, so habits are not loaded. Rules are evaluated in UTC, like
+recurring_tasks_worker.py. Dates `new Date()` cannot parse are dropped
+rather than collected on an "Invalid Date" day.
+verify_calendar_parity.py checks the results against TypeScript output
+(fixtures/calendar_parity.json).
+
+Sources:
+  rest   get_goals_with_relations for every goal owner, with the service role key (default)
+  file   --input: a JSON list of goals as GoalsService.getGoals returns them, with user_id
+
+Usage:
+    SUPABASE_SERVICE_ROLE_KEY=... python3 calendar_analytics.py
+    python3 calendar_analytics.py --input goals.json --json calendar.json
+    python3 calendar_analytics.py --url http://127.0.0.1:54321 --service-key ... --heatmap-days 365
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from recurring_tasks_worker import get_pattern, next_occurrence, parse_end_date
+from supabase_client import ANON_KEY, SUPABASE_URL, AsyncSupabaseClient
+
+DAY_MS = 86_400_000
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+EVENT_TYPES = ("goal", "task", "milestone")  # CalendarEvent.type values getAllEvents emits
+GOAL, TASK, MILESTONE = range(len(EVENT_TYPES))
+OCCURRENCES = 10  # tasksToEvents: getUpcomingOccurrences(task, 10)
+CONFLICT_TASKS = 3  # findConflicts: 3 or more other tasks on the same day
+DEFAULT_UPCOMING_DAYS = 7
+DEFAULT_HEATMAP_DAYS = 365
+DEFAULT_CONCURRENCY = 8
+PAGE_SIZE = 1000
+
+
+def to_ms(moment):
+    """Aware datetime -> epoch milliseconds, truncated like a JavaScript Date"""
+    return (moment - EPOCH) // timedelta(milliseconds=1)
+
+
+def iso_day(day):
+    """Day number -> toISOString().split('T')[0]"""
+    return date.fromordinal(EPOCH_ORDINAL + day).isoformat()
+
+
+class DateParser:
+    """new Date(value) in UTC as epoch milliseconds (None for an Invalid Date); each string is parsed once"""
+
+    def __init__(self):
+        self.cache = {}
+
+    def __call__(self, value):
+        if not isinstance(value, str):
+            return None
+        if value not in self.cache:
+            parsed = parse_end_date(value)  # same ISO subset: date-only and naive values are UTC
+            self.cache[value] = None if parsed is None else to_ms(parsed)
+        return self.cache[value]
+
+
+class CalendarFrame:
+    """Calendar events and completed tasks of many users as NumPy columns"""
+
+    def __init__(self, goals, now_ms):
+        parse = DateParser()
+        self.users = []
+        codes = {}
+        user, kind, start, complete, self.ids = [], [], [], [], []
+        done_user, done_at = [], []
+
+        def code(goal):
+            owner = goal.get("user_id")
+            if owner not in codes:
+                codes[owner] = len(self.users)
+                self.users.append(owner)
+            return codes[owner]
+
+        def add(owner, event_type, ms, is_complete, event_id):
+            user.append(owner)
+            kind.append(event_type)
+            start.append(ms)
+            complete.append(is_complete)
+            self.ids.append(event_id)
+
+        # getAllEvents order: every goal deadline, then tasks with their occurrences, then milestones
+        for goal in goals:
+            owner = code(goal)
+            ms = parse(goal.get("deadline")) if goal.get("deadline") else None
+            if ms is not None:
+                add(owner, GOAL, ms, False, f"goal-{goal['id']}")
+        for goal in goals:
+            owner = code(goal)
+            for task in goal.get("tasks") or []:
+                is_complete = bool(task.get("is_complete"))
+                if is_complete and task.get("completed_at"):
+                    ms = parse(task["completed_at"])
+                    if ms is not None:
+                        done_user.append(owner)
+                        done_at.append(ms)
+                due = task.get("due_date") or task.get("dueDate")
+                if not due:
+                    continue
+                ms = parse(due)
+                if ms is not None:
+                    add(owner, TASK, ms, is_complete, f"task-{task['id']}")
+                if task.get("recurring_pattern"):
+                    for i, ms in enumerate(occurrences(task, now_ms, parse)):
+                        add(owner, TASK, ms, is_complete, f"task-{task['id']}-occurrence-{i}")
+        for goal in goals:
+            owner = code(goal)
+            for milestone in goal.get("milestones") or []:
+                ms = parse(milestone.get("achieved_at")) if milestone.get("achieved_at") else None
+                if ms is not None:
+                    add(owner, MILESTONE, ms, False, f"milestone-{milestone['id']}")
+
+        self.user = np.array(user, dtype=np.int64)
+        self.kind = np.array(kind, dtype=np.int8)
+        self.start = np.array(start, dtype=np.int64)
+        self.complete = np.array(complete, dtype=bool)
+        self.done_user = np.array(done_user, dtype=np.int64)
+        self.done_at = np.array(done_at, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def occurrences(task, now_ms, parse, count=OCCURRENCES):
+    """getUpcomingOccurrences: start times of the next `count` occurrences of a recurring task"""
+    pattern = get_pattern(task)
+    if pattern is None:
+        return []
+    start = parse(task.get("due_date")) if task.get("due_date") else now_ms
+    if start is None:
+        return []
+    day, time_of_day = divmod(start, DAY_MS)
+    # next_occurrence checks endDate at midnight; the Date here keeps its time of day
+    end = parse(pattern.get("endDate")) if pattern.get("endDate") else None
+    rule = dict(pattern, endDate=None)
+    current = date.fromordinal(EPOCH_ORDINAL + day)
+    found = []
+    while len(found) < count:
+        following = next_occurrence(current, rule)
+        if following is None:
+            break
+        ms = (following.toordinal() - EPOCH_ORDINAL) * DAY_MS + time_of_day
+        if end is not None and ms > end:
+            break
+        found.append(ms)
+        current = following
+    return found
+
+
+def split_by_user(users, n_users):
+    """Boundaries of each user's slice in an array sorted by user"""
+    return np.searchsorted(users, np.arange(n_users + 1))
+
+
+def analyze(frame, now_ms, upcoming_days=DEFAULT_UPCOMING_DAYS, heatmap_start=None, heatmap_end=None):
+    """All of CalendarService's views for every user in the frame
+
+    Returns a dict of arrays over the (user, start) order: `order` (event
+    indices), boolean masks `upcoming` and `overdue`, `counts` (users x
+    EVENT_TYPES), conflict `heads` (positions in `order`), `day_group` and
+    per-group `tasks_per_day`, plus heatmap `cells` (user, day, completed).
+    """
+    n_users = len(frame.users)
+    # np.lexsort is stable, so equal starts keep getAllEvents order like Array.prototype.sort
+    order = np.lexsort((frame.start, frame.user))
+    user = frame.user[order]
+    start = frame.start[order]
+    kind = frame.kind[order]
+    day = start // DAY_MS
+    is_task = kind == TASK
+
+    upcoming = (start >= now_ms) & (start <= now_ms + upcoming_days * DAY_MS)
+    overdue = is_task & ~frame.complete[order] & (day < now_ms // DAY_MS)
+    counts = np.bincount(frame.user * len(EVENT_TYPES) + frame.kind,
+                         minlength=n_users * len(EVENT_TYPES)).reshape(n_users, len(EVENT_TYPES))
+
+    # findConflicts: within a (user, day) with t tasks, an event qualifies when the *other*
+    # tasks number CONFLICT_TASKS or more, and starts a group unless an earlier group holds
+    # it. Every group holds all of the day's tasks, so the heads are the first event of the
+    # day (if it qualifies) and every later non-task event that qualifies.
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (user[1:] != user[:-1]) | (day[1:] != day[:-1])
+    day_group = np.cumsum(first) - 1
+    tasks_per_day = np.bincount(day_group, weights=is_task, minlength=int(first.sum())).astype(np.int64)
+    others = tasks_per_day[day_group] - is_task
+    heads = np.flatnonzero((others >= CONFLICT_TASKS) & (first | ~is_task))
+
+    if heatmap_end is None:
+        heatmap_end = now_ms
+    if heatmap_start is None:
+        heatmap_start = heatmap_end - DEFAULT_HEATMAP_DAYS * DAY_MS
+    in_range = (frame.done_at >= heatmap_start) & (frame.done_at <= heatmap_end)
+    done_user = frame.done_user[in_range]
+    done_day = frame.done_at[in_range] // DAY_MS
+    cells = np.unique(np.stack([done_user, done_day], axis=1), axis=0, return_counts=True)
+
+    return {
+        "order": order, "user": user, "start": start, "day": day, "is_task": is_task,
+        "upcoming": upcoming, "overdue": overdue, "counts": counts,
+        "heads": heads, "day_group": day_group, "tasks_per_day": tasks_per_day, "cells": cells,
+    }
+
+
+def conflict_groups(frame, result):
+    """findConflicts' groups (event positions in `order`) per user: [[head, *other tasks]]"""
+    task_positions = np.flatnonzero(result["is_task"])
+    task_groups = result["day_group"][task_positions]
+    groups = [[] for _ in frame.users]
+    for head in result["heads"]:
+        group = result["day_group"][head]
+        lo, hi = np.searchsorted(task_groups, [group, group + 1])
+        members = [head] + [p for p in task_positions[lo:hi] if p != head]
+        groups[result["user"][head]].append(members)
+    return groups
+
+
+def per_user(frame, result):
+    """JSON-ready results keyed by user id, shaped like the TypeScript return values"""
+    ids = np.array(frame.ids, dtype=object)[result["order"]] if len(frame) else np.array([], dtype=object)
+    bounds = split_by_user(result["user"], len(frame.users))
+    (cell_keys, cell_counts) = result["cells"]
+    cell_bounds = split_by_user(cell_keys[:, 0], len(frame.users)) if len(cell_counts) else None
+    conflicts = conflict_groups(frame, result)
+
+    report = {}
+    for code, user_id in enumerate(frame.users):
+        lo, hi = bounds[code], bounds[code + 1]
+        heatmap = {}
+        if cell_bounds is not None:
+            for (_, day), count in zip(cell_keys[cell_bounds[code]:cell_bounds[code + 1]],
+                                       cell_counts[cell_bounds[code]:cell_bounds[code + 1]]):
+                heatmap[iso_day(int(day))] = int(count)
+        report[user_id] = {
+            "upcoming": list(ids[lo:hi][result["upcoming"][lo:hi]]),
+            "overdue": list(ids[lo:hi][result["overdue"][lo:hi]]),
+            "counts": {name: int(n) for name, n in zip(EVENT_TYPES, result["counts"][code]) if n},
+            "conflicts": [[ids[p] for p in group] for group in conflicts[code]],
+            "heatmap": heatmap,
+        }
+    return report
+
+
+def summarize(frame, result):
+    """Totals across all users"""
+    heads = result["heads"]
+    cell_keys, cell_counts = result["cells"]
+    return {
+        "users": len(frame.users),
+        "events": len(frame),
+        "events_by_type": {name: int(n) for name, n in zip(EVENT_TYPES, result["counts"].sum(axis=0))},
+        "upcoming": int(result["upcoming"].sum()),
+        "overdue": int(result["overdue"].sum()),
+        "conflict_groups": len(heads),
+        "conflict_days": len(np.unique(result["day_group"][heads])),
+        "users_with_conflicts": len(np.unique(result["user"][heads])),
+        "heatmap_cells": len(cell_counts),
+        "completions_in_range": int(cell_counts.sum()),
+    }
+
+
+# ---- sources ----
+
+async def fetch_goals(url, anon_key, service_key, concurrency):
+    """Every goal owner's get_goals_with_relations result, concatenated"""
+    async with AsyncSupabaseClient(url, anon_key, max_connections=concurrency) as client:
+        owners, last = {}, None
+        while True:
+            params = {"select": "id,user_id", "order": "id.asc", "limit": PAGE_SIZE}
+            if last is not None:
+                params["id"] = f"gt.{last}"
+            response = await client.request("GET", client.rest_path("goals"), service_key, params=params)
+            response.raise_for_status()
+            page = response.json()
+            for row in page:
+                owners.setdefault(row["user_id"], None)
+            if len(page) < PAGE_SIZE:
+                break
+            last = page[-1]["id"]
+
+        gate = asyncio.Semaphore(concurrency)
+
+        async def load(user_id):
+            async with gate:
+                response = await client.rpc("get_goals_with_relations", {"p_user_id": user_id}, service_key)
+                response.raise_for_status()
+                return response.json() or []
+
+        pages = await asyncio.gather(*(load(user_id) for user_id in owners))
+    return [goal for goals in pages for goal in goals]
+
+
+def print_summary(summary, timings):
+    print(f"  Users:          {summary['users']:,}")
+    by_type = ", ".join(f"{name} {n:,}" for name, n in summary["events_by_type"].items())
+    print(f"  Events:         {summary['events']:,} ({by_type})")
+    print(f"  Upcoming:       {summary['upcoming']:,}")
+    print(f"  Overdue:        {summary['overdue']:,}")
+    print(f"  Conflicts:      {summary['conflict_groups']:,} groups on {summary['conflict_days']:,} days "
+          f"({summary['users_with_conflicts']:,} users)")
+    print(f"  Heatmap:        {summary['completions_in_range']:,} completions in {summary['heatmap_cells']:,} user-days")
+    print("  Time:           " + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in timings.items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calendar analytics for all users in one pass")
+    parser.add_argument("--input", help="JSON list of goals (with user_id) instead of fetching")
+    parser.add_argument("--url", default=SUPABASE_URL)
+    parser.add_argument("--anon-key", default=ANON_KEY)
+    parser.add_argument("--service-key", default=os.environ.get("SUPABASE_SERVICE_ROLE_KEY"))
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--now", help="ISO timestamp to evaluate at (default: current time)")
+    parser.add_argument("--upcoming-days", type=int, default=DEFAULT_UPCOMING_DAYS)
+    parser.add_argument("--heatmap-days", type=int, default=DEFAULT_HEATMAP_DAYS)
+    parser.add_argument("--json", dest="json_path", help="write per-user results to this file")
+    args = parser.parse_args(argv)
+
+    if args.now:
+        now_ms = DateParser()(args.now)
+        if now_ms is None:
+            parser.error(f"cannot parse --now {args.now!r}")
+    else:
+        now_ms = to_ms(datetime.now(timezone.utc))
+
+    timings = {}
+    started = time.perf_counter()
+    if args.input:
+        with open(args.input) as f:
+            goals = json.load(f)
+        source = args.input
+    else:
+        if not args.service_key:
+            parser.error("fetching needs --service-key or SUPABASE_SERVICE_ROLE_KEY (or use --input)")
+        goals = asyncio.run(fetch_goals(args.url, args.anon_key, args.service_key, args.concurrency))
+        source = args.url
+    timings["load"] = time.perf_counter() - started
+
+    print("=" * 80)
+    print(f"CALENDAR ANALYTICS for {source}")
+    print("=" * 80)
+
+    started = time.perf_counter()
+    frame = CalendarFrame(goals, now_ms)
+    timings["columns"] = time.perf_counter() - started
+    started = time.perf_counter()
+    result = analyze(frame, now_ms, args.upcoming_days, now_ms - args.heatmap_days * DAY_MS, now_ms)
+    timings["analyze"] = time.perf_counter() - started
+    print_summary(summarize(frame, result), timings)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(per_user(frame, result), f, indent=2)
+        print(f"\n✓ Per-user results written to {args.json_path}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
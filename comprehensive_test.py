@@ -1,30 +1,31 @@
-from playwright.sync_api import sync_playwright
-import time
+import asyncio
 
-def comprehensive_test(url):
+from browser_pool import BrowserPool
+from perf_store import metric_samples, record_samples
+from readiness import demo_login, format_metrics, goto_ready, open_tab
+
+async def comprehensive_test(pool, url, recorded):
     print(f"\n{'='*70}")
     print(f"COMPREHENSIVE PRODUCTION TEST")
     print(f"URL: {url}")
     print('='*70)
     
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(viewport={'width': 1280, 'height': 720})
-        page = context.new_page()
-        
-        errors = []
-        page.on("pageerror", lambda err: errors.append(str(err)))
+    async with pool.page(url) as run:
+        page = run.page
+        errors = run.errors
         
         try:
             # Load page
             print("\n[1/8] Loading page...")
-            response = page.goto(url, wait_until="networkidle", timeout=30000)
+            response, metrics = await goto_ready(page, url)
             print(f"      ✓ Status: {response.status}")
-            time.sleep(3)
+            print(f"      ✓ Ready: {format_metrics(metrics)}")
+            recorded.update(metrics)
             
             # Check root content
             print("\n[2/8] Checking root element...")
-            root_html = page.locator("#root").inner_html()
+            root_html = await page.locator("#root").inner_html()
+            recorded["root_length"] = len(root_html)
             if len(root_html) > 100:
                 print(f"      ✓ Root has content ({len(root_html)} chars)")
             else:
@@ -33,44 +34,43 @@ def comprehensive_test(url):
             
             # Check for auth screen
             print("\n[3/8] Verifying auth screen...")
-            if page.locator("text=Goals Tracker").count() > 0:
+            if await page.locator("text=Goals Tracker").count() > 0:
                 print("      ✓ App title found")
-            if page.locator("text=Sign In").count() > 0:
+            if await page.locator("text=Sign In").count() > 0:
                 print("      ✓ Sign In button found")
-            if page.locator("text=Try Demo Account").count() > 0:
+            if await page.locator("text=Try Demo Account").count() > 0:
                 print("      ✓ Demo button found")
             
             # Test demo login
             print("\n[4/8] Testing demo account login...")
-            page.locator("text=Try Demo Account").click()
-            time.sleep(4)
-            
-            # Check if logged in (should see Diary screen)
-            if page.locator("text=Today").count() > 0 or page.locator("text=Diary").count() > 0:
+            try:
+                login = await demo_login(page)
+                recorded.update(login)
                 print("      ✓ Successfully logged in - Diary screen visible")
-            else:
-                print("      ⚠ Login might not have worked")
+                print(f"      ✓ {format_metrics(login)}")
+            except Exception as e:
+                print(f"      ⚠ Login might not have worked: {e}")
             
-            page.screenshot(path="/workspace/test_logged_in.png")
+            await page.screenshot(path="/workspace/test_logged_in.png")
             
             # Test navigation
             print("\n[5/8] Testing navigation...")
             nav_items = ["Goals", "Habits", "Calendar", "Statistics", "Profile"]
             for item in nav_items:
-                if page.locator(f"text={item}").count() > 0:
+                if await page.locator(f"text={item}").count() > 0:
                     print(f"      ✓ {item} tab found")
             
             # Click Goals tab
             print("\n[6/8] Testing Goals screen...")
-            goals_btn = page.locator("text=Goals").first
-            if goals_btn.count() > 0:
-                goals_btn.click()
-                time.sleep(2)
-                page.screenshot(path="/workspace/test_goals_screen.png")
-                print("      ✓ Goals screen loaded")
+            if await page.locator("nav >> text=Goals").count() > 0:
+                tab_ms = await open_tab(page, "Goals")
+                recorded["goals_tab_ms"] = tab_ms
+                await page.screenshot(path="/workspace/test_goals_screen.png")
+                print(f"      ✓ Goals screen loaded ({tab_ms:.0f} ms)")
             
             # Check for errors
             print("\n[7/8] Checking for JavaScript errors...")
+            recorded["page_errors"] = len(errors)
             if errors:
                 print(f"      ✗ {len(errors)} error(s) found:")
                 for err in errors[:5]:
@@ -81,11 +81,9 @@ def comprehensive_test(url):
             
             # Final verification
             print("\n[8/8] Final verification...")
-            page.screenshot(path="/workspace/test_final.png")
+            await page.screenshot(path="/workspace/test_final.png")
             print("      ✓ Screenshots saved")
             
-            browser.close()
-            
             print("\n" + "="*70)
             print("✓✓✓ ALL TESTS PASSED - APP FULLY FUNCTIONAL ✓✓✓")
             print("="*70)
@@ -93,11 +91,19 @@ def comprehensive_test(url):
             
         except Exception as e:
             print(f"\n      ✗ FAIL: {e}")
-            browser.close()
             return False
 
+async def main():
+    url = "https://zpjcl3ddswhf.space.minimax.io"
+    recorded = {}
+    async with BrowserPool() as pool:
+        passed = await comprehensive_test(pool, url, recorded)
+    record_samples(None, "comprehensive_test", url, metric_samples("comprehensive", recorded,
+                                                                  {"page_errors": "errors"}))
+    return passed
+
 # Run comprehensive test
-success = comprehensive_test("https://zpjcl3ddswhf.space.minimax.io")
+success = asyncio.run(main())
 
 if not success:
     print("\n⚠ Some tests failed - review output above")
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+CPU profiles of the app's scripted interactions, via the CDP Profiler.
+
+Each interaction runs inside its own Profiler.start / Profiler.stop on a
+Chromium page, one after the other on the same logged-in page:
+
+  demo_login        "Try Demo Account" until Diary and NavBar are up
+  tab_<screen>      every NavBar tab (readiness.NAV_TABS), Diary last
+  goal_modal        Goals -> "Add Goal" until GoalModal ("Add New Goal") shows
+  pdf_export        Profile -> Export Data -> PDF Report until jsPDF is done
+
+For every interaction this writes <out>/<host>/<interaction>.cpuprofile
+(loads in Chrome DevTools) and one <out>/<host>/profiles.speedscope.json
+with all interactions as separate flame graphs (https://www.speedscope.app).
+
+Self time is attributed to original source files through the Vite
+sourcemaps in goals_trackter/dist/assets (build them with
+`pnpm exec vite build --sourcemap hidden`, see bundle_analyzer.py; the
+deployed chunk hashes must match the local build). Files are grouped into
+components (src/...) and libraries (recharts, jspdf, ...); without a
+sourcemap a frame is counted under its script. The per-interaction busy
+time and the self time of the top groups are recorded in the
+perf_store.py history.
+
+Usage:
+    python3 cpu_profile.py https://qdfizkumoiq9.space.minimax.io
+    python3 cpu_profile.py https://qdfizkumoiq9.space.minimax.io --interactions demo_login tab_statistics
+    python3 cpu_profile.py --summarize profiles/qdfizkumoiq9/*.cpuprofile
+"""
+import argparse
+import asyncio
+import bisect
+import collections
+import json
+import os
+import time
+from urllib.parse import urlparse
+
+from bundle_analyzer import DIST_DIR, decode_vlq, module_name, package_of
+from perf_store import Sample, add_store_arguments, record_samples
+from readiness import NAV_TABS, demo_login, goto_ready, open_tab
+
+DEFAULT_OUT = "profiles"
+DEFAULT_INTERVAL_US = 100
+DEFAULT_TIMEOUT = 30000
+RECORDED_GROUPS = 8  # groups per interaction recorded in the perf history
+IDLE = {"(idle)", "(root)"}
+SPECIAL = {"(program)", "(garbage collector)", "(idle)", "(root)"}
+
+FrameInfo = collections.namedtuple("FrameInfo", "name file line group")
+Summary = collections.namedtuple("Summary", "interaction total_ms busy_ms groups files")
+
+
+# ---- Interactions ----
+
+async def _demo_login(page):
+    await demo_login(page)
+
+
+def _tab(label):
+    async def run(page):
+        await open_tab(page, label)
+    return run
+
+
+async def _goal_modal(page):
+    await open_tab(page, "Goals")
+    await page.locator('[aria-label="Add Goal"]').first.click()
+    await page.locator("text=Add New Goal").first.wait_for(state="visible", timeout=DEFAULT_TIMEOUT)
+
+
+async def _close_goal_modal(page):
+    await page.keyboard.press("Escape")
+    cancel = page.locator("button:has-text('Cancel')")
+    if await cancel.count():
+        await cancel.first.click()
+
+
+async def _pdf_export(page):
+    await page.locator('[aria-label="Profile"]').first.click()
+    await page.locator("text=Export Data").first.click()
+    await page.locator("text=PDF Report").first.click()
+    await page.locator("button:has-text('Export PDF Report')").first.click()
+    await page.locator("text=PDF report generated successfully!").first.wait_for(
+        state="visible", timeout=DEFAULT_TIMEOUT)
+
+
+def interactions():
+    """(name, run, cleanup) in the order they are profiled; later ones rely on the login"""
+    steps = [("demo_login", _demo_login, None)]
+    tabs = [label for label in NAV_TABS if label != "Diary"] + ["Diary"]
+    steps += [(f"tab_{NAV_TABS[label]}", _tab(label), None) for label in tabs]
+    steps += [("goal_modal", _goal_modal, _close_goal_modal), ("pdf_export", _pdf_export, None)]
+    return steps
+
+
+async def profile_interactions(page, names=None, interval_us=DEFAULT_INTERVAL_US):
+    """{interaction: cpuprofile dict}; an interaction that fails is reported and skipped"""
+    cdp = await page.context.new_cdp_session(page)
+    await cdp.send("Profiler.enable")
+    await cdp.send("Profiler.setSamplingInterval", {"interval": interval_us})
+    profiles = {}
+    for name, run, cleanup in interactions():
+        if names and name not in names and name != "demo_login":
+            continue
+        await cdp.send("Profiler.start")
+        started = time.perf_counter()
+        try:
+            await run(page)
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        profile = (await cdp.send("Profiler.stop"))["profile"]
+        elapsed = (time.perf_counter() - started) * 1000
+        if error:
+            print(f"  ✗ {name}: {error.splitlines()[0]}")
+        elif not names or name in names:
+            profiles[name] = profile
+            print(f"  ✓ {name}: {elapsed:.0f} ms")
+        if cleanup is not None:
+            await cleanup(page)
+    await cdp.send("Profiler.disable")
+    await cdp.detach()
+    return profiles
+
+
+async def capture(url, names=None, interval_us=DEFAULT_INTERVAL_US):
+    from browser_pool import BrowserPool
+
+    async with BrowserPool(workers=1) as pool:
+        async with pool.page(url, accept_downloads=True) as run:
+            await goto_ready(run.page, url)
+            profiles = await profile_interactions(run.page, names, interval_us)
+            for error in run.errors[:5]:
+                print(f"  {error[:100]}")
+    return profiles
+
+
+# ---- Sourcemaps ----
+
+class SourceMaps:
+    """Maps (script url, 0-based line, column) to original source files via dist sourcemaps"""
+
+    def __init__(self, dist_dir=DIST_DIR):
+        self.assets = os.path.join(dist_dir, "assets")
+        self._maps = {}
+
+    def _load(self, url):
+        filename = os.path.basename(urlparse(url).path)
+        if filename not in self._maps:
+            self._maps[filename] = None
+            path = os.path.join(self.assets, filename + ".map")
+            if filename and os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    self._maps[filename] = self._index(json.load(f))
+        return self._maps[filename]
+
+    @staticmethod
+    def _index(sourcemap):
+        """Per generated line: sorted columns and the (source, original line) at each"""
+        sources = [module_name(s) for s in sourcemap["sources"]]
+        lines, source_index, original_line = [], 0, 0
+        for mappings in sourcemap["mappings"].split(";"):
+            column, columns, targets = 0, [], []
+            for segment in filter(None, mappings.split(",")):
+                fields = decode_vlq(segment)
+                column += fields[0]
+                if len(fields) >= 4:
+                    source_index += fields[1]
+                    original_line += fields[2]
+                    columns.append(column)
+                    targets.append((sources[source_index], original_line + 1))
+            lines.append((columns, targets))
+        return lines
+
+    def lookup(self, url, line, column):
+        """(source module, original 1-based line) or None"""
+        index = self._load(url) if url else None
+        if index is None or line >= len(index):
+            return None
+        columns, targets = index[line]
+        position = bisect.bisect_right(columns, column) - 1
+        return targets[position] if position >= 0 else None
+
+
+def group_of(module):
+    """Library name for node_modules sources, the file itself for app sources"""
+    if module.startswith("pkg:"):
+        return package_of(module)
+    return module
+
+
+def frame_info(call_frame, sourcemaps):
+    name = call_frame.get("functionName") or "(anonymous)"
+    url = call_frame.get("url", "")
+    if name in SPECIAL and not url:
+        return FrameInfo(name, "", 0, name)
+    if not url:
+        return FrameInfo(name, "", 0, "(native)")
+    mapped = sourcemaps.lookup(url, call_frame.get("lineNumber", 0), call_frame.get("columnNumber", 0))
+    if mapped is None:
+        script = os.path.basename(urlparse(url).path) or url
+        return FrameInfo(name, script, call_frame.get("lineNumber", 0) + 1, script)
+    module, line = mapped
+    return FrameInfo(name, module, line, group_of(module))
+
+
+# ---- Profiles ----
+
+def sample_durations(profile):
+    """Microseconds each sample stands for: the gap to the next sample (DevTools convention)"""
+    deltas = profile.get("timeDeltas", [])
+    timestamps, now = [], profile["startTime"]
+    for delta in deltas:
+        now += delta
+        timestamps.append(now)
+    ends = timestamps[1:] + [max(profile["endTime"], timestamps[-1] if timestamps else now)]
+    return [end - start for start, end in zip(timestamps, ends)]
+
+
+def summarize(name, profile, sourcemaps):
+    nodes = {node["id"]: frame_info(node["callFrame"], sourcemaps) for node in profile["nodes"]}
+    groups, files = collections.Counter(), collections.Counter()
+    total = 0.0
+    for node_id, duration in zip(profile.get("samples", []), sample_durations(profile)):
+        info = nodes[node_id]
+        total += duration
+        groups[info.group] += duration
+        files[info.file or info.group] += duration
+    idle = sum(groups[g] for g in IDLE)
+    to_ms = lambda counter: collections.OrderedDict((k, v / 1000) for k, v in counter.most_common())
+    return Summary(name, total / 1000, (total - idle) / 1000, to_ms(groups), to_ms(files))
+
+
+def to_speedscope(profiles, sourcemaps, name):
+    """One speedscope file with a sampled flame graph per interaction"""
+    frames, frame_ids = [], {}
+    documents = []
+    for interaction, profile in profiles.items():
+        parents, by_id = {}, {}
+        for node in profile["nodes"]:
+            by_id[node["id"]] = node
+            for child in node.get("children", []):
+                parents[child] = node["id"]
+        stacks = {}
+
+        def stack(node_id):
+            if node_id not in stacks:
+                info = frame_info(by_id[node_id]["callFrame"], sourcemaps)
+                parent = parents.get(node_id)
+                prefix = stack(parent) if parent is not None else []
+                if info.name == "(root)":
+                    stacks[node_id] = prefix
+                else:
+                    key = (info.name, info.file, info.line)
+                    if key not in frame_ids:
+                        frame_ids[key] = len(frames)
+                        frame = {"name": info.name}
+                        if info.file:
+                            frame.update(file=info.file, line=info.line)
+                        frames.append(frame)
+                    stacks[node_id] = prefix + [frame_ids[key]]
+            return stacks[node_id]
+
+        durations = sample_durations(profile)
+        documents.append({
+            "type": "sampled",
+            "name": interaction,
+            "unit": "microseconds",
+            "startValue": 0,
+            "endValue": sum(durations),
+            "samples": [stack(node_id) for node_id in profile.get("samples", [])],
+            "weights": durations,
+        })
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "goals_tracker cpu_profile.py",
+        "activeProfileIndex": 0,
+        "shared": {"frames": frames},
+        "profiles": documents,
+    }
+
+
+def save(profiles, out_dir, sourcemaps, name):
+    os.makedirs(out_dir, exist_ok=True)
+    for interaction, profile in profiles.items():
+        with open(os.path.join(out_dir, f"{interaction}.cpuprofile"), "w") as f:
+            json.dump(profile, f)
+    speedscope_path = os.path.join(out_dir, "profiles.speedscope.json")
+    with open(speedscope_path, "w") as f:
+        json.dump(to_speedscope(profiles, sourcemaps, name), f)
+    return speedscope_path
+
+
+def print_summary(summary, top):
+    print(f"\n  {summary.interaction}: {summary.busy_ms:.0f} ms busy of {summary.total_ms:.0f} ms profiled")
+    busy = summary.busy_ms or 1
+    shown = [(g, ms) for g, ms in summary.groups.items() if g not in IDLE][:top]
+    for group, ms in shown:
+        print(f"    {ms:>8.1f} ms {ms / busy:>6.1%}  {group}")
+    app_files = [(f, ms) for f, ms in summary.files.items() if f.startswith("src/")][:3]
+    if app_files:
+        print("    app files: " + ", ".join(f"{f} {ms:.1f} ms" for f, ms in app_files))
+
+
+def samples_for(summary):
+    samples = [Sample(f"cpu_profile.{summary.interaction}", "busy_ms", summary.busy_ms, "ms")]
+    for group, ms in [(g, ms) for g, ms in summary.groups.items() if g not in IDLE][:RECORDED_GROUPS]:
+        samples.append(Sample(f"cpu_profile.{summary.interaction}", f"self_ms[{group}]", ms, "ms"))
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CPU-profile scripted app interactions via CDP")
+    parser.add_argument("url", nargs="?", help="deployment URL to profile")
+    parser.add_argument("--interactions", nargs="+", choices=[name for name, _, _ in interactions()],
+                        help="only these (demo_login always runs first)")
+    parser.add_argument("--interval", type=int, default=DEFAULT_INTERVAL_US, help="sampling interval in µs")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="output directory")
+    parser.add_argument("--dist", default=DIST_DIR, help="Vite dist directory with sourcemaps")
+    parser.add_argument("--top", type=int, default=8, help="groups listed per interaction")
+    parser.add_argument("--summarize", nargs="+", metavar="CPUPROFILE", help="summarize saved profiles instead")
+    add_store_arguments(parser)
+    args = parser.parse_args(argv)
+    if not args.url and not args.summarize:
+        parser.error("give a deployment URL or --summarize")
+
+    sourcemaps = SourceMaps(args.dist)
+    if args.summarize:
+        profiles = {}
+        for path in args.summarize:
+            with open(path) as f:
+                profiles[os.path.splitext(os.path.basename(path))[0]] = json.load(f)
+        title = "saved profiles"
+    else:
+        title = args.url
+    print("=" * 80)
+    print(f"CPU PROFILE: {title}")
+    print("=" * 80)
+    if not args.summarize:
+        profiles = asyncio.run(capture(args.url, args.interactions, args.interval))
+        host = urlparse(args.url).hostname.split(".", 1)[0]
+        speedscope_path = save(profiles, os.path.join(args.out, host), sourcemaps, host)
+        print(f"\n  ✓ {len(profiles)} .cpuprofile file(s) and {speedscope_path} written")
+
+    summaries = [summarize(name, profile, sourcemaps) for name, profile in profiles.items()]
+    for summary in summaries:
+        print_summary(summary, args.top)
+    if args.url and summaries:
+        print()
+        record_samples(args, "cpu_profile", args.url, [s for summary in summaries for s in samples_for(summary)])
+
+    expected = args.interactions or [name for name, _, _ in interactions()]
+    return args.summarize is not None or all(name in profiles for name in expected)
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
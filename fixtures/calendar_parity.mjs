@@ -0,0 +1,251 @@
+#!/usr/bin/env node
+/**
+ * Generates fixtures/calendar_parity.json for verify_calendar_parity.py.
+ *
+ * Runs the app's own CalendarService and RecurringTasksService
+ * (goals_trackter/src/lib/*.ts, types stripped by node:module) over
+ * seeded random users plus hand-written edge cases, with `new Date()`
+ * frozen at NOW, and records every user's goals next to what the
+ * TypeScript returns: getAllEvents, getUpcomingEvents, getOverdueEvents,
+ * getEventCountByType, findConflicts and getHeatmapData.
+ *
+ * Needs Node >= 22.13 (module.stripTypeScriptTypes) and TZ=UTC, the time
+ * zone calendar_analytics.py evaluates the rules in.
+ *
+ * Usage:
+ *     TZ=UTC node fixtures/calendar_parity.mjs > fixtures/calendar_parity.json
+ */
+import { readFileSync } from 'node:fs'
+import { stripTypeScriptTypes } from 'node:module'
+
+const LIB = new URL('../goals_trackter/src/lib/', import.meta.url)
+const NOW = Date.parse('2025-03-14T15:30:00.000Z')
+const DAY = 86400000
+const UPCOMING_DAYS = 7
+const HEATMAP_START = new Date(NOW - 90 * DAY)
+const HEATMAP_END = new Date(NOW)
+const RANDOM_USERS = 30
+
+if (new Date(2025, 0, 1).getTimezoneOffset() !== 0) {
+  console.error('Run with TZ=UTC')
+  process.exit(1)
+}
+
+// Date with `new Date()` / Date.now() pinned to NOW
+class FrozenDate extends Date {
+  constructor(...args) {
+    if (args.length) super(...args)
+    else super(NOW)
+  }
+
+  static now() {
+    return NOW
+  }
+}
+
+function load(name, modules) {
+  const code = stripTypeScriptTypes(readFileSync(new URL(`${name}.ts`, LIB), 'utf8'))
+    .replace(/^import\s+(\{[^}]*\})\s+from\s+'([^']+)'/gm, 'const $1 = require("$2")')
+    .replace(/^export class (\w+)/gm, 'exports.$1 = class $1')
+  const exports = {}
+  new Function('require', 'exports', 'Date', code)(spec => modules[spec] ?? {}, exports, FrozenDate)
+  return exports
+}
+
+const { RecurringTasksService } = load('recurringTasksService', {})
+const { CalendarService } = load('calendarService', {
+  './recurringTasksService': { RecurringTasksService },
+})
+
+// ---- seeded random users ----
+
+function mulberry32(seed) {
+  return () => {
+    seed = (seed + 0x6d2b79f5) | 0
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed)
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296
+  }
+}
+
+const random = mulberry32(15)
+const pick = items => items[Math.floor(random() * items.length)]
+const between = (low, high) => low + Math.floor(random() * (high - low + 1))
+const chance = p => random() < p
+const uuid = () => 'xxxxxxxx-xxxx-4xxx-8xxx-xxxxxxxxxxxx'.replace(/x/g, () => pick('0123456789abcdef'))
+const isoDay = ms => new Date(ms).toISOString().split('T')[0]
+
+const PATTERNS = [
+  { frequency: 'daily', interval: 1 },
+  { frequency: 'daily', interval: 1, skipWeekends: true },
+  { frequency: 'daily', interval: 2 },
+  { frequency: 'weekly', interval: 1 },
+  { frequency: 'weekly', interval: 2 },
+  { frequency: 'weekly', interval: 1, daysOfWeek: [1, 3, 5] },
+  { frequency: 'monthly', interval: 1 },
+  { frequency: 'monthly', interval: 1, dayOfMonth: 31 },
+  { frequency: 'yearly', interval: 1 },
+  { frequency: 'custom', interval: 3 },
+  { frequency: 'daily', interval: 1, endDate: '2025-03-18' },
+  { frequency: 'weekly', interval: 1, endDate: '2025-04-01T12:00:00.000Z' },
+]
+
+function randomTask(userId, goalId) {
+  const task = {
+    id: uuid(),
+    goal_id: goalId,
+    user_id: userId,
+    text: `Task ${between(1, 999)}`,
+    priority: pick(['high', 'medium', 'low', undefined]),
+    is_complete: chance(0.35),
+  }
+  if (chance(0.85)) {
+    const due = isoDay(NOW + between(-10, 10) * DAY)
+    if (chance(0.8)) {
+      task.due_date = due
+      task.dueDate = due
+    } else {
+      task.dueDate = chance(0.5) ? due : `${due}T00:00:00.000Z`
+    }
+  }
+  if (task.is_complete && chance(0.9)) {
+    task.completed_at = new Date(NOW - between(0, 100 * DAY)).toISOString()
+  }
+  if (chance(0.25)) {
+    const pattern = pick(PATTERNS)
+    task.recurring_pattern = chance(0.5) ? JSON.stringify(pattern) : pattern
+  }
+  return task
+}
+
+function randomUser(index) {
+  const userId = uuid()
+  const goals = []
+  for (let g = between(0, 5); g > 0; g--) {
+    const goalId = uuid()
+    const goal = {
+      id: goalId,
+      user_id: userId,
+      title: `Goal ${g}`,
+      color: pick(['blue', 'green', 'purple']),
+      tasks: [],
+      milestones: [],
+    }
+    if (chance(0.6)) goal.deadline = isoDay(NOW + between(-10, 10) * DAY)
+    for (let t = between(0, 10); t > 0; t--) goal.tasks.push(randomTask(userId, goalId))
+    for (let m = between(0, 3); m > 0; m--) {
+      goal.milestones.push({
+        id: uuid(),
+        goal_id: goalId,
+        user_id: userId,
+        title: `Milestone ${m}`,
+        is_achieved: true,
+        achieved_at: chance(0.6) ? new Date(NOW + between(-10 * DAY, 10 * DAY)).toISOString() : null,
+      })
+    }
+    goals.push(goal)
+  }
+  return { name: `random-${index}`, user_id: userId, goals }
+}
+
+// ---- edge cases ----
+
+function task(userId, id, fields) {
+  return { id, goal_id: `${userId}-goal`, user_id: userId, text: id, is_complete: false, ...fields }
+}
+
+function edgeUser(name, goalFields, tasks, milestones = []) {
+  const userId = `edge-${name}`
+  return {
+    name,
+    user_id: userId,
+    goals: [{
+      id: `${userId}-goal`,
+      user_id: userId,
+      title: name,
+      color: 'blue',
+      ...goalFields,
+      tasks: tasks.map(([id, fields]) => task(userId, id, fields)),
+      milestones: milestones.map(([id, achieved_at]) => ({ id, goal_id: `${userId}-goal`, user_id: userId, title: id, achieved_at })),
+    }],
+  }
+}
+
+const EDGE_USERS = [
+  // 3 tasks alone are not a conflict; 3 tasks plus the goal deadline are
+  edgeUser('three-tasks', { deadline: '2025-03-20' }, [
+    ['a1', { due_date: '2025-03-20' }], ['a2', { due_date: '2025-03-20' }], ['a3', { due_date: '2025-03-20' }],
+    ['b1', { due_date: '2025-03-21' }], ['b2', { due_date: '2025-03-21' }], ['b3', { due_date: '2025-03-21' }],
+  ]),
+  // 4 tasks: one group headed by the first task, one more per later milestone
+  edgeUser('four-tasks', {}, [
+    ['c1', { due_date: '2025-03-22' }], ['c2', { due_date: '2025-03-22' }],
+    ['c3', { due_date: '2025-03-22' }], ['c4', { due_date: '2025-03-22' }],
+  ], [['m1', '2025-03-22T09:00:00.000Z'], ['m2', '2025-03-22T23:59:59.999Z'], ['m3', '2025-03-23T00:00:00.000Z']]),
+  // the deadline sorts before same-instant tasks, so it heads the only group
+  edgeUser('deadline-first', { deadline: '2025-03-10' }, [
+    ['d1', { due_date: '2025-03-10' }], ['d2', { due_date: '2025-03-10' }],
+    ['d3', { due_date: '2025-03-10' }], ['d4', { due_date: '2025-03-10', is_complete: true }],
+  ]),
+  // overdue and upcoming boundaries around NOW (2025-03-14T15:30Z)
+  edgeUser('boundaries', {}, [
+    ['yesterday', { due_date: '2025-03-13' }],
+    ['today', { due_date: '2025-03-14' }],
+    ['done-yesterday', { due_date: '2025-03-13', is_complete: true, completed_at: '2025-03-13T10:00:00.000Z' }],
+    ['legacy-midnight', { dueDate: '2025-03-12T00:00:00.000Z' }],
+    ['in-7-days', { due_date: '2025-03-21' }],
+    ['in-8-days', { due_date: '2025-03-22' }],
+  ], [['at-now', '2025-03-14T15:30:00.000Z'], ['now-plus-7d', '2025-03-21T15:30:00.000Z'],
+    ['now-plus-7d-1ms', '2025-03-21T15:30:00.001Z'], ['just-before-now', '2025-03-14T15:29:59.999Z']]),
+  // recurring chains: month ends, weekends, end dates, string patterns, legacy dueDate starting from now
+  edgeUser('recurring', {}, [
+    ['month-end', { due_date: '2025-01-31', recurring_pattern: { frequency: 'monthly', interval: 1 } }],
+    ['day-31', { due_date: '2025-01-31', recurring_pattern: { frequency: 'monthly', interval: 1, dayOfMonth: 31 } }],
+    ['weekdays', { due_date: '2025-03-07', recurring_pattern: '{"frequency":"daily","interval":1,"skipWeekends":true}' }],
+    ['mon-wed-fri', { due_date: '2025-03-09', recurring_pattern: { frequency: 'weekly', interval: 1, daysOfWeek: [5, 1, 3] } }],
+    ['until', { due_date: '2025-03-10', recurring_pattern: { frequency: 'daily', interval: 2, endDate: '2025-03-16' } }],
+    ['leap-day', { due_date: '2024-02-29', recurring_pattern: { frequency: 'yearly', interval: 1 } }],
+    ['legacy-from-now', { dueDate: '2025-03-01', recurring_pattern: { frequency: 'daily', interval: 1, endDate: '2025-03-17T15:30:00.000Z' } }],
+    ['unknown-frequency', { due_date: '2025-03-15', recurring_pattern: { frequency: 'hourly', interval: 1 } }],
+    ['bad-json', { due_date: '2025-03-15', recurring_pattern: '{not json' }],
+    ['done-recurring', { due_date: '2025-03-01', is_complete: true, recurring_pattern: { frequency: 'weekly', interval: 1 } }],
+  ]),
+  // heatmap: inclusive range, UTC day keys, offsets, missing completed_at
+  edgeUser('heatmap', {}, [
+    ['at-start', { is_complete: true, completed_at: HEATMAP_START.toISOString() }],
+    ['before-start', { is_complete: true, completed_at: new Date(HEATMAP_START.getTime() - 1).toISOString() }],
+    ['at-end', { is_complete: true, completed_at: HEATMAP_END.toISOString() }],
+    ['after-end', { is_complete: true, completed_at: '2025-03-14T15:30:00.001Z' }],
+    ['offset', { is_complete: true, completed_at: '2025-03-02T01:30:00+02:00' }],
+    ['microseconds', { is_complete: true, completed_at: '2025-03-02T10:00:00.123456+00:00' }],
+    ['no-timestamp', { is_complete: true }],
+    ['open-with-timestamp', { is_complete: false, completed_at: '2025-03-02T10:00:00.000Z' }],
+  ]),
+]
+
+// ---- expected outputs ----
+
+const ids = events => events.map(event => event.id)
+
+function expected(goals) {
+  const events = CalendarService.getAllEvents(goals)
+  return {
+    events: events.map(event => [event.id, event.start.toISOString()]),
+    upcoming: ids(CalendarService.getUpcomingEvents(events, UPCOMING_DAYS)),
+    overdue: ids(CalendarService.getOverdueEvents(events)),
+    counts: CalendarService.getEventCountByType(events),
+    conflicts: CalendarService.findConflicts(events).map(ids),
+    heatmap: Object.fromEntries(CalendarService.getHeatmapData(goals, HEATMAP_START, HEATMAP_END)),
+  }
+}
+
+const users = [...EDGE_USERS, ...Array.from({ length: RANDOM_USERS }, (_, i) => randomUser(i))]
+const header = {
+  now: new Date(NOW).toISOString(),
+  upcoming_days: UPCOMING_DAYS,
+  heatmap_start: HEATMAP_START.toISOString(),
+  heatmap_end: HEATMAP_END.toISOString(),
+}
+// one user per line keeps regenerated fixtures diffable
+const lines = users.map(user => JSON.stringify({ ...user, expected: expected(user.goals) }))
+process.stdout.write(`${JSON.stringify(header).slice(0, -1)},"users":[\n${lines.join(',\n')}\n]}\n`)
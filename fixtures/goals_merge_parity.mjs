@@ -0,0 +1,176 @@
+#!/usr/bin/env node
+/**
+ * Generates fixtures/goals_merge_parity.json for goals_query_benchmark.py.
+ *
+ * Runs the app's own GoalsService.getGoals (goals_trackter/src/lib/
+ * goalsService.ts, types stripped by node:module) on its per-goal fallback
+ * path, with supabase and the Tasks/Milestones/Habits services answered from
+ * in-memory rows the way PostgREST would (filtered and ordered as each query
+ * asks). Each case records the rows next to what the TypeScript merge
+ * returns, so get_goals_with_relations() can be checked against the real
+ * merge rules instead of a re-implementation of them.
+ *
+ * Cases are seeded random goals plus hand-written edge cases of the legacy
+ * JSONB: repeated ids, numeric and string ids, missing and null ids, and
+ * elements that are not objects.
+ *
+ * Needs Node >= 22.13 (module.stripTypeScriptTypes).
+ *
+ * Usage:
+ *     node fixtures/goals_merge_parity.mjs > fixtures/goals_merge_parity.json
+ */
+import { readFileSync } from 'node:fs'
+import { stripTypeScriptTypes } from 'node:module'
+
+const LIB = new URL('../goals_trackter/src/lib/', import.meta.url)
+const USER_ID = '00000000-0000-4000-8000-000000000001'
+const BASE = Date.parse('2025-03-14T15:30:00.000Z')
+const RANDOM_CASES = 25
+
+function load(name, modules) {
+  const code = stripTypeScriptTypes(readFileSync(new URL(`${name}.ts`, LIB), 'utf8'))
+    .replace(/^import\s+(\{[^}]*\})\s+from\s+'([^']+)'/gm, 'const $1 = require("$2")')
+    .replace(/^export class (\w+)/gm, 'exports.$1 = class $1')
+  const exports = {}
+  new Function('require', 'exports', code)(spec => modules[spec] ?? {}, exports)
+  return exports
+}
+
+// ---- PostgREST stand-in over one case's rows ----
+
+let tables = {}
+
+function query(table) {
+  let rows = [...(tables[table] || [])]
+  const builder = {
+    select: () => builder,
+    eq: (column, value) => {
+      rows = rows.filter(row => row[column] === value)
+      return builder
+    },
+    order: (column, { ascending = true } = {}) => {
+      rows.sort((a, b) => (a[column] < b[column] ? -1 : a[column] > b[column] ? 1 : 0) * (ascending ? 1 : -1))
+      return builder
+    },
+    then: (resolve, reject) => Promise.resolve({ data: rows, error: null }).then(resolve, reject),
+  }
+  return builder
+}
+
+const supabase = {
+  from: query,
+  // the function "not deployed": getGoals takes the per-goal path
+  rpc: async () => ({ data: null, error: { code: 'PGRST202', message: 'not found' } }),
+}
+
+const { TasksService } = load('tasksService', { './supabase': { supabase } })
+const { MilestonesService } = load('milestonesService', { './supabase': { supabase } })
+const { HabitsService } = load('habitsService', { './supabase': { supabase } })
+const { GoalsService } = load('goalsService', {
+  './supabase': { supabase },
+  './tasksService': { TasksService },
+  './milestonesService': { MilestonesService },
+  './habitsService': { HabitsService },
+})
+
+// ---- seeded random cases ----
+
+function mulberry32(seed) {
+  return () => {
+    seed = (seed + 0x6d2b79f5) | 0
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed)
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296
+  }
+}
+
+const random = mulberry32(11)
+const pick = items => items[Math.floor(random() * items.length)]
+const between = (low, high) => low + Math.floor(random() * (high - low + 1))
+const chance = p => random() < p
+const uuid = () => 'xxxxxxxx-xxxx-4xxx-8xxx-xxxxxxxxxxxx'.replace(/x/g, () => pick('0123456789abcdef'))
+const isoDay = ms => new Date(ms).toISOString().split('T')[0]
+const isoTime = ms => new Date(ms).toISOString()
+
+let clock = 0
+const nextCreatedAt = () => isoTime(BASE + ++clock * 60000)
+
+function goal(tasks, title) {
+  return {
+    id: uuid(), user_id: USER_ID, title, description: 'parity', icon: 'Target', color: 'blue',
+    deadline: isoDay(BASE + 30 * 86400000), tasks, created_at: nextCreatedAt(),
+  }
+}
+
+function jsonbTask(id) {
+  const task = { text: `legacy ${between(1, 999)}`, isComplete: chance(0.5) }
+  if (id !== undefined) task.id = id
+  if (chance(0.7)) task.dueDate = isoDay(BASE + between(-5, 5) * 86400000)
+  return task
+}
+
+function relationalRows(goalId, count) {
+  const positions = [...Array(count).keys()].sort(() => random() - 0.5)
+  return positions.map(position => ({
+    id: uuid(), goal_id: goalId, user_id: USER_ID, text: `task ${position}`, order_index: position,
+    due_date: chance(0.7) ? isoDay(BASE + between(-5, 5) * 86400000) : null,
+    is_complete: chance(0.4), priority: pick(['high', 'medium', 'low']),
+  }))
+}
+
+function children(goalId) {
+  return {
+    milestones: [...Array(between(0, 3)).keys()].map(i => ({
+      id: uuid(), goal_id: goalId, user_id: USER_ID, title: `milestone ${i}`, order_index: i,
+      target_value: 10, current_value: between(0, 10),
+    })),
+    habits: [...Array(between(0, 2)).keys()].map(i => ({
+      id: uuid(), goal_id: goalId, user_id: USER_ID, title: `habit ${i}`, frequency: 'daily',
+      created_at: nextCreatedAt(),
+    })),
+  }
+}
+
+function makeCase(name, goals, relationalCounts) {
+  const rows = { goals, tasks: [], milestones: [], habits: [] }
+  goals.forEach((g, i) => {
+    rows.tasks.push(...relationalRows(g.id, relationalCounts[i] ?? 0))
+    const { milestones, habits } = children(g.id)
+    rows.milestones.push(...milestones)
+    rows.habits.push(...habits)
+  })
+  return { name, ...rows }
+}
+
+const cases = [
+  makeCase('empty-jsonb', [goal([], 'no legacy tasks')], [3]),
+  makeCase('numeric-ids', [goal([jsonbTask(1700000000001), jsonbTask(1700000000002)], 'Date.now ids')], [2]),
+  makeCase('string-ids', [goal([jsonbTask('a'), jsonbTask('b'), jsonbTask('c')], 'string ids')], [0]),
+  makeCase('repeated-ids', [goal([jsonbTask(1), jsonbTask(2), jsonbTask(1), jsonbTask(3), jsonbTask(2)],
+    'first position, last value')], [1]),
+  makeCase('number-and-string-id', [goal([jsonbTask(7), jsonbTask('7')], 'same key')], [0]),
+  makeCase('missing-and-null-ids', [goal([jsonbTask(undefined), jsonbTask(null), jsonbTask(undefined),
+    jsonbTask(null), jsonbTask('null')], 'undefined and null keys')], [0]),
+  makeCase('not-objects', [goal(['plain text', 42, [1, 2], jsonbTask(5)], 'scalar elements')], [1]),
+  makeCase('only-relational', [goal([], 'a'), goal([], 'b')], [0, 4]),
+]
+
+for (let c = 0; c < RANDOM_CASES; c++) {
+  const goals = [...Array(between(1, 4)).keys()].map(g => {
+    const ids = [...Array(between(0, 6)).keys()].map(() => pick([
+      () => 1700000000000 + between(0, 5), () => uuid(), () => `t${between(0, 3)}`, () => undefined,
+    ])())
+    return goal(ids.map(jsonbTask), `random ${c}.${g}`)
+  })
+  cases.push(makeCase(`random-${c}`, goals, goals.map(() => between(0, 5))))
+}
+
+// ---- record ----
+
+console.log('{"user_id":"' + USER_ID + '","cases":[')
+for (const [i, c] of cases.entries()) {
+  tables = { goals: c.goals, tasks: c.tasks, milestones: c.milestones, habits: c.habits }
+  const expected = await GoalsService.getGoals(USER_ID)
+  console.log(JSON.stringify({ ...c, expected }) + (i + 1 < cases.length ? ',' : ''))
+}
+console.log(']}')
@@ -0,0 +1,162 @@
+#!/usr/bin/env node
+/**
+ * Generates fixtures/recurring_occurrence_parity.json for
+ * recurring_tasks_benchmark.py.
+ *
+ * Runs the app's own RecurringTasksService (goals_trackter/src/lib/
+ * recurringTasksService.ts, types stripped by node:module) over seeded
+ * random recurring tasks plus hand-written edge cases, and records for
+ * each task the chain of due dates completeRecurringTask would write:
+ * getPattern, then calculateNextOccurrence from new Date(due_date), the
+ * result formatted with toISOString().split('T')[0], and the next step
+ * starting from that date. A null ends the chain, as it ends the
+ * recurrence in the app (no pattern, no next date, or an Invalid Date
+ * that toISOString rejects).
+ *
+ * Patterns cover every frequency, null/missing/zero/negative/fractional
+ * intervals (the modal stores parseInt(...), so NaN arrives as null),
+ * unsorted daysOfWeek, dayOfMonth past the month end, month-end and leap
+ * day starts, endDate as a day, an instant and garbage, and JSON-encoded
+ * patterns.
+ *
+ * Needs Node >= 22.13 (module.stripTypeScriptTypes) and TZ=UTC, the time
+ * zone recurring_tasks_worker.py evaluates the rules in.
+ *
+ * Usage:
+ *     TZ=UTC node fixtures/recurring_occurrence_parity.mjs > fixtures/recurring_occurrence_parity.json
+ */
+import { readFileSync } from 'node:fs'
+import { stripTypeScriptTypes } from 'node:module'
+
+const LIB = new URL('../goals_trackter/src/lib/', import.meta.url)
+const DAY = 86400000
+const START = Date.parse('2023-01-01T00:00:00.000Z')
+const STEPS = 8
+const RANDOM_TASKS = 1500
+
+if (new Date(2025, 0, 1).getTimezoneOffset() !== 0) {
+  console.error('Run with TZ=UTC')
+  process.exit(1)
+}
+
+function load(name, modules) {
+  const code = stripTypeScriptTypes(readFileSync(new URL(`${name}.ts`, LIB), 'utf8'))
+    .replace(/^import\s+(\{[^}]*\})\s+from\s+'([^']+)'/gm, 'const $1 = require("$2")')
+    .replace(/^export class (\w+)/gm, 'exports.$1 = class $1')
+  const exports = {}
+  new Function('require', 'exports', code)(spec => modules[spec] ?? {}, exports)
+  return exports
+}
+
+const { RecurringTasksService } = load('recurringTasksService', {})
+
+// ---- seeded random tasks ----
+
+function mulberry32(seed) {
+  return () => {
+    seed = (seed + 0x6d2b79f5) | 0
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed)
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296
+  }
+}
+
+const random = mulberry32(14)
+const pick = items => items[Math.floor(random() * items.length)]
+const between = (low, high) => low + Math.floor(random() * (high - low + 1))
+const chance = p => random() < p
+const isoDay = ms => new Date(ms).toISOString().split('T')[0]
+
+const FREQUENCIES = ['daily', 'daily', 'weekly', 'weekly', 'monthly', 'monthly', 'yearly', 'custom', 'hourly']
+const INTERVALS = [1, 1, 1, 2, 3, 7, 12, 0, -1, 1.5, null, undefined]
+const DAYS_OF_MONTH = [undefined, undefined, 1, 15, 28, 29, 30, 31, 0, null, 40]
+const END_DATES = [
+  () => isoDay(START + between(0, 1200) * DAY),
+  () => new Date(START + between(0, 1200) * DAY + between(0, DAY - 1)).toISOString(),
+  () => 'not a date',
+  () => '',
+]
+
+function randomPattern() {
+  const pattern = { frequency: pick(FREQUENCIES) }
+  const interval = pick(INTERVALS)
+  if (interval !== undefined) pattern.interval = interval
+  if (chance(0.3)) pattern.skipWeekends = chance(0.8)
+  if (chance(0.4)) {
+    pattern.daysOfWeek = [...Array(between(0, 4)).keys()].map(() => between(0, 6))
+  }
+  const dayOfMonth = pick(DAYS_OF_MONTH)
+  if (dayOfMonth !== undefined) pattern.dayOfMonth = dayOfMonth
+  if (chance(0.25)) pattern.endDate = pick(END_DATES)()
+  return pattern
+}
+
+function randomDue() {
+  // month ends and leap days come up far more often than uniformly
+  if (chance(0.3)) {
+    return pick(['2023-01-31', '2023-03-31', '2023-08-31', '2024-01-29', '2024-01-30', '2024-01-31',
+      '2024-02-28', '2024-02-29', '2024-12-31', '2025-05-31', '2025-10-31'])
+  }
+  return isoDay(START + between(0, 1100) * DAY)
+}
+
+// ---- edge cases ----
+
+const EDGE_TASKS = [
+  ['month-end', '2025-01-31', { frequency: 'monthly', interval: 1 }],
+  ['day-31', '2025-01-31', { frequency: 'monthly', interval: 1, dayOfMonth: 31 }],
+  ['day-31-from-30th', '2024-04-30', { frequency: 'monthly', interval: 1, dayOfMonth: 31 }],
+  ['quarterly-month-end', '2024-11-30', { frequency: 'monthly', interval: 3 }],
+  ['leap-day', '2024-02-29', { frequency: 'yearly', interval: 1 }],
+  ['leap-day-every-4', '2024-02-29', { frequency: 'yearly', interval: 4 }],
+  ['weekdays-from-friday', '2025-03-07', { frequency: 'daily', interval: 1, skipWeekends: true }],
+  ['weekdays-from-saturday', '2025-03-08', { frequency: 'daily', interval: 2, skipWeekends: true }],
+  ['mon-wed-fri', '2025-03-09', { frequency: 'weekly', interval: 1, daysOfWeek: [5, 1, 3] }],
+  ['sunday-only', '2025-03-09', { frequency: 'weekly', interval: 2, daysOfWeek: [0] }],
+  ['repeated-days', '2025-03-10', { frequency: 'weekly', interval: 1, daysOfWeek: [2, 2, 6] }],
+  ['no-days', '2025-03-10', { frequency: 'weekly', interval: 2, daysOfWeek: [] }],
+  ['until-day', '2025-03-10', { frequency: 'daily', interval: 2, endDate: '2025-03-16' }],
+  ['until-instant', '2025-03-10', { frequency: 'daily', interval: 1, endDate: '2025-03-13T12:00:00.000Z' }],
+  ['until-garbage', '2025-03-10', { frequency: 'daily', interval: 1, endDate: 'soon' }],
+  ['null-interval', '2025-03-10', { frequency: 'daily', interval: null }],
+  ['missing-interval', '2025-03-10', { frequency: 'monthly' }],
+  ['missing-interval-with-days', '2025-03-10', { frequency: 'weekly', daysOfWeek: [4] }],
+  ['zero-interval', '2025-03-10', { frequency: 'custom', interval: 0 }],
+  ['negative-interval', '2025-03-10', { frequency: 'monthly', interval: -1, dayOfMonth: 31 }],
+  ['fractional-interval', '2025-03-10', { frequency: 'daily', interval: 1.5 }],
+  ['unknown-frequency', '2025-03-15', { frequency: 'hourly', interval: 1 }],
+  ['json-string', '2025-03-15', '{"frequency":"weekly","interval":1,"daysOfWeek":[1,4]}'],
+  ['bad-json', '2025-03-15', '{not json'],
+]
+
+// ---- record ----
+
+function nextDue(due, pattern) {
+  const next = RecurringTasksService.calculateNextOccurrence(new Date(due), pattern)
+  return next && !isNaN(next) ? next.toISOString().split('T')[0] : null
+}
+
+function chain(task) {
+  const pattern = RecurringTasksService.getPattern(task)
+  if (!pattern) return []
+  const occurrences = []
+  let due = task.due_date
+  while (occurrences.length < STEPS) {
+    due = nextDue(due, pattern)
+    occurrences.push(due)
+    if (due === null) break
+  }
+  return occurrences
+}
+
+const tasks = EDGE_TASKS.map(([name, due_date, recurring_pattern]) => ({ name, due_date, recurring_pattern }))
+for (let i = 0; i < RANDOM_TASKS; i++) {
+  const pattern = randomPattern()
+  tasks.push({ name: `random-${i}`, due_date: randomDue(), recurring_pattern: chance(0.5) ? JSON.stringify(pattern) : pattern })
+}
+
+console.log('{"steps":' + STEPS + ',"tasks":[')
+for (const [i, task] of tasks.entries()) {
+  console.log(JSON.stringify({ ...task, expected: chain(task) }) + (i + 1 < tasks.length ? ',' : ''))
+}
+console.log(']}')
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Goals screen load: per-goal fan-out vs the get_goals_with_relations RPC.
+
+GoalsService.getGoals fetches the goal list and then, for every goal,
+its tasks, milestones and habits (1 + 3 * N PostgREST requests). The
+get_goals_with_relations() SQL function (supabase/migrations/
+1762600000_get_goals_with_relations.sql) returns the same nested JSON in
+one round trip.
+
+For each goal count (1, 10, 50, 200 by default) this seeds a benchmark
+user up to that many goals, replays both paths --repeat times and reports
+request count, response bytes on the wire and latency percentiles.
+
+Before that, the parity check seeds every case of
+fixtures/goals_merge_parity.json, the rows next to what the real
+GoalsService.getGoals merge returned for them under Node, and compares the
+RPC's goal order, merged tasks (order, id, text, dueDate, isComplete),
+milestone and habit order with it. Against a real project that tests the
+SQL function; against the stand-in it only tests local_supabase.py's
+emulation of it. Regenerate the fixtures after changing goalsService.ts:
+
+    node fixtures/goals_merge_parity.mjs > fixtures/goals_merge_parity.json
+
+Without --url the benchmark starts the in-process stand-in from
+local_supabase.py; against a real project pass --url and an account
+(its goals are deleted afterwards, so never use a real user).
+
+Usage:
+    python3 goals_query_benchmark.py
+    python3 goals_query_benchmark.py --url http://127.0.0.1:54321 --levels 1 10 50 200 --repeat 10
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import date, timedelta
+
+from load_test import percentile
+from supabase_client import ANON_KEY, DEMO_EMAIL, AsyncSupabaseClient
+
+DEFAULT_LEVELS = (1, 10, 50, 200)
+DEFAULT_REPEAT = 5
+BENCH_PASSWORD = "bench-password-123"
+DEFAULT_FIXTURES = "fixtures/goals_merge_parity.json"
+
+
+class Meter:
+    """Requests and response bytes for one page load"""
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+
+    async def call(self, request):
+        response = await request
+        self.requests += 1
+        self.bytes += response.num_bytes_downloaded
+        if response.status_code != 200:
+            raise RuntimeError(f"{response.request.url.path} returned {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+
+def legacy_key(task):
+    """`jsonb-${task.id}` for the fan-out timing path; parity is checked against the fixtures"""
+    value = task.get("id", "undefined") if isinstance(task, dict) else "undefined"
+    return "jsonb-" + (value if isinstance(value, str) else json.dumps(value))
+
+
+async def load_fan_out(client, token, user_id, meter):
+    """GoalsService.getGoals as shipped: goal list, then tasks/milestones/habits per goal"""
+    goals = await meter.call(client.select(
+        "goals", {"user_id": user_id}, token, params={"select": "*", "order": "created_at.desc"}))
+
+    async def relations(goal):
+        relational, milestones, habits = await asyncio.gather(
+            meter.call(client.select("tasks", {"goal_id": goal["id"]}, token,
+                                     params={"select": "*", "order": "order_index.asc"})),
+            meter.call(client.select("milestones", {"goal_id": goal["id"]}, token,
+                                     params={"select": "*", "order": "order_index.asc"})),
+            meter.call(client.select("habits", {"goal_id": goal["id"]}, token,
+                                     params={"select": "*", "order": "created_at.desc"})),
+        )
+        merged = {}
+        for task in goal.get("tasks") or []:
+            merged[legacy_key(task)] = task
+        for task in relational:
+            merged[task["id"]] = dict(task, dueDate=task.get("due_date") or "", isComplete=task["is_complete"])
+        return dict(goal, tasks=list(merged.values()), milestones=milestones, habits=habits)
+
+    return await asyncio.gather(*(relations(goal) for goal in goals))
+
+
+async def load_rpc(client, token, user_id, meter):
+    return await meter.call(client.rpc("get_goals_with_relations", {"p_user_id": user_id}, token))
+
+
+PATHS = {"fan-out": load_fan_out, "rpc": load_rpc}
+
+
+async def ensure_user(client, email, password):
+    response = await client.sign_in(email, password)
+    if response.status_code != 200:
+        response = await client.signup(email, password)
+        if response.status_code != 200:
+            raise SystemExit(f"could not create {email}: {response.text[:200]}")
+        user_id = response.json()["user"]["id"]
+        await client.invoke("auto-confirm-user", {"user_id": user_id})
+        response = await client.sign_in(email, password)
+    session = response.json()
+    return session["access_token"], session["user"]["id"]
+
+
+async def add_goals(client, token, user_id, start, stop, shape):
+    """Insert goals [start, stop) with their relational rows and a few legacy JSONB tasks"""
+    today = date.today()
+    goals, tasks, milestones, habits = [], [], [], []
+    for g in range(start, stop):
+        goal_id = str(uuid.uuid4())
+        goals.append({
+            "id": goal_id, "user_id": user_id, "title": f"bench goal {g}", "description": "benchmark",
+            "icon": "Target", "color": "blue", "deadline": (today + timedelta(days=30 + g)).isoformat(),
+            "tasks": [{"id": 1700000000000 + i, "text": f"legacy task {i}", "dueDate": today.isoformat(),
+                       "isComplete": i % 2 == 0} for i in range(shape["jsonb_tasks"])],
+        })
+        tasks += [{"goal_id": goal_id, "user_id": user_id, "text": f"task {i}", "order_index": i,
+                   "due_date": (today + timedelta(days=i)).isoformat(), "is_complete": i % 3 == 0,
+                   "priority": "medium"} for i in range(shape["tasks"])]
+        milestones += [{"goal_id": goal_id, "user_id": user_id, "title": f"milestone {i}", "order_index": i,
+                        "target_value": 10, "current_value": i} for i in range(shape["milestones"])]
+        habits += [{"goal_id": goal_id, "user_id": user_id, "title": f"habit {i}", "frequency": "daily"}
+                   for i in range(shape["habits"])]
+    for table, rows in (("goals", goals), ("tasks", tasks), ("milestones", milestones), ("habits", habits)):
+        for offset in range(0, len(rows), 500):
+            response = await client.insert(table, rows[offset:offset + 500], token, returning="minimal")
+            if response.status_code not in (200, 201):
+                raise SystemExit(f"seeding {table} failed: {response.status_code} {response.text[:200]}")
+
+
+async def cleanup(client, token, user_id):
+    for table in ("habits", "milestones", "tasks", "goals"):
+        await client.delete(table, {"user_id": user_id}, token)
+
+
+def project(goals):
+    """What the merge decides: goal order, merged tasks and milestone/habit order"""
+    def task_view(task):
+        if not isinstance(task, dict):
+            return task
+        return [task.get(key) for key in ("id", "text", "dueDate", "isComplete")]
+    return [{
+        "id": goal["id"],
+        "tasks": [task_view(task) for task in goal.get("tasks") or []],
+        "milestones": [m["id"] for m in goal.get("milestones") or []],
+        "habits": [h["id"] for h in goal.get("habits") or []],
+    } for goal in goals]
+
+
+async def check_parity(client, token, user_id, fixtures):
+    """Names of the fixture cases where get_goals_with_relations differs from the TypeScript merge"""
+    failures = []
+    for case in fixtures["cases"]:
+        await cleanup(client, token, user_id)
+        for table in ("goals", "tasks", "milestones", "habits"):
+            rows = [dict(row, user_id=user_id) for row in case[table]]
+            if rows:
+                response = await client.insert(table, rows, token, returning="minimal")
+                if response.status_code not in (200, 201):
+                    raise SystemExit(f"seeding {case['name']} {table} failed: "
+                                     f"{response.status_code} {response.text[:200]}")
+        response = await client.rpc("get_goals_with_relations", {"p_user_id": user_id}, token)
+        if response.status_code != 200 or project(response.json()) != project(case["expected"]):
+            failures.append(case["name"])
+    await cleanup(client, token, user_id)
+    return failures
+
+
+async def measure(client, token, user_id, path, repeat):
+    latencies, meters, result = [], [], None
+    for _ in range(repeat):
+        meter = Meter()
+        started = time.perf_counter()
+        result = await PATHS[path](client, token, user_id, meter)
+        latencies.append((time.perf_counter() - started) * 1000)
+        meters.append(meter)
+    latencies.sort()
+    return {
+        "requests": meters[-1].requests,
+        "bytes": meters[-1].bytes,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "mean_ms": sum(latencies) / len(latencies),
+    }, result
+
+
+async def run(url, anon_key, email, password, levels, repeat, shape, fixtures):
+    results = []
+    async with AsyncSupabaseClient(url, anon_key) as client:
+        token, user_id = await ensure_user(client, email, password)
+        await cleanup(client, token, user_id)
+        seeded = 0
+        try:
+            failures = await check_parity(client, token, user_id, fixtures)
+            mark = "✓" if not failures else "✗"
+            print(f"  {mark} parity with the TypeScript merge: {len(fixtures['cases']) - len(failures)}"
+                  f"/{len(fixtures['cases'])} cases" + (f" (failed: {', '.join(failures)})" if failures else ""))
+            print()
+            print(f"  {'goals':>6}  {'path':<8}{'requests':>9}{'KB':>11}{'p50 ms':>10}{'p95 ms':>10}")
+            for level in sorted(levels):
+                await add_goals(client, token, user_id, seeded, level, shape)
+                seeded = level
+                row = {"goals": level}
+                for path in PATHS:
+                    row[path], _ = await measure(client, token, user_id, path, repeat)
+                results.append(row)
+                print_row(row)
+        finally:
+            await cleanup(client, token, user_id)
+    return results, failures
+
+
+def print_row(row):
+    for path in PATHS:
+        m = row[path]
+        print(f"  {row['goals']:>6}  {path:<8}{m['requests']:>9}{m['bytes'] / 1024:>11.1f}"
+              f"{m['p50_ms']:>10.1f}{m['p95_ms']:>10.1f}")
+    speedup = row["fan-out"]["p50_ms"] / row["rpc"]["p50_ms"] if row["rpc"]["p50_ms"] else float("inf")
+    print(f"  {'':>6}  {'':<8}{'':>9}{'':>11}  {speedup:.1f}x faster")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark goals fan-out vs get_goals_with_relations RPC")
+    parser.add_argument("--url", help="Supabase URL (default: start local_supabase in-process)")
+    parser.add_argument("--anon-key", default=ANON_KEY)
+    parser.add_argument("--email", default=f"bench-{int(time.time())}@example.com")
+    parser.add_argument("--password", default=BENCH_PASSWORD)
+    parser.add_argument("--levels", type=int, nargs="+", default=list(DEFAULT_LEVELS))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--tasks", type=int, default=10, help="relational tasks per goal")
+    parser.add_argument("--jsonb-tasks", type=int, default=2, help="legacy JSONB tasks per goal")
+    parser.add_argument("--milestones", type=int, default=2)
+    parser.add_argument("--habits", type=int, default=1)
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="TypeScript merge outputs to check against")
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    args = parser.parse_args(argv)
+    if args.email.lower() == DEMO_EMAIL:
+        parser.error("the benchmark deletes the account's goals; use a dedicated account, not the demo user")
+    shape = {"tasks": args.tasks, "jsonb_tasks": args.jsonb_tasks, "milestones": args.milestones, "habits": args.habits}
+    with open(args.fixtures) as f:
+        fixtures = json.load(f)
+
+    server = None
+    url = args.url
+    if url is None:
+        from local_supabase import LocalSupabase
+        server = LocalSupabase().start()
+        url = server.url
+
+    print("=" * 64)
+    print(f"GOALS SCREEN LOAD: fan-out vs RPC against {url}")
+    print("=" * 64)
+    try:
+        results, failures = asyncio.run(run(url, args.anon_key, args.email, args.password, args.levels, args.repeat,
+                                            shape, fixtures))
+    finally:
+        if server is not None:
+            server.stop()
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"levels": results, "parity_failures": failures}, f, indent=2)
+    return not failures
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
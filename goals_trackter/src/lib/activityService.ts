@@ -1,5 +1,5 @@
 import { supabase } from './supabase'
-import type { ActivityFeedItem, ActivityType } from '../types'
+import type { ActivityCursor, ActivityFeedItem, ActivityType } from '../types'
 
 /**
  * Activity Service
@@ -7,6 +7,13 @@ import type { ActivityFeedItem, ActivityType } from '../types'
  */
 
 export class ActivityService {
+  // get_activity_feed caps p_limit at 200; pages are clamped the same way
+  private static readonly MAX_PAGE = 200
+
+  private static pageSize(limit: number): number {
+    return Math.min(Math.max(limit, 1), this.MAX_PAGE)
+  }
+
   /**
    * Create activity entry
    */
@@ -48,12 +55,42 @@ export class ActivityService {
   }
 
   /**
-   * Get activity feed for current user (includes followed users' activity)
+   * Cursor for the page after `items`, or null when `items` was the last page
+   */
+  static nextCursor(items: ActivityFeedItem[], limit: number = 50): ActivityCursor | null {
+    const last = items[items.length - 1]
+    if (items.length < this.pageSize(limit) || !last?.created_at) return null
+    return { created_at: last.created_at, id: last.id }
+  }
+
+  /**
+   * PostgREST filter for the items after `cursor` in newest-first order
+   */
+  private static cursorFilter(cursor: ActivityCursor): string {
+    const createdAt = `"${cursor.created_at}"`
+    return `created_at.lt.${createdAt},and(created_at.eq.${createdAt},id.lt.${cursor.id})`
+  }
+
+  /**
+   * Get activity feed for current user (includes followed users' activity).
+   * Pass nextCursor() of the previous page to get the following one.
    */
-  static async getActivityFeed(limit: number = 50): Promise<ActivityFeedItem[]> {
+  static async getActivityFeed(limit: number = 50, cursor?: ActivityCursor): Promise<ActivityFeedItem[]> {
     try {
       const { data: { user } } = await supabase.auth.getUser()
       if (!user) return []
+      limit = this.pageSize(limit)
+
+      // One page of the fan-out inbox (1763000000_activity_feed_inbox.sql)
+      const { data: page, error: rpcError } = await supabase.rpc('get_activity_feed', {
+        p_user_id: user.id,
+        p_limit: limit,
+        p_before_created_at: cursor?.created_at ?? null,
+        p_before_id: cursor?.id ?? null
+      })
+      if (!rpcError) return (page as ActivityFeedItem[]) || []
+      // PGRST202: function not deployed yet, fall back to the follow-list query
+      if (rpcError.code !== 'PGRST202') throw rpcError
 
       // Get users current user is following
       const { data: following } = await supabase
@@ -64,7 +101,7 @@ export class ActivityService {
       const followingIds = following?.map(f => f.following_id) || []
 
       // Get activity from followed users and current user
-      const { data, error } = await supabase
+      let query = supabase
         .from('activity_feed')
         .select(`
           *,
@@ -75,7 +112,11 @@ export class ActivityService {
         `)
         .or(`user_id.eq.${user.id},user_id.in.(${followingIds.join(',')})`)
         .eq('is_public', true)
+
+      if (cursor) query = query.or(this.cursorFilter(cursor))
+      const { data, error } = await query
         .order('created_at', { ascending: false })
+        .order('id', { ascending: false })
         .limit(limit)
 
       if (error) throw error
@@ -87,11 +128,16 @@ export class ActivityService {
   }
 
   /**
-   * Get user's own activity
+   * Get user's own activity, newest first from `cursor`
    */
-  static async getUserActivity(userId: string, limit: number = 50): Promise<ActivityFeedItem[]> {
+  static async getUserActivity(
+    userId: string,
+    limit: number = 50,
+    cursor?: ActivityCursor
+  ): Promise<ActivityFeedItem[]> {
     try {
-      const { data, error } = await supabase
+      limit = this.pageSize(limit)
+      let query = supabase
         .from('activity_feed')
         .select(`
           *,
@@ -101,7 +147,12 @@ export class ActivityService {
           team_goal:team_goals(*)
         `)
         .eq('user_id', userId)
+
+      // (user_id, created_at DESC, id DESC) index
+      if (cursor) query = query.or(this.cursorFilter(cursor))
+      const { data, error } = await query
         .order('created_at', { ascending: false })
+        .order('id', { ascending: false })
         .limit(limit)
 
       if (error) throw error
@@ -113,11 +164,12 @@ export class ActivityService {
   }
 
   /**
-   * Get public activity (discover feed)
+   * Get public activity (discover feed), newest first from `cursor`
    */
-  static async getPublicActivity(limit: number = 50): Promise<ActivityFeedItem[]> {
+  static async getPublicActivity(limit: number = 50, cursor?: ActivityCursor): Promise<ActivityFeedItem[]> {
     try {
-      const { data, error } = await supabase
+      limit = this.pageSize(limit)
+      let query = supabase
         .from('activity_feed')
         .select(`
           *,
@@ -127,7 +179,12 @@ export class ActivityService {
           team_goal:team_goals(*)
         `)
         .eq('is_public', true)
+
+      // partial (created_at DESC, id DESC) WHERE is_public index
+      if (cursor) query = query.or(this.cursorFilter(cursor))
+      const { data, error } = await query
         .order('created_at', { ascending: false })
+        .order('id', { ascending: false })
         .limit(limit)
 
       if (error) throw error
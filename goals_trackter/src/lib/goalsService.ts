@@ -11,6 +11,14 @@ export class GoalsService {
   // Get all goals for the current user (with relational data)
   static async getGoals(userId: string, includeRelations: boolean = true): Promise<Goal[]> {
     try {
+      if (includeRelations) {
+        // One round trip: goals with nested tasks, milestones and habits, same merge rules as below
+        const { data, error } = await supabase.rpc('get_goals_with_relations', { p_user_id: userId })
+        if (!error) return (data as Goal[]) || []
+        // PGRST202: function not deployed yet, fall back to per-goal requests
+        if (error.code !== 'PGRST202') throw error
+      }
+
       const { data, error } = await supabase
         .from(this.tableName)
         .select('*')
@@ -1,5 +1,5 @@
 import { supabase } from './supabase'
-import { Habit, HabitCompletion, HabitTemplate, HabitAchievement, HabitNote, HabitProgressPhoto, HabitCategory } from '../types'
+import { Habit, HabitCompletion, HabitTemplate, HabitAchievement, HabitNote, HabitProgressPhoto, HabitCategory, HabitDashboard } from '../types'
 
 export class HabitsService {
   private static tableName = 'habits'
@@ -198,13 +198,24 @@ export class HabitsService {
 
       if (habitError) throw habitError
 
-      // Get total completions
-      const { count, error: countError } = await supabase
-        .from(this.completionsTable)
-        .select('*', { count: 'exact', head: true })
+      // Completion total maintained by the habit_daily_rollup triggers; no row until the first completion
+      const { data: totals, error: totalsError } = await supabase
+        .from('habit_completion_totals')
+        .select('total')
         .eq('habit_id', habitId)
-
-      if (countError) throw countError
+        .maybeSingle()
+
+      let count: number | null = totalsError ? null : totals?.total ?? 0
+      if (count === null) {
+        // Counter table not deployed yet, count the completions
+        const { count: exactCount, error: countError } = await supabase
+          .from(this.completionsTable)
+          .select('*', { count: 'exact', head: true })
+          .eq('habit_id', habitId)
+
+        if (countError) throw countError
+        count = exactCount
+      }
 
       // Calculate days since creation
       const createdDate = new Date(habit.created_at)
@@ -656,9 +667,20 @@ export class HabitsService {
     topStreak: number
   }> {
     try {
+      const today = new Date().toISOString().split('T')[0]
+
+      // One round trip: counts come from the habit_daily_rollup table
+      const { data: dashboard, error: rpcError } = await supabase
+        .rpc('get_habit_dashboard', { p_user_id: userId, p_today: today })
+      if (!rpcError) {
+        const { totalHabits, completedToday, weekCompletion, topStreak } = dashboard as HabitDashboard
+        return { totalHabits, completedToday, weekCompletion, topStreak }
+      }
+      // PGRST202: function not deployed yet, fall back to per-habit requests
+      if (rpcError.code !== 'PGRST202') throw rpcError
+
       // Get all habits
       const habits = await this.getHabits(userId)
-      const today = new Date().toISOString().split('T')[0]
       
       // Get completions for today
       let completedToday = 0
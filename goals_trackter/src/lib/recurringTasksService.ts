@@ -133,17 +133,19 @@ export class RecurringTasksService {
         priority: task.priority,
         category: task.category,
         recurring_pattern: task.recurring_pattern,
+        recurrence_of: task.id,
       }
 
-      const { data: createdTask, error: createError } = await supabase
+      // (recurrence_of, due_date) is unique: if the occurrence already exists
+      // (created by recurring_tasks_worker.py or another tab) nothing is inserted
+      const { data: createdTasks, error: createError } = await supabase
         .from('tasks')
-        .insert([newTask])
+        .upsert([newTask], { onConflict: 'recurrence_of,due_date', ignoreDuplicates: true })
         .select()
-        .single()
 
       if (createError) throw createError
 
-      return createdTask as Task
+      return (createdTasks?.[0] as Task) || null
     } catch (error) {
       console.error('Error completing recurring task:', error)
       return null
@@ -17,6 +17,7 @@ export interface Task {
   estimated_minutes?: number
   actual_minutes?: number
   recurring_pattern?: any // JSONB field for recurring tasks
+  recurrence_of?: string // task this occurrence was generated from
   recurrence_rule?: string
   next_occurrence_date?: string
   last_occurrence_date?: string
@@ -92,6 +93,22 @@ export interface HabitCompletion {
   created_at?: string
 }
 
+// Habits dashboard returned by the get_habit_dashboard RPC
+export interface HabitDashboard {
+  totalHabits: number
+  completedToday: number
+  weekCompletion: number
+  topStreak: number
+  habits: {
+    habitId: string
+    totalCompletions: number
+    currentStreak: number
+    bestStreak: number
+    completedToday: boolean
+    completionRate: number
+  }[]
+}
+
 // Habit template type
 export interface HabitTemplate {
   id: string
@@ -365,6 +382,12 @@ export interface ActivityFeedItem {
   team_goal?: TeamGoal
 }
 
+// Keyset cursor for activity pages: the created_at and id of the last item seen
+export interface ActivityCursor {
+  created_at: string
+  id: string
+}
+
 // Goal visibility type
 export type GoalVisibility = 'public' | 'private' | 'followers'
 
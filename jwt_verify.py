@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+Local verification of Supabase access tokens, without an auth round trip.
+
+Checks the signature and the time claims of a GoTrue JWT in-process and
+returns who it belongs to (sub, role, exp, aal, session_id):
+
+  - HS256/384/512 with the project's JWT secret (SUPABASE_JWT_SECRET)
+  - RS256/384/512 and ES256/384 with the project's signing keys, read from
+    /auth/v1/.well-known/jwks.json and cached; the key set is fetched again
+    after JWKS_TTL seconds, or when a token names an unknown kid (at most
+    once per JWKS_MIN_REFRESH seconds, so a flood of forged kids cannot
+    turn into a flood of requests)
+  - the algorithm must match the key: an HS256 token is never checked
+    against a public key, `none` is never accepted
+  - exp (required), nbf and optionally aud/iss are checked on every call;
+    signatures are checked once per token and remembered in a bounded LRU,
+    so a load generator or monitor re-presenting the same tokens pays a
+    dict lookup; each entry remembers the kid and key that verified it and
+    stops counting once that key has been rotated out of the key set
+
+RSA and ECDSA signatures are checked with the `cryptography` package
+(pip install cryptography); without it only HS* tokens can be verified.
+Coroutines call verify_async(), which fetches a due key set in a worker
+thread instead of blocking the event loop.
+
+    verifier = get_verifier()
+    claims = verifier.verify(session["access_token"])
+    assert claims.sub == user_id and claims.role == "authenticated"
+
+Usage:
+    python3 jwt_verify.py <token> [<token> ...]
+    echo "$TOKEN" | python3 jwt_verify.py -
+    python3 jwt_verify.py --url https://<ref>.supabase.co <token>
+    python3 jwt_verify.py --bench 20000
+    python3 jwt_verify.py --jwks jwks.json --bench 5000 - < tokens.txt
+"""
+import argparse
+import asyncio
+import base64
+import collections
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+
+from supabase_client import SUPABASE_URL, SupabaseClient
+
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import ec, padding, rsa
+    from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+except ImportError:
+    rsa = ec = None
+
+JWT_SECRET = os.environ.get("SUPABASE_JWT_SECRET")
+JWKS_PATH = "/auth/v1/.well-known/jwks.json"
+JWKS_TTL = 600  # seconds a fetched key set is trusted
+JWKS_MIN_REFRESH = 30  # seconds between fetches triggered by unknown kids
+CACHE_SIZE = 8192  # verified tokens remembered
+
+Claims = collections.namedtuple("Claims", "sub role exp aal session_id claims")
+
+# verify(alg, signing_input, signature) -> bool; algs are the JWS algorithms the key may be used with
+Key = collections.namedtuple("Key", "kid kty algs verify")
+
+
+class TokenError(Exception):
+    """A token that is malformed, unverifiable or no longer valid
+
+    `reason` is one of: malformed, unsupported_alg, no_key, bad_signature,
+    expired, not_yet_valid, missing_exp, audience, issuer.
+    """
+
+    def __init__(self, reason, message):
+        super().__init__(f"{reason}: {message}")
+        self.reason = reason
+        self.message = message
+
+
+def _b64url_decode(segment):
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _b64url_int(segment):
+    return int.from_bytes(_b64url_decode(segment), "big")
+
+
+def split_token(token):
+    """(header, payload, signing_input, signature) without verifying anything"""
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64url_decode(header_b64))
+        payload = json.loads(_b64url_decode(payload_b64))
+        signature = _b64url_decode(signature_b64)
+    except (ValueError, AttributeError) as e:
+        raise TokenError("malformed", f"not a JWS compact token ({e})") from None
+    if not isinstance(header, dict) or not isinstance(payload, dict):
+        raise TokenError("malformed", "header and payload must be JSON objects")
+    return header, payload, f"{header_b64}.{payload_b64}".encode("ascii"), signature
+
+
+# ---- HMAC ----
+
+HMAC_HASHES = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+
+def hmac_key(secret):
+    secret = secret.encode() if isinstance(secret, str) else secret
+
+    def verify(alg, signing_input, signature):
+        digest = hmac.new(secret, signing_input, HMAC_HASHES[alg]).digest()
+        return hmac.compare_digest(digest, signature)
+    return Key(None, "oct", frozenset(HMAC_HASHES), verify)
+
+
+# ---- RSA and ECDSA (cryptography) ----
+
+RSA_HASHES = {"RS256": "SHA256", "RS384": "SHA384", "RS512": "SHA512"}
+# crv -> (JWS alg, coordinate size, curve, hash)
+EC_CURVES = {"P-256": ("ES256", 32, "SECP256R1", "SHA256"), "P-384": ("ES384", 48, "SECP384R1", "SHA384")}
+ASYMMETRIC_ALGS = frozenset(RSA_HASHES) | frozenset(alg for alg, _, _, _ in EC_CURVES.values())
+
+
+def rsa_key(jwk):
+    public_key = rsa.RSAPublicNumbers(_b64url_int(jwk["e"]), _b64url_int(jwk["n"])).public_key()
+    algs = frozenset([jwk["alg"]]) if jwk.get("alg") else frozenset(RSA_HASHES)
+
+    def verify(alg, signing_input, signature):
+        try:
+            public_key.verify(signature, signing_input, padding.PKCS1v15(), getattr(hashes, RSA_HASHES[alg])())
+            return True
+        except InvalidSignature:
+            return False
+    return Key(jwk.get("kid"), "RSA", algs & set(RSA_HASHES), verify)
+
+
+def ec_key(jwk):
+    if jwk.get("crv") not in EC_CURVES:
+        raise ValueError(f"unsupported curve {jwk.get('crv')}")
+    alg, size, curve, hash_name = EC_CURVES[jwk["crv"]]
+    # public_key() rejects points that are not on the curve
+    public_key = ec.EllipticCurvePublicNumbers(
+        _b64url_int(jwk["x"]), _b64url_int(jwk["y"]), getattr(ec, curve)()).public_key()
+    algorithm = ec.ECDSA(getattr(hashes, hash_name)())
+
+    def verify(alg, signing_input, signature):
+        # JWS signatures are r || s, cryptography wants DER
+        if len(signature) != 2 * size:
+            return False
+        r = int.from_bytes(signature[:size], "big")
+        s = int.from_bytes(signature[size:], "big")
+        try:
+            public_key.verify(encode_dss_signature(r, s), signing_input, algorithm)
+            return True
+        except InvalidSignature:
+            return False
+    return Key(jwk.get("kid"), "EC", frozenset([alg]), verify)
+
+
+def key_from_jwk(jwk):
+    """Key for one JWK, or None for key types and uses this module does not verify with"""
+    if jwk.get("use", "sig") != "sig" or rsa is None:
+        return None
+    try:
+        if jwk.get("kty") == "RSA":
+            return rsa_key(jwk)
+        if jwk.get("kty") == "EC":
+            return ec_key(jwk)
+    except (KeyError, ValueError):
+        return None
+    return None
+
+
+# ---- key set ----
+
+class JwksCache:
+    """Signing keys of one project, fetched from JWKS_PATH and refreshed after `ttl` or on an unknown kid
+
+    Pass `document` (a parsed JWKS) to use a fixed key set and never fetch.
+    """
+
+    def __init__(self, url=None, ttl=JWKS_TTL, min_refresh=JWKS_MIN_REFRESH, client=None, document=None):
+        self.url = (url or SUPABASE_URL).rstrip("/")
+        self.ttl = ttl
+        self.min_refresh = min_refresh
+        self._client = client
+        self.keys = {}
+        self.fetched_at = None
+        self.static = document is not None
+        self.stats = {"fetches": 0, "fetch_errors": 0}
+        self._lock = threading.Lock()
+        # one asyncio.Lock per event loop, created on first use: the cache is a process-wide singleton
+        self._async_locks = weakref.WeakKeyDictionary()
+        self._jwks = {}
+        if document is not None:
+            self.load(document)
+
+    def load(self, document):
+        """Replace the key set; a kid whose JWK did not change keeps its Key, so verified tokens stay cached"""
+        keys, jwks = {}, {}
+        for jwk in document.get("keys", ()):
+            kid = jwk.get("kid")
+            key = self.keys.get(kid) if self._jwks.get(kid) == jwk else key_from_jwk(jwk)
+            if key is not None:
+                keys[key.kid] = key
+                jwks[key.kid] = jwk
+        self.keys, self._jwks = keys, jwks
+
+    def refresh(self):
+        """Fetch the key set now; on failure the previous keys stay in use"""
+        if self._client is None:
+            self._client = SupabaseClient(self.url)
+        self.fetched_at = time.monotonic()
+        self.stats["fetches"] += 1
+        try:
+            response = self._client.request("GET", JWKS_PATH)
+            if response.status_code == 200:
+                self.load(response.json())
+                return True
+        except Exception:  # network errors must not fail verification of already-known keys
+            pass
+        self.stats["fetch_errors"] += 1
+        return False
+
+    def due(self, kid):
+        """Whether get(kid) would fetch the key set first"""
+        if self.static:
+            return False
+        age = None if self.fetched_at is None else time.monotonic() - self.fetched_at
+        return age is None or age > self.ttl or (kid not in self.keys and age > self.min_refresh)
+
+    def get(self, kid):
+        if self.static:
+            return self.keys.get(kid)
+        with self._lock:
+            if self.due(kid):
+                self.refresh()
+            return self.keys.get(kid)
+
+    async def refresh_async(self, kid=None):
+        """Fetch the key set in a worker thread if get(kid) would, so the event loop never waits on it
+
+        Concurrent callers share one fetch.
+        """
+        loop = asyncio.get_running_loop()
+        lock = self._async_locks.get(loop)
+        if lock is None:
+            lock = self._async_locks[loop] = asyncio.Lock()
+        async with lock:
+            if self.due(kid):
+                await asyncio.to_thread(self.get, kid)
+
+
+# ---- verification ----
+
+class TokenVerifier:
+    """Verify access tokens against a JWT secret and/or a JwksCache"""
+
+    def __init__(self, secret=None, jwks=None, audience=None, issuer=None, leeway=0, cache_size=CACHE_SIZE):
+        self.hmac = hmac_key(secret) if secret else None
+        self.jwks = jwks
+        self.audience = audience
+        self.issuer = issuer
+        self.leeway = leeway
+        self.cache_size = cache_size
+        self._verified = collections.OrderedDict()
+        self.stats = {"verified": 0, "cache_hits": 0, "rejected": 0}
+
+    def _key(self, header):
+        alg = header.get("alg")
+        if alg in HMAC_HASHES:
+            if self.hmac is None:
+                raise TokenError("no_key", f"{alg} token but no JWT secret configured (SUPABASE_JWT_SECRET)")
+            return self.hmac
+        if alg not in ASYMMETRIC_ALGS:
+            raise TokenError("unsupported_alg", f"algorithm {alg!r} is not accepted")
+        if rsa is None:
+            raise TokenError("unsupported_alg", f"{alg} needs the cryptography package (pip install cryptography)")
+        key = self.jwks.get(header.get("kid")) if self.jwks is not None else None
+        if key is None:
+            raise TokenError("no_key", f"no signing key with kid {header.get('kid')!r}")
+        return key
+
+    def _current(self, kid, key):
+        """Whether `key` is still the key for `kid`: the JWT secret, or in the (refreshed) key set"""
+        if key is self.hmac:
+            return True
+        return self.jwks is not None and self.jwks.get(kid) is key
+
+    def _signed_payload(self, token):
+        entry = self._verified.get(token)
+        if entry is not None:
+            kid, key, payload = entry
+            if self._current(kid, key):
+                self._verified.move_to_end(token)
+                self.stats["cache_hits"] += 1
+                return payload
+            del self._verified[token]  # key rotated out: check the signature again
+        header, payload, signing_input, signature = split_token(token)
+        key = self._key(header)
+        alg = header["alg"]
+        if alg not in key.algs:
+            raise TokenError("unsupported_alg", f"{alg} token signed for a {key.kty} key")
+        if not key.verify(alg, signing_input, signature):
+            raise TokenError("bad_signature", "signature does not match")
+        self._verified[token] = (header.get("kid"), key, payload)
+        if len(self._verified) > self.cache_size:
+            self._verified.popitem(last=False)
+        return payload
+
+    def _check_claims(self, payload, now):
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)):
+            raise TokenError("missing_exp", "token has no numeric exp")
+        if exp + self.leeway <= now:
+            raise TokenError("expired", f"expired {int(now - exp)} s ago")
+        nbf = payload.get("nbf")
+        if isinstance(nbf, (int, float)) and nbf - self.leeway > now:
+            raise TokenError("not_yet_valid", f"valid in {int(nbf - now)} s")
+        if self.audience is not None:
+            aud = payload.get("aud")
+            if self.audience not in (aud if isinstance(aud, list) else [aud]):
+                raise TokenError("audience", f"aud {aud!r} is not {self.audience!r}")
+        if self.issuer is not None and payload.get("iss") != self.issuer:
+            raise TokenError("issuer", f"iss {payload.get('iss')!r} is not {self.issuer!r}")
+
+    async def verify_async(self, token, now=None):
+        """verify() for coroutines: a due key-set fetch runs in a worker thread, not on the event loop"""
+        if self.jwks is not None:
+            entry = self._verified.get(token)
+            if entry is not None:
+                kid, asymmetric = entry[0], entry[1] is not self.hmac
+            else:
+                try:
+                    header = split_token(token)[0]
+                except TokenError:
+                    header = {}  # verify() reports it
+                kid, asymmetric = header.get("kid"), header.get("alg") in ASYMMETRIC_ALGS
+            if asymmetric:
+                await self.jwks.refresh_async(kid)
+        return self.verify(token, now)
+
+    def verify(self, token, now=None):
+        """Claims of a valid token; raises TokenError otherwise"""
+        try:
+            payload = self._signed_payload(token)
+            self._check_claims(payload, time.time() if now is None else now)
+        except TokenError:
+            self.stats["rejected"] += 1
+            raise
+        self.stats["verified"] += 1
+        return Claims(payload.get("sub"), payload.get("role"), payload.get("exp"), payload.get("aal"),
+                      payload.get("session_id"), payload)
+
+
+_shared_verifier = None
+
+
+def get_verifier():
+    """Return the process-wide TokenVerifier for SUPABASE_URL and SUPABASE_JWT_SECRET"""
+    global _shared_verifier
+    if _shared_verifier is None:
+        _shared_verifier = TokenVerifier(secret=JWT_SECRET, jwks=JwksCache())
+    return _shared_verifier
+
+
+# ---- command line ----
+
+def describe(claims, now):
+    expires = datetime.fromtimestamp(claims.exp, timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+    return (f"sub={claims.sub} role={claims.role} aal={claims.aal} "
+            f"exp={expires} (in {int(claims.exp - now)} s)")
+
+
+def read_tokens(sources):
+    tokens = []
+    for source in sources:
+        lines = sys.stdin.read().split() if source == "-" else [source]
+        tokens.extend(line.strip() for line in lines if line.strip())
+    return tokens
+
+
+def inspect(verifier, tokens):
+    now = time.time()
+    valid = 0
+    for token in tokens:
+        try:
+            claims = verifier.verify(token, now)
+        except TokenError as e:
+            print(f"  ✗ {e}")
+            try:
+                header, payload, _, _ = split_token(token)
+                print(f"      alg={header.get('alg')} kid={header.get('kid')} unverified: "
+                      f"sub={payload.get('sub')} role={payload.get('role')} exp={payload.get('exp')}")
+            except TokenError:
+                pass
+            continue
+        valid += 1
+        print(f"  ✓ {describe(claims, now)}")
+    return valid == len(tokens)
+
+
+def bench(verifier, tokens, count, secret):
+    """Tokens per second for first-seen tokens (signature checked, per algorithm) and for repeats (cached)"""
+    if not tokens:
+        from local_supabase import encode_jwt
+        issued = int(time.time())
+        tokens = [encode_jwt({"sub": f"bench-{i}", "role": "authenticated", "aal": "aal1", "aud": "authenticated",
+                              "iat": issued, "exp": issued + 3600}, secret) for i in range(count)]
+    verifier._verified.clear()
+    verifier.cache_size = max(verifier.cache_size, len(tokens))
+    by_alg = collections.defaultdict(lambda: [0, 0.0])
+    for token in tokens:
+        alg = split_token(token)[0].get("alg")
+        started = time.perf_counter()
+        verifier.verify(token)
+        by_alg[alg][0] += 1
+        by_alg[alg][1] += time.perf_counter() - started
+    rounds = [tokens[i % len(tokens)] for i in range(count)]
+    started = time.perf_counter()
+    for token in rounds:
+        verifier.verify(token)
+    elapsed = time.perf_counter() - started
+    results = {alg: n / spent if spent else float("inf") for alg, (n, spent) in sorted(by_alg.items())}
+    results["cached"] = len(rounds) / elapsed if elapsed else float("inf")
+    print(f"  First seen (signature checked), {len(tokens):,} distinct tokens")
+    for alg, (n, _) in sorted(by_alg.items()):
+        print(f"    {alg:<8} {results[alg]:>12,.0f} tokens/s  (n={n:,})")
+    print(f"  Repeated (cached signature), {len(rounds):,} verifications")
+    print(f"    {'any':<8} {results['cached']:>12,.0f} tokens/s")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify Supabase access tokens locally")
+    parser.add_argument("tokens", nargs="*", help="tokens to verify; - reads whitespace-separated tokens from stdin")
+    parser.add_argument("--secret", default=JWT_SECRET, help="HS256 JWT secret (default: SUPABASE_JWT_SECRET)")
+    parser.add_argument("--url", default=None, help="project URL whose JWKS is used (default: SUPABASE_URL)")
+    parser.add_argument("--jwks", help="read the key set from this file instead of fetching it")
+    parser.add_argument("--no-jwks", action="store_true", help="HMAC tokens only; never fetch a key set")
+    parser.add_argument("--audience", help="require this aud (GoTrue user tokens: authenticated)")
+    parser.add_argument("--issuer", help="require this iss")
+    parser.add_argument("--leeway", type=float, default=0, help="seconds of clock skew allowed on exp/nbf")
+    parser.add_argument("--bench", type=int, metavar="N", help="time N verifications")
+    args = parser.parse_args(argv)
+
+    tokens = read_tokens(args.tokens)
+    if args.bench is None and not tokens:
+        parser.error("give tokens to verify, - for stdin, or --bench N")
+    secret = args.secret
+    if args.bench is not None and not tokens and not secret:
+        from local_supabase import JWT_SECRET as secret  # the stand-in's; tokens are minted with it
+
+    jwks = None
+    if args.jwks:
+        with open(args.jwks) as f:
+            jwks = JwksCache(document=json.load(f))
+    elif not args.no_jwks:
+        jwks = JwksCache(args.url)
+    verifier = TokenVerifier(secret, jwks, args.audience, args.issuer, args.leeway)
+
+    print("=" * 80)
+    print("LOCAL JWT VERIFICATION")
+    print("=" * 80)
+    key_sources = ["HMAC secret"] if secret else []
+    if jwks is not None:
+        key_sources.append(f"JWKS {args.jwks or jwks.url + JWKS_PATH}")
+    print(f"  Keys: {', '.join(key_sources) or 'none'}"
+          f"{'' if rsa is not None else '  (RS*/ES* need the cryptography package)'}\n")
+
+    if args.bench is not None:
+        try:
+            bench(verifier, tokens, args.bench, secret)
+        except TokenError as e:
+            print(f"  ✗ {e}")
+            return False
+        return True
+    return inspect(verifier, tokens)
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
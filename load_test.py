@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Virtual-user load generator for the Goals Tracker backend.
+
+Each virtual user replays the journey from
+`user_acceptance_test.test_complete_user_workflow`:
+signup -> signin -> create goal -> list goals -> PATCH tasks -> logout.
+
+Users are started over a configurable ramp, all requests are paced by a
+global token bucket (target RPS) and auth calls additionally by a
+separate bucket so GoTrue rate limits are respected. The report gives
+per-step latency percentiles, a latency histogram, error rates and
+throughput; percentiles, errors and throughput are also recorded in the
+perf_store.py history.
+
+With --verify-tokens every signin's access token is verified in-process
+(jwt_verify.py: --jwt-secret for HS256 projects, the project's JWKS for
+asymmetric keys) and must name the user that signed in; mismatches count
+as failed signins.
+
+Usage:
+    python3 load_test.py --users 50 --ramp 10 --duration 60 --rps 40 --auth-rps 5
+    python3 load_test.py --users 50 --verify-tokens --jwt-secret $SUPABASE_JWT_SECRET
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+
+from jwt_verify import JWT_SECRET, JwksCache, TokenError, TokenVerifier
+from perf_store import add_store_arguments, metric_samples, record_samples
+from supabase_client import SUPABASE_URL, AsyncSupabaseClient
+
+STEPS = ["signup", "signin", "create_goal", "list_goals", "update_tasks", "logout"]
+AUTH_STEPS = {"signup", "signin"}
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+HISTOGRAM_BUCKETS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class TokenBucket:
+    """asyncio token bucket: `rate` tokens per second, at most `burst` banked"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class StepStats:
+    """Latency samples and error counts for one journey step"""
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.errors = 0
+        self.error_codes = {}
+
+    def record(self, latency_ms, ok, status=None):
+        self.latencies.append(latency_ms)
+        if not ok:
+            self.errors += 1
+            key = str(status)
+            self.error_codes[key] = self.error_codes.get(key, 0) + 1
+
+    def histogram(self):
+        counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        for value in self.latencies:
+            for i, bound in enumerate(HISTOGRAM_BUCKETS):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+        labels = [f"<={b}ms" for b in HISTOGRAM_BUCKETS] + [f">{HISTOGRAM_BUCKETS[-1]}ms"]
+        return dict(zip(labels, counts))
+
+    def summary(self, elapsed):
+        values = sorted(self.latencies)
+        count = len(values)
+        return {
+            "count": count,
+            "errors": self.errors,
+            "error_rate": self.errors / count if count else 0.0,
+            "error_codes": self.error_codes,
+            "throughput_rps": count / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+            "max_ms": values[-1] if values else 0.0,
+            "histogram": self.histogram(),
+        }
+
+
+class LoadTest:
+    """Drives N virtual users against one Supabase project"""
+
+    def __init__(self, users=10, ramp=5.0, duration=30.0, rps=20.0, auth_rps=2.0,
+                 think_time=1.0, email_domain="example.com", url=None, anon_key=None, verifier=None):
+        self.users = users
+        self.ramp = ramp
+        self.duration = duration
+        self.think_time = think_time
+        self.email_domain = email_domain
+        self.url = url
+        self.anon_key = anon_key
+        self.request_bucket = TokenBucket(rps)
+        self.auth_bucket = TokenBucket(auth_rps)
+        self.stats = {name: StepStats(name) for name in STEPS}
+        self.journeys_completed = 0
+        self.journeys_failed = 0
+        self.verifier = verifier
+        self.identity_failures = {}
+
+    async def timed(self, step, call, ok_statuses):
+        """Pace, time and record one request; returns the response, or None if it failed"""
+        if step in AUTH_STEPS:
+            await self.auth_bucket.acquire()
+        await self.request_bucket.acquire()
+        start = time.perf_counter()
+        try:
+            response = await call()
+        except Exception as e:
+            self.stats[step].record((time.perf_counter() - start) * 1000, False, type(e).__name__)
+            return None
+        latency_ms = (time.perf_counter() - start) * 1000
+        ok = response.status_code in ok_statuses
+        self.stats[step].record(latency_ms, ok, response.status_code)
+        return response if ok else None
+
+    async def identity_ok(self, access_token, user_id):
+        """The signin token verifies locally and names the user that signed in"""
+        try:
+            claims = await self.verifier.verify_async(access_token)
+            reason = None if claims.sub == user_id and claims.role == "authenticated" else "wrong_subject"
+        except TokenError as e:
+            reason = e.reason
+        if reason:
+            self.identity_failures[reason] = self.identity_failures.get(reason, 0) + 1
+        return reason is None
+
+    async def think(self):
+        if self.think_time > 0:
+            # +/-50% jitter so users do not march in lockstep
+            await asyncio.sleep(self.think_time * random.uniform(0.5, 1.5))
+
+    async def journey(self, client, vu_id):
+        """One pass through the acceptance workflow; returns True when every step succeeded"""
+        email = f"load{vu_id}-{uuid.uuid4().hex[:12]}@{self.email_domain}"
+        password = "loadtest123456"
+
+        response = await self.timed("signup", lambda: client.signup(email, password), (200, 201))
+        if response is None:
+            return False
+        await self.think()
+
+        response = await self.timed("signin", lambda: client.sign_in(email, password), (200,))
+        if response is None:
+            return False
+        session = response.json()
+        access_token = session.get("access_token")
+        user_id = session.get("user", {}).get("id")
+        if self.verifier is not None and not await self.identity_ok(access_token, user_id):
+            return False
+        await self.think()
+
+        goal = {
+            "user_id": user_id,
+            "title": "Load Test Goal",
+            "description": f"Virtual user {vu_id}",
+            "icon": "Target",
+            "color": "blue",
+            "image_url": "",
+            "deadline": "2025-12-31",
+            "tasks": [
+                {"id": 1, "text": "First task", "dueDate": "2025-11-04", "isComplete": False},
+                {"id": 2, "text": "Second task", "dueDate": "2025-11-05", "isComplete": False}
+            ]
+        }
+        response = await self.timed(
+            "create_goal", lambda: client.insert("goals", goal, access_token), (200, 201)
+        )
+        if response is None:
+            return False
+        created = response.json()
+        goal_id = (created[0] if isinstance(created, list) else created).get("id")
+        await self.think()
+
+        response = await self.timed(
+            "list_goals", lambda: client.select("goals", {"user_id": user_id}, access_token), (200,)
+        )
+        if response is None:
+            return False
+        goals = response.json()
+        tasks = next((g["tasks"] for g in goals if g.get("id") == goal_id), goal["tasks"])
+        tasks[0]["isComplete"] = True
+        await self.think()
+
+        response = await self.timed(
+            "update_tasks",
+            lambda: client.update("goals", {"id": goal_id}, {"tasks": tasks}, access_token),
+            (200, 204),
+        )
+        if response is None:
+            return False
+        await self.think()
+
+        response = await self.timed("logout", lambda: client.logout(access_token), (200, 204))
+        return response is not None
+
+    async def virtual_user(self, client, vu_id, deadline):
+        while time.monotonic() < deadline:
+            if await self.journey(client, vu_id):
+                self.journeys_completed += 1
+            else:
+                self.journeys_failed += 1
+                await self.think()
+
+    async def run(self):
+        client = AsyncSupabaseClient(self.url, self.anon_key, max_connections=max(10, self.users))
+        started = time.monotonic()
+        deadline = started + self.duration
+        tasks = []
+        try:
+            for vu_id in range(self.users):
+                if self.users > 1 and self.ramp > 0:
+                    delay = started + self.ramp * vu_id / (self.users - 1) - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(self.virtual_user(client, vu_id, deadline)))
+            await asyncio.gather(*tasks)
+        finally:
+            await client.close()
+        return self.report(time.monotonic() - started)
+
+    def report(self, elapsed):
+        total = sum(len(s.latencies) for s in self.stats.values())
+        errors = sum(s.errors for s in self.stats.values())
+        return {
+            "config": {
+                "users": self.users,
+                "ramp_s": self.ramp,
+                "duration_s": self.duration,
+                "target_rps": self.request_bucket.rate,
+                "auth_rps": self.auth_bucket.rate,
+                "think_time_s": self.think_time,
+            },
+            "elapsed_s": elapsed,
+            "requests": total,
+            "errors": errors,
+            "error_rate": errors / total if total else 0.0,
+            "throughput_rps": total / elapsed if elapsed else 0.0,
+            "journeys_completed": self.journeys_completed,
+            "journeys_failed": self.journeys_failed,
+            "identity_checks": None if self.verifier is None else {
+                "verified": self.verifier.stats["verified"],
+                "failed": dict(self.identity_failures),
+            },
+            "steps": {name: s.summary(elapsed) for name, s in self.stats.items()},
+        }
+
+
+def print_report(report):
+    print("\n" + "=" * 80)
+    print("LOAD TEST REPORT")
+    print("=" * 80)
+    cfg = report["config"]
+    print(f"\n  Users: {cfg['users']}  Ramp: {cfg['ramp_s']}s  Duration: {cfg['duration_s']}s  "
+          f"Target RPS: {cfg['target_rps']}  Auth RPS: {cfg['auth_rps']}")
+    print(f"  Requests: {report['requests']}  Errors: {report['errors']} "
+          f"({report['error_rate']:.1%})  Throughput: {report['throughput_rps']:.1f} req/s")
+    print(f"  Journeys: {report['journeys_completed']} completed, {report['journeys_failed']} failed")
+    identity = report.get("identity_checks")
+    if identity is not None:
+        failed = ", ".join(f"{reason} {n}" for reason, n in identity["failed"].items()) or "none"
+        print(f"  Signin tokens verified locally: {identity['verified']} ok, failed: {failed}")
+
+    print(f"\n  {'Step':<14}{'Count':>7}{'Err%':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    print("  " + "-" * 65)
+    for name, s in report["steps"].items():
+        print(f"  {name:<14}{s['count']:>7}{s['error_rate']:>8.1%}{s['p50_ms']:>9.1f}"
+              f"{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}{s['max_ms']:>9.1f}")
+
+    print("\n  Latency histogram (all steps, ms)")
+    merged = {}
+    for s in report["steps"].values():
+        for bucket, count in s["histogram"].items():
+            merged[bucket] = merged.get(bucket, 0) + count
+    peak = max(merged.values()) if merged else 0
+    for bucket, count in merged.items():
+        bar = "#" * (int(40 * count / peak) if peak else 0)
+        print(f"  {bucket:>10} {count:>7} {bar}")
+    print("\n" + "=" * 80 + "\n")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Virtual-user load test for the Goals Tracker backend")
+    parser.add_argument("--users", type=int, default=10, help="number of virtual users")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which users are started")
+    parser.add_argument("--duration", type=float, default=30.0, help="total test duration in seconds")
+    parser.add_argument("--rps", type=float, default=20.0, help="target requests per second across all users")
+    parser.add_argument("--auth-rps", type=float, default=2.0, help="max signup/signin requests per second")
+    parser.add_argument("--think-time", type=float, default=1.0, help="mean pause between steps in seconds")
+    parser.add_argument("--email-domain", default="example.com", help="domain for generated accounts")
+    parser.add_argument("--url", default=None, help="Supabase URL (defaults to SUPABASE_URL)")
+    parser.add_argument("--verify-tokens", action="store_true",
+                        help="verify each signin's access token locally and check it names the user")
+    parser.add_argument("--jwt-secret", default=JWT_SECRET, help="HS256 secret for --verify-tokens "
+                        "(default SUPABASE_JWT_SECRET; asymmetric keys come from the project's JWKS)")
+    parser.add_argument("--json", dest="json_path", default=None, help="write the full report to this file")
+    add_store_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    verifier = None
+    if args.verify_tokens:
+        jwks = JwksCache(args.url)
+        jwks.refresh()  # fetch before the event loop starts; later ones run in a worker thread
+        verifier = TokenVerifier(args.jwt_secret, jwks)
+    test = LoadTest(
+        users=args.users,
+        ramp=args.ramp,
+        duration=args.duration,
+        rps=args.rps,
+        auth_rps=args.auth_rps,
+        think_time=args.think_time,
+        email_domain=args.email_domain,
+        url=args.url,
+        verifier=verifier,
+    )
+    report = asyncio.run(test.run())
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"  Report written to {args.json_path}")
+    units = {"errors": "errors", "error_rate": "errors"}
+    samples = metric_samples("load_test", {key: report[key] for key in ("errors", "error_rate", "throughput_rps")}, units)
+    for name, step in report["steps"].items():
+        samples += metric_samples(f"load_test.{name}", step, units)
+    record_samples(args, "load_test", args.url or SUPABASE_URL, samples)
+    return report["errors"] == 0 and not test.identity_failures
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,1632 @@
+#!/usr/bin/env python3
+"""
+Local in-process Supabase stand-in (GoTrue + PostgREST subset).
+
+Speaks the part of the Supabase HTTP API that the Python scripts and the
+`src/lib/*Service.ts` files use, backed by an in-memory store:
+
+  /auth/v1/health, /auth/v1/signup, /auth/v1/token?grant_type=password|refresh_token,
+  /auth/v1/logout, /auth/v1/user, /auth/v1/admin/users (service role),
+  /auth/v1/.well-known/jwks.json (empty: HS256 only)
+  /rest/v1/<table>   GET/HEAD/POST/PATCH/DELETE with eq/neq/gt/gte/lt/lte/in/is/
+                     like/ilike/not/or filters, select, order, limit, offset,
+                     Range headers, Prefer: return=representation|minimal,
+                     count=exact and resolution=merge-duplicates|ignore-duplicates
+  /rest/v1/rpc/<fn>  functions registered with @rpc
+  /functions/v1/<fn> edge functions registered with @edge_function
+  /v1/projects/<ref>/config/auth  Management API auth config, GET/PATCH per ref
+  /realtime/v1/websocket  Phoenix channels (JSON v1.0.0) with postgres_changes
+                     bindings: event/table/single-filter, RLS-checked against the
+                     join's access_token; /realtime/v1/api/stats counts deliveries
+
+Access tokens are real HS256 JWTs signed with JWT_SECRET. Row ownership
+mirrors the RLS policies in supabase/migrations: authenticated users only
+see and write their own rows (plus public rows where a policy allows it),
+the service role bypasses RLS. The demo account is seeded on start.
+
+Run standalone and point the scripts at it:
+    python3 local_supabase.py --port 54321
+    SUPABASE_URL=http://127.0.0.1:54321 python3 user_acceptance_test.py
+
+Or embed it in a script or benchmark:
+    with LocalSupabase() as server:
+        client = SupabaseClient(server.url)
+"""
+import argparse
+import asyncio
+import base64
+import collections
+import copy
+import hashlib
+import hmac
+import itertools
+import json
+import re
+import secrets
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from supabase_client import ANON_KEY, DEMO_EMAIL, DEMO_PASSWORD
+
+JWT_SECRET = "super-secret-jwt-token-with-at-least-32-characters-long"
+ACCESS_TOKEN_TTL = 3600
+DEFAULT_PORT = 54321
+
+# RLS model per table, mirroring supabase/migrations:
+#   owner       column compared with auth.uid() for reads and writes (None = no user writes)
+#   read_also   extra columns that grant read access when equal to auth.uid()
+#   public      boolean column that makes a row readable by every authenticated user
+#   public_read every row is readable (reference tables)
+Policy = collections.namedtuple("Policy", "owner read_also public public_read")
+DEFAULT_POLICY = Policy("user_id", (), None, False)
+POLICIES = {
+    "user_profiles": Policy("id", (), "is_public", False),
+    "user_follows": Policy("follower_id", ("following_id",), None, False),
+    "goal_shares": Policy("owner_id", ("shared_with_user_id",), None, False),
+    "team_goals": Policy("creator_id", (), None, False),
+    "activity_feed": Policy("user_id", (), "is_public", False),
+    "activity_feed_inbox": Policy("owner_id", (), None, False),
+    "task_templates": Policy("user_id", (), "is_public", False),
+    "goal_templates": Policy(None, (), None, True),
+    "habit_templates": Policy(None, (), None, True),
+    "subscription_plans": Policy(None, (), None, True),
+}
+
+# Unique constraints from the migrations, used for conflict detection and upserts
+UNIQUE_KEYS = {
+    "habit_completions": ("habit_id", "completion_date"),
+    "achievements": ("user_id", "achievement_type"),
+    "user_activity": ("user_id", "activity_date"),
+    "user_follows": ("follower_id", "following_id"),
+    "goal_shares": ("goal_id", "shared_with_user_id"),
+    "team_members": ("team_goal_id", "user_id"),
+    "user_subscriptions": ("user_id",),
+    "tasks": ("recurrence_of", "due_date"),
+}
+
+# A subset of the Management API's auth config (GET/PATCH /v1/projects/{ref}/config/auth),
+# one document per project ref. Secret settings are write-only: GET returns them as null.
+DEFAULT_AUTH_CONFIG = {
+    "site_url": "http://localhost:3000",
+    "uri_allow_list": "",
+    "disable_signup": False,
+    "external_email_enabled": True,
+    "external_phone_enabled": False,
+    "external_anonymous_users_enabled": False,
+    "external_google_enabled": False,
+    "external_google_client_id": None,
+    "external_google_secret": None,
+    "mailer_autoconfirm": True,
+    "mailer_allow_unverified_email_sign_ins": False,
+    "mailer_secure_email_change_enabled": True,
+    "mailer_otp_exp": 3600,
+    "jwt_exp": ACCESS_TOKEN_TTL,
+    "refresh_token_rotation_enabled": True,
+    "security_refresh_token_reuse_interval": 10,
+    "password_min_length": 6,
+    "rate_limit_email_sent": 2,
+    "smtp_admin_email": None,
+    "smtp_host": None,
+    "smtp_pass": None,
+}
+AUTH_CONFIG_SECRETS = {"external_google_secret", "smtp_pass"}
+
+RPC_FUNCTIONS = {}
+EDGE_FUNCTIONS = {}
+# table name -> list of fn(store, event, rows), event in insert/update/delete
+WRITE_HOOKS = collections.defaultdict(list)
+
+
+def rpc(name):
+    """Register a /rest/v1/rpc/<name> handler: fn(store, auth, args) -> JSON value"""
+    def register(fn):
+        RPC_FUNCTIONS[name] = fn
+        return fn
+    return register
+
+
+def write_hook(table_name):
+    """Register a function called after rows of `table_name` are written (a row-trigger stand-in)"""
+    def register(fn):
+        WRITE_HOOKS[table_name].append(fn)
+        return fn
+    return register
+
+
+def edge_function(name):
+    """Register a /functions/v1/<name> handler: fn(store, auth, payload) -> (status, JSON value)"""
+    def register(fn):
+        EDGE_FUNCTIONS[name] = fn
+        return fn
+    return register
+
+
+class ApiError(Exception):
+    """Raised by handlers; rendered as a PostgREST/GoTrue style JSON error"""
+
+    def __init__(self, status, body):
+        super().__init__(body)
+        self.status = status
+        self.body = body
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+# ---- JWT ----
+
+def _b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64url_decode(segment):
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def encode_jwt(payload, secret=JWT_SECRET):
+    header = _b64url(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+    body = _b64url(json.dumps(payload, separators=(",", ":")).encode())
+    signing_input = f"{header}.{body}".encode("ascii")
+    signature = hmac.new(secret.encode(), signing_input, hashlib.sha256).digest()
+    return f"{header}.{body}.{_b64url(signature)}"
+
+
+def decode_jwt(token, secret=JWT_SECRET, now=None):
+    """Verify an HS256 token and return its claims, or None when invalid or expired"""
+    try:
+        header, body, signature = token.split(".")
+        expected = hmac.new(secret.encode(), f"{header}.{body}".encode("ascii"), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64url_decode(signature)):
+            return None
+        claims = json.loads(_b64url_decode(body))
+    except (ValueError, TypeError):
+        return None
+    exp = claims.get("exp")
+    if exp is not None and exp <= (now if now is not None else time.time()):
+        return None
+    return claims
+
+
+SERVICE_ROLE_KEY = encode_jwt({"iss": "supabase-local", "role": "service_role", "exp": 4102444800})
+
+
+# ---- Store ----
+
+class Table:
+    """Rows keyed by id plus an index on the RLS owner column and any secondary indexes"""
+
+    def __init__(self, name):
+        self.name = name
+        self.policy = POLICIES.get(name, DEFAULT_POLICY)
+        self.unique = UNIQUE_KEYS.get(name)
+        self.rows = {}
+        self.by_owner = collections.defaultdict(dict)
+        self.by_unique = {}
+        self.indexes = {}
+
+    def index(self, column):
+        """Rows grouped by `column` ({value: {id: row}}), built on first use and kept up to date"""
+        index = self.indexes.get(column)
+        if index is None:
+            index = self.indexes[column] = collections.defaultdict(dict)
+            for row in self.rows.values():
+                index[row.get(column)][row["id"]] = row
+        return index
+
+    def _unique_key(self, row):
+        """Unique-constraint key, None when unconstrained (NULLs never conflict, as in SQL)"""
+        if not self.unique or any(row.get(col) is None for col in self.unique):
+            return None
+        return tuple(str(row.get(col)) for col in self.unique)
+
+    def add(self, row):
+        self.rows[row["id"]] = row
+        if self.policy.owner:
+            self.by_owner[row.get(self.policy.owner)][row["id"]] = row
+        for column, index in self.indexes.items():
+            index[row.get(column)][row["id"]] = row
+        key = self._unique_key(row)
+        if key is not None:
+            self.by_unique[key] = row
+
+    def remove(self, row):
+        self.rows.pop(row["id"], None)
+        if self.policy.owner:
+            self.by_owner.get(row.get(self.policy.owner), {}).pop(row["id"], None)
+        for column, index in self.indexes.items():
+            index.get(row.get(column), {}).pop(row["id"], None)
+        key = self._unique_key(row)
+        if key is not None and self.by_unique.get(key) is row:
+            del self.by_unique[key]
+
+    def find_conflict(self, row, columns=None):
+        if columns and tuple(columns) != ("id",) and tuple(columns) != self.unique:
+            return next(
+                (r for r in self.rows.values() if all(str(r.get(c)) == str(row.get(c)) for c in columns)),
+                None,
+            )
+        if "id" in row and row["id"] in self.rows:
+            return self.rows[row["id"]]
+        key = self._unique_key(row)
+        return self.by_unique.get(key) if key is not None else None
+
+    def _scan(self, auth, equalities):
+        """Narrow a scan by primary key, owner column or a secondary index when the query pins one"""
+        if equalities and "id" in equalities:
+            row = self.rows.get(equalities["id"])
+            return [row] if row is not None else []
+        owner = self.policy.owner
+        if owner and equalities and owner in equalities:
+            return self.by_owner.get(equalities[owner], {}).values()
+        for column, index in self.indexes.items():
+            # literals are strings: only a hit is conclusive, a miss may be a typed column
+            if equalities and equalities.get(column) in index:
+                return index[equalities[column]].values()
+        return None
+
+    def candidates(self, auth, equalities=None):
+        """Lazily yield the rows the caller may read, narrowed through the indexes when possible"""
+        policy = self.policy
+        scan = self._scan(auth, equalities)
+        if auth.role == "service_role" or policy.public_read or (auth.uid is not None and not policy.owner):
+            return iter(scan if scan is not None else self.rows.values())
+        if auth.uid is None:
+            return iter(())
+        if not policy.read_also and not policy.public:
+            if scan is None:
+                return iter(self.by_owner.get(auth.uid, {}).values())
+            return (r for r in scan if r.get(policy.owner) == auth.uid)
+        rows = scan if scan is not None else self.rows.values()
+        return (r for r in rows if can_read(policy, auth, r))
+
+    def writable(self, auth, equalities=None):
+        scan = self._scan(auth, equalities)
+        if auth.role == "service_role":
+            return list(scan) if scan is not None else list(self.rows.values())
+        if auth.uid is None or not self.policy.owner:
+            return []
+        if scan is not None:
+            return [r for r in scan if r.get(self.policy.owner) == auth.uid]
+        return list(self.by_owner.get(auth.uid, {}).values())
+
+
+def can_read(policy, auth, row):
+    if auth.role == "service_role" or policy.public_read:
+        return True
+    if auth.uid is None:
+        return False
+    if not policy.owner or row.get(policy.owner) == auth.uid:
+        return True
+    if any(row.get(col) == auth.uid for col in policy.read_also):
+        return True
+    return bool(policy.public and row.get(policy.public))
+
+
+class Store:
+    """In-memory users, refresh tokens and tables"""
+
+    def __init__(self):
+        self.tables = {}
+        self.users = {}
+        self.users_by_id = {}
+        self.refresh_tokens = {}
+        self.auth_configs = {}
+
+    def table(self, name):
+        table = self.tables.get(name)
+        if table is None:
+            table = self.tables[name] = Table(name)
+        return table
+
+    @staticmethod
+    def _hash_password(password, salt):
+        return hashlib.sha256(salt + password.encode()).hexdigest()
+
+    def create_user(self, email, password, user_id=None):
+        salt = secrets.token_bytes(8)
+        user = {
+            "id": user_id or str(uuid.uuid4()),
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": email,
+            "email_confirmed_at": now_iso(),
+            "created_at": now_iso(),
+            "app_metadata": {"provider": "email", "providers": ["email"]},
+            "user_metadata": {},
+        }
+        self.users[email.lower()] = (user, salt, self._hash_password(password, salt))
+        self.users_by_id[user["id"]] = user
+        return user
+
+    def check_password(self, email, password):
+        entry = self.users.get((email or "").lower())
+        if entry is None:
+            return None
+        user, salt, digest = entry
+        if not hmac.compare_digest(digest, self._hash_password(password or "", salt)):
+            return None
+        return user
+
+    def issue_session(self, user):
+        issued = int(time.time())
+        claims = {
+            "aud": "authenticated",
+            "exp": issued + ACCESS_TOKEN_TTL,
+            "iat": issued,
+            "iss": "supabase-local/auth/v1",
+            "sub": user["id"],
+            "email": user["email"],
+            "role": "authenticated",
+            "aal": "aal1",
+            "session_id": str(uuid.uuid4()),
+        }
+        refresh_token = secrets.token_urlsafe(16)
+        self.refresh_tokens[refresh_token] = user["id"]
+        return {
+            "access_token": encode_jwt(claims),
+            "token_type": "bearer",
+            "expires_in": ACCESS_TOKEN_TTL,
+            "expires_at": claims["exp"],
+            "refresh_token": refresh_token,
+            "user": user,
+        }
+
+    def auth_config(self, ref):
+        config = self.auth_configs.get(ref)
+        if config is None:
+            config = self.auth_configs[ref] = dict(DEFAULT_AUTH_CONFIG)
+        return config
+
+    def revoke_sessions(self, user_id):
+        for token in [t for t, uid in self.refresh_tokens.items() if uid == user_id]:
+            del self.refresh_tokens[token]
+
+
+Auth = collections.namedtuple("Auth", "role uid claims")
+ANON = Auth("anon", None, {})
+
+
+# ---- PostgREST query engine ----
+
+def _split_top_level(text, sep=","):
+    parts, depth, current = [], 0, []
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == sep and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def _coerce(raw, sample):
+    """Convert a filter literal to the type of the stored value it is compared with"""
+    if raw == "null":
+        return None
+    if isinstance(sample, bool):
+        return raw.lower() == "true"
+    if isinstance(sample, (int, float)):
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+def _like_regex(pattern, flags=0):
+    escaped = re.escape(pattern).replace(r"\*", ".*").replace("%", ".*").replace("_", ".")
+    return re.compile(f"^{escaped}$", flags | re.DOTALL)
+
+
+_ORDERINGS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+
+def compile_comparison(op, raw):
+    """Return fn(value) -> bool for one PostgREST operator and literal"""
+    if op == "is":
+        lowered = raw.lower()
+        if lowered == "null":
+            return lambda value: value is None
+        if lowered in ("true", "false"):
+            flag = lowered == "true"
+            return lambda value: value is flag
+        return lambda value: False
+    if op == "in":
+        items = [item.strip().strip('"') for item in _split_top_level(raw.strip("()"))]
+        strings = set(items)
+
+        def contains(value):
+            if isinstance(value, str):
+                return value in strings
+            return value is not None and any(value == _coerce(item, value) for item in items)
+        return contains
+    if op in ("like", "ilike"):
+        regex = _like_regex(raw, re.IGNORECASE if op == "ilike" else 0)
+        return lambda value: value is not None and regex.match(str(value)) is not None
+    ordering = _ORDERINGS.get(op)
+    if ordering is None:
+        raise ApiError(400, {"code": "PGRST100", "message": f"unknown operator '{op}'", "details": None, "hint": None})
+    if len(raw) >= 2 and raw[0] == raw[-1] == '"':
+        raw = raw[1:-1]  # quoted literal, e.g. a timestamp inside or=(...)
+
+    def compare(value):
+        if value is None:
+            return False
+        if isinstance(value, str):
+            # fast path: text, uuid and ISO date columns compare as strings
+            return ordering(value, raw)
+        target = _coerce(raw, value)
+        if isinstance(target, str):
+            value = str(value)
+        try:
+            return ordering(value, target)
+        except TypeError:
+            return False
+    return compare
+
+
+def parse_condition(column, expr):
+    """Compile `column=op.value` (optionally `not.op.value`) into a row predicate"""
+    negate = False
+    if expr.startswith("not."):
+        negate, expr = True, expr[4:]
+    op, _, raw = expr.partition(".")
+    if column in ("or", "and"):
+        predicate = parse_logic(column, op + ("." + raw if raw else ""))
+    elif "->" in column:
+        test = compile_comparison(op, raw)
+
+        def predicate(row):
+            return test(_get_path(row, column))
+    else:
+        test = compile_comparison(op, raw)
+
+        def predicate(row):
+            return test(row.get(column))
+    if negate:
+        return lambda row: not predicate(row)
+    return predicate
+
+
+def parse_logic(kind, body):
+    """Compile `or=(a.eq.1,b.lt.2)` / `and=(...)` including nested groups"""
+    body = body.strip()
+    if body.startswith("(") and body.endswith(")"):
+        body = body[1:-1]
+    predicates = []
+    for part in _split_top_level(body):
+        part = part.strip()
+        negate = part.startswith("not.")
+        if negate:
+            part = part[4:]
+        if part.startswith(("or(", "and(")):
+            nested_kind, _, nested = part.partition("(")
+            pred = parse_logic(nested_kind, "(" + nested)
+        else:
+            column, _, expr = part.partition(".")
+            pred = parse_condition(column, expr)
+        predicates.append((lambda row, p=pred: not p(row)) if negate else pred)
+    if kind == "or":
+        return lambda row: any(p(row) for p in predicates)
+    return lambda row: all(p(row) for p in predicates)
+
+
+def _get_path(row, column):
+    """Resolve `col` or JSON paths such as `data->>key`"""
+    if "->" not in column:
+        return row.get(column)
+    parts = re.split(r"->>?", column)
+    value = row.get(parts[0])
+    for key in parts[1:]:
+        if isinstance(value, dict):
+            value = value.get(key)
+        elif isinstance(value, list) and key.isdigit():
+            index = int(key)
+            value = value[index] if index < len(value) else None
+        else:
+            return None
+    return value
+
+
+class Query:
+    """Parsed PostgREST query string"""
+
+    def __init__(self, params):
+        self.filters = []
+        self.equalities = {}
+        self.select = None
+        self.order = []
+        self.limit = None
+        self.offset = 0
+        self.on_conflict = None
+        for key, value in params:
+            if key == "select":
+                self.select = value
+            elif key == "order":
+                self.order = [self._parse_order(term) for term in _split_top_level(value)]
+            elif key == "limit":
+                self.limit = int(value)
+            elif key == "offset":
+                self.offset = int(value)
+            elif key == "on_conflict":
+                self.on_conflict = [c.strip() for c in value.split(",")]
+            elif key == "columns":
+                continue
+            else:
+                if value.startswith("eq.") and "->" not in key and key not in ("or", "and"):
+                    self.equalities[key] = value[3:]
+                self.filters.append(parse_condition(key, value))
+
+    @staticmethod
+    def _parse_order(term):
+        parts = term.split(".")
+        column, descending, nulls_first = parts[0], False, None
+        for modifier in parts[1:]:
+            if modifier == "desc":
+                descending = True
+            elif modifier == "asc":
+                descending = False
+            elif modifier == "nullsfirst":
+                nulls_first = True
+            elif modifier == "nullslast":
+                nulls_first = False
+        if nulls_first is None:
+            nulls_first = descending
+        return column, descending, nulls_first
+
+    def matches(self, row):
+        return all(predicate(row) for predicate in self.filters)
+
+    def sort(self, rows):
+        for column, descending, nulls_first in reversed(self.order):
+            present = [r for r in rows if _get_path(r, column) is not None]
+            missing = [r for r in rows if _get_path(r, column) is None]
+            present.sort(key=lambda r: _get_path(r, column), reverse=descending)
+            rows = missing + present if nulls_first else present + missing
+        return rows
+
+    def project(self, row):
+        if not self.select or self.select.strip() == "*":
+            return row
+        out = {}
+        for item in _split_top_level(self.select):
+            item = item.strip()
+            if not item or "(" in item:
+                continue  # embedded resources are not supported by the stand-in
+            if item == "*":
+                out.update(row)
+                continue
+            alias, _, column = item.rpartition(":")
+            column = column.split("::")[0]
+            out[alias or column] = _get_path(row, column)
+        return out
+
+
+def parse_prefer(header):
+    prefs = {}
+    for part in (header or "").split(","):
+        key, _, value = part.strip().partition("=")
+        if key:
+            prefs[key] = value
+    return prefs
+
+
+def parse_range(header):
+    match = re.match(r"^\s*(\d+)-(\d*)\s*$", header or "")
+    if not match:
+        return None
+    start = int(match.group(1))
+    end = int(match.group(2)) if match.group(2) else None
+    return start, end
+
+
+# ---- Realtime (Phoenix channels over websocket, postgres_changes only) ----
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+REALTIME_MAX_BUFFER = 1 << 20  # bytes queued on one socket before messages to it are dropped
+REALTIME_EVENTS = {"insert": "INSERT", "update": "UPDATE", "delete": "DELETE"}
+
+# slot: (table, column, value) for `column=eq.value` filters, (table, None, None) otherwise
+Subscription = collections.namedtuple("Subscription", "socket topic id event predicate auth slot")
+
+
+def websocket_frame(opcode, data):
+    """One unmasked, unfragmented server frame"""
+    length = len(data)
+    if length < 126:
+        header = bytes((0x80 | opcode, length))
+    elif length < 1 << 16:
+        header = bytes((0x80 | opcode, 126)) + length.to_bytes(2, "big")
+    else:
+        header = bytes((0x80 | opcode, 127)) + length.to_bytes(8, "big")
+    return header + data
+
+
+async def read_websocket_message(reader):
+    """Next (opcode, payload) from a client; continuation frames are joined, control frames returned as-is"""
+    opcode, parts = None, []
+    while True:
+        first, second = await reader.readexactly(2)
+        length = second & 0x7F
+        if length == 126:
+            length = int.from_bytes(await reader.readexactly(2), "big")
+        elif length == 127:
+            length = int.from_bytes(await reader.readexactly(8), "big")
+        mask = await reader.readexactly(4) if second & 0x80 else None
+        data = await reader.readexactly(length)
+        if mask and length:
+            key = (mask * (length // 4 + 1))[:length]
+            data = (int.from_bytes(data, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+        frame_opcode = first & 0x0F
+        if frame_opcode >= 0x8:
+            return frame_opcode, data
+        if frame_opcode:
+            opcode = frame_opcode
+        parts.append(data)
+        if first & 0x80:
+            return opcode, b"".join(parts)
+
+
+def _column_type(value):
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int8"
+    if isinstance(value, float):
+        return "float8"
+    if isinstance(value, (dict, list)):
+        return "jsonb"
+    return "text"
+
+
+def _filter_key(value):
+    """A row value spelled the way it appears in an eq filter"""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+class RealtimeSocket:
+    """One websocket connection: its joined channels and a bounded write buffer"""
+
+    def __init__(self, hub, writer, auth):
+        self.hub = hub
+        self.writer = writer
+        self.auth = auth
+        self.channels = {}
+
+    def send_text(self, text):
+        transport = self.writer.transport
+        if transport.is_closing():
+            return False
+        if transport.get_write_buffer_size() > REALTIME_MAX_BUFFER:
+            # a client that stopped reading loses messages instead of growing the server
+            self.hub.dropped += 1
+            return False
+        self.writer.write(websocket_frame(0x1, text.encode()))
+        return True
+
+    def send(self, topic, event, payload, ref=None, join_ref=None):
+        message = {"topic": topic, "event": event, "payload": payload, "ref": ref, "join_ref": join_ref}
+        return self.send_text(json.dumps(message, default=str))
+
+
+class Realtime:
+    """postgres_changes subscriptions of every open socket, fed written rows by Handler.store_hooks
+
+    Subscriptions with a `column=eq.value` filter (every per-user channel in the app) are indexed by
+    that value, so a write only visits the subscribers it can match.
+    """
+
+    def __init__(self):
+        self.sockets = set()
+        self.slots = collections.defaultdict(dict)
+        self.eq_columns = collections.defaultdict(collections.Counter)
+        self._ids = itertools.count(1)
+        self.delivered = 0
+        self.dropped = 0
+
+    def stats(self):
+        return {
+            "sockets": len(self.sockets),
+            "channels": sum(len(s.channels) for s in self.sockets),
+            "subscriptions": sum(len(subs) for subs in self.slots.values()),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+    async def serve(self, reader, writer, params):
+        """Run one upgraded connection until the client closes it"""
+        apikey = params.get("apikey", "")
+        auth = Auth("service_role", None, {"role": "service_role"}) if apikey == SERVICE_ROLE_KEY else ANON
+        socket = RealtimeSocket(self, writer, auth)
+        self.sockets.add(socket)
+        try:
+            while True:
+                try:
+                    opcode, data = await read_websocket_message(reader)
+                except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+                    break
+                if opcode == 0x8:
+                    writer.write(websocket_frame(0x8, data[:2]))
+                    break
+                if opcode == 0x9:
+                    writer.write(websocket_frame(0xA, data))
+                elif opcode == 0x1:
+                    try:
+                        message = json.loads(data)
+                    except ValueError:
+                        continue
+                    self.dispatch(socket, message)
+        finally:
+            for topic in list(socket.channels):
+                self.leave(socket, topic)
+            self.sockets.discard(socket)
+
+    def dispatch(self, socket, message):
+        topic = message.get("topic")
+        event = message.get("event")
+        payload = message.get("payload") or {}
+        ref, join_ref = message.get("ref"), message.get("join_ref")
+        if topic == "phoenix" and event == "heartbeat":
+            socket.send(topic, "phx_reply", {"status": "ok", "response": {}}, ref)
+        elif event == "phx_join":
+            self.join(socket, topic, payload, ref, join_ref)
+        elif topic not in socket.channels:
+            socket.send(topic, "phx_reply", {"status": "error", "response": {"reason": "unmatched topic"}}, ref)
+        elif event == "phx_leave":
+            self.leave(socket, topic)
+            socket.send(topic, "phx_reply", {"status": "ok", "response": {}}, ref, join_ref)
+            socket.send(topic, "phx_close", {}, ref, join_ref)
+        elif event == "access_token":
+            auth = self._token_auth(socket, payload.get("access_token"))
+            if auth is not None:
+                for sub in socket.channels[topic]:
+                    self.slots[sub.slot][sub.id] = sub._replace(auth=auth)
+                socket.channels[topic] = [s._replace(auth=auth) for s in socket.channels[topic]]
+
+    def _token_auth(self, socket, token):
+        if not token or token == ANON_KEY:
+            return socket.auth
+        if token == SERVICE_ROLE_KEY:
+            return Auth("service_role", None, {"role": "service_role"})
+        claims = decode_jwt(token)
+        if claims is None:
+            return None
+        return Auth(claims.get("role", "authenticated"), claims.get("sub"), claims)
+
+    def join(self, socket, topic, payload, ref, join_ref):
+        auth = self._token_auth(socket, payload.get("access_token"))
+        if auth is None:
+            socket.send(topic, "phx_reply", {"status": "error", "response": {"reason": "Invalid token"}}, ref, join_ref)
+            return
+        specs = (payload.get("config") or {}).get("postgres_changes") or []
+        subs, response = [], []
+        try:
+            for spec in specs:
+                table = spec.get("table")
+                event = (spec.get("event") or "*").upper()
+                text = spec.get("filter")
+                predicate, slot = None, (table, None, None)
+                if text:
+                    column, _, expr = text.partition("=")
+                    predicate = parse_condition(column, expr)
+                    op, _, value = expr.partition(".")
+                    if op == "eq":
+                        slot = (table, column, value)
+                subs.append(Subscription(socket, topic, next(self._ids), event, predicate, auth, slot))
+                response.append({"id": subs[-1].id, "event": event, "schema": spec.get("schema", "public"),
+                                 "table": table, "filter": text})
+        except ApiError as e:
+            socket.send(topic, "phx_reply", {"status": "error", "response": {"reason": e.body["message"]}},
+                        ref, join_ref)
+            return
+        self.leave(socket, topic)
+        for sub in subs:
+            self.slots[sub.slot][sub.id] = sub
+            if sub.slot[1] is not None:
+                self.eq_columns[sub.slot[0]][sub.slot[1]] += 1
+        socket.channels[topic] = subs
+        socket.send(topic, "phx_reply", {"status": "ok", "response": {"postgres_changes": response}}, ref, join_ref)
+        if subs:
+            socket.send(topic, "system", {"channel": topic.partition(":")[2], "extension": "postgres_changes",
+                                          "message": "Subscribed to PostgreSQL", "status": "ok"})
+
+    def leave(self, socket, topic):
+        for sub in socket.channels.pop(topic, ()):
+            slot = self.slots[sub.slot]
+            slot.pop(sub.id, None)
+            if not slot:
+                del self.slots[sub.slot]
+            table, column, _ = sub.slot
+            if column is not None:
+                counts = self.eq_columns[table]
+                counts[column] -= 1
+                if counts[column] <= 0:
+                    del counts[column]
+
+    def publish(self, event, table, rows):
+        """Deliver written rows to every matching subscriber allowed to read them"""
+        if not self.slots:
+            return
+        kind = REALTIME_EVENTS[event]
+        timestamp = now_iso()
+        columns = self.eq_columns.get(table.name, ())
+        for row in rows:
+            candidates = list(self.slots.get((table.name, None, None), {}).values())
+            for column in columns:
+                candidates.extend(self.slots.get((table.name, column, _filter_key(row.get(column))), {}).values())
+            matched = {}
+            for sub in candidates:
+                if sub.event != "*" and sub.event != kind:
+                    continue
+                if sub.predicate is not None and not sub.predicate(row):
+                    continue
+                if not can_read(table.policy, sub.auth, row):
+                    continue
+                matched.setdefault((sub.socket, sub.topic), []).append(sub.id)
+            if not matched:
+                continue
+            # with the default replica identity a delete only carries the primary key
+            record, old = ({}, {"id": row.get("id")}) if kind == "DELETE" else (row, {})
+            data = json.dumps({
+                "schema": "public",
+                "table": table.name,
+                "commit_timestamp": timestamp,
+                "type": kind,
+                "record": record,
+                "old_record": old,
+                "columns": [{"name": k, "type": _column_type(v)} for k, v in row.items()],
+                "errors": None,
+            }, default=str)
+            for (socket, topic), ids in matched.items():
+                text = '{"topic":%s,"event":"postgres_changes","payload":{"ids":%s,"data":%s},"ref":null}' % (
+                    json.dumps(topic), json.dumps(ids), data)
+                if socket.send_text(text):
+                    self.delivered += 1
+
+
+# ---- Request handling ----
+
+class Handler:
+    """Routes parsed HTTP requests to the auth, rest, rpc and functions endpoints"""
+
+    def __init__(self, store, anon_key=ANON_KEY):
+        self.store = store
+        self.anon_key = anon_key
+        self.realtime = Realtime()
+
+    def authenticate(self, headers):
+        authorization = headers.get("authorization", "")
+        token = authorization[7:].strip() if authorization.lower().startswith("bearer ") else ""
+        apikey = headers.get("apikey", "")
+        if not token or token == apikey or token == self.anon_key:
+            if token == SERVICE_ROLE_KEY or apikey == SERVICE_ROLE_KEY:
+                return Auth("service_role", None, {"role": "service_role"})
+            return ANON
+        claims = decode_jwt(token)
+        if claims is None:
+            raise ApiError(401, {"code": "PGRST301", "message": "JWT expired or invalid", "details": None, "hint": None})
+        return Auth(claims.get("role", "authenticated"), claims.get("sub"), claims)
+
+    def handle(self, method, target, headers, body):
+        split = urlsplit(target)
+        path = unquote(split.path)
+        params = parse_qsl(split.query, keep_blank_values=True)
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            return 400, {}, {"code": "PGRST102", "message": "Empty or invalid json", "details": None, "hint": None}
+        try:
+            if path.startswith("/auth/v1/"):
+                return self.auth_endpoint(method, path[len("/auth/v1/"):], dict(params), headers, payload)
+            if path.startswith("/rest/v1/rpc/"):
+                return self.rpc_endpoint(path[len("/rest/v1/rpc/"):], params, headers, payload)
+            if path.startswith("/rest/v1/"):
+                return self.rest_endpoint(method, path[len("/rest/v1/"):], params, headers, payload)
+            if path.startswith("/functions/v1/"):
+                return self.function_endpoint(path[len("/functions/v1/"):], headers, payload)
+            if path == "/realtime/v1/api/stats":
+                return 200, {}, self.realtime.stats()
+            if path.startswith("/v1/projects/"):
+                return self.management_endpoint(method, path[len("/v1/projects/"):], headers, payload)
+            return 404, {}, {"message": "no route matched"}
+        except ApiError as e:
+            return e.status, {}, e.body
+
+    # ---- /auth/v1 ----
+
+    def auth_endpoint(self, method, route, params, headers, payload):
+        payload = payload or {}
+        store = self.store
+        if route == "health":
+            return 200, {}, {"version": "local", "name": "GoTrue", "description": "Local Supabase stand-in"}
+        if route == ".well-known/jwks.json":
+            # tokens are HS256 only, and a shared secret is never published
+            return 200, {}, {"keys": []}
+        if route == "signup" and method == "POST":
+            email, password = payload.get("email"), payload.get("password")
+            if not email or not password:
+                raise ApiError(400, {"code": 400, "error_code": "validation_failed", "msg": "Signup requires a valid password"})
+            if len(password) < 6:
+                raise ApiError(422, {"code": 422, "error_code": "weak_password", "msg": "Password should be at least 6 characters."})
+            if email.lower() in store.users:
+                raise ApiError(422, {"code": 422, "error_code": "user_already_exists", "msg": "User already registered"})
+            return 200, {}, store.issue_session(store.create_user(email, password))
+        if route == "token" and method == "POST":
+            grant_type = params.get("grant_type")
+            if grant_type == "password":
+                user = store.check_password(payload.get("email"), payload.get("password"))
+                if user is None:
+                    raise ApiError(400, {"code": 400, "error_code": "invalid_credentials", "msg": "Invalid login credentials"})
+                return 200, {}, store.issue_session(user)
+            if grant_type == "refresh_token":
+                user_id = store.refresh_tokens.pop(payload.get("refresh_token"), None)
+                if user_id is None:
+                    raise ApiError(400, {"code": 400, "error_code": "refresh_token_not_found", "msg": "Invalid Refresh Token: Refresh Token Not Found"})
+                return 200, {}, store.issue_session(store.users_by_id[user_id])
+            raise ApiError(400, {"code": 400, "error_code": "validation_failed", "msg": "unsupported_grant_type"})
+        if route == "logout" and method == "POST":
+            auth = self.authenticate(headers)
+            if auth.uid is None:
+                raise ApiError(401, {"code": 401, "error_code": "no_authorization", "msg": "This endpoint requires a Bearer token"})
+            store.revoke_sessions(auth.uid)
+            return 204, {}, None
+        if route == "admin/users" and method == "POST":
+            if self.authenticate(headers).role != "service_role":
+                raise ApiError(403, {"code": 403, "error_code": "not_admin", "msg": "User not allowed"})
+            email = payload.get("email")
+            if not email:
+                raise ApiError(400, {"code": 400, "error_code": "validation_failed", "msg": "Unable to validate email address"})
+            if email.lower() in store.users or payload.get("id") in store.users_by_id:
+                raise ApiError(422, {"code": 422, "error_code": "email_exists", "msg": "A user with this email address has already been registered"})
+            return 200, {}, store.create_user(email, payload.get("password") or secrets.token_urlsafe(12), payload.get("id"))
+        if route == "user" and method == "GET":
+            auth = self.authenticate(headers)
+            user = store.users_by_id.get(auth.uid)
+            if user is None:
+                raise ApiError(401, {"code": 401, "error_code": "no_authorization", "msg": "This endpoint requires a Bearer token"})
+            return 200, {}, user
+        return 404, {}, {"code": 404, "msg": f"no auth route for {method} /auth/v1/{route}"}
+
+    # ---- /rest/v1/<table> ----
+
+    def rest_endpoint(self, method, table_name, params, headers, payload):
+        auth = self.authenticate(headers)
+        table = self.store.table(table_name)
+        query = Query(params)
+        prefer = parse_prefer(headers.get("prefer"))
+        if method in ("GET", "HEAD"):
+            return self.read(table, auth, query, headers, prefer, head=method == "HEAD")
+        if method == "POST":
+            return self.insert(table, auth, query, headers, prefer, payload)
+        if method == "PATCH":
+            return self.update(table, auth, query, headers, prefer, payload)
+        if method == "DELETE":
+            return self.delete(table, auth, query, headers, prefer)
+        return 405, {}, {"message": f"method {method} not allowed"}
+
+    def _respond_rows(self, rows, query, headers, prefer, status, extra_headers=None):
+        extra_headers = dict(extra_headers or {})
+        if prefer.get("return") != "representation":
+            return (204 if status == 200 else status), extra_headers, None
+        return self._render(rows, query, headers, status, extra_headers)
+
+    def _render(self, rows, query, headers, status, extra_headers):
+        body = [query.project(row) for row in rows]
+        if "vnd.pgrst.object" in headers.get("accept", ""):
+            if len(body) != 1:
+                raise ApiError(406, {
+                    "code": "PGRST116",
+                    "message": "JSON object requested, multiple (or no) rows returned",
+                    "details": f"The result contains {len(body)} rows",
+                    "hint": None,
+                })
+            return status, extra_headers, body[0]
+        return status, extra_headers, body
+
+    def read(self, table, auth, query, headers, prefer, head=False):
+        requested = parse_range(headers.get("range"))
+        counting = prefer.get("count") in ("exact", "planned", "estimated")
+        start = query.offset
+        end = None if query.limit is None else start + query.limit
+        if requested:
+            start = max(start, requested[0])
+            if requested[1] is not None:
+                end = requested[1] + 1 if end is None else min(end, requested[1] + 1)
+        matching = (row for row in table.candidates(auth, query.equalities) if query.matches(row))
+        if query.order or counting or requested or end is None:
+            rows = query.sort(list(matching))
+            total = len(rows)
+            page = rows[start:end]
+        else:
+            # unordered, uncounted page: stop scanning once it is full
+            page = list(itertools.islice(matching, start, end))
+            total = None
+        count = str(total) if counting else "*"
+        content_range = f"{start}-{start + len(page) - 1}/{count}" if page else f"*/{count}"
+        status = 206 if requested and total is not None and len(page) < total else 200
+        extra = {"Content-Range": content_range}
+        if head:
+            return status, extra, None
+        return self._render(page, query, headers, status, extra)
+
+    def _check_owner(self, table, auth, row):
+        if auth.role == "service_role":
+            return
+        owner = table.policy.owner
+        if auth.uid is None or owner is None or row.get(owner) != auth.uid:
+            raise ApiError(401 if auth.uid is None else 403, {
+                "code": "42501",
+                "message": f'new row violates row-level security policy for table "{table.name}"',
+                "details": None,
+                "hint": None,
+            })
+
+    def insert(self, table, auth, query, headers, prefer, payload):
+        rows = payload if isinstance(payload, list) else [payload or {}]
+        resolution = prefer.get("resolution")
+        stamp = now_iso()
+        written, inserted, merged = [], [], []
+        for incoming in rows:
+            row = copy.deepcopy(incoming)
+            if table.policy.owner and auth.uid and table.policy.owner not in row:
+                row[table.policy.owner] = auth.uid
+            self._check_owner(table, auth, row)
+            existing = table.find_conflict(row, query.on_conflict)
+            if existing is not None:
+                if resolution == "ignore-duplicates":
+                    continue
+                if resolution != "merge-duplicates":
+                    raise ApiError(409, {
+                        "code": "23505",
+                        "message": f'duplicate key value violates unique constraint "{table.name}_key"',
+                        "details": None,
+                        "hint": None,
+                    })
+                self._check_owner(table, auth, existing)
+                table.remove(existing)
+                existing.update(row)
+                existing["id"] = existing.get("id") or str(uuid.uuid4())
+                if "updated_at" in existing:
+                    existing["updated_at"] = stamp
+                table.add(existing)
+                written.append(existing)
+                merged.append(existing)
+                continue
+            row.setdefault("id", str(uuid.uuid4()))
+            row.setdefault("created_at", stamp)
+            row.setdefault("updated_at", stamp)
+            table.add(row)
+            written.append(row)
+            inserted.append(row)
+        self.store_hooks("insert", table, inserted)
+        # ON CONFLICT DO UPDATE fires update triggers, not insert ones
+        if merged:
+            self.store_hooks("update", table, merged)
+        return self._respond_rows(written, query, headers, prefer, 201)
+
+    def update(self, table, auth, query, headers, prefer, payload):
+        values = payload or {}
+        stamp = now_iso()
+        updated = []
+        for row in [r for r in table.writable(auth, query.equalities) if query.matches(r)]:
+            table.remove(row)
+            row.update(copy.deepcopy(values))
+            if "updated_at" in row and "updated_at" not in values:
+                row["updated_at"] = stamp
+            table.add(row)
+            updated.append(row)
+        self.store_hooks("update", table, updated)
+        return self._respond_rows(updated, query, headers, prefer, 200)
+
+    def delete(self, table, auth, query, headers, prefer):
+        removed = [r for r in table.writable(auth, query.equalities) if query.matches(r)]
+        for row in removed:
+            table.remove(row)
+        self.store_hooks("delete", table, removed)
+        return self._respond_rows(removed, query, headers, prefer, 200)
+
+    def store_hooks(self, event, table, rows):
+        """Run registered write hooks (the stand-in's equivalent of row triggers)"""
+        for hook in WRITE_HOOKS.get(table.name, ()):
+            hook(self.store, event, rows)
+        self.realtime.publish(event, table, rows)
+
+    # ---- /rest/v1/rpc and /functions/v1 ----
+
+    def rpc_endpoint(self, name, params, headers, payload):
+        auth = self.authenticate(headers)
+        fn = RPC_FUNCTIONS.get(name)
+        if fn is None:
+            raise ApiError(404, {
+                "code": "PGRST202",
+                "message": f"Could not find the function public.{name} in the schema cache",
+                "details": None,
+                "hint": None,
+            })
+        args = payload if payload is not None else dict(params)
+        return 200, {}, fn(self.store, auth, args)
+
+    def function_endpoint(self, name, headers, payload):
+        auth = self.authenticate(headers)
+        fn = EDGE_FUNCTIONS.get(name)
+        if fn is None:
+            return 404, {}, {"error": f"Function {name} not found"}
+        status, body = fn(self.store, auth, payload or {})
+        return status, {}, body
+
+    # ---- /v1/projects (Management API) ----
+
+    def management_endpoint(self, method, route, headers, payload):
+        """GET/PATCH /v1/projects/{ref}/config/auth; any bearer token is a valid personal access token"""
+        if not headers.get("authorization", "").lower().startswith("bearer "):
+            return 401, {}, {"message": "Unauthorized"}
+        ref, _, rest = route.partition("/")
+        if rest != "config/auth":
+            return 404, {}, {"message": "no route matched"}
+        config = self.store.auth_config(ref)
+        if method == "PATCH":
+            if not isinstance(payload, dict):
+                return 400, {}, {"message": "body must be a JSON object"}
+            unknown = sorted(k for k in payload if k not in DEFAULT_AUTH_CONFIG)
+            if unknown:
+                return 400, {}, {"message": f"property {unknown[0]} should not exist"}
+            config.update(payload)
+        elif method != "GET":
+            return 405, {}, {"message": "method not allowed"}
+        return 200, {}, {k: None if k in AUTH_CONFIG_SECRETS else v for k, v in config.items()}
+
+
+@edge_function("auto-confirm-user")
+def _auto_confirm_user(store, auth, payload):
+    user = store.users_by_id.get(payload.get("user_id"))
+    if user is None:
+        return 404, {"error": "User not found"}
+    user["email_confirmed_at"] = user.get("email_confirmed_at") or now_iso()
+    return 200, {"success": True, "user_id": user["id"]}
+
+
+# ---- RPC functions (supabase/migrations) ----
+
+def _sorted(rows, column, descending=False):
+    """ORDER BY column [DESC] with PostgreSQL null placement (last for ASC, first for DESC)"""
+    return sorted(rows, key=lambda r: (r.get(column) is None, r.get(column)), reverse=descending)
+
+
+def jsonb_task_key(task):
+    """The Map key GoalsService.getGoals gives a JSONB task: `jsonb-${task.id}`"""
+    if not isinstance(task, dict) or "id" not in task:
+        return "jsonb-undefined"
+    value = task["id"]
+    return "jsonb-" + (value if isinstance(value, str) else json.dumps(value))
+
+
+@rpc("get_goals_with_relations")
+def _get_goals_with_relations(store, auth, args):
+    """1762600000_get_goals_with_relations.sql: goals with nested tasks, milestones and habits"""
+    user_id = args.get("p_user_id") or auth.uid
+    goals = [g for g in store.table("goals").candidates(auth, {"user_id": user_id}) if g.get("user_id") == user_id]
+    children = {}
+    for name in ("tasks", "milestones", "habits"):
+        grouped = collections.defaultdict(list)
+        for row in store.table(name).candidates(auth, {"user_id": user_id}):
+            grouped[row.get("goal_id")].append(row)
+        children[name] = grouped
+
+    result = []
+    for goal in _sorted(goals, "created_at", descending=True):
+        merged = {}
+        for task in goal.get("tasks") or []:
+            merged[jsonb_task_key(task)] = task
+        for task in _sorted(children["tasks"][goal["id"]], "order_index"):
+            merged[task["id"]] = dict(task, dueDate=task.get("due_date") or "", isComplete=task.get("is_complete"))
+        result.append(dict(
+            goal,
+            tasks=list(merged.values()),
+            milestones=_sorted(children["milestones"][goal["id"]], "order_index"),
+            habits=_sorted(children["habits"][goal["id"]], "created_at", descending=True),
+        ))
+    return result
+
+
+
+# ---- habit_daily_rollup (1762700000_habit_daily_rollup.sql) ----
+
+def _created_day(row):
+    """(created_at AT TIME ZONE 'UTC')::date for the stand-in's UTC ISO timestamps"""
+    return str(row.get("created_at") or "")[:10]
+
+
+@write_hook("habit_completions")
+def _maintain_habit_daily_rollup(store, event, rows):
+    """maintain_habit_daily_rollup(): completed per (user, day) and habit_completion_totals"""
+    if event == "update":
+        return
+    rollup = store.table("habit_daily_rollup")
+    habits = store.table("habits")
+    totals = store.table("habit_completion_totals")
+    for row in rows:
+        user_id, day = row.get("user_id"), str(row.get("completion_date"))
+        key = f"{user_id}:{day}"
+        entry = rollup.rows.get(key)
+        habit_total = totals.rows.get(row.get("habit_id"))
+        if event == "insert":
+            if entry is None:
+                total = sum(1 for h in habits.by_owner.get(user_id, {}).values() if _created_day(h) <= day)
+                entry = {"id": key, "user_id": user_id, "date": day, "completed": 0, "total": total}
+                rollup.add(entry)
+            entry["completed"] += 1
+            if habit_total is None:
+                habit_total = {"id": row.get("habit_id"), "habit_id": row.get("habit_id"), "user_id": user_id,
+                               "total": 0}
+                totals.add(habit_total)
+            habit_total["total"] += 1
+            continue
+        if entry is not None:
+            entry["completed"] -= 1
+            if entry["completed"] <= 0:
+                rollup.remove(entry)
+        if habit_total is not None:
+            habit_total["total"] = max(habit_total["total"] - 1, 0)
+
+
+@write_hook("habits")
+def _maintain_habit_daily_rollup_total(store, event, rows):
+    """maintain_habit_daily_rollup_total(), plus the ON DELETE CASCADE from habit_completions"""
+    if event == "update":
+        return
+    rollup = store.table("habit_daily_rollup")
+    completions = store.table("habit_completions")
+    totals = store.table("habit_completion_totals")
+    for row in rows:
+        user_id, created = row.get("user_id"), _created_day(row)
+        for entry in rollup.by_owner.get(user_id, {}).values():
+            if entry["date"] >= created:
+                entry["total"] = entry["total"] + 1 if event == "insert" else max(entry["total"] - 1, 0)
+        if event == "delete":
+            cascade = [c for c in completions.by_owner.get(user_id, {}).values() if c.get("habit_id") == row["id"]]
+            for completion in cascade:
+                completions.remove(completion)
+            _maintain_habit_daily_rollup(store, "delete", cascade)
+            if row["id"] in totals.rows:
+                totals.remove(totals.rows[row["id"]])
+
+
+@rpc("get_habit_dashboard")
+def _get_habit_dashboard(store, auth, args):
+    """get_habit_dashboard(): HabitsService.getWeeklyStats plus per-habit completion rates"""
+    user_id = args.get("p_user_id") or auth.uid
+    today = args.get("p_today") or datetime.now(timezone.utc).date().isoformat()
+    week_start = (date.fromisoformat(today) - timedelta(days=6)).isoformat()
+    habits = [h for h in store.table("habits").candidates(auth, {"user_id": user_id}) if h.get("user_id") == user_id]
+    rollup = [r for r in store.table("habit_daily_rollup").candidates(auth, {"user_id": user_id})
+              if r.get("user_id") == user_id]
+    completions = store.table("habit_completions")
+    totals = store.table("habit_completion_totals")
+    now = datetime.now(timezone.utc)
+
+    per_habit = []
+    for habit in _sorted(habits, "created_at", descending=True):
+        total = totals.rows.get(habit["id"], {}).get("total", 0)
+        days = (now - datetime.fromisoformat(habit["created_at"])).total_seconds() // 86400
+        per_habit.append({
+            "habitId": habit["id"],
+            "totalCompletions": total,
+            "currentStreak": habit.get("current_streak"),
+            "bestStreak": habit.get("best_streak"),
+            "completedToday": (str(habit["id"]), today) in completions.by_unique,
+            "completionRate": min(100, total / days * 100) if days > 0 else 0,
+        })
+    return {
+        "totalHabits": len(habits),
+        "completedToday": sum(r["completed"] for r in rollup if r["date"] == today),
+        "weekCompletion": sum(r["completed"] for r in rollup if r["date"] >= week_start),
+        "topStreak": max((h.get("current_streak") or 0 for h in habits), default=0),
+        "habits": per_habit,
+    }
+
+
+# ---- habit streaks (1762800000_habit_streak_engine.sql) ----
+
+def habit_streaks(dates):
+    """(current_streak, best_streak, last_completed_date) over ISO dates, in any order"""
+    days = sorted({date.fromisoformat(str(d)) for d in dates})
+    current = best = 0
+    for previous, day in zip([None] + days, days):
+        current = current + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        best = max(best, current)
+    return current, best, days[-1].isoformat() if days else None
+
+
+def _recompute_habit_streaks(store, habit_ids=None):
+    """recompute_habit_streaks(): daily habits only, writes changed rows, returns how many"""
+    habits = store.table("habits")
+    completions = store.table("habit_completions")
+    targets = habits.rows.values() if habit_ids is None else filter(None, map(habits.rows.get, habit_ids))
+    targets = [h for h in targets if h.get("frequency", "daily") == "daily"]
+    wanted = {h["id"] for h in targets}
+    dates = collections.defaultdict(list)
+    owners = {h.get("user_id") for h in targets}
+    for owner in owners:
+        for completion in completions.by_owner.get(owner, {}).values():
+            if completion.get("habit_id") in wanted:
+                dates[completion["habit_id"]].append(completion["completion_date"])
+    updated = 0
+    for habit in targets:
+        current, best, last = habit_streaks(dates[habit["id"]])
+        if (habit.get("current_streak"), habit.get("best_streak"), habit.get("last_completed_date")) != (current, best, last):
+            habit.update(current_streak=current, best_streak=best, last_completed_date=last)
+            updated += 1
+    return updated
+
+
+@write_hook("habit_completions")
+def _maintain_habit_streaks(store, event, rows):
+    """update_habit_streak() plus the statement-level recomputes, applied per request"""
+    if event != "update" and rows:
+        _recompute_habit_streaks(store, {r.get("habit_id") for r in rows})
+
+
+@rpc("recompute_habit_streaks")
+def _recompute_habit_streaks_rpc(store, auth, args):
+    habit_ids = args.get("p_habit_ids")
+    if auth.role != "service_role":
+        # SECURITY INVOKER: only the caller's own habits are updated
+        owned = store.table("habits").by_owner.get(auth.uid, {})
+        habit_ids = [h for h in (habit_ids if habit_ids is not None else owned) if h in owned]
+    return _recompute_habit_streaks(store, habit_ids)
+
+
+# ---- activity feed inbox (1763000000_activity_feed_inbox.sql) ----
+
+def _deliver(inbox, owner_id, activity):
+    key = f"{owner_id}:{activity['id']}"
+    if key not in inbox.rows:
+        inbox.add({"id": key, "owner_id": owner_id, "created_at": activity["created_at"],
+                   "activity_id": activity["id"], "actor_id": activity.get("user_id")})
+
+
+@write_hook("activity_feed")
+def _fan_out_activity(store, event, rows):
+    """fan_out_activity() and the ON DELETE CASCADE; an update re-delivers the row"""
+    inbox = store.table("activity_feed_inbox")
+    by_activity = inbox.index("activity_id")
+    followers = store.table("user_follows").index("following_id")
+    for activity in rows:
+        for entry in list(by_activity.get(activity["id"], {}).values()):
+            inbox.remove(entry)
+        if event == "delete" or not activity.get("is_public") or activity.get("created_at") is None:
+            continue
+        _deliver(inbox, activity.get("user_id"), activity)
+        for follow in followers.get(activity.get("user_id"), {}).values():
+            _deliver(inbox, follow["follower_id"], activity)
+
+
+@write_hook("user_follows")
+def _sync_activity_inbox_follow(store, event, rows):
+    """sync_activity_inbox_follow(): follow copies the followee's public history, unfollow removes it"""
+    if event == "update":
+        return
+    inbox = store.table("activity_feed_inbox")
+    by_actor = store.table("activity_feed").by_owner
+    for follow in rows:
+        follower, followee = follow.get("follower_id"), follow.get("following_id")
+        if event == "insert":
+            for activity in by_actor.get(followee, {}).values():
+                if activity.get("is_public") and activity.get("created_at") is not None:
+                    _deliver(inbox, follower, activity)
+            continue
+        for entry in [e for e in inbox.by_owner.get(follower, {}).values() if e["actor_id"] == followee]:
+            inbox.remove(entry)
+
+
+@rpc("get_activity_feed")
+def _get_activity_feed(store, auth, args):
+    """get_activity_feed(): one page of the inbox, newest first, with embedded rows"""
+    user_id = args.get("p_user_id") or auth.uid
+    limit = min(max(int(args.get("p_limit") or 50), 1), 200)
+    before = args.get("p_before_created_at")
+
+    def key(entry):
+        return datetime.fromisoformat(entry["created_at"]), entry["activity_id"]
+
+    entries = [e for e in store.table("activity_feed_inbox").candidates(auth, {"owner_id": user_id})
+               if e.get("owner_id") == user_id]
+    if before is not None:
+        cursor = (datetime.fromisoformat(before), args.get("p_before_id") or "")
+        entries = [e for e in entries if key(e) < cursor]
+    page = sorted(entries, key=key, reverse=True)[:limit]
+
+    def embed(name, row_id):
+        # SECURITY INVOKER: joined rows the caller cannot read come back as null
+        table = store.table(name)
+        row = table.rows.get(row_id) if row_id is not None else None
+        return row if row is not None and can_read(table.policy, auth, row) else None
+
+    feed = []
+    for entry in page:
+        activity = store.table("activity_feed").rows.get(entry["activity_id"])
+        if activity is None:
+            continue
+        feed.append(dict(activity, user=embed("user_profiles", activity.get("user_id")),
+                         goal=embed("goals", activity.get("goal_id")), task=embed("tasks", activity.get("task_id")),
+                         team_goal=embed("team_goals", activity.get("team_goal_id"))))
+    return feed
+
+
+# ---- HTTP server ----
+
+STATUS_TEXT = {
+    200: "OK", 201: "Created", 204: "No Content", 206: "Partial Content",
+    400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+    405: "Method Not Allowed", 406: "Not Acceptable", 409: "Conflict",
+    422: "Unprocessable Entity", 500: "Internal Server Error",
+}
+
+
+class LocalSupabase:
+    """asyncio HTTP/1.1 keep-alive server around Handler; usable standalone or from a thread"""
+
+    def __init__(self, host="127.0.0.1", port=0, store=None, seed_demo=True):
+        self.host = host
+        self.port = port
+        self.store = store or Store()
+        self.handler = Handler(self.store)
+        self.server = None
+        self._thread = None
+        self._loop = None
+        self._ready = threading.Event()
+        if seed_demo:
+            self.store.create_user(DEMO_EMAIL, DEMO_PASSWORD)
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError,
+                        asyncio.CancelledError):
+                    # CancelledError: shutting down; swallowing it keeps asyncio from logging the task
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    # malformed or empty request line; the stream cannot be trusted past it
+                    writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                    await writer.drain()
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if line:
+                        key, _, value = line.partition(":")
+                        headers[key.strip().lower()] = value.strip()
+                if headers.get("upgrade", "").lower() == "websocket" and target.startswith("/realtime/v1/websocket"):
+                    await self._serve_websocket(reader, writer, target, headers)
+                    break
+                length = int(headers.get("content-length") or 0)
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, extra, payload = self.handler.handle(method, target, headers, body)
+                except Exception as e:  # keep serving; surface the error to the client
+                    status, extra, payload = 500, {}, {"message": f"{type(e).__name__}: {e}"}
+                data = b"" if payload is None else json.dumps(payload, default=str).encode()
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                response = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'Unknown')}"]
+                if payload is not None:
+                    response.append("Content-Type: application/json; charset=utf-8")
+                for key, value in extra.items():
+                    response.append(f"{key}: {value}")
+                response.append(f"Content-Length: {0 if method == 'HEAD' else len(data)}")
+                response.append("Connection: keep-alive" if keep_alive else "Connection: close")
+                writer.write(("\r\n".join(response) + "\r\n\r\n").encode("latin-1"))
+                if method != "HEAD":
+                    writer.write(data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _serve_websocket(self, reader, writer, target, headers):
+        key = headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode("latin-1"))
+        await self.handler.realtime.serve(reader, writer, dict(parse_qsl(urlsplit(target).query)))
+
+    async def start_async(self):
+        self.server = await asyncio.start_server(self._serve_connection, self.host, self.port, backlog=1024)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        await self.start_async()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def start(self):
+        """Serve from a daemon thread; returns once the port is bound"""
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.start_async())
+            self._ready.set()
+            self._loop.run_forever()
+            self.server.close()
+            pending = asyncio.all_tasks(self._loop)
+            for task in pending:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self._loop.run_until_complete(self.server.wait_closed())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="local-supabase", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Supabase stand-in (GoTrue + PostgREST subset)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    server = LocalSupabase(args.host, args.port)
+    print("=" * 60)
+    print("LOCAL SUPABASE STAND-IN")
+    print("=" * 60)
+    print(f"  URL:              http://{args.host}:{args.port}")
+    print(f"  Realtime:         ws://{args.host}:{args.port}/realtime/v1/websocket")
+    print(f"  Demo account:     {DEMO_EMAIL} / {DEMO_PASSWORD}")
+    print(f"  Service role key: {SERVICE_ROLE_KEY}")
+    print(f"\n  export SUPABASE_URL=http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+Dependency-aware runner for the check scripts.
+
+A Suite is a set of checks, each declaring the values it needs and the
+values it provides (a user id, a goal id, an account), plus the fixtures
+it uses (shared resources such as a browser pool or a logged-in browser
+context). The needs/provides edges form a DAG; every check starts as soon
+as the checks it depends on have passed, so independent checks run
+concurrently and the suite takes about as long as its longest dependency
+chain instead of the sum of all checks.
+
+    suite = Suite("auth")
+
+    @suite.check(provides=("user_id",))
+    def login():
+        ...
+        return {"user_id": user_id}
+
+    @suite.check(needs=("user_id",), fixtures=("browser",))
+    async def dashboard(user_id, browser):
+        ...
+
+    results = suite.run(jobs=8)
+
+Checks receive their inputs as keyword arguments and may be plain
+functions (run on a worker thread) or coroutines. They pass by returning
+None, True or a dict holding every value they provide; they fail by
+returning False or raising; raising Skip marks them skipped. When a check
+does not pass, everything downstream of it is skipped with the reason.
+
+Fixtures are set up once, on first use, and torn down after the run. A
+fixture is a function, a coroutine or a (async) generator that yields
+the value and cleans up after the yield; fixtures may use other fixtures.
+A fixture that raises Skip, or whose module is not installed, skips the
+checks using it; any other fixture error is an error of those checks.
+
+Each check's stdout is captured separately and printed as one block when
+it finishes, so concurrent output does not interleave. The run reports
+per-check timing, the critical path, and can write JUnit XML and JSON;
+passed checks' durations go into the perf_store.py history.
+
+Usage (from a script that builds a suite):
+    python3 run_checks.py --jobs 8 --junit results.xml --json results.json
+    python3 run_checks.py --list
+    python3 run_checks.py --only crud --skip browser_tabs
+"""
+import asyncio
+import collections
+import contextlib
+import contextvars
+import inspect
+import io
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+from perf_store import add_store_arguments, orchestrator_samples, record_samples
+
+DEFAULT_JOBS = 8
+
+Check = collections.namedtuple("Check", "name func needs provides fixtures timeout")
+Fixture = collections.namedtuple("Fixture", "name func fixtures")
+Result = collections.namedtuple("Result", "name status seconds started message output")
+
+PASSED, FAILED, ERROR, SKIPPED = "passed", "failed", "error", "skipped"
+MARKS = {PASSED: "✓", FAILED: "✗", ERROR: "✗", SKIPPED: "-"}
+
+_output = contextvars.ContextVar("orchestrator_output", default=None)
+
+
+class Skip(Exception):
+    """Raised by a check or fixture that cannot run here (missing dependency, no deployment)"""
+
+
+class FixtureError(Exception):
+    """A fixture failed to set up; the check using it is an error, not skipped"""
+
+    def __init__(self, name, error):
+        first_line = str(error).strip().splitlines()[0] if str(error).strip() else ""
+        super().__init__(f"fixture {name} failed: {type(error).__name__}: {first_line}")
+
+
+class SuiteError(Exception):
+    """The suite itself is invalid: unknown input, two providers, a cycle"""
+
+
+class _CapturedStdout(io.TextIOBase):
+    """sys.stdout replacement that routes writes to the current check's buffer"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        buffer = _output.get()
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        if _output.get() is None:
+            self.stream.flush()
+
+
+class Suite:
+    def __init__(self, name):
+        self.name = name
+        self.checks = {}
+        self.fixtures = {}
+
+    # ---- Registration ----
+
+    def check(self, name=None, needs=(), provides=(), fixtures=(), timeout=None):
+        def register(func):
+            self.add(Check(name or func.__name__, func, tuple(needs), tuple(provides), tuple(fixtures), timeout))
+            return func
+        return register
+
+    def fixture(self, name=None, fixtures=()):
+        def register(func):
+            self.add_fixture(Fixture(name or func.__name__, func, tuple(fixtures)))
+            return func
+        return register
+
+    def script(self, name, argv, needs=(), timeout=None, env=None):
+        """A check that runs `python3 argv...` in a subprocess and passes on exit code 0"""
+        async def run_script(**_):
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+                env={**os.environ, **(env or {})})
+            try:
+                output, _ = await process.communicate()
+            except asyncio.CancelledError:
+                process.kill()
+                await process.wait()
+                raise
+            print(output.decode(errors="replace"), end="")
+            if process.returncode:
+                raise AssertionError(f"{' '.join(argv)} exited with {process.returncode}")
+
+        self.add(Check(name, run_script, tuple(needs), (), (), timeout))
+
+    def add(self, check):
+        if check.name in self.checks:
+            raise SuiteError(f"duplicate check {check.name!r}")
+        self.checks[check.name] = check
+
+    def add_fixture(self, fixture):
+        existing = self.fixtures.get(fixture.name)
+        if existing is not None and existing.func is not fixture.func:
+            raise SuiteError(f"duplicate fixture {fixture.name!r}")
+        self.fixtures[fixture.name] = fixture
+
+    def include(self, other):
+        """Merge another suite's checks and fixtures into this one"""
+        for fixture in other.fixtures.values():
+            self.add_fixture(fixture)
+        for check in other.checks.values():
+            self.add(check)
+        return self
+
+    # ---- Graph ----
+
+    def graph(self):
+        """check name -> names of the checks it depends on, in topological order"""
+        providers = {}
+        for check in self.checks.values():
+            for value in check.provides:
+                if value in providers:
+                    raise SuiteError(f"{value!r} provided by both {providers[value]} and {check.name}")
+                providers[value] = check.name
+        deps = {}
+        for check in self.checks.values():
+            missing = [value for value in check.needs if value not in providers]
+            if missing:
+                raise SuiteError(f"{check.name} needs {', '.join(missing)}, which no check provides")
+            unknown = [name for name in check.fixtures if name not in self.fixtures]
+            if unknown:
+                raise SuiteError(f"{check.name} uses unknown fixture {', '.join(unknown)}")
+            deps[check.name] = sorted({providers[value] for value in check.needs})
+
+        order, indegree = [], {name: len(d) for name, d in deps.items()}
+        dependents = collections.defaultdict(list)
+        for name, d in deps.items():
+            for dep in d:
+                dependents[dep].append(name)
+        ready = [name for name in self.checks if indegree[name] == 0]
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for child in dependents[name]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+        if len(order) != len(deps):
+            raise SuiteError(f"dependency cycle among {', '.join(sorted(set(deps) - set(order)))}")
+        return {name: deps[name] for name in order}
+
+    def select(self, only=(), skip=()):
+        """Names to run (`only` plus everything they depend on) and the set to report as skipped"""
+        graph = self.graph()
+        for name in (*only, *skip):
+            if name not in graph:
+                raise SuiteError(f"unknown check {name!r}")
+        if only:
+            selected, stack = set(), list(only)
+            while stack:
+                name = stack.pop()
+                if name not in selected:
+                    selected.add(name)
+                    stack.extend(graph[name])
+        else:
+            selected = set(graph)
+        return [name for name in graph if name in selected], set(skip)
+
+    # ---- Running ----
+
+    def run(self, jobs=DEFAULT_JOBS, only=(), skip=(), timeout=None, echo=True):
+        return asyncio.run(self.run_async(jobs, only, skip, timeout, echo))
+
+    async def run_async(self, jobs=DEFAULT_JOBS, only=(), skip=(), timeout=None, echo=True):
+        """Run the selected checks; returns Results in topological order"""
+        graph = self.graph()
+        selected, skipped = self.select(only, skip)
+        runner = _Run(self, jobs, timeout, echo)
+        stdout = sys.stdout
+        sys.stdout = _CapturedStdout(stdout)
+        try:
+            tasks = {}
+            for name in selected:
+                deps = [tasks[dep] for dep in graph[name]]
+                tasks[name] = asyncio.create_task(runner.node(self.checks[name], deps, skipped))
+            results = await asyncio.gather(*tasks.values())
+        finally:
+            await runner.close()
+            sys.stdout = stdout
+        return results
+
+
+class _Run:
+    def __init__(self, suite, jobs, timeout, echo):
+        self.suite = suite
+        self.semaphore = asyncio.Semaphore(jobs)
+        self.timeout = timeout
+        self.echo = echo
+        self.started = time.perf_counter()
+        self.values = {}
+        self.fixtures = {}
+        self.exit_stack = contextlib.AsyncExitStack()
+
+    async def fixture(self, name):
+        """Set the fixture up once; concurrent users share the same task"""
+        if name not in self.fixtures:
+            self.fixtures[name] = asyncio.ensure_future(self._setup(self.suite.fixtures[name]))
+        return await asyncio.shield(self.fixtures[name])
+
+    async def _setup(self, fixture):
+        # Fixture output belongs to the run, not to whichever check asked first
+        _output.set(None)
+        kwargs = {name: await self.fixture(name) for name in fixture.fixtures}
+        func = fixture.func
+        if inspect.isasyncgenfunction(func):
+            return await self.exit_stack.enter_async_context(contextlib.asynccontextmanager(func)(**kwargs))
+        if inspect.isgeneratorfunction(func):
+            manager = contextlib.contextmanager(func)(**kwargs)
+            value = await asyncio.to_thread(manager.__enter__)
+            self.exit_stack.push_async_callback(asyncio.to_thread, manager.__exit__, None, None, None)
+            return value
+        if inspect.iscoroutinefunction(func):
+            return await func(**kwargs)
+        return await asyncio.to_thread(func, **kwargs)
+
+    async def close(self):
+        for task in self.fixtures.values():
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*self.fixtures.values(), return_exceptions=True)
+        await self.exit_stack.aclose()
+
+    async def node(self, check, deps, skipped):
+        started = time.perf_counter() - self.started
+        if check.name in skipped:
+            return self.finish(check, SKIPPED, started, 0.0, "deselected with --skip", "")
+        for dep in deps:
+            result = await dep
+            if result.status != PASSED:
+                return self.finish(check, SKIPPED, started, 0.0, f"{result.name} {result.status}", "")
+
+        buffer = io.StringIO()
+        _output.set(buffer)
+        async with self.semaphore:
+            started = time.perf_counter() - self.started
+            status, message = PASSED, ""
+            limit = check.timeout or self.timeout
+            try:
+                kwargs = {value: self.values[value] for value in check.needs}
+                for name in check.fixtures:
+                    try:
+                        kwargs[name] = await self.fixture(name)
+                    except Skip:
+                        raise
+                    except ModuleNotFoundError as e:
+                        # an optional dependency such as playwright; not a failure of the app
+                        raise Skip(f"fixture {name} needs {e.name}, which is not installed") from e
+                    except Exception as e:
+                        raise FixtureError(name, e) from e
+                outcome = await asyncio.wait_for(self.call(check.func, kwargs), limit)
+                if outcome is False:
+                    status, message = FAILED, "check returned False"
+                elif isinstance(outcome, dict):
+                    missing = [value for value in check.provides if value not in outcome]
+                    if missing:
+                        status, message = ERROR, f"did not provide {', '.join(missing)}"
+                    self.values.update((value, outcome[value]) for value in check.provides if value in outcome)
+                elif check.provides:
+                    status, message = ERROR, f"did not provide {', '.join(check.provides)}"
+            except Skip as e:
+                status, message = SKIPPED, str(e)
+            except FixtureError as e:
+                status, message = ERROR, str(e)
+            except asyncio.TimeoutError:
+                status, message = ERROR, f"timed out after {limit}s"
+            except AssertionError as e:
+                status, message = FAILED, str(e) or "assertion failed"
+            except Exception as e:
+                status, message = ERROR, f"{type(e).__name__}: {e}"
+            seconds = time.perf_counter() - self.started - started
+        _output.set(None)
+        return self.finish(check, status, started, seconds, message, buffer.getvalue())
+
+    @staticmethod
+    async def call(func, kwargs):
+        if inspect.iscoroutinefunction(func):
+            return await func(**kwargs)
+        return await asyncio.to_thread(func, **kwargs)
+
+    def finish(self, check, status, started, seconds, message, output):
+        result = Result(check.name, status, seconds, started, message, output)
+        if self.echo:
+            if output:
+                sys.stdout.write(output if output.endswith("\n") else output + "\n")
+            note = f" ({message})" if message else ""
+            sys.stdout.write(f"{MARKS[status]} {check.name}: {status} in {seconds:.2f}s{note}\n")
+        return result
+
+
+# ---- Reporting ----
+
+def critical_path(suite, results):
+    """Longest chain of dependent checks by duration: (seconds, [names])"""
+    graph = suite.graph()
+    by_name = {result.name: result for result in results}
+    best = {}
+    for name in graph:
+        if name not in by_name:
+            continue
+        chains = [best[dep] for dep in graph[name] if dep in best]
+        seconds, path = max(chains, default=(0.0, []))
+        best[name] = (seconds + by_name[name].seconds, path + [name])
+    return max(best.values(), default=(0.0, []))
+
+
+def summary(suite, results, wall_seconds):
+    counts = collections.Counter(result.status for result in results)
+    path_seconds, path = critical_path(suite, results)
+    return {
+        "suite": suite.name,
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "wall_seconds": wall_seconds,
+        "sum_seconds": sum(result.seconds for result in results),
+        "critical_path_seconds": path_seconds,
+        "critical_path": path,
+        "counts": {status: counts.get(status, 0) for status in (PASSED, FAILED, ERROR, SKIPPED)},
+        "checks": [
+            {
+                "name": result.name,
+                "status": result.status,
+                "seconds": result.seconds,
+                "started": result.started,
+                "needs": list(suite.checks[result.name].needs),
+                "provides": list(suite.checks[result.name].provides),
+                "fixtures": list(suite.checks[result.name].fixtures),
+                "message": result.message,
+                "output": result.output,
+            }
+            for result in results
+        ],
+    }
+
+
+def write_json(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def write_junit(report, path):
+    counts = report["counts"]
+    testsuite = ET.Element("testsuite", {
+        "name": report["suite"],
+        "tests": str(len(report["checks"])),
+        "failures": str(counts[FAILED]),
+        "errors": str(counts[ERROR]),
+        "skipped": str(counts[SKIPPED]),
+        "time": f"{report['wall_seconds']:.3f}",
+        "timestamp": report["finished_at"],
+    })
+    for check in report["checks"]:
+        case = ET.SubElement(testsuite, "testcase", {
+            "classname": report["suite"], "name": check["name"], "time": f"{check['seconds']:.3f}"})
+        if check["status"] == FAILED:
+            ET.SubElement(case, "failure", {"message": check["message"]})
+        elif check["status"] == ERROR:
+            ET.SubElement(case, "error", {"message": check["message"]})
+        elif check["status"] == SKIPPED:
+            ET.SubElement(case, "skipped", {"message": check["message"]})
+        if check["output"]:
+            ET.SubElement(case, "system-out").text = check["output"]
+    tree = ET.ElementTree(ET.Element("testsuites"))
+    tree.getroot().append(testsuite)
+    ET.indent(tree)
+    tree.write(path, encoding="utf-8", xml_declaration=True)
+
+
+def print_report(report):
+    print("\n" + "=" * 80)
+    print(f"CHECK RESULTS: {report['suite']}")
+    print("=" * 80)
+    print(f"\n  {'check':<28} {'status':<8} {'start':>8} {'seconds':>8}  message")
+    for check in report["checks"]:
+        print(f"  {MARKS[check['status']]} {check['name']:<26} {check['status']:<8} "
+              f"{check['started']:>8.2f} {check['seconds']:>8.2f}  {check['message']}")
+    counts = report["counts"]
+    print(f"\n  {counts[PASSED]} passed, {counts[FAILED]} failed, {counts[ERROR]} errors, {counts[SKIPPED]} skipped")
+    print(f"  Wall clock:       {report['wall_seconds']:.2f}s")
+    print(f"  Sum of checks:    {report['sum_seconds']:.2f}s")
+    print(f"  Critical path:    {report['critical_path_seconds']:.2f}s ({' -> '.join(report['critical_path'])})")
+
+
+def print_graph(suite):
+    graph = suite.graph()
+    for name, deps in graph.items():
+        check = suite.checks[name]
+        details = []
+        if deps:
+            details.append("after " + ", ".join(deps))
+        if check.fixtures:
+            details.append("uses " + ", ".join(check.fixtures))
+        if check.provides:
+            details.append("provides " + ", ".join(check.provides))
+        print(f"  {name:<28} {'; '.join(details)}")
+
+
+def add_arguments(parser):
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="checks running at the same time")
+    parser.add_argument("--only", nargs="+", default=[], metavar="CHECK", help="run these checks and what they need")
+    parser.add_argument("--skip", nargs="+", default=[], metavar="CHECK", help="skip these checks and what needs them")
+    parser.add_argument("--timeout", type=float, help="per-check timeout in seconds")
+    parser.add_argument("--junit", metavar="PATH", help="write JUnit XML results")
+    parser.add_argument("--json", metavar="PATH", help="write JSON results")
+    parser.add_argument("--list", action="store_true", help="print the dependency graph and exit")
+    parser.add_argument("--quiet", action="store_true", help="do not echo check output, only the report")
+    add_store_arguments(parser)
+
+
+def execute(suite, args, deployment=None):
+    """Run a suite with the add_arguments() options and write the requested result files
+
+    With a deployment the durations are recorded in the result store too.
+    """
+    started = time.perf_counter()
+    results = suite.run(args.jobs, args.only, args.skip, args.timeout, echo=not args.quiet)
+    report = summary(suite, results, time.perf_counter() - started)
+    if args.json:
+        write_json(report, args.json)
+    if args.junit:
+        write_junit(report, args.junit)
+    if deployment:
+        record_samples(args, f"orchestrator:{suite.name}", deployment, orchestrator_samples(report))
+    return report
+
+
+def succeeded(report):
+    return not (report["counts"][FAILED] or report["counts"][ERROR])
+
+
+def run_cli(suite, args, deployment=None):
+    """--list or execute() plus the report; True when nothing failed or errored"""
+    if args.list:
+        print_graph(suite)
+        return True
+    report = execute(suite, args, deployment)
+    print_report(report)
+    if args.json:
+        print(f"\n✓ JSON results written to {args.json}")
+    if args.junit:
+        print(f"✓ JUnit XML written to {args.junit}")
+    return succeeded(report)
@@ -0,0 +1,592 @@
+#!/usr/bin/env python3
+"""
+Historical performance results with regression detection.
+
+The harnesses (web_perf.py, smoke_test.py, comprehensive_test.py,
+load_test.py, bundle_analyzer.py and every orchestrator.py suite) write
+their timing and size samples into one SQLite file instead of printing
+and discarding them. Each run is keyed by harness, deployment URL and git
+SHA; each sample by check name and metric.
+
+Regressions are found per series (deployment, check, metric) on the
+per-run medians, so one run with many samples still counts once:
+
+  - a Mann-Whitney U test compares the `window` runs before every point
+    with the `window` runs from it on; a change point needs a median
+    shift of at least min_change and a p-value at or below the series'
+    critical_p_value, which corrects for testing every split: a series
+    of pure noise gets any change point with chance alpha (a permutation
+    max-statistic correction), so neither a single slow run nor a long
+    history of wobble is flagged
+  - the strongest non-overlapping change points are kept; a change in the
+    metric's worse direction (slower, bigger, less content) that the
+    latest runs are still on is a regression
+
+A shift is only confirmed once `min_window` runs have landed after it,
+which is the price of not alerting on noise.
+
+The trend report (Markdown or HTML) replaces the hand-written
+comprehensive_test_report.md / test-progress.md style summaries.
+
+Usage:
+    python3 perf_store.py                           # series and change points
+    python3 perf_store.py --check                   # exit 1 on open regressions
+    python3 perf_store.py --report trend.md --html trend.html
+    python3 perf_store.py --import results.json --deployment http://127.0.0.1:54321
+    python3 perf_store.py --record smoke root_length 5123 --unit chars --deployment https://x.space.minimax.io
+"""
+import argparse
+import bisect
+import collections
+import functools
+import html
+import json
+import math
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+DEFAULT_DB = os.environ.get(
+    "GOALS_TRACKER_PERF_DB", os.path.join(os.path.expanduser("~"), ".cache", "goals_tracker", "perf.sqlite"))
+DEFAULT_WINDOW = 8
+MIN_WINDOW = 4
+DEFAULT_ALPHA = 0.01
+DEFAULT_MIN_CHANGE = 0.05
+EXACT_LIMIT = 400  # n1 * n2 up to which the U distribution is enumerated instead of approximated
+PERMUTATIONS = 1000  # shuffles behind each critical p-value (see critical_p_value)
+
+# Which way is worse, by unit; units not listed only report shifts
+LOWER_IS_BETTER = {"ms", "s", "bytes", "KB", "MB", "errors", "%"}
+HIGHER_IS_BETTER = {"chars", "rps"}
+
+Sample = collections.namedtuple("Sample", "check metric value unit")
+Run = collections.namedtuple("Run", "id recorded_at harness deployment git_sha")
+Point = collections.namedtuple("Point", "run_id recorded_at git_sha value")
+ChangePoint = collections.namedtuple("ChangePoint", "index p_value before after change")
+Trend = collections.namedtuple("Trend", "deployment check metric unit points change_points status")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    recorded_at REAL NOT NULL,
+    harness TEXT NOT NULL,
+    deployment TEXT NOT NULL,
+    git_sha TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    check_name TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL,
+    unit TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_deployment ON runs(deployment, recorded_at);
+CREATE INDEX IF NOT EXISTS samples_by_series ON samples(check_name, metric, run_id);
+"""
+
+
+def git_sha():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def direction(unit):
+    """'lower' or 'higher' is better, or None when either way is just a shift"""
+    if unit in LOWER_IS_BETTER:
+        return "lower"
+    if unit in HIGHER_IS_BETTER:
+        return "higher"
+    return None
+
+
+class ResultStore:
+    """SQLite file shared by all harnesses; safe for concurrent writers (WAL)"""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, harness, deployment, samples, sha=None, recorded_at=None):
+        """Store one run's samples; returns the run id"""
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO runs (recorded_at, harness, deployment, git_sha) VALUES (?, ?, ?, ?)",
+                (recorded_at or time.time(), harness, deployment, sha or git_sha()))
+            run_id = cursor.lastrowid
+            self.db.executemany(
+                "INSERT INTO samples (run_id, check_name, metric, value, unit) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, s.check, s.metric, float(s.value), s.unit) for s in samples
+                 if s.value is not None and math.isfinite(s.value)])
+        return run_id
+
+    def runs(self, deployment=None, limit=50):
+        query = "SELECT id, recorded_at, harness, deployment, git_sha FROM runs"
+        params = ()
+        if deployment:
+            query, params = query + " WHERE deployment = ?", (deployment,)
+        rows = self.db.execute(query + " ORDER BY recorded_at DESC, id DESC LIMIT ?", (*params, limit))
+        return [Run(*row) for row in rows]
+
+    def series(self, deployment=None, check=None, metric=None):
+        """{(deployment, check, metric): (unit, [Point])}, one per-run median per point, oldest first"""
+        query = """
+            SELECT r.deployment, s.check_name, s.metric, s.unit, r.id, r.recorded_at, r.git_sha, s.value
+            FROM samples s JOIN runs r ON r.id = s.run_id
+        """
+        clauses, params = [], []
+        for column, value in (("r.deployment", deployment), ("s.check_name", check), ("s.metric", metric)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY r.recorded_at, r.id"
+
+        grouped = collections.OrderedDict()
+        for dep, check_name, metric_name, unit, run_id, recorded_at, sha, value in self.db.execute(query, params):
+            _, runs = grouped.setdefault((dep, check_name, metric_name), (unit, collections.OrderedDict()))
+            runs.setdefault(run_id, (recorded_at, sha, []))[2].append(value)
+        return {
+            key: (unit, [Point(run_id, at, sha, statistics.median(values))
+                         for run_id, (at, sha, values) in runs.items()])
+            for key, (unit, runs) in grouped.items()
+        }
+
+    def prune(self, older_than_days):
+        cutoff = time.time() - older_than_days * 86400
+        with self.db:
+            return self.db.execute("DELETE FROM runs WHERE recorded_at < ?", (cutoff,)).rowcount
+
+
+# ---- Statistics ----
+
+@functools.lru_cache(maxsize=None)
+def _u_distribution(n1, n2):
+    """Cumulative counts of the rank arrangements with U <= k, for k = 0 .. n1*n2, with no ties"""
+    # counts[j][k]: arrangements of i values from a and j from b with U = k, for the current i;
+    # the largest value is either from a (and beats all j values of b) or from b (adds nothing)
+    counts = [[1] for _ in range(n2 + 1)]
+    for i in range(1, n1 + 1):
+        row = [[1]]
+        for j in range(1, n2 + 1):
+            above, left = counts[j], row[j - 1]
+            row.append([(above[k - j] if 0 <= k - j < len(above) else 0) + (left[k] if k < len(left) else 0)
+                        for k in range(i * j + 1)])
+        counts = row
+    cumulative, total = [], 0
+    for count in counts[n2]:
+        total += count
+        cumulative.append(total)
+    return cumulative
+
+
+def _exact_u_pvalue(u, n1, n2):
+    """Two-sided P(U <= u or U >= n1*n2 - u) with no ties, by counting rank arrangements"""
+    cumulative = _u_distribution(n1, n2)
+    low = min(u, n1 * n2 - u)
+    return min(1.0, 2 * cumulative[math.floor(low)] / cumulative[-1])
+
+
+def mann_whitney(a, b):
+    """Two-sided Mann-Whitney U test; returns (U of a, p-value)
+
+    Exact for small tie-free samples, otherwise the normal approximation
+    with tie and continuity corrections.
+    """
+    n1, n2 = len(a), len(b)
+    if not n1 or not n2:
+        return 0.0, 1.0
+    pooled = sorted((value, group) for group, values in enumerate((a, b)) for value in values)
+    ranks, ties, i = [0.0] * len(pooled), [], 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        if j > i:
+            ties.append(j - i + 1)
+        i = j + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, pooled) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+
+    if not ties and n1 * n2 <= EXACT_LIMIT:
+        return u, _exact_u_pvalue(u, n1, n2)
+    n = n1 + n2
+    tie_term = sum(t ** 3 - t for t in ties) / (n * (n - 1))
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term))
+    if sigma == 0:
+        return u, 1.0
+    z = (abs(u - n1 * n2 / 2) - 0.5) / sigma
+    return u, min(1.0, math.erfc(max(z, 0) / math.sqrt(2)))
+
+
+def relative_change(before, after):
+    if before == 0:
+        return math.inf if after else 0.0
+    return (after - before) / abs(before)
+
+
+def _splits(values, window, min_window):
+    """(index, runs before, runs from index on) for every split with min_window runs on each side"""
+    for index in range(min_window, len(values) - min_window + 1):
+        yield index, values[max(0, index - window):index], values[index:index + window]
+
+
+@functools.lru_cache(maxsize=None)
+def critical_p_value(length, window=DEFAULT_WINDOW, min_window=MIN_WINDOW, alpha=DEFAULT_ALPHA):
+    """Per-split p-value a change point must beat so a `length`-run series of noise is flagged with chance alpha
+
+    Every split of the series is tested, so at alpha per split most long
+    noise-only series would show a change point somewhere. Without a change
+    the runs are exchangeable and the rank test only sees their order, so
+    the smallest p-value over all splits has one distribution for every
+    tie-free series of this length: it is sampled by shuffling 0..length-1
+    (a Westfall-Young max-statistic correction), and the threshold is the
+    largest of those minima that at most alpha of the shuffles reach.
+
+    The exact test cannot go below 2 / C(2 * window, window); past about
+    ten windows of history more than alpha of noise series reach that, and
+    the threshold stays at it (at the default window, 2.7% of 200-run noise
+    series against ~50% uncorrected).
+    """
+    rng = random.Random(length)
+    order = list(range(length))
+    smallest = []
+    for _ in range(PERMUTATIONS):
+        rng.shuffle(order)
+        smallest.append(min((mann_whitney(before, after)[1] for _, before, after in _splits(order, window, min_window)),
+                            default=1.0))
+    smallest.sort()
+    allowed = alpha * PERMUTATIONS
+    threshold = smallest[0]
+    for value in sorted(set(smallest)):
+        if bisect.bisect_right(smallest, value) > allowed:
+            break
+        threshold = value
+    return min(alpha, threshold)
+
+
+def change_points(values, window=DEFAULT_WINDOW, min_window=MIN_WINDOW, alpha=DEFAULT_ALPHA,
+                  min_change=DEFAULT_MIN_CHANGE):
+    """Significant level shifts in `values`, strongest first among overlapping candidates
+
+    `alpha` is the chance that a series with no change at all gets a change
+    point, not a per-split level: see critical_p_value.
+    """
+    if len(values) < 2 * min_window:
+        return []
+    threshold = critical_p_value(len(values), window, min_window, alpha)
+    candidates = []
+    for index, before, after in _splits(values, window, min_window):
+        _, p_value = mann_whitney(before, after)
+        before_median, after_median = statistics.median(before), statistics.median(after)
+        change = relative_change(before_median, after_median)
+        if p_value <= threshold and abs(change) >= min_change:
+            candidates.append(ChangePoint(index, p_value, before_median, after_median, change))
+
+    chosen = []
+    for candidate in sorted(candidates, key=lambda c: (c.p_value, -abs(c.change))):
+        if all(abs(candidate.index - other.index) >= min_window for other in chosen):
+            chosen.append(candidate)
+    return sorted(chosen, key=lambda c: c.index)
+
+
+def classify(change_point, unit):
+    better = direction(unit)
+    if better is None:
+        return "shift"
+    worse = change_point.change > 0 if better == "lower" else change_point.change < 0
+    return "regression" if worse else "improvement"
+
+
+def trends(store, deployment=None, check=None, metric=None, **detect):
+    """One Trend per series; status is the latest change point's class, or ok / insufficient"""
+    min_window = detect.get("min_window", MIN_WINDOW)
+    result = []
+    for (dep, check_name, metric_name), (unit, points) in store.series(deployment, check, metric).items():
+        found = change_points([point.value for point in points], **detect)
+        if len(points) < 2 * min_window:
+            status = "insufficient"
+        elif found:
+            status = classify(found[-1], unit)
+        else:
+            status = "ok"
+        result.append(Trend(dep, check_name, metric_name, unit, points, found, status))
+    return result
+
+
+# ---- Reports ----
+
+SPARK = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(values, width=24):
+    values = values[-width:]
+    low, high = min(values), max(values)
+    if high == low:
+        return SPARK[3] * len(values)
+    return "".join(SPARK[int((value - low) / (high - low) * (len(SPARK) - 1))] for value in values)
+
+
+def format_value(value, unit):
+    if value is None:
+        return "-"
+    text = f"{value:.0f}" if abs(value) >= 100 else f"{value:.3g}"
+    return f"{text} {unit}" if unit else text
+
+
+def format_change(change):
+    return "new" if math.isinf(change) else f"{change:+.1%}"
+
+
+STATUS_LABELS = {
+    "regression": "✗ regression",
+    "improvement": "✓ improvement",
+    "shift": "~ shift",
+    "ok": "✓ stable",
+    "insufficient": "… collecting",
+}
+
+
+def _row(trend):
+    latest = trend.points[-1]
+    change = trend.change_points[-1] if trend.change_points else None
+    return {
+        "check": trend.check,
+        "metric": trend.metric,
+        "latest": format_value(latest.value, trend.unit),
+        "runs": len(trend.points),
+        "change": format_change(change.change) if change else "",
+        "p_value": f"{change.p_value:.2g}" if change else "",
+        "since": trend.points[change.index].git_sha if change else "",
+        "status": STATUS_LABELS[trend.status],
+    }
+
+
+def _by_deployment(trend_list):
+    grouped = collections.OrderedDict()
+    for trend in sorted(trend_list, key=lambda t: (t.deployment, t.check, t.metric)):
+        grouped.setdefault(trend.deployment, []).append(trend)
+    return grouped
+
+
+def markdown_report(trend_list, title="Performance trends"):
+    generated = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    regressions = [t for t in trend_list if t.status == "regression"]
+    lines = [f"# {title}", f"Generated {generated} | {len(trend_list)} series | "
+             f"{len(regressions)} open regression(s)", ""]
+    if regressions:
+        lines += ["## Open regressions", ""]
+        for trend in regressions:
+            row = _row(trend)
+            lines.append(f"- **{trend.check} / {trend.metric}** on {trend.deployment}: {row['change']} "
+                         f"since `{row['since']}` (p={row['p_value']}, now {row['latest']})")
+        lines.append("")
+    for deployment, group in _by_deployment(trend_list).items():
+        lines += [f"## {deployment}", "",
+                  "| Check | Metric | Latest | Runs | Trend | Last change | p | Since | Status |",
+                  "|---|---|---|---|---|---|---|---|---|"]
+        for trend in group:
+            row = _row(trend)
+            spark = sparkline([point.value for point in trend.points])
+            lines.append(f"| {row['check']} | {row['metric']} | {row['latest']} | {row['runs']} | {spark} | "
+                         f"{row['change']} | {row['p_value']} | {row['since']} | {row['status']} |")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def svg_sparkline(trend, width=160, height=32):
+    values = [point.value for point in trend.points]
+    low, high = min(values), max(values)
+    span = (high - low) or 1
+    step = width / max(len(values) - 1, 1)
+
+    def xy(i, value):
+        return i * step, height - 2 - (value - low) / span * (height - 4)
+
+    path = " ".join(f"{x:.1f},{y:.1f}" for x, y in (xy(i, v) for i, v in enumerate(values)))
+    marks = "".join(f'<line x1="{xy(c.index, 0)[0]:.1f}" x2="{xy(c.index, 0)[0]:.1f}" y1="0" y2="{height}" '
+                    f'stroke="{"#c0392b" if classify(c, trend.unit) == "regression" else "#7f8c8d"}" '
+                    f'stroke-dasharray="2,2"/>' for c in trend.change_points)
+    return (f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}">{marks}'
+            f'<polyline fill="none" stroke="#2c3e50" stroke-width="1.5" points="{path}"/></svg>')
+
+
+def html_report(trend_list, title="Performance trends"):
+    esc = html.escape
+    generated = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>",
+        f"<title>{esc(title)}</title>",
+        "<style>body{font-family:system-ui,sans-serif;margin:2em}table{border-collapse:collapse}"
+        "td,th{padding:4px 10px;border-bottom:1px solid #ddd;text-align:left}"
+        ".regression{color:#c0392b;font-weight:bold}.improvement{color:#27ae60}</style></head><body>",
+        f"<h1>{esc(title)}</h1><p>Generated {generated} &middot; {len(trend_list)} series</p>",
+    ]
+    for deployment, group in _by_deployment(trend_list).items():
+        parts.append(f"<h2>{esc(deployment)}</h2><table><tr><th>Check</th><th>Metric</th><th>Latest</th>"
+                     "<th>Runs</th><th>Trend</th><th>Last change</th><th>p</th><th>Since</th><th>Status</th></tr>")
+        for trend in group:
+            row = _row(trend)
+            parts.append(
+                f"<tr class='{trend.status}'><td>{esc(row['check'])}</td><td>{esc(row['metric'])}</td>"
+                f"<td>{esc(row['latest'])}</td><td>{row['runs']}</td><td>{svg_sparkline(trend)}</td>"
+                f"<td>{row['change']}</td><td>{row['p_value']}</td><td>{esc(row['since'])}</td>"
+                f"<td>{esc(row['status'])}</td></tr>")
+        parts.append("</table>")
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+# ---- Harness helpers ----
+
+def add_store_arguments(parser):
+    parser.add_argument("--perf-db", default=DEFAULT_DB, help=f"result store (default {DEFAULT_DB})")
+    parser.add_argument("--no-perf-db", action="store_true", help="do not record samples")
+
+
+UNIT_SUFFIXES = (("_ms", "ms"), ("_seconds", "s"), ("_bytes", "bytes"), ("_kb", "KB"), ("_mb", "MB"),
+                 ("_rps", "rps"), ("_length", "chars"))
+
+
+def unit_for(metric):
+    return next((unit for suffix, unit in UNIT_SUFFIXES if metric.endswith(suffix)), None)
+
+
+def metric_samples(check, metrics, units=None):
+    """Samples for every numeric value in a metrics dict; units from `units` or the name suffix"""
+    units = units or {}
+    return [Sample(check, metric, value, units.get(metric, unit_for(metric)))
+            for metric, value in metrics.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)]
+
+
+def record_samples(args, harness, deployment, samples, sha=None):
+    """Record a harness run per add_store_arguments() (args=None: default store)
+
+    A store failure never fails the harness.
+    """
+    if getattr(args, "no_perf_db", False) or not samples:
+        return None
+    path = getattr(args, "perf_db", DEFAULT_DB)
+    try:
+        with ResultStore(path) as store:
+            run_id = store.record(harness, deployment, samples, sha)
+    except sqlite3.Error as e:
+        print(f"  ✗ Could not record samples in {path}: {e}")
+        return None
+    print(f"  ✓ {len(samples)} samples recorded in {path} (run {run_id})")
+    return run_id
+
+
+def orchestrator_samples(report):
+    """Samples from an orchestrator.py JSON report: every passed check's duration plus the totals"""
+    samples = [Sample(check["name"], "seconds", check["seconds"], "s")
+               for check in report["checks"] if check["status"] == "passed"]
+    samples.append(Sample(report["suite"], "wall_seconds", report["wall_seconds"], "s"))
+    samples.append(Sample(report["suite"], "critical_path_seconds", report["critical_path_seconds"], "s"))
+    return samples
+
+
+# ---- CLI ----
+
+def print_trends(trend_list, runs):
+    print("=" * 80)
+    print(f"PERFORMANCE HISTORY: {len(trend_list)} series, {len(runs)} recent run(s)")
+    print("=" * 80)
+    for deployment, group in _by_deployment(trend_list).items():
+        print(f"\n  {deployment}")
+        for trend in group:
+            row = _row(trend)
+            mark = {"regression": "✗", "improvement": "✓", "ok": "✓"}.get(trend.status, " ")
+            note = f" {row['change']} since {row['since']} (p={row['p_value']})" if row["change"] else ""
+            print(f"  {mark} {trend.check + ' / ' + trend.metric:<44} {row['latest']:>12} "
+                  f"{sparkline([p.value for p in trend.points], 16):<16} {trend.status}{note}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Performance result store and regression detection")
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite file")
+    parser.add_argument("--deployment", help="only this deployment (and the deployment for --import/--record)")
+    parser.add_argument("--check-name", help="only this check")
+    parser.add_argument("--metric", help="only this metric")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="runs on each side of a change point")
+    parser.add_argument("--min-window", type=int, default=MIN_WINDOW, help="runs needed on each side")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA,
+                        help="chance of a false change point per series (corrected over all splits)")
+    parser.add_argument("--min-change", type=float, default=DEFAULT_MIN_CHANGE,
+                        help="smallest relative median shift worth flagging")
+    parser.add_argument("--import", dest="import_path", help="record an orchestrator.py JSON report")
+    parser.add_argument("--record", nargs=3, metavar=("CHECK", "METRIC", "VALUE"), help="record one sample")
+    parser.add_argument("--unit", help="unit for --record")
+    parser.add_argument("--harness", default="manual", help="harness name for --record")
+    parser.add_argument("--sha", help="git SHA for --import/--record (default: HEAD)")
+    parser.add_argument("--report", metavar="PATH", help="write a Markdown trend report")
+    parser.add_argument("--html", metavar="PATH", help="write an HTML trend report")
+    parser.add_argument("--check", dest="fail_on_regression", action="store_true",
+                        help="exit non-zero when any series has an open regression")
+    parser.add_argument("--prune-days", type=float, help="delete runs older than this many days")
+    args = parser.parse_args(argv)
+    if (args.import_path or args.record) and not args.deployment:
+        parser.error("--import and --record need --deployment")
+
+    with ResultStore(args.db) as store:
+        if args.import_path:
+            with open(args.import_path) as f:
+                report = json.load(f)
+            run_id = store.record(f"orchestrator:{report['suite']}", args.deployment,
+                                  orchestrator_samples(report), args.sha)
+            print(f"✓ Imported {args.import_path} as run {run_id}")
+        if args.record:
+            check_name, metric, value = args.record
+            run_id = store.record(args.harness, args.deployment,
+                                  [Sample(check_name, metric, float(value), args.unit)], args.sha)
+            print(f"✓ Recorded {check_name} / {metric} = {value} as run {run_id}")
+        if args.prune_days is not None:
+            print(f"✓ Pruned {store.prune(args.prune_days)} run(s)")
+
+        detect = {"window": args.window, "min_window": args.min_window, "alpha": args.alpha,
+                  "min_change": args.min_change}
+        trend_list = trends(store, args.deployment, args.check_name, args.metric, **detect)
+        print_trends(trend_list, store.runs(args.deployment))
+
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(markdown_report(trend_list))
+        print(f"\n✓ Markdown report written to {args.report}")
+    if args.html:
+        with open(args.html, "w") as f:
+            f.write(html_report(trend_list))
+        print(f"✓ HTML report written to {args.html}")
+
+    regressions = [trend for trend in trend_list if trend.status == "regression"]
+    if regressions:
+        print(f"\n✗ {len(regressions)} open regression(s)")
+    return not (args.fail_on_regression and regressions)
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Event-driven readiness detection for the Playwright checks.
+
+Replaces `wait_until="networkidle"` plus fixed `time.sleep()` calls with
+waits on concrete signals, and reports how long each one took:
+
+  - #root being populated, recorded in-page by a MutationObserver
+    (time_to_first_render_ms, measured from navigation start); with no
+    screen to wait for, a page still blank BLANK_GRACE_MS after `load`
+    is returned with None instead of timing out, for the white-screen
+    checks to report
+  - a named screen becoming visible (auth screen, Diary, NavBar, tabs)
+  - the Supabase /auth/v1/token response after "Try Demo Account"
+    (auth_response_ms, time_to_logged_in_ms)
+
+    response, metrics = await goto_ready(page, url)
+    login = await demo_login(page)
+"""
+import time
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+DEFAULT_TIMEOUT = 30000
+BLANK_GRACE_MS = 3000  # how long #root may stay empty after `load` before the page counts as blank
+
+# Installed before any page script runs; records when #root first gets children
+RENDER_OBSERVER_JS = """
+(() => {
+  if (window.__readiness) return;
+  const marks = window.__readiness = { firstRender: null };
+  const check = () => {
+    const root = document.getElementById('root');
+    if (marks.firstRender === null && root && root.childElementCount > 0) {
+      marks.firstRender = performance.now();
+      observer.disconnect();
+    }
+  };
+  const observer = new MutationObserver(check);
+  observer.observe(document, { childList: true, subtree: true });
+})();
+"""
+
+# Selectors that prove a screen has rendered (headings from src/components/*Screen.tsx)
+SCREENS = {
+    "auth": "text=Try Demo Account",
+    "diary": "text=Daily Report",
+    "goals": "text=My Goals",
+    "habits": "text=Daily Habits",
+    "statistics": "text=Progress Report",
+    "navbar": "nav >> text=Diary",
+}
+
+# NavBar tab label -> screen it opens
+NAV_TABS = {
+    "Diary": "diary",
+    "Goals": "goals",
+    "Habits": "habits",
+    "Statistics": "statistics",
+}
+
+
+async def page_now(page):
+    """performance.now() in the page, i.e. ms since navigation start"""
+    return await page.evaluate("performance.now()")
+
+
+async def install(page):
+    """Register the render observer for every navigation of this page"""
+    await page.add_init_script(RENDER_OBSERVER_JS)
+
+
+async def wait_for_first_render(page, timeout=DEFAULT_TIMEOUT):
+    """Wait until #root has children; returns ms since navigation start"""
+    await page.wait_for_function(
+        "() => window.__readiness && window.__readiness.firstRender !== null",
+        timeout=timeout,
+    )
+    return await page.evaluate("window.__readiness.firstRender")
+
+
+async def wait_for_render_or_blank(page, timeout=DEFAULT_TIMEOUT, grace=BLANK_GRACE_MS):
+    """wait_for_first_render, but None for a blank page: #root still empty `grace` ms after load"""
+    try:
+        await page.wait_for_function(
+            """grace => {
+              if (window.__readiness && window.__readiness.firstRender !== null) return true;
+              const nav = performance.getEntriesByType('navigation')[0];
+              return !!nav && nav.loadEventEnd > 0 && performance.now() - nav.loadEventEnd > grace;
+            }""",
+            arg=grace, timeout=timeout, polling=100,
+        )
+    except PlaywrightTimeoutError:
+        return None
+    return await page.evaluate("window.__readiness ? window.__readiness.firstRender : null")
+
+
+async def wait_for_screen(page, screen, timeout=DEFAULT_TIMEOUT):
+    """Wait for a SCREENS entry (or a raw selector) to be visible; returns ms since navigation start"""
+    selector = SCREENS.get(screen, screen)
+    await page.locator(selector).first.wait_for(state="visible", timeout=timeout)
+    return await page_now(page)
+
+
+async def goto_ready(page, url, screen="auth", timeout=DEFAULT_TIMEOUT):
+    """Navigate and wait for first render and `screen`; returns (response, metrics)
+
+    Pass screen=None to only wait for #root to be populated; a blank page
+    then comes back with time_to_first_render_ms=None rather than raising,
+    so the caller can report NO CONTENT.
+    """
+    await install(page)
+    response = await page.goto(url, wait_until="commit", timeout=timeout)
+    if not screen:
+        return response, {"time_to_first_render_ms": await wait_for_render_or_blank(page, timeout)}
+    metrics = {"time_to_first_render_ms": await wait_for_first_render(page, timeout)}
+    metrics[f"time_to_{screen}_ms"] = await wait_for_screen(page, screen, timeout)
+    return response, metrics
+
+
+async def demo_login(page, timeout=DEFAULT_TIMEOUT):
+    """Click "Try Demo Account" and wait for the auth response, Diary and NavBar
+
+    Returns metrics with the token response status, time until it landed
+    and time until the Diary screen was usable, both from the click.
+    """
+    started = time.perf_counter()
+    async with page.expect_response(lambda r: "/auth/v1/token" in r.url, timeout=timeout) as info:
+        await page.locator(SCREENS["auth"]).first.click()
+    response = await info.value
+    auth_ms = (time.perf_counter() - started) * 1000
+    await wait_for_screen(page, "diary", timeout)
+    await wait_for_screen(page, "navbar", timeout)
+    return {
+        "auth_status": response.status,
+        "auth_response_ms": auth_ms,
+        "time_to_logged_in_ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+async def open_tab(page, label, timeout=DEFAULT_TIMEOUT):
+    """Click a NavBar tab and wait for its screen; returns ms from click to visible"""
+    started = time.perf_counter()
+    await page.locator(f"nav >> text={label}").first.click()
+    await wait_for_screen(page, NAV_TABS.get(label, f"text={label}"), timeout)
+    return (time.perf_counter() - started) * 1000
+
+
+def format_metrics(metrics):
+    return ", ".join(f"{key}={value:.0f}" if isinstance(value, float) else f"{key}={value}"
+                     for key, value in metrics.items())
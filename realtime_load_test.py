@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+"""
+Realtime fan-out load test: thousands of Phoenix-channel subscribers, timed writes.
+
+Opens --clients websocket connections to /realtime/v1/websocket from one
+asyncio process, each signed in as its own user and joined to the channels
+the app opens for it:
+
+  habits-<uid>     HabitsService.subscribeToHabitChanges
+                   (habits, event *, filter user_id=eq.<uid>)
+  activity:<uid>   ActivityService.subscribeToUserActivity
+                   (activity_feed, event *, filter user_id=eq.<uid>)
+  activity-feed    ActivityService.subscribeToActivityFeed
+                   (activity_feed INSERT, no filter) on --feed-share of them
+
+then inserts rows at --rate per second for --duration seconds through
+PostgREST with the service role key: habits for a random subscriber and,
+for --activity-share of the writes, activity_feed rows (--private-share of
+them not public, which RLS keeps off other users' activity-feed channels).
+Row ids are generated client-side, so every delivery is matched to the
+moment its write was sent and to the number of deliveries it should cause.
+
+Reports:
+  subscribe       connect + join time per client, failed clients
+  delivery        end-to-end latency p50/p95/p99/max (write sent -> message
+                  parsed), deliveries expected vs received after --drain
+                  seconds (dropped), duplicates, unknown messages, sockets
+                  closed by the server
+  writes          achieved rate, insert latency, failed writes
+  memory          RSS per connection for this process and, when the
+                  stand-in is used, for the server
+  event loop      lag of this process; when it is high the latencies
+                  include the load generator's own backlog
+
+Without --url the stand-in from local_supabase.py is started in a
+subprocess (so the two sides do not share a GIL or an RSS figure) and
+tokens are minted with its JWT secret. Against a real project the tables
+must be in the supabase_realtime publication; pass --jwt-secret to mint
+tokens instead of signing every user in. Load accounts are named
+realtime-load-<n>@example.com; their habits and activity rows are deleted
+afterwards unless --keep is given. One source address reaches about 28k
+connections to one port before running out of ephemeral ports.
+
+Requires: pip install websockets
+
+Usage:
+    python3 realtime_load_test.py
+    python3 realtime_load_test.py --clients 10000 --rate 200 --duration 60 --feed-share 0.05
+    python3 realtime_load_test.py --url http://127.0.0.1:54321 --service-key $SUPABASE_SERVICE_ROLE_KEY \\
+        --jwt-secret $SUPABASE_JWT_SECRET
+"""
+import argparse
+import asyncio
+import gc
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+try:
+    import websockets
+    from websockets.asyncio.client import connect
+except ImportError:
+    websockets = None
+
+from load_test import percentile
+from supabase_client import ANON_KEY, AsyncSupabaseClient
+
+DEFAULT_CLIENTS = 1000
+DEFAULT_RATE = 50.0
+DEFAULT_DURATION = 20.0
+DEFAULT_ACTIVITY_SHARE = 0.3
+DEFAULT_PRIVATE_SHARE = 0.2
+DEFAULT_FEED_SHARE = 0.1
+DEFAULT_CONNECT_CONCURRENCY = 200
+DEFAULT_WRITE_CONCURRENCY = 64
+DEFAULT_DRAIN = 5.0
+DEFAULT_P99_BUDGET_MS = 1000.0
+HEARTBEAT_INTERVAL = 25.0  # realtime-js default
+JOIN_TIMEOUT = 30.0
+LOAD_PASSWORD = "realtime-load-123"
+ACTIVITY_TYPES = ("goal_completed", "task_completed", "milestone_reached", "streak_achieved")
+SPARE_FILES = 256
+
+
+def load_email(index):
+    return f"realtime-load-{index}@example.com"
+
+
+def load_id(index):
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, load_email(index)))
+
+
+def rss_bytes(pid="self"):
+    """Resident set size from /proc, or None where there is no /proc"""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def raise_file_limit(needed):
+    """Raise the soft open-file limit towards `needed`; returns the limit in effect"""
+    if resource is None:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+    if target > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        soft = target
+    return soft
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_stand_in():
+    """Run local_supabase.py in a subprocess; returns (process, url) once it answers"""
+    port = free_port()
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_supabase.py")
+    process = subprocess.Popen([sys.executable, script, "--port", str(port)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{url}/auth/v1/health", timeout=1).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        if process.poll() is not None:
+            break
+        time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("local_supabase.py did not start")
+
+
+def mint_token(secret, user_id, email, ttl=3600):
+    """An access token like GoTrue's, signed locally with the project's JWT secret"""
+    from local_supabase import encode_jwt
+    issued = int(time.time())
+    return encode_jwt({
+        "aud": "authenticated", "exp": issued + ttl, "iat": issued, "sub": user_id,
+        "email": email, "role": "authenticated", "aal": "aal1", "session_id": str(uuid.uuid4()),
+    }, secret)
+
+
+class Admin:
+    """Service-role calls used to seed and clean up the load accounts"""
+
+    def __init__(self, client, service_key, concurrency=32):
+        self.client = client
+        self.service_key = service_key
+        self.gate = asyncio.Semaphore(concurrency)
+
+    async def call(self, method, path, **kwargs):
+        async with self.gate:
+            response = await self.client.request(method, path, self.service_key, **kwargs)
+        if response.status_code not in (200, 201, 204, 206, 422):
+            raise RuntimeError(f"{method} {path} returned {response.status_code}: {response.text[:200]}")
+        return response
+
+    async def ensure_users(self, count):
+        await asyncio.gather(*(self.call("POST", "/auth/v1/admin/users", json={
+            "id": load_id(i), "email": load_email(i), "password": LOAD_PASSWORD, "email_confirm": True})
+            for i in range(count)))
+
+    async def tokens(self, count, jwt_secret):
+        if jwt_secret:
+            return [mint_token(jwt_secret, load_id(i), load_email(i)) for i in range(count)]
+
+        async def sign_in(index):
+            async with self.gate:
+                response = await self.client.sign_in(load_email(index), LOAD_PASSWORD)
+            if response.status_code != 200:
+                raise RuntimeError(f"sign-in for {load_email(index)} returned {response.status_code}")
+            return response.json()["access_token"]
+        return await asyncio.gather(*(sign_in(i) for i in range(count)))
+
+    async def cleanup(self, user_ids):
+        for offset in range(0, len(user_ids), 100):
+            ids = f"in.({','.join(user_ids[offset:offset + 100])})"
+            await self.call("DELETE", "/rest/v1/habits", params={"user_id": ids})
+            await self.call("DELETE", "/rest/v1/activity_feed", params={"user_id": ids})
+
+    async def realtime_stats(self):
+        """Server-side counters; only the stand-in has them"""
+        try:
+            response = await self.client.request("GET", "/realtime/v1/api/stats", self.service_key)
+        except httpx.HTTPError:
+            return None
+        return response.json() if response.status_code == 200 else None
+
+
+class DeliveryTracker:
+    """Send time and expected/received delivery counts per written row id"""
+
+    def __init__(self):
+        self.rows = {}
+        self.latencies = []
+        self.unknown = 0
+        self.disconnects = 0
+
+    def expect(self, row_id, expected):
+        self.rows[row_id] = [time.perf_counter(), expected, 0]
+
+    def forget(self, row_id):
+        self.rows.pop(row_id, None)
+
+    def delivered(self, row_id, received_at):
+        entry = self.rows.get(row_id)
+        if entry is None:
+            self.unknown += 1
+            return
+        entry[2] += 1
+        self.latencies.append(received_at - entry[0])
+
+    def outstanding(self):
+        return sum(expected - received for _, expected, received in self.rows.values() if received < expected)
+
+    def totals(self):
+        """(expected, received, dropped, duplicates) over every row written"""
+        expected = sum(e for _, e, _ in self.rows.values())
+        received = sum(r for _, _, r in self.rows.values())
+        duplicates = sum(r - e for _, e, r in self.rows.values() if r > e)
+        return expected, received, self.outstanding(), duplicates
+
+
+class Subscriber:
+    """One websocket connection for one user, joined to the app's channels for that user"""
+
+    def __init__(self, index, token, feed, tracker):
+        self.index = index
+        self.user_id = load_id(index)
+        self.token = token
+        self.feed = feed
+        self.tracker = tracker
+        self.ws = None
+        self.reader = None
+        self.pending = {}
+        self.refs = itertools.count(1)
+        self.closing = False
+
+    def channels(self):
+        uid = self.user_id
+        yield f"habits-{uid}", [{"event": "*", "schema": "public", "table": "habits",
+                                 "filter": f"user_id=eq.{uid}"}]
+        yield f"activity:{uid}", [{"event": "*", "schema": "public", "table": "activity_feed",
+                                   "filter": f"user_id=eq.{uid}"}]
+        if self.feed:
+            yield "activity-feed", [{"event": "INSERT", "schema": "public", "table": "activity_feed"}]
+
+    async def subscribe(self, url):
+        """Connect and join every channel; returns the error text, or None"""
+        self.ws = await connect(url, compression=None, ping_interval=None, open_timeout=JOIN_TIMEOUT,
+                                close_timeout=1, max_size=1 << 20)
+        self.reader = asyncio.create_task(self.read())
+        loop = asyncio.get_running_loop()
+        replies = []
+        for name, bindings in self.channels():
+            ref = str(next(self.refs))
+            self.pending[ref] = loop.create_future()
+            replies.append(self.pending[ref])
+            await self.ws.send(json.dumps({
+                "topic": f"realtime:{name}", "event": "phx_join", "ref": ref, "join_ref": ref,
+                "payload": {"config": {"broadcast": {"ack": False, "self": False}, "presence": {"key": ""},
+                                       "postgres_changes": bindings, "private": False},
+                            "access_token": self.token}}))
+        for reply in await asyncio.wait_for(asyncio.gather(*replies), JOIN_TIMEOUT):
+            if reply.get("status") != "ok":
+                return str(reply.get("response"))
+        return None
+
+    async def heartbeat(self):
+        try:
+            await self.ws.send(json.dumps({"topic": "phoenix", "event": "heartbeat", "payload": {},
+                                           "ref": str(next(self.refs))}))
+        except websockets.ConnectionClosed:
+            pass
+
+    async def read(self):
+        try:
+            async for text in self.ws:
+                received_at = time.perf_counter()
+                message = json.loads(text)
+                event = message.get("event")
+                if event == "postgres_changes":
+                    data = message["payload"].get("data") or {}
+                    record = data.get("record") or data.get("new") or data.get("old_record") or {}
+                    self.tracker.delivered(record.get("id"), received_at)
+                elif event == "phx_reply":
+                    reply = self.pending.pop(message.get("ref"), None)
+                    if reply is not None and not reply.done():
+                        reply.set_result(message.get("payload") or {})
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            if not self.closing:
+                self.tracker.disconnects += 1
+            for reply in self.pending.values():
+                if not reply.done():
+                    reply.set_result({"status": "error", "response": "connection closed"})
+
+    async def close(self):
+        self.closing = True
+        if self.ws is not None:
+            await self.ws.close()
+        if self.reader is not None:
+            await self.reader
+
+
+async def subscribe_all(subscribers, url, concurrency):
+    gate = asyncio.Semaphore(concurrency)
+    times, failures = [], []
+
+    async def one(subscriber):
+        async with gate:
+            started = time.perf_counter()
+            try:
+                error = await subscriber.subscribe(url)
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+                error = f"{type(e).__name__}: {e}"
+            if error is None:
+                times.append((time.perf_counter() - started) * 1000)
+            else:
+                failures.append(error)
+    started = time.perf_counter()
+    await asyncio.gather(*(one(s) for s in subscribers))
+    return sorted(times), failures, time.perf_counter() - started
+
+
+async def send_heartbeats(subscribers, interval):
+    """Phoenix heartbeats spread evenly over the interval, as each client's own timer would send them"""
+    batch = 100
+    while True:
+        for offset in range(0, len(subscribers), batch):
+            await asyncio.gather(*(s.heartbeat() for s in subscribers[offset:offset + batch]))
+            await asyncio.sleep(interval * batch / len(subscribers))
+
+
+async def watch_loop_lag(samples, interval=0.05):
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - started - interval) * 1000)
+
+
+def synthetic_write(subscriber, feed_subscribers, args, rng, sequence):
+    """(table, row, expected deliveries) for one write on behalf of `subscriber`"""
+    row_id = str(uuid.uuid4())
+    if rng.random() >= args.activity_share:
+        return "habits", {"id": row_id, "user_id": subscriber.user_id,
+                          "title": f"Realtime load habit {sequence}", "frequency": "daily"}, 1
+    public = rng.random() >= args.private_share
+    row = {"id": row_id, "user_id": subscriber.user_id, "activity_type": rng.choice(ACTIVITY_TYPES),
+           "is_public": public, "metadata": {"source": "realtime_load_test", "sequence": sequence}}
+    # activity:<uid> always; activity-feed for everyone when public, only the actor's own otherwise
+    return "activity_feed", row, 1 + (feed_subscribers if public else int(subscriber.feed))
+
+
+async def drive_writes(client, service_key, subscribers, tracker, args, rng):
+    """Open-loop inserts at args.rate; a write that cannot start on time is counted as lag"""
+    total = int(args.rate * args.duration)
+    feed_subscribers = sum(1 for s in subscribers if s.feed)
+    gate = asyncio.Semaphore(args.write_concurrency)
+    latencies, failed, late = [], [0], [0]
+
+    async def write(table, row, expected):
+        async with gate:
+            tracker.expect(row["id"], expected)
+            started = time.perf_counter()
+            try:
+                response = await client.request("POST", client.rest_path(table), service_key,
+                                                prefer="return=minimal", json=row)
+                ok = response.status_code in (200, 201, 204)
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - started) * 1000)
+            if not ok:
+                failed[0] += 1
+                tracker.forget(row["id"])
+
+    tasks = []
+    started = time.perf_counter()
+    for sequence in range(total):
+        delay = started + sequence / args.rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        elif delay < -0.1:
+            late[0] += 1
+        table, row, expected = synthetic_write(rng.choice(subscribers), feed_subscribers, args, rng, sequence)
+        tasks.append(asyncio.create_task(write(table, row, expected)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    return {
+        "writes": total,
+        "failed": failed[0],
+        "late_starts": late[0],
+        "achieved_rate": round(total / elapsed, 1) if elapsed else 0.0,
+        "insert_ms": summarize_ms(sorted(latencies)),
+    }
+
+
+def summarize_ms(values):
+    if not values:
+        return {"n": 0, "p50": None, "p95": None, "p99": None, "max": None}
+    return {"n": len(values), "p50": round(percentile(values, 50), 2), "p95": round(percentile(values, 95), 2),
+            "p99": round(percentile(values, 99), 2), "max": round(values[-1], 2)}
+
+
+async def drain(tracker, timeout):
+    deadline = time.perf_counter() + timeout
+    while tracker.outstanding() and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+
+
+async def run(url, anon_key, service_key, args, server_pid=None):
+    rng = random.Random(args.seed)
+    user_ids = [load_id(i) for i in range(args.clients)]
+    ws_url = url.replace("https://", "wss://").replace("http://", "ws://")
+    ws_url = f"{ws_url}/realtime/v1/websocket?apikey={anon_key}&vsn=1.0.0"
+    tracker = DeliveryTracker()
+    result = {"clients": args.clients}
+
+    async with AsyncSupabaseClient(url, anon_key) as client:
+        admin = Admin(client, service_key)
+        await admin.ensure_users(args.clients)
+        tokens = await admin.tokens(args.clients, args.jwt_secret)
+        feed = set(rng.sample(range(args.clients), round(args.clients * args.feed_share)))
+        subscribers = [Subscriber(i, tokens[i], i in feed, tracker) for i in range(args.clients)]
+        del tokens
+
+        gc.collect()
+        client_rss, server_rss = rss_bytes(), rss_bytes(server_pid) if server_pid else None
+        lag = []
+        background = [asyncio.create_task(watch_loop_lag(lag))]
+        try:
+            join_ms, failures, elapsed = await subscribe_all(subscribers, ws_url, args.connect_concurrency)
+            live = [s for s in subscribers if s.reader is not None and not s.reader.done()]
+            gc.collect()
+            result["subscribe"] = {
+                "connected": len(join_ms),
+                "failed": len(failures),
+                "errors": sorted(set(failures))[:5],
+                "channels": sum(len(list(s.channels())) for s in live),
+                "seconds": round(elapsed, 2),
+                "join_ms": summarize_ms(join_ms),
+            }
+            result["memory"] = {
+                "client_bytes_per_connection": per_connection(client_rss, rss_bytes(), len(live)),
+                "server_bytes_per_connection":
+                    per_connection(server_rss, rss_bytes(server_pid), len(live)) if server_pid else None,
+            }
+            if not live:
+                raise RuntimeError(f"no subscriber connected: {failures[:1]}")
+
+            lag.clear()
+            background.append(asyncio.create_task(send_heartbeats(live, HEARTBEAT_INTERVAL)))
+            result["writes"] = await drive_writes(client, service_key, live, tracker, args, rng)
+            await drain(tracker, args.drain)
+            expected, received, dropped, duplicates = tracker.totals()
+            result["delivery"] = {
+                "expected": expected,
+                "received": received,
+                "dropped": dropped,
+                "duplicates": duplicates,
+                "unknown": tracker.unknown,
+                "disconnects": tracker.disconnects,
+                "latency_ms": summarize_ms(sorted(x * 1000 for x in tracker.latencies)),
+            }
+            result["loop_lag_ms"] = summarize_ms(sorted(lag))
+            result["server"] = await admin.realtime_stats()
+        finally:
+            for task in background:
+                task.cancel()
+            await asyncio.gather(*background, return_exceptions=True)
+            await asyncio.gather(*(s.close() for s in subscribers), return_exceptions=True)
+            if not args.keep:
+                await admin.cleanup(user_ids)
+
+    latency = result["delivery"]["latency_ms"]
+    result["checks"] = {
+        "all_clients_subscribed": result["subscribe"]["failed"] == 0,
+        "no_dropped_deliveries": result["delivery"]["dropped"] == 0,
+        "no_duplicate_deliveries": result["delivery"]["duplicates"] == 0,
+        "no_failed_writes": result["writes"]["failed"] == 0,
+        "p99_latency_within_budget": latency["p99"] is not None and latency["p99"] <= args.p99_budget,
+    }
+    return result
+
+
+def per_connection(before, after, connections):
+    if before is None or after is None or not connections:
+        return None
+    return round((after - before) / connections)
+
+
+def print_result(result):
+    sub = result["subscribe"]
+    print(f"\n  Subscribe: {sub['connected']:,} of {result['clients']:,} clients, {sub['channels']:,} channels "
+          f"in {sub['seconds']} s")
+    print(f"    connect + join  p50 {sub['join_ms']['p50']} ms  p99 {sub['join_ms']['p99']} ms  "
+          f"max {sub['join_ms']['max']} ms")
+    for error in sub["errors"]:
+        print(f"    ✗ {error}")
+    memory = result["memory"]
+    print("\n  Memory per connection")
+    for side in ("client", "server"):
+        value = memory[f"{side}_bytes_per_connection"]
+        if value is not None:
+            print(f"    {side:<8} {value / 1024:8.1f} KiB")
+    writes = result["writes"]
+    print(f"\n  Writes: {writes['writes']:,} at {writes['achieved_rate']}/s "
+          f"({writes['failed']} failed, {writes['late_starts']} started >100 ms late)")
+    print(f"    insert  p50 {writes['insert_ms']['p50']} ms  p99 {writes['insert_ms']['p99']} ms")
+    delivery = result["delivery"]
+    latency = delivery["latency_ms"]
+    print(f"\n  Delivery: {delivery['received']:,} of {delivery['expected']:,} expected "
+          f"({delivery['dropped']:,} dropped, {delivery['duplicates']} duplicates, {delivery['unknown']} unknown, "
+          f"{delivery['disconnects']} sockets closed)")
+    print(f"    latency p50 {latency['p50']} ms  p95 {latency['p95']} ms  p99 {latency['p99']} ms  "
+          f"max {latency['max']} ms")
+    lag = result["loop_lag_ms"]
+    print(f"    load generator event loop lag p99 {lag['p99']} ms, max {lag['max']} ms")
+    if result["server"]:
+        server = result["server"]
+        print(f"    server: {server['delivered']:,} messages sent, {server['dropped']:,} dropped on full buffers")
+    print()
+    for name, ok in result["checks"].items():
+        print(f"  {'✓' if ok else '✗'} {name.replace('_', ' ')}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test Supabase Realtime fan-out to many subscribers")
+    parser.add_argument("--url", help="Supabase URL (default: start local_supabase.py in a subprocess)")
+    parser.add_argument("--anon-key", default=ANON_KEY)
+    parser.add_argument("--service-key", default=os.environ.get("SUPABASE_SERVICE_ROLE_KEY"))
+    parser.add_argument("--jwt-secret", default=os.environ.get("SUPABASE_JWT_SECRET"),
+                        help="mint access tokens locally instead of signing every user in")
+    parser.add_argument("--clients", type=int, default=DEFAULT_CLIENTS)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="writes per second")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds of writes")
+    parser.add_argument("--activity-share", type=float, default=DEFAULT_ACTIVITY_SHARE,
+                        help="fraction of writes that are activity_feed rows (the rest are habits)")
+    parser.add_argument("--private-share", type=float, default=DEFAULT_PRIVATE_SHARE,
+                        help="fraction of activity rows with is_public = false")
+    parser.add_argument("--feed-share", type=float, default=DEFAULT_FEED_SHARE,
+                        help="fraction of clients also subscribed to activity-feed")
+    parser.add_argument("--connect-concurrency", type=int, default=DEFAULT_CONNECT_CONCURRENCY)
+    parser.add_argument("--write-concurrency", type=int, default=DEFAULT_WRITE_CONCURRENCY)
+    parser.add_argument("--drain", type=float, default=DEFAULT_DRAIN,
+                        help="seconds to wait for outstanding deliveries after the last write")
+    parser.add_argument("--p99-budget", type=float, default=DEFAULT_P99_BUDGET_MS, help="ms")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="keep the rows written")
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    if websockets is None:
+        parser.error("the websockets package is required: pip install websockets")
+    if args.clients < 1 or args.rate <= 0:
+        parser.error("--clients and --rate must be positive")
+    limit = raise_file_limit(args.clients + SPARE_FILES)
+    if limit is not None and limit < args.clients + SPARE_FILES:
+        parser.error(f"open-file limit is {limit}; raise it (ulimit -n) or lower --clients")
+
+    process = None
+    url, service_key = args.url, args.service_key
+    if url is None:
+        from local_supabase import JWT_SECRET, SERVICE_ROLE_KEY
+        process, url = start_stand_in()
+        service_key, args.jwt_secret = SERVICE_ROLE_KEY, args.jwt_secret or JWT_SECRET
+    elif not service_key:
+        parser.error("--url needs --service-key or SUPABASE_SERVICE_ROLE_KEY")
+
+    print("=" * 80)
+    print(f"REALTIME FAN-OUT: {args.clients:,} subscribers, {args.rate:g} writes/s for {args.duration:g} s "
+          f"against {url}")
+    print("=" * 80)
+    try:
+        result = asyncio.run(run(url, args.anon_key, service_key, args, process.pid if process else None))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    print_result(result)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+    return all(result["checks"].values())
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
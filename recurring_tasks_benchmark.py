@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for recurring_tasks_worker.py.
+
+For each task count (1000 and 5000 by default) this seeds a benchmark
+user with that many open recurring tasks (every RecurringPattern kind:
+daily with and without skipWeekends, weekly with and without daysOfWeek,
+monthly with and without dayOfMonth, yearly, custom, some with an
+endDate) due up to --backlog-days ago, runs one worker pass and reports
+tasks/s, occurrences written and requests made, next to the round trips
+RecurringTasksService.processRecurringTasks would need for the same
+catch-up (an update and an insert per occurrence, one app open per
+step).
+
+Before that, next_occurrence() is checked against the app itself:
+fixtures/recurring_occurrence_parity.json holds recurring tasks (seeded
+random patterns plus edge cases: month ends, leap days, skipWeekends,
+unsorted daysOfWeek, null and fractional intervals, endDate forms,
+JSON-encoded patterns) with the chain of due dates the TypeScript
+calculateNextOccurrence produced for them under TZ=UTC, and every chain
+must match. Regenerate the fixtures after changing
+recurringTasksService.ts:
+    TZ=UTC node fixtures/recurring_occurrence_parity.mjs > fixtures/recurring_occurrence_parity.json
+
+Each level is then checked:
+  - the materialized occurrences of every seeded task match expand()
+  - reopening every seeded task and running the worker again inserts no
+    new rows (idempotent per task and occurrence date)
+
+Without --url the benchmark starts the in-process stand-in from
+local_supabase.py. The benchmark user's tasks are deleted afterwards.
+
+Usage:
+    python3 recurring_tasks_benchmark.py
+    python3 recurring_tasks_benchmark.py --levels 1000 10000 --backlog-days 90 --concurrency 8
+    python3 recurring_tasks_benchmark.py --url http://127.0.0.1:54321 --service-key $SUPABASE_SERVICE_ROLE_KEY
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from recurring_tasks_worker import (DEFAULT_BATCH_SIZE, DEFAULT_CONCURRENCY, DEFAULT_MAX_OCCURRENCES,
+                                    RestStore, expand, get_pattern, next_occurrence, print_stats, run)
+from supabase_client import ANON_KEY, AsyncSupabaseClient
+
+DEFAULT_LEVELS = (1000, 5000)
+DEFAULT_BACKLOG_DAYS = 30
+DEFAULT_FIXTURES = "fixtures/recurring_occurrence_parity.json"
+BENCH_EMAIL = "recurring-bench@example.com"
+BENCH_PASSWORD = "bench-password-123"
+PATTERNS = (
+    {"frequency": "daily", "interval": 1},
+    {"frequency": "daily", "interval": 1, "skipWeekends": True},
+    {"frequency": "daily", "interval": 3},
+    {"frequency": "weekly", "interval": 1},
+    {"frequency": "weekly", "interval": 1, "daysOfWeek": [1, 3, 5]},
+    {"frequency": "monthly", "interval": 1},
+    {"frequency": "monthly", "interval": 1, "dayOfMonth": 31},
+    {"frequency": "yearly", "interval": 1},
+    {"frequency": "custom", "interval": 10},
+)
+
+
+class Admin:
+    """Service-role calls used to seed, inspect and clean up the benchmark user"""
+
+    def __init__(self, client, service_key):
+        self.client = client
+        self.service_key = service_key
+
+    async def call(self, method, path, **kwargs):
+        response = await self.client.request(method, path, self.service_key, **kwargs)
+        if response.status_code not in (200, 201, 204, 206, 422):
+            raise RuntimeError(f"{method} {path} returned {response.status_code}: {response.text[:200]}")
+        return response
+
+    async def ensure_user(self):
+        user_id = str(uuid.uuid5(uuid.NAMESPACE_URL, BENCH_EMAIL))
+        await self.call("POST", "/auth/v1/admin/users", json={
+            "id": user_id, "email": BENCH_EMAIL, "password": BENCH_PASSWORD, "email_confirm": True})
+        return user_id
+
+    async def tasks(self, user_id):
+        rows = []
+        while True:
+            page = (await self.call("GET", "/rest/v1/tasks", params={
+                "user_id": f"eq.{user_id}", "select": "id,due_date,is_complete,recurrence_of",
+                "order": "id.asc", "limit": 1000, "offset": len(rows)})).json()
+            rows += page
+            if len(page) < 1000:
+                return rows
+
+    async def seed(self, user_id, count, backlog_days, today, rng):
+        goal_id = str(uuid.uuid4())
+        await self.call("POST", "/rest/v1/goals", prefer="return=minimal", json={
+            "id": goal_id, "user_id": user_id, "title": "Recurring benchmark", "description": "benchmark",
+            "icon": "Target", "color": "blue", "tasks": []})
+        tasks = []
+        for i in range(count):
+            pattern = dict(rng.choice(PATTERNS))
+            if rng.random() < 0.1:
+                pattern["endDate"] = (today - timedelta(days=rng.randrange(backlog_days))).isoformat()
+            tasks.append({
+                "id": str(uuid.uuid4()), "goal_id": goal_id, "user_id": user_id, "text": f"recurring {i}",
+                "due_date": (today - timedelta(days=rng.randrange(backlog_days + 1))).isoformat(),
+                "is_complete": False, "priority": "medium",
+                # TaskModalEnhanced stores the pattern JSON-encoded; keep a share of both shapes
+                "recurring_pattern": json.dumps(pattern) if i % 2 else pattern,
+            })
+        for offset in range(0, len(tasks), 1000):
+            await self.call("POST", "/rest/v1/tasks", prefer="return=minimal", json=tasks[offset:offset + 1000])
+        return tasks
+
+    async def reopen(self, ids):
+        for offset in range(0, len(ids), 200):
+            await self.call("PATCH", "/rest/v1/tasks", prefer="return=minimal",
+                            params={"id": f"in.({','.join(ids[offset:offset + 200])})"},
+                            json={"is_complete": False, "completed_at": None})
+
+    async def cleanup(self, user_id):
+        await self.call("DELETE", "/rest/v1/tasks", params={"user_id": f"eq.{user_id}"})
+        await self.call("DELETE", "/rest/v1/goals", params={"user_id": f"eq.{user_id}"})
+
+
+def browser_round_trips(seeded, today):
+    """Requests processRecurringTasks needs to reach the same state: per app open, one
+    select, then an update and an insert per overdue task; one open per catch-up step"""
+    steps = [len(expand(datetime.fromisoformat(t["due_date"]).date(), get_pattern(t), today, 10 ** 6)[0])
+             for t in seeded]
+    opens = max(steps, default=0)
+    return opens + 2 * sum(steps)
+
+
+def occurrence_chain(task, steps):
+    """Due dates completeRecurringTask would write one after another; a None ends the chain"""
+    pattern = get_pattern(task)
+    chain = []
+    due = task["due_date"]
+    while pattern is not None and len(chain) < steps:
+        following = next_occurrence(date.fromisoformat(due), pattern)
+        due = following.isoformat() if following else None
+        chain.append(due)
+        if due is None:
+            break
+    return chain
+
+
+def check_parity(fixtures):
+    """Names of the fixture tasks whose next_occurrence() chain differs from calculateNextOccurrence"""
+    return [task["name"] for task in fixtures["tasks"]
+            if occurrence_chain(task, fixtures["steps"]) != task["expected"]]
+
+
+def check_occurrences(seeded, rows, today, limit):
+    """Seeded tasks whose materialized occurrence dates differ from expand()"""
+    made = collections.defaultdict(list)
+    for row in rows:
+        if row.get("recurrence_of"):
+            made[row["recurrence_of"]].append(str(row["due_date"])[:10])
+    wrong = 0
+    for task in seeded:
+        expected, _ = expand(datetime.fromisoformat(task["due_date"]).date(), get_pattern(task), today, limit)
+        if sorted(made[task["id"]]) != [d.isoformat() for d in expected]:
+            wrong += 1
+    return wrong
+
+
+async def bench_level(url, anon_key, service_key, count, args, today, rng):
+    async with AsyncSupabaseClient(url, anon_key) as client:
+        admin = Admin(client, service_key)
+        user_id = await admin.ensure_user()
+        await admin.cleanup(user_id)
+        try:
+            seeded = await admin.seed(user_id, count, args.backlog_days, today, rng)
+            store = RestStore(url, anon_key, service_key, args.concurrency)
+            try:
+                stats = await run(store, today, args.batch_size, args.concurrency, args.max_occurrences)
+            finally:
+                await store.close()
+            rows = await admin.tasks(user_id)
+            wrong = check_occurrences(seeded, rows, today, args.max_occurrences)
+
+            await admin.reopen([t["id"] for t in seeded])
+            store = RestStore(url, anon_key, service_key, args.concurrency)
+            try:
+                await run(store, today, args.batch_size, args.concurrency, args.max_occurrences)
+            finally:
+                await store.close()
+            duplicates = len(await admin.tasks(user_id)) - len(rows)
+        finally:
+            await admin.cleanup(user_id)
+    return {
+        "tasks": count,
+        "worker": stats,
+        "browser_round_trips": browser_round_trips(seeded, today),
+        "wrong_occurrences": wrong,
+        "rows_added_on_rerun": duplicates,
+    }
+
+
+def print_level(result):
+    print(f"\n  {result['tasks']:,} recurring tasks")
+    print_stats(result["worker"])
+    print(f"  Browser equivalent: {result['browser_round_trips']:,} round trips")
+    ok = result["wrong_occurrences"] == 0
+    print(f"  {'✓' if ok else '✗'} occurrences match expand() ({result['wrong_occurrences']} tasks differ)")
+    ok = result["rows_added_on_rerun"] == 0
+    print(f"  {'✓' if ok else '✗'} rerun after reopening added {result['rows_added_on_rerun']} rows")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the recurring task materializer")
+    parser.add_argument("--url", help="Supabase URL (default: start local_supabase in-process)")
+    parser.add_argument("--anon-key", default=ANON_KEY)
+    parser.add_argument("--service-key", default=os.environ.get("SUPABASE_SERVICE_ROLE_KEY"))
+    parser.add_argument("--levels", type=int, nargs="+", default=list(DEFAULT_LEVELS))
+    parser.add_argument("--backlog-days", type=int, default=DEFAULT_BACKLOG_DAYS)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--max-occurrences", type=int, default=DEFAULT_MAX_OCCURRENCES)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES,
+                        help="calculateNextOccurrence outputs to check against")
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    server = None
+    url, service_key = args.url, args.service_key
+    if url is None:
+        from local_supabase import SERVICE_ROLE_KEY, LocalSupabase
+        server = LocalSupabase().start()
+        url, service_key = server.url, SERVICE_ROLE_KEY
+    elif not service_key:
+        parser.error("--url needs --service-key or SUPABASE_SERVICE_ROLE_KEY")
+
+    with open(args.fixtures) as f:
+        fixtures = json.load(f)
+
+    today = datetime.now(timezone.utc).date()
+    rng = random.Random(args.seed)
+    print("=" * 80)
+    print(f"RECURRING TASK MATERIALIZER against {url} (backlog {args.backlog_days} days)")
+    print("=" * 80)
+    failures = check_parity(fixtures)
+    mark = "✓" if not failures else "✗"
+    print(f"\n  {mark} parity with calculateNextOccurrence: {len(fixtures['tasks']) - len(failures)}"
+          f"/{len(fixtures['tasks'])} tasks" + (f" (failed: {', '.join(failures[:10])})" if failures else ""))
+    results = []
+    try:
+        for count in args.levels:
+            started = time.perf_counter()
+            result = asyncio.run(bench_level(url, args.anon_key, service_key, count, args, today, rng))
+            result["wall_s"] = round(time.perf_counter() - started, 3)
+            results.append(result)
+            print_level(result)
+    finally:
+        if server is not None:
+            server.stop()
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"levels": results, "parity_failures": failures}, f, indent=2)
+    return not failures and all(r["wrong_occurrences"] == 0 and r["rows_added_on_rerun"] == 0 for r in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Run the Goals Tracker checks as one dependency graph (see orchestrator.py).
+
+The API checks from comprehensive_auth_test.py, user_acceptance_test.py,
+final_auth_verification.py and test_supabase_auth.py, the self-contained
+verifiers (verify_habit_rollup.py, verify_calendar_parity.py, each in its
+own process) and the browser checks all run concurrently wherever they do
+not depend on each other:
+
+  - the demo login runs once; CRUD, the demo workflows and the token check
+    wait for it and reuse the cached session
+  - sign in waits for sign up
+  - the browser checks share one Chromium (browser_pool) and the NavBar
+    tab checks share one demo-logged-in context (demo_context), each on
+    its own page
+
+Without Playwright the browser checks are skipped, not failed.
+
+Usage:
+    python3 run_checks.py
+    python3 run_checks.py --jobs 4 --junit results.xml --json results.json
+    python3 run_checks.py --app-url https://mc1m4uj4xoyc.space.minimax.io --only browser_tabs
+    SUPABASE_URL=http://127.0.0.1:54321 python3 run_checks.py --skip deployment browser_auth_screen
+"""
+import argparse
+
+import comprehensive_auth_test
+import final_auth_verification
+import test_supabase_auth
+import user_acceptance_test
+from orchestrator import Fixture, Skip, Suite, add_arguments, run_cli
+from readiness import NAV_TABS, demo_login, format_metrics, goto_ready, open_tab
+from supabase_client import SUPABASE_URL
+
+suite = Suite("goals_tracker").include(comprehensive_auth_test.suite)
+
+
+# ---- API checks ----
+
+@suite.check()
+def auth_health():
+    return test_supabase_auth.test_health().status_code == 200
+
+@suite.check()
+def new_user_workflow():
+    return user_acceptance_test.test_complete_user_workflow()
+
+@suite.check(needs=("demo_user_id",))
+def demo_workflow(demo_user_id):
+    return user_acceptance_test.test_demo_account_workflow()
+
+@suite.check(needs=("demo_user_id",))
+def demo_token(demo_user_id):
+    success, _, user_id = final_auth_verification.test_demo_login()
+    return success and user_id == demo_user_id
+
+@suite.check()
+def signup_autoconfirm():
+    return final_auth_verification.test_new_user_signup_and_signin()
+
+@suite.check(fixtures=("app_url",))
+def deployment(app_url):
+    return final_auth_verification.test_deployment_accessibility(app_url)
+
+
+# ---- Self-contained verifiers ----
+
+suite.script("habit_rollup", ["verify_habit_rollup.py", "--users", "4", "--rounds", "2"])
+suite.script("calendar_parity", ["verify_calendar_parity.py"])
+
+
+# ---- Browser checks ----
+
+@suite.fixture()
+async def browser_pool():
+    try:
+        from browser_pool import BrowserPool
+    except ImportError:
+        raise Skip("playwright is not installed")
+    async with BrowserPool() as pool:
+        yield pool
+
+@suite.fixture(fixtures=("browser_pool", "app_url"))
+async def demo_context(browser_pool, app_url):
+    """One context logged in as the demo user; checks open their own pages in it"""
+    context = await browser_pool.browser.new_context(viewport={"width": 1280, "height": 720})
+    try:
+        page = await context.new_page()
+        await goto_ready(page, app_url)
+        await demo_login(page)
+        await page.close()
+        yield context
+    finally:
+        await context.close()
+
+@suite.check(fixtures=("browser_pool", "app_url"))
+async def browser_auth_screen(browser_pool, app_url):
+    async with browser_pool.page(app_url) as run:
+        response, metrics = await goto_ready(run.page, app_url)
+        root_html = await run.page.locator("#root").inner_html()
+        print(f"  ✓ Status {response.status}, #root {len(root_html)} chars ({format_metrics(metrics)})")
+        for error in run.errors:
+            print(f"  ✗ {error}")
+        return response.status == 200 and len(root_html) > 100 and not run.errors
+
+@suite.check(fixtures=("browser_pool", "app_url"))
+async def browser_demo_login(browser_pool, app_url):
+    async with browser_pool.page(app_url) as run:
+        await goto_ready(run.page, app_url)
+        metrics = await demo_login(run.page)
+        print(f"  ✓ Logged in: {format_metrics(metrics)}")
+        return metrics["auth_status"] == 200
+
+@suite.check(fixtures=("demo_context", "app_url"))
+async def browser_tabs(demo_context, app_url):
+    page = await demo_context.new_page()
+    try:
+        await goto_ready(page, app_url, screen="diary")
+        for label in NAV_TABS:
+            print(f"  ✓ {label}: {await open_tab(page, label):.0f}ms")
+    finally:
+        await page.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Goals Tracker checks as a dependency graph")
+    parser.add_argument("--app-url", default=final_auth_verification.DEPLOYMENT_URL,
+                        help="deployment for the browser and accessibility checks")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    suite.add_fixture(Fixture("app_url", lambda: args.app_url, ()))
+    return run_cli(suite, args, SUPABASE_URL)
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
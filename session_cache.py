@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Expiry-aware Supabase session cache shared by the test scripts.
+
+Password grants are the slowest and most rate-limited auth call, so
+sessions are cached per (project URL, email):
+
+  - the access token's `exp` claim is decoded locally (no signature check)
+  - a session within REFRESH_MARGIN seconds of expiry is renewed with
+    grant_type=refresh_token, falling back to the password grant if the
+    refresh token was already used or revoked
+  - sessions are persisted in a small JSON file so later processes reuse
+    them; the process that renews an account first writes a lease for it
+    under a short flock, and other processes wait for the new session
+    until the lease expires, so a rotated refresh token is only ever spent
+    once, even across processes. No lock is held during the token request
+  - the async cache holds one asyncio.Lock per account, so any number of
+    tasks asking for the same account trigger a single token request, and
+    takes the flock non-blocking so waiting never ties up executor threads
+
+    sessions = get_session_cache()
+    session = sessions.session(DEMO_EMAIL, DEMO_PASSWORD)
+    client.select("goals", {"user_id": session["user"]["id"]}, session["access_token"])
+"""
+import asyncio
+import base64
+import contextlib
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+
+from supabase_client import AsyncSupabaseClient, get_client
+
+SESSION_CACHE_PATH = os.environ.get(
+    "SUPABASE_SESSION_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "goals_tracker", "sessions.json"),
+)
+REFRESH_MARGIN = 60  # seconds before `exp` at which a session is renewed
+LEASE_SECONDS = 45  # longer than a token request can take (DEFAULT_TIMEOUT)
+LEASE_POLL = 0.05  # seconds between checks while another process renews
+
+
+class SessionError(Exception):
+    """The token endpoint rejected both the refresh and the password grant"""
+
+    def __init__(self, status, body):
+        super().__init__(f"{status}: {body}")
+        self.status = status
+        self.body = body
+
+
+def jwt_claims(token):
+    """Decode a JWT payload without verifying it"""
+    payload = token.split(".")[1]
+    payload += "=" * (-len(payload) % 4)
+    return json.loads(base64.urlsafe_b64decode(payload))
+
+
+def to_session(body):
+    """Keep only what the cache needs from a /auth/v1/token response"""
+    claims = jwt_claims(body["access_token"])
+    user = body.get("user") or {}
+    return {
+        "access_token": body["access_token"],
+        "refresh_token": body.get("refresh_token"),
+        "expires_at": claims.get("exp") or body.get("expires_at"),
+        "user": {"id": user.get("id") or claims.get("sub"), "email": user.get("email")},
+    }
+
+
+def _error_body(response):
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+class FileSessionStore:
+    """JSON file of sessions keyed by "<url>|<email>", guarded by an flock on a sidecar file"""
+
+    def __init__(self, path=SESSION_CACHE_PATH):
+        self.path = path
+
+    @contextlib.contextmanager
+    def locked(self, blocking=True):
+        """Hold the flock; with blocking=False raise BlockingIOError if another process has it"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, key):
+        return self.load().get(key)
+
+    def put(self, key, session):
+        """Atomically rewrite the file with `session` (None removes the key); call under locked()"""
+        sessions = self.load()
+        if session is None:
+            sessions.pop(key, None)
+        else:
+            sessions[key] = session
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", prefix=".sessions-")
+        with os.fdopen(fd, "w") as f:
+            json.dump(sessions, f)
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, self.path)
+
+
+class _SessionCacheBase:
+    """In-memory layer, freshness rule and counters shared by the sync and async caches"""
+
+    def __init__(self, client, path=SESSION_CACHE_PATH, margin=REFRESH_MARGIN):
+        self.client = client
+        self.store = FileSessionStore(path) if path else None
+        self.margin = margin
+        self.sessions = {}
+        self.stats = {"hits": 0, "refreshes": 0, "password_grants": 0}
+
+    def key(self, email):
+        return f"{self.client.url}|{email.lower()}"
+
+    def fresh(self, session):
+        return bool(session) and session["expires_at"] - self.margin > time.time()
+
+    def cached(self, key):
+        """Fresh session from memory, then from the file store"""
+        session = self.sessions.get(key)
+        if not self.fresh(session) and self.store:
+            session = self.store.get(key)
+        if self.fresh(session):
+            self.sessions[key] = session
+            self.stats["hits"] += 1
+            return session
+        return None
+
+    def remember(self, key, session):
+        self.sessions[key] = session
+        if self.store:
+            self.store.put(key, session)
+
+    def stale(self, key):
+        """Expired session whose refresh token is still worth trying"""
+        session = self.sessions.get(key) or (self.store.get(key) if self.store else None)
+        return session if session and session.get("refresh_token") else None
+
+    def forget(self, key):
+        """Drop the session; call under the store's flock"""
+        self.sessions.pop(key, None)
+        if self.store:
+            self.store.put(key, None)
+
+    def claim(self, key):
+        """(session, claimed) under the store's flock
+
+        A fresh session is returned as is. Otherwise the caller gets the
+        renewal lease (claimed=True) unless another process holds a live
+        one, in which case it should poll again.
+        """
+        session = self.cached(key)
+        if session:
+            return session, False
+        lease = self.store.get(key + "|renewing")
+        if lease and lease["until"] > time.time():
+            return None, False
+        self.store.put(key + "|renewing", {"pid": os.getpid(), "until": time.time() + LEASE_SECONDS})
+        return None, True
+
+    def settle(self, key, session):
+        """Store the renewed session (None after a failure) and give up the lease; under the flock"""
+        if session is not None:
+            self.remember(key, session)
+        self.store.put(key + "|renewing", None)
+
+
+class SessionCache(_SessionCacheBase):
+    """Blocking session cache on top of a SupabaseClient"""
+
+    def __init__(self, client=None, path=SESSION_CACHE_PATH, margin=REFRESH_MARGIN):
+        super().__init__(client or get_client(), path, margin)
+        self._lock = threading.Lock()
+
+    def session(self, email, password):
+        """Fresh session dict (access_token, refresh_token, expires_at, user) for the account"""
+        key = self.key(email)
+        with self._lock:
+            if not self.store:
+                session = self.cached(key)
+                if not session:
+                    session = self._renew(key, email, password)
+                    self.remember(key, session)
+                return session
+            while True:
+                with self.store.locked():
+                    session, claimed = self.claim(key)
+                if session or claimed:
+                    break
+                time.sleep(LEASE_POLL)
+            if session:
+                return session
+            try:
+                session = self._renew(key, email, password)
+            finally:
+                with self.store.locked():
+                    self.settle(key, session)
+            return session
+
+    def access_token(self, email, password):
+        return self.session(email, password)["access_token"]
+
+    def seed(self, email, session):
+        """Cache a session the caller obtained itself, e.g. from a login test's own password grant"""
+        with self._lock, (self.store.locked() if self.store else contextlib.nullcontext()):
+            self.remember(self.key(email), session)
+
+    def invalidate(self, email):
+        with self._lock, (self.store.locked() if self.store else contextlib.nullcontext()):
+            self.forget(self.key(email))
+
+    def _renew(self, key, email, password):
+        stale = self.stale(key)
+        if stale:
+            response = self.client.refresh(stale["refresh_token"])
+            if response.status_code == 200:
+                self.stats["refreshes"] += 1
+                return to_session(response.json())
+        response = self.client.sign_in(email, password)
+        if response.status_code != 200:
+            raise SessionError(response.status_code, _error_body(response))
+        self.stats["password_grants"] += 1
+        return to_session(response.json())
+
+
+class AsyncSessionCache(_SessionCacheBase):
+    """asyncio session cache; concurrent requests for one account share a single token call"""
+
+    def __init__(self, client=None, path=SESSION_CACHE_PATH, margin=REFRESH_MARGIN):
+        super().__init__(client or AsyncSupabaseClient(), path, margin)
+        self._locks = {}
+
+    async def session(self, email, password):
+        key = self.key(email)
+        session = self.sessions.get(key)
+        if self.fresh(session):
+            self.stats["hits"] += 1
+            return session
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            session = self.sessions.get(key)
+            if self.fresh(session):
+                # another task renewed it while we waited
+                self.stats["hits"] += 1
+                return session
+            if not self.store:
+                session = await self._renew(key, email, password)
+                self.sessions[key] = session
+                return session
+            while True:
+                session, claimed = await self._under_flock(self.claim, key)
+                if session or claimed:
+                    break
+                await asyncio.sleep(LEASE_POLL)
+            if session:
+                return session
+            try:
+                session = await self._renew(key, email, password)
+            finally:
+                await self._under_flock(self.settle, key, session)
+            return session
+
+    async def access_token(self, email, password):
+        return (await self.session(email, password))["access_token"]
+
+    async def invalidate(self, email):
+        async with self._locks.setdefault(self.key(email), asyncio.Lock()):
+            if self.store:
+                await self._under_flock(self.forget, self.key(email))
+            else:
+                self.forget(self.key(email))
+
+    async def _under_flock(self, fn, *args):
+        """Run a short file operation under the flock, polling for it instead of blocking a thread"""
+        while True:
+            try:
+                with self.store.locked(blocking=False):
+                    return fn(*args)
+            except BlockingIOError:
+                await asyncio.sleep(LEASE_POLL)
+
+    async def _renew(self, key, email, password):
+        stale = self.stale(key)
+        if stale:
+            response = await self.client.refresh(stale["refresh_token"])
+            if response.status_code == 200:
+                self.stats["refreshes"] += 1
+                return to_session(response.json())
+        response = await self.client.sign_in(email, password)
+        if response.status_code != 200:
+            raise SessionError(response.status_code, _error_body(response))
+        self.stats["password_grants"] += 1
+        return to_session(response.json())
+
+
+_shared_cache = None
+
+
+def get_session_cache():
+    """Return the process-wide SessionCache built on get_client()"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = SessionCache()
+    return _shared_cache
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Multi-deployment browser smoke test.
+
+Runs a deployment x viewport matrix on one shared Chromium (see
+browser_pool.py): each cell loads the app, checks that #root rendered and
+that the auth screen is present, and saves a screenshot. Root length and
+readiness timings are recorded per deployment in the perf_store.py history,
+and every screenshot is compared with its baseline (visual_diff.py); a
+blank page or a visual change fails the cell. Cells without a baseline
+store theirs.
+
+Usage:
+    python3 smoke_test.py https://a.space.minimax.io https://b.space.minimax.io \
+        --viewports desktop mobile --workers 6
+    python3 smoke_test.py --update-baselines     # accept the current screenshots
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from browser_pool import DEFAULT_WORKERS, VIEWPORTS, BrowserPool
+from perf_store import add_store_arguments, metric_samples, record_samples
+from readiness import format_metrics, goto_ready
+from visual_diff import DEFAULT_MASK_SELECTORS, DEFAULT_STORE, BaselineStore, baseline_name, compare_many, mask_boxes
+from visual_diff import passed as visual_passed
+
+DEPLOYMENTS = [
+    "https://god7aypl3xkb.space.minimax.io",  # Minimal
+    "https://jecpj8btabxn.space.minimax.io",  # No StrictMode
+    "https://p1ygh23c8w9l.space.minimax.io",  # Debug logging
+]
+SCREENSHOT_DIR = "/workspace"
+
+
+def screenshot_name(url, viewport_name):
+    host = url.split("//", 1)[-1].split(".", 1)[0]
+    return os.path.join(SCREENSHOT_DIR, f"smoke_{host}_{viewport_name}.png")
+
+
+async def smoke_check(run):
+    """Load the page and report what rendered"""
+    page = run.page
+    response, metrics = await goto_ready(page, run.url, screen=None)
+
+    root_html = await page.locator("#root").inner_html()
+    body_text = await page.locator("body").inner_text()
+    screenshot = screenshot_name(run.url, run.viewport_name)
+    await page.screenshot(path=screenshot)
+    masks = await mask_boxes(page, [s for selectors in DEFAULT_MASK_SELECTORS.values() for s in selectors])
+    return {
+        "status": response.status if response else None,
+        "root_length": len(root_html),
+        "auth_screen": any(text in body_text for text in ("Sign In", "Sign Up", "Try Demo Account")),
+        "screenshot": screenshot,
+        "masks": masks,
+        "metrics": metrics,
+    }
+
+
+def passed(cell):
+    result = cell["result"]
+    return (cell["error"] is None and not cell["page_errors"]
+            and result["status"] == 200 and result["root_length"] > 100)
+
+
+async def run_smoke(deployments, viewports, workers):
+    async with BrowserPool(workers=workers) as pool:
+        return await pool.run_matrix(deployments, viewports, smoke_check)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Browser smoke test across deployments and viewports")
+    parser.add_argument("urls", nargs="*", default=DEPLOYMENTS, help="deployment URLs")
+    parser.add_argument("--viewports", nargs="+", default=["desktop"], choices=sorted(VIEWPORTS))
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="max concurrent browser contexts")
+    parser.add_argument("--baselines", default=DEFAULT_STORE, help="visual baseline directory")
+    parser.add_argument("--update-baselines", action="store_true", help="store these screenshots as the baselines")
+    parser.add_argument("--no-visual", action="store_true", help="skip the visual comparison")
+    add_store_arguments(parser)
+    args = parser.parse_args(argv)
+
+    print("=" * 80)
+    print(f"BROWSER SMOKE TEST: {len(args.urls)} deployment(s) x {len(args.viewports)} viewport(s)")
+    print("=" * 80)
+
+    started = time.perf_counter()
+    cells = asyncio.run(run_smoke(args.urls, args.viewports, args.workers))
+    elapsed = time.perf_counter() - started
+
+    for cell in cells:
+        mark = "✓" if passed(cell) else "✗"
+        print(f"\n{mark} {cell['url']} [{cell['viewport']}] ({cell['seconds']:.1f}s)")
+        if cell["error"]:
+            print(f"    Error: {cell['error']}")
+            continue
+        result = cell["result"]
+        print(f"    Status: {result['status']}  Root: {result['root_length']} chars  "
+              f"Auth screen: {'yes' if result['auth_screen'] else 'no'}")
+        print(f"    Ready: {format_metrics(result['metrics'])}")
+        print(f"    Screenshot: {result['screenshot']}")
+        for err in cell["page_errors"][:5]:
+            print(f"    {err[:100]}")
+
+    print()
+    for url in args.urls:
+        samples = [sample for cell in cells if cell["url"] == url and cell["error"] is None
+                   for sample in metric_samples(f"smoke[{cell['viewport']}]", {
+                       "root_length": cell["result"]["root_length"],
+                       "cell_seconds": cell["seconds"],
+                       **cell["result"]["metrics"]})]
+        record_samples(args, "smoke_test", url, samples)
+
+    visual_ok = True
+    shots = [cell["result"] for cell in cells if cell["error"] is None]
+    if shots and not args.no_visual:
+        print(f"\nVISUAL ({args.baselines})")
+        masks = {baseline_name(shot["screenshot"]): shot["masks"] for shot in shots}
+        for comparison in compare_many([shot["screenshot"] for shot in shots], BaselineStore(args.baselines),
+                                       mask_file=masks, update=args.update_baselines):
+            mark = "✓" if visual_passed(comparison) else "✗"
+            print(f"  {mark} {comparison.name}: {comparison.status} - {comparison.message}")
+            visual_ok &= visual_passed(comparison)
+
+    all_passed = all(passed(cell) for cell in cells) and visual_ok
+    print("\n" + "=" * 80)
+    print(f"{'ALL CHECKS PASSED' if all_passed else 'SOME CHECKS FAILED'} in {elapsed:.1f}s")
+    print("=" * 80)
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
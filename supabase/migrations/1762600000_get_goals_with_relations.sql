@@ -0,0 +1,76 @@
+-- Migration: get_goals_with_relations
+-- Created at: 1762600000
+
+-- Returns a user's goals with nested tasks, milestones and habits in one query,
+-- replacing the 1 + 3 * N PostgREST requests GoalsService.getGoals used to make.
+--
+-- Task merge rules match GoalsService.getGoals (src/lib/goalsService.ts):
+--   - JSONB tasks from goals.tasks come first, keyed "jsonb-<id>"; a repeated id
+--     keeps its first position and its last value (JavaScript Map semantics)
+--   - relational tasks follow, ordered by order_index, with the legacy
+--     dueDate (due_date or '') and isComplete (is_complete) fields added
+-- Goals are ordered by created_at DESC, milestones by order_index, habits by
+-- created_at DESC, as in the per-goal service calls. SECURITY INVOKER, so the
+-- existing RLS policies still decide which rows are visible.
+
+CREATE INDEX IF NOT EXISTS idx_tasks_goal_order ON tasks(goal_id, order_index);
+CREATE INDEX IF NOT EXISTS idx_milestones_goal_order ON milestones(goal_id, order_index);
+
+CREATE OR REPLACE FUNCTION get_goals_with_relations(p_user_id UUID DEFAULT auth.uid())
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+AS $$
+    SELECT COALESCE(
+        jsonb_agg(
+            to_jsonb(g) || jsonb_build_object(
+                'tasks', t.tasks,
+                'milestones', m.milestones,
+                'habits', h.habits
+            )
+            ORDER BY g.created_at DESC
+        ),
+        '[]'::jsonb
+    )
+    FROM goals g
+    CROSS JOIN LATERAL (
+        SELECT COALESCE(jsonb_agg(merged.task ORDER BY merged.source, merged.position), '[]'::jsonb) AS tasks
+        FROM (
+            -- JSONB tasks, de-duplicated on the same key the Map uses
+            SELECT 0 AS source,
+                   MIN(e.ordinality) AS position,
+                   (array_agg(e.task ORDER BY e.ordinality DESC))[1] AS task
+            FROM jsonb_array_elements(
+                CASE WHEN jsonb_typeof(g.tasks) = 'array' THEN g.tasks ELSE '[]'::jsonb END
+            ) WITH ORDINALITY AS e(task, ordinality)
+            GROUP BY CASE
+                WHEN jsonb_typeof(e.task) = 'object' AND e.task ? 'id' THEN COALESCE(e.task->>'id', 'null')
+                ELSE 'undefined'
+            END
+            UNION ALL
+            -- relational tasks in legacy-compatible shape
+            SELECT 1,
+                   row_number() OVER (ORDER BY rt.order_index),
+                   to_jsonb(rt) || jsonb_build_object(
+                       'dueDate', COALESCE(rt.due_date::text, ''),
+                       'isComplete', rt.is_complete
+                   )
+            FROM tasks rt
+            WHERE rt.goal_id = g.id
+        ) merged
+    ) t
+    CROSS JOIN LATERAL (
+        SELECT COALESCE(jsonb_agg(to_jsonb(ms) ORDER BY ms.order_index), '[]'::jsonb) AS milestones
+        FROM milestones ms
+        WHERE ms.goal_id = g.id
+    ) m
+    CROSS JOIN LATERAL (
+        SELECT COALESCE(jsonb_agg(to_jsonb(hb) ORDER BY hb.created_at DESC), '[]'::jsonb) AS habits
+        FROM habits hb
+        WHERE hb.goal_id = g.id
+    ) h
+    WHERE g.user_id = p_user_id;
+$$;
+
+GRANT EXECUTE ON FUNCTION get_goals_with_relations(UUID) TO authenticated;
@@ -0,0 +1,195 @@
+-- Migration: habit_daily_rollup
+-- Created at: 1762700000
+
+-- Per-user daily habit rollup and a single-call dashboard RPC.
+--
+-- HabitsService.getWeeklyStats used to cost 2 + H sequential round trips (the
+-- habit list, one isHabitCompleted per habit, then a count=exact over the
+-- week), and getHabitStats counted every completion of a habit to get its
+-- completion rate. Both now read maintained counters instead:
+--   - habit_daily_rollup(user_id, date, completed, total): completions the
+--     user logged on `date`, and how many of the user's habits existed that day
+--     (created_at::date <= date, UTC). A row exists only while completed > 0.
+--   - habit_completion_totals(habit_id, user_id, total): completions per
+--     habit. Kept out of `habits` so logging a completion neither locks the
+--     habit row nor fires update_habits_updated_at.
+-- The counters are kept in step by row triggers on habit_completions
+-- (insert/delete) and on habits (insert/delete, for `total`). The app never
+-- updates completion_date in place; it deletes and re-inserts.
+
+CREATE TABLE IF NOT EXISTS habit_daily_rollup (
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    date DATE NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, date)
+);
+
+ALTER TABLE habit_daily_rollup ENABLE ROW LEVEL SECURITY;
+
+-- Read-only for users; rows are written by the SECURITY DEFINER triggers below
+CREATE POLICY "Users can view their own habit rollup"
+    ON habit_daily_rollup FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE TABLE IF NOT EXISTS habit_completion_totals (
+    habit_id UUID PRIMARY KEY REFERENCES habits(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    total INTEGER NOT NULL DEFAULT 0
+);
+
+ALTER TABLE habit_completion_totals ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their own habit completion totals"
+    ON habit_completion_totals FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE INDEX IF NOT EXISTS idx_habits_user_created ON habits(user_id, created_at);
+
+-- Counters on habit_completions insert/delete
+CREATE OR REPLACE FUNCTION maintain_habit_daily_rollup()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO habit_daily_rollup (user_id, date, completed, total)
+        VALUES (
+            NEW.user_id,
+            NEW.completion_date,
+            1,
+            (SELECT COUNT(*) FROM habits h
+             WHERE h.user_id = NEW.user_id
+               AND (h.created_at AT TIME ZONE 'UTC')::date <= NEW.completion_date)
+        )
+        ON CONFLICT (user_id, date)
+        DO UPDATE SET completed = habit_daily_rollup.completed + 1;
+
+        INSERT INTO habit_completion_totals (habit_id, user_id, total)
+        VALUES (NEW.habit_id, NEW.user_id, 1)
+        ON CONFLICT (habit_id)
+        DO UPDATE SET total = habit_completion_totals.total + 1;
+        RETURN NEW;
+    END IF;
+
+    UPDATE habit_daily_rollup
+    SET completed = completed - 1
+    WHERE user_id = OLD.user_id AND date = OLD.completion_date;
+
+    DELETE FROM habit_daily_rollup
+    WHERE user_id = OLD.user_id AND date = OLD.completion_date AND completed <= 0;
+
+    -- no-op when the completion is going away because its habit was deleted
+    UPDATE habit_completion_totals SET total = GREATEST(total - 1, 0) WHERE habit_id = OLD.habit_id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS habit_daily_rollup_trigger ON habit_completions;
+CREATE TRIGGER habit_daily_rollup_trigger
+    AFTER INSERT OR DELETE ON habit_completions
+    FOR EACH ROW
+    EXECUTE FUNCTION maintain_habit_daily_rollup();
+
+-- `total` on habits insert/delete: every rollup day on or after the habit's creation
+CREATE OR REPLACE FUNCTION maintain_habit_daily_rollup_total()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE habit_daily_rollup
+        SET total = total + 1
+        WHERE user_id = NEW.user_id AND date >= (NEW.created_at AT TIME ZONE 'UTC')::date;
+        RETURN NEW;
+    END IF;
+
+    UPDATE habit_daily_rollup
+    SET total = GREATEST(total - 1, 0)
+    WHERE user_id = OLD.user_id AND date >= (OLD.created_at AT TIME ZONE 'UTC')::date;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS habit_daily_rollup_total_trigger ON habits;
+CREATE TRIGGER habit_daily_rollup_total_trigger
+    AFTER INSERT OR DELETE ON habits
+    FOR EACH ROW
+    EXECUTE FUNCTION maintain_habit_daily_rollup_total();
+
+-- Backfill from existing completions
+INSERT INTO habit_completion_totals (habit_id, user_id, total)
+SELECT h.id, h.user_id, COUNT(*)
+FROM habit_completions c
+JOIN habits h ON h.id = c.habit_id
+GROUP BY h.id, h.user_id
+ON CONFLICT (habit_id) DO UPDATE SET total = EXCLUDED.total;
+
+INSERT INTO habit_daily_rollup (user_id, date, completed, total)
+SELECT c.user_id,
+       c.completion_date,
+       COUNT(*),
+       (SELECT COUNT(*) FROM habits h
+        WHERE h.user_id = c.user_id
+          AND (h.created_at AT TIME ZONE 'UTC')::date <= c.completion_date)
+FROM habit_completions c
+GROUP BY c.user_id, c.completion_date
+ON CONFLICT (user_id, date) DO UPDATE
+SET completed = EXCLUDED.completed, total = EXCLUDED.total;
+
+-- Habits dashboard in one call. Field names and rules match
+-- HabitsService.getWeeklyStats and getHabitStats (src/lib/habitsService.ts):
+--   completedToday  completions dated p_today
+--   weekCompletion  completions dated p_today - 6 or later
+--   topStreak       max(current_streak), 0 without habits
+--   habits[].completionRate  min(100, total completions / days since
+--                   creation * 100), 0 on the day a habit was created
+CREATE OR REPLACE FUNCTION get_habit_dashboard(
+    p_user_id UUID DEFAULT auth.uid(),
+    p_today DATE DEFAULT CURRENT_DATE
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+AS $$
+    SELECT jsonb_build_object(
+        'totalHabits', COALESCE(hs.total_habits, 0),
+        'completedToday', COALESCE(today.completed, 0),
+        'weekCompletion', COALESCE(week.completed, 0),
+        'topStreak', COALESCE(hs.top_streak, 0),
+        'habits', COALESCE(hs.habits, '[]'::jsonb)
+    )
+    FROM (
+        SELECT COUNT(*) AS total_habits,
+               MAX(h.current_streak) AS top_streak,
+               jsonb_agg(
+                   jsonb_build_object(
+                       'habitId', h.id,
+                       'totalCompletions', COALESCE(t.total, 0),
+                       'currentStreak', h.current_streak,
+                       'bestStreak', h.best_streak,
+                       'completedToday', EXISTS (
+                           SELECT 1 FROM habit_completions hc
+                           WHERE hc.habit_id = h.id AND hc.completion_date = p_today
+                       ),
+                       'completionRate', CASE
+                           WHEN d.days > 0 THEN LEAST(100, COALESCE(t.total, 0)::numeric / d.days * 100)
+                           ELSE 0
+                       END
+                   )
+                   ORDER BY h.created_at DESC
+               ) AS habits
+        FROM habits h
+        LEFT JOIN habit_completion_totals t ON t.habit_id = h.id
+        CROSS JOIN LATERAL (
+            SELECT FLOOR(EXTRACT(EPOCH FROM (NOW() - h.created_at)) / 86400) AS days
+        ) d
+        WHERE h.user_id = p_user_id
+    ) hs
+    LEFT JOIN habit_daily_rollup today
+        ON today.user_id = p_user_id AND today.date = p_today
+    LEFT JOIN LATERAL (
+        SELECT SUM(r.completed) AS completed
+        FROM habit_daily_rollup r
+        WHERE r.user_id = p_user_id AND r.date >= p_today - 6
+    ) week ON TRUE;
+$$;
+
+GRANT EXECUTE ON FUNCTION get_habit_dashboard(UUID, DATE) TO authenticated;
@@ -0,0 +1,190 @@
+-- Migration: habit_streak_engine
+-- Created at: 1762800000
+
+-- Order-independent habit streaks.
+--
+-- update_habit_streak() only compared each new completion with
+-- last_completed_date, so streaks were right only when completions arrived
+-- in date order: a back-dated insert reset current_streak to 1 and moved
+-- last_completed_date backwards, and deletes (HabitsService.uncompleteHabit)
+-- were never accounted for. It also read and locked the habit row on every
+-- insert, daily or not.
+--
+-- Streaks are now defined over the completions themselves (gaps and
+-- islands: consecutive dates minus their row number are constant within a
+-- run), for daily habits only, as before:
+--   last_completed_date  latest completion_date, NULL without completions
+--   current_streak       length of the run ending at last_completed_date
+--   best_streak          longest run
+--
+-- Maintenance:
+--   - row trigger (habit_completion_trigger): appending the habit's newest
+--     date extends or restarts the current run with one guarded UPDATE; no
+--     row is touched otherwise
+--   - statement triggers: after an insert, habits that received an older
+--     date than one they already had are recomputed once, set-based; after a
+--     delete, every affected habit is recomputed
+--   - recompute_habit_streaks(ids) is the set-based recompute, also usable
+--     directly for imports and repairs (NULL = all habits); it only writes
+--     rows whose values change
+-- The row trigger keeps its name, so check_habit_achievements() still runs
+-- after it and sees the updated current_streak of an append. Row triggers
+-- fire before statement triggers, though, so for out-of-order inserts it
+-- sees the stale streak; the insert statement trigger therefore awards the
+-- streak achievements of the habits it recomputed
+-- (award_streak_achievements). Deletes only shorten streaks and award
+-- nothing. Per-habit reads use the UNIQUE (habit_id, completion_date) index.
+
+CREATE OR REPLACE FUNCTION recompute_habit_streaks(p_habit_ids UUID[] DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    WITH runs AS (
+        SELECT habit_id,
+               completion_date,
+               completion_date - (ROW_NUMBER() OVER (PARTITION BY habit_id ORDER BY completion_date))::int AS island
+        FROM habit_completions
+        WHERE p_habit_ids IS NULL OR habit_id = ANY(p_habit_ids)
+    ),
+    islands AS (
+        SELECT habit_id, COUNT(*)::int AS length, MAX(completion_date) AS end_date
+        FROM runs
+        GROUP BY habit_id, island
+    ),
+    streaks AS (
+        SELECT habit_id,
+               (ARRAY_AGG(length ORDER BY end_date DESC))[1] AS current_streak,
+               MAX(length) AS best_streak,
+               MAX(end_date) AS last_completed_date
+        FROM islands
+        GROUP BY habit_id
+    ),
+    target AS (
+        SELECT h.id,
+               COALESCE(s.current_streak, 0) AS current_streak,
+               COALESCE(s.best_streak, 0) AS best_streak,
+               s.last_completed_date
+        FROM habits h
+        LEFT JOIN streaks s ON s.habit_id = h.id
+        WHERE h.frequency = 'daily'
+          AND (p_habit_ids IS NULL OR h.id = ANY(p_habit_ids))
+    )
+    UPDATE habits h
+    SET current_streak = t.current_streak,
+        best_streak = t.best_streak,
+        last_completed_date = t.last_completed_date
+    FROM target t
+    WHERE h.id = t.id
+      AND (h.current_streak, h.best_streak, h.last_completed_date)
+          IS DISTINCT FROM (t.current_streak, t.best_streak, t.last_completed_date);
+
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Streak achievements for recomputed habits. A recompute can merge runs
+-- and pass a threshold without landing on it, so every threshold reached
+-- is awarded, once per habit (habit_achievements has no unique key for
+-- ON CONFLICT to use).
+CREATE OR REPLACE FUNCTION award_streak_achievements(p_habit_ids UUID[])
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO habit_achievements (habit_id, user_id, achievement_type, title, description, icon, badge_color)
+    SELECT h.id, h.user_id, a.achievement_type, a.title, a.description, a.icon, a.badge_color
+    FROM habits h
+    JOIN (VALUES
+        (7, 'streak_7', '7-Day Streak', 'Completed habit for 7 days in a row', 'flame', 'bronze'),
+        (30, 'streak_30', '30-Day Streak', 'Completed habit for 30 days in a row', 'flame', 'silver'),
+        (100, 'streak_100', '100-Day Streak', 'Completed habit for 100 days in a row', 'flame', 'gold'),
+        (365, 'streak_365', '365-Day Streak', 'Completed habit for a full year', 'trophy', 'platinum')
+    ) AS a(days, achievement_type, title, description, icon, badge_color)
+      ON h.current_streak >= a.days
+    WHERE h.id = ANY(p_habit_ids)
+      AND NOT EXISTS (
+        SELECT 1 FROM habit_achievements e
+        WHERE e.habit_id = h.id AND e.achievement_type = a.achievement_type
+      );
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Append fast path (row level)
+CREATE OR REPLACE FUNCTION update_habit_streak()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE habits
+    SET current_streak = CASE
+            WHEN last_completed_date = NEW.completion_date - 1 THEN COALESCE(current_streak, 0) + 1
+            ELSE 1
+        END,
+        best_streak = GREATEST(COALESCE(best_streak, 0), CASE
+            WHEN last_completed_date = NEW.completion_date - 1 THEN COALESCE(current_streak, 0) + 1
+            ELSE 1
+        END),
+        last_completed_date = NEW.completion_date
+    WHERE id = NEW.habit_id
+      AND frequency = 'daily'
+      AND (last_completed_date IS NULL OR last_completed_date < NEW.completion_date);
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Out-of-order inserts (statement level, once per INSERT)
+CREATE OR REPLACE FUNCTION recompute_streaks_after_insert()
+RETURNS TRIGGER AS $$
+DECLARE
+    stale UUID[];
+BEGIN
+    -- a habit that already has a later date than one of its new rows was not
+    -- (or not only) appended to, so the row trigger could not handle it
+    SELECT ARRAY_AGG(DISTINCT i.habit_id) INTO stale
+    FROM inserted i
+    WHERE EXISTS (
+        SELECT 1 FROM habit_completions c
+        WHERE c.habit_id = i.habit_id AND c.completion_date > i.completion_date
+    );
+
+    IF stale IS NOT NULL THEN
+        PERFORM recompute_habit_streaks(stale);
+        -- check_habit_achievements() ran per row, before this recompute
+        PERFORM award_streak_achievements(stale);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Deletes (statement level); habits removed by a cascade are skipped by the join
+CREATE OR REPLACE FUNCTION recompute_streaks_after_delete()
+RETURNS TRIGGER AS $$
+DECLARE
+    affected UUID[];
+BEGIN
+    SELECT ARRAY_AGG(DISTINCT habit_id) INTO affected FROM removed;
+
+    IF affected IS NOT NULL THEN
+        PERFORM recompute_habit_streaks(affected);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS habit_streak_insert_trigger ON habit_completions;
+CREATE TRIGGER habit_streak_insert_trigger
+    AFTER INSERT ON habit_completions
+    REFERENCING NEW TABLE AS inserted
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION recompute_streaks_after_insert();
+
+DROP TRIGGER IF EXISTS habit_streak_delete_trigger ON habit_completions;
+CREATE TRIGGER habit_streak_delete_trigger
+    AFTER DELETE ON habit_completions
+    REFERENCING OLD TABLE AS removed
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION recompute_streaks_after_delete();
+
+-- Repair streaks written by the old trigger
+SELECT recompute_habit_streaks();
+
+GRANT EXECUTE ON FUNCTION recompute_habit_streaks(UUID[]) TO authenticated;
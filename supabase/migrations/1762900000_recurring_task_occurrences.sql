@@ -0,0 +1,24 @@
+-- Migration: recurring_task_occurrences
+-- Created at: 1762900000
+
+-- Server-side materialization of recurring tasks (recurring_tasks_worker.py).
+--
+-- recurring_pattern is the JSONB RecurringPattern that TaskModalEnhanced and
+-- RecurringTasksService already read and write; the column was never added
+-- by a migration. recurrence_of points an occurrence at the task it was
+-- generated from, and the unique (recurrence_of, due_date) index makes
+-- "create the occurrence of task T on day D" idempotent for both the worker
+-- and RecurringTasksService.completeRecurringTask (ON CONFLICT DO NOTHING).
+-- Ordinary tasks have recurrence_of NULL and never conflict.
+
+ALTER TABLE tasks
+    ADD COLUMN IF NOT EXISTS recurring_pattern JSONB,
+    ADD COLUMN IF NOT EXISTS recurrence_of UUID REFERENCES tasks(id) ON DELETE SET NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_recurrence_occurrence
+    ON tasks(recurrence_of, due_date);
+
+-- The worker's keyset scan: open recurring tasks in id order
+CREATE INDEX IF NOT EXISTS idx_tasks_recurring_open
+    ON tasks(id) INCLUDE (due_date)
+    WHERE is_complete = FALSE AND recurring_pattern IS NOT NULL;
@@ -0,0 +1,171 @@
+-- Migration: activity_feed_inbox
+-- Created at: 1763000000
+
+-- Fan-out-on-write home feed and keyset pagination for activity_feed.
+--
+-- ActivityService.getActivityFeed selected every following_id, then asked
+-- activity_feed for user_id IN (...) ORDER BY created_at DESC LIMIT 50. With
+-- only single-column indexes on user_id and created_at that is a merge of
+-- every followed user's rows and a sort, and the cost grows with the size of
+-- the follow list. Now:
+--   - activity_feed_inbox(owner_id, created_at, activity_id, actor_id) holds
+--     one row per public activity per reader: the actor and each follower.
+--     Rows are written by triggers on activity_feed (insert, visibility or
+--     timestamp change; ON DELETE CASCADE removes them) and on user_follows
+--     (follow copies the followee's public history, unfollow removes it).
+--   - get_activity_feed() reads one page of the caller's inbox off its
+--     primary key and joins the activities, with the same embedded user,
+--     goal, task and team_goal objects as the old select.
+--   - pages are addressed by a (created_at, id) cursor, newest first. The
+--     user and public feeds use the same cursor through PostgREST, served by
+--     (user_id, created_at DESC, id DESC) and a partial
+--     (created_at DESC, id DESC) WHERE is_public index.
+-- The old idx_activity_feed_user (a prefix of the new composite),
+-- idx_activity_feed_created and the boolean idx_activity_feed_public are
+-- replaced.
+
+CREATE INDEX IF NOT EXISTS idx_activity_feed_user_created
+    ON activity_feed(user_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_activity_feed_public_created
+    ON activity_feed(created_at DESC, id DESC)
+    WHERE is_public = true;
+
+DROP INDEX IF EXISTS idx_activity_feed_user;
+DROP INDEX IF EXISTS idx_activity_feed_created;
+DROP INDEX IF EXISTS idx_activity_feed_public;
+
+CREATE TABLE IF NOT EXISTS activity_feed_inbox (
+    owner_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    created_at TIMESTAMPTZ NOT NULL,
+    activity_id UUID NOT NULL REFERENCES activity_feed(id) ON DELETE CASCADE,
+    actor_id UUID NOT NULL,
+    -- scanned backwards for "newest first"
+    PRIMARY KEY (owner_id, created_at, activity_id)
+);
+
+-- For the ON DELETE CASCADE from activity_feed. Unfollow deletes within one
+-- owner's primary key range, so actor_id is left unindexed: every index here
+-- is paid once per follower on every activity write.
+CREATE INDEX IF NOT EXISTS idx_activity_feed_inbox_activity ON activity_feed_inbox(activity_id);
+
+ALTER TABLE activity_feed_inbox ENABLE ROW LEVEL SECURITY;
+
+-- Read-only for users; rows are written by the SECURITY DEFINER triggers below
+CREATE POLICY "Users can view their own feed inbox"
+    ON activity_feed_inbox FOR SELECT
+    USING (auth.uid() = owner_id);
+
+-- activity_feed insert/update: deliver public activity to the actor and their followers
+CREATE OR REPLACE FUNCTION fan_out_activity()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        IF NEW.is_public IS NOT DISTINCT FROM OLD.is_public
+           AND NEW.created_at IS NOT DISTINCT FROM OLD.created_at
+           AND NEW.user_id = OLD.user_id THEN
+            RETURN NEW;
+        END IF;
+        DELETE FROM activity_feed_inbox WHERE activity_id = OLD.id;
+    END IF;
+
+    IF NEW.is_public AND NEW.created_at IS NOT NULL THEN
+        INSERT INTO activity_feed_inbox (owner_id, created_at, activity_id, actor_id)
+        SELECT NEW.user_id, NEW.created_at, NEW.id, NEW.user_id
+        UNION ALL
+        SELECT f.follower_id, NEW.created_at, NEW.id, NEW.user_id
+        FROM user_follows f
+        WHERE f.following_id = NEW.user_id
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS activity_feed_fan_out_trigger ON activity_feed;
+CREATE TRIGGER activity_feed_fan_out_trigger
+    AFTER INSERT OR UPDATE ON activity_feed
+    FOR EACH ROW
+    EXECUTE FUNCTION fan_out_activity();
+
+-- user_follows insert/delete: copy or remove the followee's public activity
+CREATE OR REPLACE FUNCTION sync_activity_inbox_follow()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO activity_feed_inbox (owner_id, created_at, activity_id, actor_id)
+        SELECT NEW.follower_id, a.created_at, a.id, a.user_id
+        FROM activity_feed a
+        WHERE a.user_id = NEW.following_id
+          AND a.is_public = true
+          AND a.created_at IS NOT NULL
+        ON CONFLICT DO NOTHING;
+        RETURN NEW;
+    END IF;
+
+    DELETE FROM activity_feed_inbox
+    WHERE owner_id = OLD.follower_id AND actor_id = OLD.following_id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS activity_inbox_follow_trigger ON user_follows;
+CREATE TRIGGER activity_inbox_follow_trigger
+    AFTER INSERT OR DELETE ON user_follows
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_activity_inbox_follow();
+
+-- One page of the home feed, newest first. Pass the created_at and id of the
+-- last item of the previous page to get the next one.
+CREATE OR REPLACE FUNCTION get_activity_feed(
+    p_user_id UUID DEFAULT auth.uid(),
+    p_limit INTEGER DEFAULT 50,
+    p_before_created_at TIMESTAMPTZ DEFAULT NULL,
+    p_before_id UUID DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+AS $$
+    SELECT COALESCE(
+        jsonb_agg(
+            to_jsonb(a) || jsonb_build_object(
+                'user', to_jsonb(p),
+                'goal', to_jsonb(g),
+                'task', to_jsonb(t),
+                'team_goal', to_jsonb(tg)
+            )
+            ORDER BY page.created_at DESC, page.activity_id DESC
+        ),
+        '[]'::jsonb
+    )
+    FROM (
+        SELECT i.created_at, i.activity_id
+        FROM activity_feed_inbox i
+        WHERE i.owner_id = p_user_id
+          AND (p_before_created_at IS NULL
+               OR (i.created_at, i.activity_id) < (p_before_created_at, p_before_id))
+        ORDER BY i.created_at DESC, i.activity_id DESC
+        LIMIT LEAST(GREATEST(p_limit, 1), 200)
+    ) page
+    JOIN activity_feed a ON a.id = page.activity_id
+    LEFT JOIN user_profiles p ON p.id = a.user_id
+    LEFT JOIN goals g ON g.id = a.goal_id
+    LEFT JOIN tasks t ON t.id = a.task_id
+    LEFT JOIN team_goals tg ON tg.id = a.team_goal_id;
+$$;
+
+GRANT EXECUTE ON FUNCTION get_activity_feed(UUID, INTEGER, TIMESTAMPTZ, UUID) TO authenticated;
+
+-- Backfill: every public activity for its actor and the actor's current followers
+INSERT INTO activity_feed_inbox (owner_id, created_at, activity_id, actor_id)
+SELECT a.user_id, a.created_at, a.id, a.user_id
+FROM activity_feed a
+WHERE a.is_public = true AND a.created_at IS NOT NULL
+UNION ALL
+SELECT f.follower_id, a.created_at, a.id, a.user_id
+FROM activity_feed a
+JOIN user_follows f ON f.following_id = a.user_id
+WHERE a.is_public = true AND a.created_at IS NOT NULL
+ON CONFLICT DO NOTHING;
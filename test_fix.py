@@ -1,35 +1,39 @@
-from playwright.sync_api import sync_playwright
-import time
+import asyncio
+
+from browser_pool import BrowserPool
+from readiness import format_metrics, goto_ready
 
 url = "https://y38vikvimtz1.space.minimax.io"
 print(f"Testing: {url}")
 
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=True)
-    page = browser.new_page(viewport={'width': 1280, 'height': 720})
-    
-    errors = []
-    page.on("pageerror", lambda err: errors.append(str(err)))
-    
-    page.goto(url, wait_until="networkidle", timeout=30000)
-    time.sleep(4)
-    
-    root_html = page.locator("#root").inner_html()
-    
-    print(f"\nRoot content: {len(root_html)} chars")
-    print(f"Errors: {len(errors)}")
-    
-    if errors:
-        print("\nERRORS FOUND:")
-        for err in errors:
-            print(f"  - {err}")
-    else:
-        print("\n✓ NO ERRORS!")
-    
-    if len(root_html) > 100:
-        print("✓ CONTENT EXISTS!")
-    else:
-        print("✗ NO CONTENT")
-    
-    page.screenshot(path="/workspace/test_fixed.png")
-    browser.close()
+
+async def main():
+    async with BrowserPool() as pool:
+        async with pool.page(url) as run:
+            page = run.page
+            errors = run.errors
+            
+            _, metrics = await goto_ready(page, url, screen=None)
+            
+            root_html = await page.locator("#root").inner_html()
+            
+            print(f"\nReady: {format_metrics(metrics)}")
+            print(f"Root content: {len(root_html)} chars")
+            print(f"Errors: {len(errors)}")
+            
+            if errors:
+                print("\nERRORS FOUND:")
+                for err in errors:
+                    print(f"  - {err}")
+            else:
+                print("\n✓ NO ERRORS!")
+            
+            if len(root_html) > 100:
+                print("✓ CONTENT EXISTS!")
+            else:
+                print("✗ NO CONTENT")
+            
+            await page.screenshot(path="/workspace/test_fixed.png")
+
+
+asyncio.run(main())
@@ -1,37 +1,32 @@
 #!/usr/bin/env python3
-from playwright.sync_api import sync_playwright
-import time
+import asyncio
 
-def test_fixed_app(url):
+from browser_pool import BrowserPool
+from readiness import format_metrics, goto_ready
+
+async def test_fixed_app(pool, url):
     print(f"\n{'='*60}")
     print(f"Testing FIXED Application")
     print(f"URL: {url}")
     print('='*60)
     
-    with sync_playwright() as p:
+    async with pool.page(url) as run:
         try:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(viewport={'width': 1280, 'height': 720})
-            page = context.new_page()
-            
-            # Collect console messages
-            console_messages = []
-            page.on("console", lambda msg: console_messages.append(f"[{msg.type}] {msg.text}"))
+            page = run.page
             
-            # Collect errors
-            errors = []
-            page.on("pageerror", lambda err: errors.append(f"PAGE ERROR: {err}"))
+            # Console messages and errors are collected by the pool
+            console_messages = run.console_messages
+            errors = run.errors
             
             # Go to page
             print(f"\nLoading page...")
-            response = page.goto(url, wait_until="networkidle", timeout=30000)
+            # Returns once React has rendered into #root, or the page loaded blank
+            response, metrics = await goto_ready(page, url, screen=None)
             print(f"✓ Page loaded (status: {response.status})")
-            
-            # Wait for React to render
-            time.sleep(4)
+            print(f"✓ First render: {format_metrics(metrics)}")
             
             # Check if root has content
-            root_html = page.locator("#root").inner_html()
+            root_html = await page.locator("#root").inner_html()
             print(f"\nRoot content length: {len(root_html)} characters")
             
             if len(root_html) < 50:
@@ -41,7 +36,7 @@ def test_fixed_app(url):
                 print("✓ SUCCESS: Root div has content")
                 
                 # Check for splash screen or auth screen
-                page_text = page.locator("body").inner_text()
+                page_text = await page.locator("body").inner_text()
                 if "Goals Tracker" in page_text or "Sign In" in page_text or "Sign Up" in page_text or "Demo Account" in page_text:
                     print("✓ SUCCESS: App UI detected!")
                 else:
@@ -50,7 +45,7 @@ def test_fixed_app(url):
             
             # Take screenshot
             screenshot_path = f"/workspace/screenshot_fixed_app.png"
-            page.screenshot(path=screenshot_path)
+            await page.screenshot(path=screenshot_path)
             print(f"✓ Screenshot saved: {screenshot_path}")
             
             # Print console messages
@@ -64,20 +59,22 @@ def test_fixed_app(url):
                 print(f"\n✗ FAIL: JavaScript Errors Found ({len(errors)}) ---")
                 for err in errors:
                     print(err)
-                browser.close()
                 return False
             else:
                 print("\n✓ SUCCESS: No JavaScript errors!")
             
-            browser.close()
             return True
             
         except Exception as e:
             print(f"✗ FAIL: Exception occurred: {e}")
             return False
 
+async def main():
+    async with BrowserPool() as pool:
+        return await test_fixed_app(pool, "https://jx9a8zrqvonz.space.minimax.io")
+
 # Test the fixed deployment
-success = test_fixed_app("https://jx9a8zrqvonz.space.minimax.io")
+success = asyncio.run(main())
 
 if success:
     print("\n" + "="*60)
@@ -1,78 +1,76 @@
 #!/usr/bin/env python3
-from playwright.sync_api import sync_playwright
-import time
+import asyncio
 
-def test_page_with_browser(url, name):
-    print(f"\n{'='*60}")
-    print(f"Testing: {name}")
-    print(f"URL: {url}")
-    print('='*60)
+from browser_pool import BrowserPool
+from readiness import format_metrics, goto_ready
+
+async def test_page_with_browser(pool, url, name):
+    # Test cases run concurrently, so output is buffered and printed per case
+    lines = []
+    out = lines.append
+    out(f"\n{'='*60}")
+    out(f"Testing: {name}")
+    out(f"URL: {url}")
+    out('='*60)
     
-    with sync_playwright() as p:
+    async with pool.page(url) as run:
         try:
-            # Launch browser
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(viewport={'width': 1280, 'height': 720})
-            page = context.new_page()
-            
-            # Collect console messages
-            console_messages = []
-            page.on("console", lambda msg: console_messages.append(f"[{msg.type}] {msg.text}"))
+            page = run.page
             
-            # Collect errors
-            errors = []
-            page.on("pageerror", lambda err: errors.append(f"PAGE ERROR: {err}"))
+            # Console messages and errors are collected by the pool
+            console_messages = run.console_messages
+            errors = run.errors
             
             # Go to page
-            print(f"\nLoading page...")
-            response = page.goto(url, wait_until="networkidle", timeout=30000)
-            print(f"✓ Page loaded (status: {response.status})")
-            
-            # Wait a bit for React to render
-            time.sleep(3)
+            out(f"\nLoading page...")
+            # Returns once React has rendered into #root, or the page loaded blank
+            response, metrics = await goto_ready(page, url, screen=None)
+            out(f"✓ Page loaded (status: {response.status})")
+            out(f"✓ First render: {format_metrics(metrics)}")
             
             # Check if root has content
-            root_html = page.locator("#root").inner_html()
-            print(f"\nRoot content length: {len(root_html)} characters")
+            root_html = await page.locator("#root").inner_html()
+            out(f"\nRoot content length: {len(root_html)} characters")
             
             if len(root_html) < 50:
-                print("✗ WARNING: Root div appears empty or minimal!")
-                print(f"Root HTML: {root_html[:200]}")
+                out("✗ WARNING: Root div appears empty or minimal!")
+                out(f"Root HTML: {root_html[:200]}")
             else:
-                print("✓ Root div has content")
+                out("✓ Root div has content")
                 # Check for specific content
                 if "Goals Tracker" in root_html or "goal" in root_html.lower():
-                    print("✓ App content detected")
+                    out("✓ App content detected")
                 else:
-                    print("⚠ App content might not be loaded properly")
+                    out("⚠ App content might not be loaded properly")
             
             # Take screenshot
             screenshot_path = f"/workspace/screenshot_{name.replace(' ', '_')}.png"
-            page.screenshot(path=screenshot_path)
-            print(f"✓ Screenshot saved: {screenshot_path}")
+            await page.screenshot(path=screenshot_path)
+            out(f"✓ Screenshot saved: {screenshot_path}")
             
             # Print console messages
             if console_messages:
-                print(f"\n--- Console Messages ({len(console_messages)}) ---")
+                out(f"\n--- Console Messages ({len(console_messages)}) ---")
                 for msg in console_messages[:20]:  # First 20
-                    print(msg)
+                    out(msg)
                 if len(console_messages) > 20:
-                    print(f"... and {len(console_messages) - 20} more messages")
+                    out(f"... and {len(console_messages) - 20} more messages")
             
             # Print errors
             if errors:
-                print(f"\n--- JavaScript Errors ({len(errors)}) ---")
+                out(f"\n--- JavaScript Errors ({len(errors)}) ---")
                 for err in errors:
-                    print(err)
+                    out(err)
             else:
-                print("\n✓ No JavaScript errors detected")
+                out("\n✓ No JavaScript errors detected")
             
-            browser.close()
             return True
             
         except Exception as e:
-            print(f"✗ Failed to test page: {e}")
+            out(f"✗ Failed to test page: {e}")
             return False
+        finally:
+            print("\n".join(lines))
 
 # Test the deployments
 test_cases = [
@@ -80,8 +78,11 @@ test_cases = [
     ("https://jecpj8btabxn.space.minimax.io", "Full_App_No_StrictMode"),
 ]
 
-for url, name in test_cases:
-    test_page_with_browser(url, name)
+async def main():
+    async with BrowserPool() as pool:
+        await asyncio.gather(*(test_page_with_browser(pool, url, name) for url, name in test_cases))
+
+asyncio.run(main())
 
 print("\n" + "="*60)
 print("Testing complete. Check screenshots for visual confirmation.")
@@ -1,31 +1,20 @@
 #!/usr/bin/env python3
-import requests
-import json
+"""
+Turn on email auto-confirm and unverified email sign-ins for the production
+project.
 
-SUPABASE_PROJECT_ID = "poadoavnqqtdkqnpszaw"
-ACCESS_TOKEN = "sbp_oauth_3f94f99c5b863e9821351813fef821036637a3c4"
+Thin wrapper around `auth_config.py`: PATCHes only the keys that differ.
+Extra arguments are passed on.
 
-print("Updating auth configuration...")
-url = f"https://api.supabase.com/v1/projects/{SUPABASE_PROJECT_ID}/config/auth"
-headers = {
-    "Authorization": f"Bearer {ACCESS_TOKEN}",
-    "Content-Type": "application/json"
-}
+Usage:
+    python3 update_auth_allow_unverified.py
+"""
+import sys
 
-# Update config to allow unverified email sign-ins
-update_data = {
-    "MAILER_AUTOCONFIRM": True,  # Auto-confirm emails
-    "MAILER_ALLOW_UNVERIFIED_EMAIL_SIGN_INS": True  # Allow sign-in without confirmation
-}
+from auth_config import DEFAULT_PROJECT, main
 
-response = requests.patch(url, headers=headers, json=update_data)
-print(f"Status: {response.status_code}")
-
-if response.status_code == 200:
-    print("Successfully updated auth configuration!")
-    print("Settings applied:")
-    print("  - Email auto-confirm: Enabled")
-    print("  - Allow unverified sign-ins: Enabled")
-    print("\nUsers can now sign in immediately after signup without email verification.")
-else:
-    print(f"Error: {response.text}")
+if __name__ == "__main__":
+    success = main(["--desired", "", "--project", DEFAULT_PROJECT, "--refresh",
+                    "--set", "mailer_autoconfirm=true",
+                    "--set", "mailer_allow_unverified_email_sign_ins=true", "--apply"] + sys.argv[1:])
+    exit(0 if success else 1)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Parity check for calendar_analytics.py against the TypeScript CalendarService.
+
+fixtures/calendar_parity.json holds users (seeded random ones plus edge
+cases: exactly three tasks on a day, deadlines sorting before same-instant
+tasks, upcoming/overdue/heatmap boundaries, month-end and weekday
+recurrences, end dates, legacy dueDate-only tasks) together with what
+CalendarService returned for them under TZ=UTC at a fixed `now`. All users
+go through calendar_analytics in a single pass and every user's
+getAllEvents events and start times, upcoming, overdue, counts, conflict
+groups and heatmap must match exactly.
+
+--scale N then repeats the fixture users N times under new ids and times
+one pass over all of them, checking every copy against the original
+result.
+
+Regenerate the fixtures after changing calendarService.ts or
+recurringTasksService.ts:
+    TZ=UTC node fixtures/calendar_parity.mjs > fixtures/calendar_parity.json
+
+Usage:
+    python3 verify_calendar_parity.py
+    python3 verify_calendar_parity.py --scale 2000
+"""
+import argparse
+import json
+import time
+from datetime import timedelta
+
+import numpy as np
+
+from calendar_analytics import EPOCH, CalendarFrame, DateParser, analyze, per_user
+
+DEFAULT_FIXTURES = "fixtures/calendar_parity.json"
+
+
+def iso_ms(ms):
+    """Epoch milliseconds -> Date.prototype.toISOString()"""
+    return (EPOCH + timedelta(milliseconds=int(ms))).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def events_of(frame, code):
+    """One user's events in getAllEvents order, as the fixtures record them"""
+    return [[frame.ids[i], iso_ms(frame.start[i])] for i in np.flatnonzero(frame.user == code)]
+
+
+def run(goals, fixture):
+    parse = DateParser()
+    now_ms = parse(fixture["now"])
+    frame = CalendarFrame(goals, now_ms)
+    result = analyze(frame, now_ms, fixture["upcoming_days"],
+                     parse(fixture["heatmap_start"]), parse(fixture["heatmap_end"]))
+    return frame, result
+
+
+def compare(user, frame, code, actual):
+    """Names of the views where a user's result differs from the TypeScript output"""
+    expected = user["expected"]
+    differs = []
+    if events_of(frame, code) != expected["events"]:
+        differs.append("events")
+    for view in ("upcoming", "overdue", "counts", "conflicts", "heatmap"):
+        if actual[view] != expected[view]:
+            differs.append(view)
+    return differs
+
+
+def check_parity(fixture):
+    users = fixture["users"]
+    frame, result = run([goal for user in users for goal in user["goals"]], fixture)
+    report = per_user(frame, result)
+    codes = {user_id: code for code, user_id in enumerate(frame.users)}
+
+    failures = 0
+    for user in users:
+        if user["user_id"] not in codes:
+            # no goals at all: every TypeScript view is empty
+            empty = all(not value for value in user["expected"].values())
+            differs = [] if empty else ["events"]
+        else:
+            differs = compare(user, frame, codes[user["user_id"]], report[user["user_id"]])
+        if differs:
+            failures += 1
+            print(f"  ✗ {user['name']}: {', '.join(differs)} differ")
+    totals = {view: sum(len(user["expected"][view]) for user in users)
+              for view in ("events", "upcoming", "overdue", "conflicts")}
+    print(f"  {'✓' if not failures else '✗'} {len(users) - failures}/{len(users)} users match "
+          f"({totals['events']} events, {totals['upcoming']} upcoming, {totals['overdue']} overdue, "
+          f"{totals['conflicts']} conflict groups)")
+    return failures == 0, report
+
+
+def rename(goals, suffix):
+    """A copy of a user's goals under new user, goal, task and milestone ids"""
+    copies = []
+    for goal in goals:
+        copy = dict(goal, id=f"{goal['id']}-{suffix}", user_id=f"{goal['user_id']}-{suffix}")
+        copy["tasks"] = [dict(task, id=f"{task['id']}-{suffix}") for task in goal.get("tasks") or []]
+        copy["milestones"] = [dict(m, id=f"{m['id']}-{suffix}") for m in goal.get("milestones") or []]
+        copies.append(copy)
+    return copies
+
+
+def strip_suffix(value, suffix):
+    if isinstance(value, str):
+        return value.replace(f"-{suffix}", "")
+    if isinstance(value, list):
+        return [strip_suffix(item, suffix) for item in value]
+    if isinstance(value, dict):
+        return {key: strip_suffix(item, suffix) for key, item in value.items()}
+    return value
+
+
+def check_scale(fixture, baseline, copies):
+    users = [user for user in fixture["users"] if user["goals"]]
+    goals = [goal for n in range(copies) for user in users for goal in rename(user["goals"], f"x{n}")]
+
+    started = time.perf_counter()
+    frame, result = run(goals, fixture)
+    built = time.perf_counter()
+    report = per_user(frame, result)
+    finished = time.perf_counter()
+
+    mismatched = sum(
+        1 for n in range(copies) for user in users
+        if strip_suffix(report[f"{user['user_id']}-x{n}"], f"x{n}") != baseline[user["user_id"]]
+    )
+    print(f"  {len(frame.users):,} users, {len(frame):,} events: columns + analyze {built - started:.3f}s, "
+          f"per-user output {finished - built:.3f}s")
+    print(f"  {'✓' if not mismatched else '✗'} every copy matches the original "
+          f"({mismatched} of {copies * len(users):,} differ)")
+    return mismatched == 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check calendar_analytics.py against CalendarService output")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    parser.add_argument("--scale", type=int, default=0, help="also time a pass over N copies of the users")
+    args = parser.parse_args(argv)
+
+    with open(args.fixtures) as f:
+        fixture = json.load(f)
+
+    print("=" * 80)
+    print(f"CALENDAR PARITY against {args.fixtures} (now {fixture['now']})")
+    print("=" * 80)
+    ok, baseline = check_parity(fixture)
+    if args.scale:
+        print(f"\nScale: {args.scale} copies in one pass")
+        ok &= check_scale(fixture, baseline, args.scale)
+
+    print("\n" + ("✓ calendar analytics match CalendarService" if ok else "✗ calendar analytics differ from CalendarService"))
+    return ok
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Verification suite for the habit_daily_rollup triggers and get_habit_dashboard().
+
+1762700000_habit_daily_rollup.sql keeps per-user daily counters
+(habit_daily_rollup) and per-habit totals (habit_completion_totals) up to
+date with row triggers instead of recounting habit_completions. This
+script checks that those counters never drift:
+
+  1. seeds users with seed_data.generate_user histories; half of each
+     user's habits are inserted after their completions already exist, so
+     both the completion and the habit triggers maintain `total`
+  2. churns the data: deletes completions, logs new ones on random past
+     days, deletes habits (cascading their completions) and adds new
+     back-dated habits
+  3. after seeding and after every churn round, reads habits,
+     habit_completions and habit_daily_rollup back and compares them, and
+     the get_habit_dashboard() result, with a brute-force recomputation
+     from the raw rows (the rules of HabitsService.getWeeklyStats and
+     getHabitStats)
+
+Without --url the checks run against the in-process stand-in from
+local_supabase.py (which emulates the triggers); against a real project
+pass --url and a service role key. Seeded accounts are named
+seed-rollup-check-<seed>-<n>@example.com and their rows are deleted
+afterwards unless --keep is given.
+
+Usage:
+    python3 verify_habit_rollup.py
+    python3 verify_habit_rollup.py --users 20 --years 2 --rounds 5
+    python3 verify_habit_rollup.py --url http://127.0.0.1:54321 --service-key $SUPABASE_SERVICE_ROLE_KEY
+"""
+import argparse
+import collections
+import os
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from seed_data import Population, generate_user, stable_id
+from supabase_client import ANON_KEY, SupabaseClient
+
+PAGE_ROWS = 1000  # PostgREST max-rows on hosted projects
+RATE_TOLERANCE = 1e-6
+
+
+def utc_day(timestamp):
+    return datetime.fromisoformat(str(timestamp).replace("Z", "+00:00")).astimezone(timezone.utc).date()
+
+
+class Checker:
+    """Writes and reads through PostgREST with the service role key"""
+
+    def __init__(self, client, service_key):
+        self.client = client
+        self.service_key = service_key
+
+    def call(self, method, path, **kwargs):
+        response = self.client.request(method, path, self.service_key, **kwargs)
+        if response.status_code not in (200, 201, 204):
+            raise RuntimeError(f"{method} {path} returned {response.status_code}: {response.text[:200]}")
+        return response.json() if response.content else None
+
+    def create_user(self, user):
+        response = self.client.request(
+            "POST", "/auth/v1/admin/users", self.service_key,
+            json={"id": user["id"], "email": user["email"], "password": user["password"], "email_confirm": True},
+        )
+        if response.status_code not in (200, 201, 422):
+            raise RuntimeError(f"creating {user['email']} failed: {response.status_code} {response.text[:200]}")
+
+    def insert(self, table, rows):
+        for offset in range(0, len(rows), PAGE_ROWS):
+            self.call("POST", self.client.rest_path(table), prefer="return=minimal,resolution=ignore-duplicates",
+                      json=rows[offset:offset + PAGE_ROWS])
+
+    def delete(self, table, ids):
+        for offset in range(0, len(ids), 100):
+            batch = ",".join(ids[offset:offset + 100])
+            self.call("DELETE", self.client.rest_path(table), params={"id": f"in.({batch})"})
+
+    def rows(self, table, user_id, order):
+        result = []
+        while True:
+            page = self.call("GET", self.client.rest_path(table), params={
+                "user_id": f"eq.{user_id}", "select": "*", "order": order,
+                "limit": PAGE_ROWS, "offset": len(result),
+            })
+            result += page
+            if len(page) < PAGE_ROWS:
+                return result
+
+    def snapshot(self, user_id, today):
+        return {
+            "habits": self.rows("habits", user_id, "id.asc"),
+            "completions": self.rows("habit_completions", user_id, "id.asc"),
+            "rollup": self.rows("habit_daily_rollup", user_id, "date.asc"),
+            "totals": self.rows("habit_completion_totals", user_id, "habit_id.asc"),
+            "dashboard": self.call("POST", "/rest/v1/rpc/get_habit_dashboard",
+                                   json={"p_user_id": user_id, "p_today": today.isoformat()}),
+            "now": datetime.now(timezone.utc),
+        }
+
+
+# ---- brute force ----
+
+def expected_rollup(habits, completions):
+    """{date: (completed, total)} recomputed from the raw rows"""
+    created = [utc_day(h["created_at"]) for h in habits]
+    per_day = collections.Counter(date.fromisoformat(str(c["completion_date"])) for c in completions)
+    return {day: (count, sum(1 for c in created if c <= day)) for day, count in per_day.items()}
+
+
+def expected_dashboard(habits, completions, today, now):
+    """HabitsService.getWeeklyStats + getHabitStats computed the pre-rollup way"""
+    week_start = today - timedelta(days=6)
+    per_habit = collections.Counter(c["habit_id"] for c in completions)
+    done_today = {c["habit_id"] for c in completions if date.fromisoformat(str(c["completion_date"])) == today}
+    rows = []
+    for habit in sorted(habits, key=lambda h: h["created_at"], reverse=True):
+        count = per_habit[habit["id"]]
+        created = datetime.fromisoformat(str(habit["created_at"]).replace("Z", "+00:00"))
+        days = (now - created).total_seconds() // 86400
+        rows.append({
+            "habitId": habit["id"],
+            "totalCompletions": count,
+            "currentStreak": habit.get("current_streak"),
+            "bestStreak": habit.get("best_streak"),
+            "completedToday": habit["id"] in done_today,
+            "completionRate": min(100, count / days * 100) if days > 0 else 0,
+        })
+    return {
+        "totalHabits": len(habits),
+        "completedToday": len(done_today),
+        "weekCompletion": sum(1 for c in completions if date.fromisoformat(str(c["completion_date"])) >= week_start),
+        "topStreak": max((h.get("current_streak") or 0 for h in habits), default=0),
+        "habits": rows,
+    }
+
+
+def compare(snapshot, today):
+    """List of human-readable mismatches for one user's snapshot"""
+    problems = []
+    habits, completions = snapshot["habits"], snapshot["completions"]
+
+    stored = {date.fromisoformat(str(r["date"])): (r["completed"], r["total"]) for r in snapshot["rollup"]}
+    expected = expected_rollup(habits, completions)
+    for day in sorted(set(stored) | set(expected)):
+        if stored.get(day) != expected.get(day):
+            problems.append(f"rollup {day}: stored {stored.get(day)} expected {expected.get(day)}")
+
+    counts = collections.Counter(c["habit_id"] for c in completions)
+    totals = {r["habit_id"]: r["total"] for r in snapshot["totals"]}
+    for habit in habits:
+        if totals.get(habit["id"], 0) != counts[habit["id"]]:
+            problems.append(f"habit {habit['id']}: habit_completion_totals {totals.get(habit['id'])} "
+                            f"expected {counts[habit['id']]}")
+    orphans = set(totals) - {habit["id"] for habit in habits}
+    if orphans:
+        problems.append(f"habit_completion_totals rows for {len(orphans)} deleted habit(s)")
+
+    actual = snapshot["dashboard"]
+    wanted = expected_dashboard(habits, completions, today, snapshot["now"])
+    for field in ("totalHabits", "completedToday", "weekCompletion", "topStreak"):
+        if actual.get(field) != wanted[field]:
+            problems.append(f"dashboard {field}: {actual.get(field)} expected {wanted[field]}")
+    if [h["habitId"] for h in actual.get("habits", [])] != [h["habitId"] for h in wanted["habits"]]:
+        problems.append("dashboard habits: different habits or order")
+    else:
+        for got, want in zip(actual["habits"], wanted["habits"]):
+            for field, value in want.items():
+                ok = (abs(float(got.get(field)) - value) <= RATE_TOLERANCE if field == "completionRate"
+                      else got.get(field) == value)
+                if not ok:
+                    problems.append(f"dashboard habit {want['habitId']} {field}: {got.get(field)} expected {value}")
+    return problems
+
+
+# ---- seeding and churn ----
+
+def seed_user(checker, pop, index):
+    """Insert one generated user; the second half of the habits lands after the completions"""
+    user, rows = generate_user(pop, index)
+    checker.create_user(user)
+    checker.insert("goals", rows["goals"])
+    habits = rows["habits"]
+    early = {h["id"] for h in habits[: (len(habits) + 1) // 2]}
+    checker.insert("habits", [h for h in habits if h["id"] in early])
+    checker.insert("habit_completions", [c for c in rows["habit_completions"] if c["habit_id"] in early])
+    checker.insert("habits", [h for h in habits if h["id"] not in early])
+    checker.insert("habit_completions", [c for c in rows["habit_completions"] if c["habit_id"] not in early])
+    return user
+
+
+def churn(checker, rng, user_id, snapshot, today, round_no, intensity):
+    """Random deletes and inserts of completions and habits for one user"""
+    habits, completions = snapshot["habits"], snapshot["completions"]
+    if completions:
+        doomed = rng.sample(completions, min(len(completions), rng.randint(1, intensity)))
+        checker.delete("habit_completions", [c["id"] for c in doomed])
+
+    taken = {(c["habit_id"], str(c["completion_date"])) for c in completions}
+    fresh = []
+    for habit in habits:
+        start = utc_day(habit["created_at"])
+        for _ in range(rng.randint(0, intensity)):
+            day = start + timedelta(days=rng.randrange((today - start).days + 1))
+            if (habit["id"], day.isoformat()) in taken:
+                continue
+            taken.add((habit["id"], day.isoformat()))
+            fresh.append({"id": stable_id("rollup-check", habit["id"], day, round_no), "habit_id": habit["id"],
+                          "user_id": user_id, "completion_date": day.isoformat()})
+    checker.insert("habit_completions", fresh)
+
+    if habits and rng.random() < 0.3:
+        checker.delete("habits", [rng.choice(habits)["id"]])
+    if rng.random() < 0.5:
+        created = today - timedelta(days=rng.randrange(120))
+        habit_id = stable_id("rollup-check", user_id, "habit", round_no)
+        checker.insert("habits", [{
+            "id": habit_id, "user_id": user_id, "title": "Back-dated habit", "frequency": "daily",
+            "created_at": datetime.combine(created, datetime.min.time(), timezone.utc).isoformat(),
+        }])
+        checker.insert("habit_completions", [
+            {"id": stable_id("rollup-check", habit_id, d), "habit_id": habit_id, "user_id": user_id,
+             "completion_date": (created + timedelta(days=d)).isoformat()}
+            for d in range(0, (today - created).days + 1, 3)
+        ])
+
+
+def cleanup(checker, user_id):
+    checker.call("DELETE", checker.client.rest_path("habits"), params={"user_id": f"eq.{user_id}"})
+    checker.call("DELETE", checker.client.rest_path("habit_completions"), params={"user_id": f"eq.{user_id}"})
+    checker.call("DELETE", checker.client.rest_path("goals"), params={"user_id": f"eq.{user_id}"})
+
+
+def verify(checker, users, today, label):
+    failures = 0
+    for user in users:
+        problems = compare(checker.snapshot(user["id"], today), today)
+        failures += bool(problems)
+        for problem in problems[:5]:
+            print(f"    ✗ {user['email']}: {problem}")
+        if len(problems) > 5:
+            print(f"    ✗ {user['email']}: ... {len(problems) - 5} more")
+    mark = "✓" if not failures else "✗"
+    print(f"  {mark} {label}: {len(users) - failures}/{len(users)} users consistent")
+    return failures == 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check habit_daily_rollup against brute-force recomputation")
+    parser.add_argument("--url", help="Supabase URL (default: start local_supabase in-process)")
+    parser.add_argument("--anon-key", default=ANON_KEY)
+    parser.add_argument("--service-key", default=os.environ.get("SUPABASE_SERVICE_ROLE_KEY"))
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--habits", type=float, default=4, help="mean habits per user")
+    parser.add_argument("--years", type=float, default=1, help="history length")
+    parser.add_argument("--rounds", type=int, default=3, help="churn rounds after seeding")
+    parser.add_argument("--intensity", type=int, default=10, help="max completions deleted/added per habit per round")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help="leave the seeded rows in place")
+    args = parser.parse_args(argv)
+
+    server = None
+    url, service_key = args.url, args.service_key
+    if url is None:
+        from local_supabase import SERVICE_ROLE_KEY, LocalSupabase
+        server = LocalSupabase().start()
+        url, service_key = server.url, SERVICE_ROLE_KEY
+    elif not service_key:
+        parser.error("--url needs --service-key or SUPABASE_SERVICE_ROLE_KEY")
+
+    today = datetime.now(timezone.utc).date()
+    pop = Population(args.users, 1, 0, 0, args.habits, args.years, f"rollup-check-{args.seed}", today, 0.0)
+    rng = random.Random(args.seed)
+
+    print("=" * 80)
+    print(f"HABIT ROLLUP VERIFICATION against {url}")
+    print("=" * 80)
+    ok = True
+    users = []
+    try:
+        with SupabaseClient(url, args.anon_key) as client:
+            checker = Checker(client, service_key)
+            users = [seed_user(checker, pop, index) for index in range(args.users)]
+            ok &= verify(checker, users, today, "after seeding")
+            for round_no in range(1, args.rounds + 1):
+                for user in users:
+                    snapshot = checker.snapshot(user["id"], today)
+                    churn(checker, rng, user["id"], snapshot, today, round_no, args.intensity)
+                ok &= verify(checker, users, today, f"after churn round {round_no}")
+            if not args.keep:
+                for user in users:
+                    cleanup(checker, user["id"])
+                ok &= verify(checker, users, today, "after deleting everything")
+    finally:
+        if server is not None:
+            server.stop()
+
+    print("\n" + ("✓ rollup matches brute force" if ok else "✗ rollup drifted from brute force"))
+    return ok
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
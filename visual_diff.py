@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+Visual regression checks for the Playwright screenshots.
+
+Screenshots are compared against named baselines in a baseline store
+(visual_baselines/ by default; one <name>.json with metadata and tile
+hashes and one <name>.npz with the pixels per baseline):
+
+  1. identical files (same SHA-256) are a match without decoding anything
+  2. the screenshot is cut into tiles and every tile is hashed (a 64-bit
+     multiply-sum over the tile's bytes, vectorized with NumPy); tiles
+     whose hash equals the baseline's are skipped, so unchanged regions
+     cost one pass over the image
+  3. only changed tiles are compared pixel by pixel with a perceptual
+     colour distance (YIQ, as in pixelmatch); pixels over --threshold
+     count as different and the screenshot fails when more than
+     --max-diff of its unmasked pixels differ
+  4. masked rectangles (dynamic regions such as the date under "Daily
+     Report" on the Diary screen) are ignored; fully masked tiles are never
+     looked at
+
+Independently of any baseline, every screenshot is checked for a blank or
+near-blank page (one colour covering almost everything, no tiles with
+content), the white-screen failure from WHITE_SCREEN_RESOLUTION.md, and
+for a large drop in grey-level entropy against its baseline.
+
+PNG decoding uses Pillow when it is installed and otherwise a NumPy
+decoder (zlib plus vectorized unfiltering; rows using the Average/Paeth
+filters are resolved along anti-diagonals). Screenshots are processed in
+parallel worker processes.
+
+Usage:
+    python3 visual_diff.py production_test.png screenshot_*.png           # compare
+    python3 visual_diff.py production_test.png --update                   # (re)set baselines
+    python3 visual_diff.py shots/*.png --diff-dir visual_diffs --json visual.json
+    python3 visual_diff.py diary.png --mask 0,60,400,30 --update
+"""
+import argparse
+import base64
+import collections
+import concurrent.futures
+import fnmatch
+import hashlib
+import json
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STORE = os.environ.get("GOALS_TRACKER_VISUAL_BASELINES", os.path.join(HERE, "visual_baselines"))
+DEFAULT_TILE = 32
+DEFAULT_THRESHOLD = 0.1  # per-pixel YIQ distance, as a fraction of the largest possible
+DEFAULT_MAX_DIFF = 0.001  # fraction of unmasked pixels allowed to differ
+MAX_YIQ_DELTA = 35215.0
+
+# Blank page: one colour (4 bits per channel) covers this much, or almost no tile has any content
+BLANK_DOMINANT = 0.99
+BLANK_CONTENT_TILES = 0.03
+# Entropy drop against the baseline that fails a screenshot, in bits of grey-level entropy
+ENTROPY_DROP = 1.0
+
+# Regions to mask per screen, as Playwright selectors; see mask_boxes()
+DEFAULT_MASK_SELECTORS = {
+    "diary": ["h1:has-text('Daily Report') + p"],  # today's date
+}
+
+Quality = collections.namedtuple("Quality", "entropy dominant content_tiles blank")
+Comparison = collections.namedtuple(
+    "Comparison", "name path status diff_ratio diff_pixels changed_tiles tiles boxes quality seconds message")
+
+FAILING = {"changed", "size_changed", "blank", "low_entropy"}
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+# ---- PNG ----
+
+def _unfilter(filters, data, bpp):
+    """Undo PNG row filters; data is (rows, stride) uint8 without the filter bytes"""
+    rows, stride = data.shape
+    width = stride // bpp
+    out = np.empty_like(data)
+    previous = np.zeros(stride, np.uint8)
+
+    # None/Sub/Up rows only depend on the row above: one vector operation per row
+    slow = np.flatnonzero(filters >= 3)
+    first = int(slow[0]) if len(slow) else rows
+    for r in range(first):
+        line, kind = data[r], filters[r]
+        if kind == 1:
+            line = line.reshape(width, bpp).cumsum(axis=0, dtype=np.uint8).reshape(stride)
+        elif kind == 2:
+            line = line + previous
+        out[r] = line
+        previous = out[r]
+    if first == rows:
+        return out
+
+    # From the first Average/Paeth row on, a pixel needs its left neighbour too. Pixels on
+    # one anti-diagonal (row + column = k) are independent, so walk the diagonals; storing
+    # them diagonal-major keeps every step a contiguous slice.
+    n = rows - first
+    recon = np.zeros((n + width + 1, n + 1, bpp), np.int16)
+    recon[1:width + 1, 0] = previous.reshape(width, bpp)
+    sheared = np.zeros((n + width - 1, n, bpp), np.int16)
+    pixels = data[first:].reshape(n, width, bpp)
+    for r in range(n):
+        sheared[r:r + width, r] = pixels[r]
+    kinds = filters[first:].reshape(n, 1)
+    masks = {kind: kinds == kind for kind in (1, 2, 3, 4) if (kinds == kind).any()}
+    for k in range(n + width - 1):
+        r0, r1 = max(0, k - width + 1), min(n - 1, k) + 1
+        a = recon[k + 1, r0 + 1:r1 + 1]  # left
+        b = recon[k + 1, r0:r1]  # up
+        c = recon[k, r0:r1]  # up-left
+        predicted = np.zeros_like(a)
+        if 1 in masks:
+            predicted = np.where(masks[1][r0:r1], a, predicted)
+        if 2 in masks:
+            predicted = np.where(masks[2][r0:r1], b, predicted)
+        if 3 in masks:
+            predicted = np.where(masks[3][r0:r1], (a + b) >> 1, predicted)
+        if 4 in masks:
+            pa, pb, pc = np.abs(b - c), np.abs(a - c), np.abs(a + b - 2 * c)
+            paeth = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+            predicted = np.where(masks[4][r0:r1], paeth, predicted)
+        predicted += sheared[k, r0:r1]
+        predicted &= 255
+        recon[k + 2, r0 + 1:r1 + 1] = predicted
+    for r in range(n):
+        out[first + r] = recon[r + 2:r + 2 + width, r + 1].reshape(stride)
+    return out
+
+
+def _decode_png(data):
+    if data[:8] != _PNG_SIGNATURE:
+        raise ValueError("not a PNG file")
+    header, palette, idat, offset = None, None, [], 8
+    while offset < len(data):
+        length, kind = struct.unpack(">I4s", data[offset:offset + 8])
+        body = data[offset + 8:offset + 8 + length]
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"PLTE":
+            palette = np.frombuffer(body, np.uint8).reshape(-1, 3)
+        elif kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"IEND":
+            break
+        offset += 12 + length
+    width, height, depth, color, _, _, interlace = header
+    if depth != 8 or interlace or color not in _CHANNELS:
+        raise ValueError(f"unsupported PNG (depth {depth}, colour type {color}, interlace {interlace})")
+    bpp = _CHANNELS[color]
+    raw = np.frombuffer(zlib.decompress(b"".join(idat)), np.uint8).reshape(height, 1 + width * bpp)
+    pixels = _unfilter(raw[:, 0], raw[:, 1:], bpp).reshape(height, width, bpp)
+    if color == 3:
+        return palette[pixels[..., 0]]
+    if color in (0, 4):
+        return np.repeat(pixels[..., :1], 3, axis=2)
+    return np.ascontiguousarray(pixels[..., :3])
+
+
+def read_png(path):
+    """(height, width, 3) uint8 RGB; alpha is dropped"""
+    if Image is not None:
+        with Image.open(path) as image:
+            return np.asarray(image.convert("RGB"))
+    with open(path, "rb") as f:
+        return _decode_png(f.read())
+
+
+def write_png(path, pixels):
+    height, width, _ = pixels.shape
+    raw = np.hstack([np.zeros((height, 1), np.uint8), pixels.reshape(height, width * 3)])
+
+    def chunk(kind, body):
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    with open(path, "wb") as f:
+        f.write(_PNG_SIGNATURE + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+                + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)) + chunk(b"IEND", b""))
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# ---- Tiles ----
+
+_HASH_KEYS = {}
+
+
+def _tile_view(array, tile):
+    """(tiles_y, tiles_x, tile, tile, ...) view, edge-padded to whole tiles"""
+    height, width = array.shape[:2]
+    ty, tx = -(-height // tile), -(-width // tile)
+    if (ty * tile, tx * tile) != (height, width):
+        padding = [(0, ty * tile - height), (0, tx * tile - width)] + [(0, 0)] * (array.ndim - 2)
+        array = np.pad(array, padding, mode="edge")
+    return array.reshape(ty, tile, tx, tile, *array.shape[2:]).swapaxes(1, 2)
+
+
+def tile_hashes(pixels, tile=DEFAULT_TILE):
+    """(tiles_y, tiles_x) uint64 hashes: sum of the tile's 64-bit words times fixed odd keys
+
+    Any single-word change always changes the hash; this is for skipping
+    unchanged regions, not for adversarial input.
+    """
+    words = tile * tile * 3 // 8
+    if tile not in _HASH_KEYS:
+        _HASH_KEYS[tile] = np.random.default_rng(0x6F616C73).integers(
+            0, 2 ** 63, words, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    tiles = np.ascontiguousarray(_tile_view(pixels, tile))
+    ty, tx = tiles.shape[:2]
+    return (tiles.reshape(ty, tx, -1).view(np.uint64) * _HASH_KEYS[tile]).sum(axis=2, dtype=np.uint64)
+
+
+def mask_array(shape, rects):
+    mask = np.zeros(shape[:2], bool)
+    for x, y, w, h in rects:
+        mask[max(0, int(y)):max(0, int(y + h)), max(0, int(x)):max(0, int(x + w))] = True
+    return mask
+
+
+def quality(pixels, tile=DEFAULT_TILE):
+    """Grey-level entropy, dominant colour share, share of tiles with content, blank verdict"""
+    sample = pixels[::2, ::2].astype(np.uint16)
+    grey = (sample[..., 0] * 77 + sample[..., 1] * 150 + sample[..., 2] * 29) >> 8
+    histogram = np.bincount(grey.ravel(), minlength=256) / grey.size
+    nonzero = histogram[histogram > 0]
+    entropy = float(-(nonzero * np.log2(nonzero)).sum())
+    colours = (sample[..., 0] >> 4 << 8) | (sample[..., 1] >> 4 << 4) | (sample[..., 2] >> 4)
+    dominant = float(np.bincount(colours.ravel()).max() / colours.size)
+    tiles = _tile_view(pixels, tile)
+    spread = tiles.max(axis=(2, 3, 4)).astype(np.int16) - tiles.min(axis=(2, 3, 4))
+    content_tiles = float((spread > 16).mean())
+    blank = dominant >= BLANK_DOMINANT or content_tiles <= BLANK_CONTENT_TILES
+    return Quality(entropy, dominant, content_tiles, blank)
+
+
+def _yiq(pixels):
+    rgb = pixels.astype(np.float32)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    return (r * 0.29889531 + g * 0.58662247 + b * 0.11448223,
+            r * 0.59597799 - g * 0.27417610 - b * 0.32180189,
+            r * 0.21147017 - g * 0.52261711 + b * 0.31114694)
+
+
+def perceptual_delta(a, b):
+    """Squared YIQ distance per pixel, 0..MAX_YIQ_DELTA"""
+    (ya, ia, qa), (yb, ib, qb) = _yiq(a), _yiq(b)
+    return 0.5053 * (ya - yb) ** 2 + 0.299 * (ia - ib) ** 2 + 0.1957 * (qa - qb) ** 2
+
+
+# ---- Baselines ----
+
+class BaselineStore:
+    """<root>/<name>.json (metadata, tile hashes, masks) and <name>.npz (pixels)"""
+
+    def __init__(self, root=DEFAULT_STORE):
+        self.root = root
+
+    def _path(self, name, ext):
+        return os.path.join(self.root, f"{name}.{ext}")
+
+    def names(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(f[:-5] for f in os.listdir(self.root) if f.endswith(".json"))
+
+    def get(self, name):
+        try:
+            with open(self._path(name, "json")) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        meta["hashes"] = np.frombuffer(base64.b64decode(meta["hashes"]), np.uint64).reshape(meta["tile_grid"])
+        return meta
+
+    def pixels(self, name):
+        with np.load(self._path(name, "npz")) as data:
+            return data["pixels"]
+
+    def put(self, name, path, pixels, masks=(), tile=DEFAULT_TILE, digest=None):
+        os.makedirs(self.root, exist_ok=True)
+        hashes = tile_hashes(pixels, tile)
+        q = quality(pixels, tile)
+        np.savez_compressed(self._path(name, "npz"), pixels=pixels)
+        meta = {
+            "name": name,
+            "source": os.path.abspath(path),
+            "digest": digest or file_digest(path),
+            "shape": list(pixels.shape),
+            "tile": tile,
+            "tile_grid": list(hashes.shape),
+            "hashes": base64.b64encode(hashes.tobytes()).decode(),
+            "masks": [list(rect) for rect in masks],
+            "entropy": q.entropy,
+            "updated_at": time.time(),
+        }
+        tmp = self._path(name, "json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f, indent=1)
+        os.replace(tmp, self._path(name, "json"))
+        return meta
+
+
+def baseline_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def load_mask_file(path):
+    """{"<name glob>": [[x, y, w, h], ...]}"""
+    if not path:
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def masks_for(name, mask_file, extra=()):
+    rects = [tuple(rect) for pattern, rs in mask_file.items() if fnmatch.fnmatch(name, pattern) for rect in rs]
+    return rects + [tuple(rect) for rect in extra]
+
+
+async def mask_boxes(page, selectors):
+    """Bounding boxes (x, y, w, h) of every element matching the selectors, for masks"""
+    boxes = []
+    for selector in selectors:
+        locator = page.locator(selector)
+        for i in range(await locator.count()):
+            box = await locator.nth(i).bounding_box()
+            if box:
+                boxes.append((box["x"], box["y"], box["width"], box["height"]))
+    return boxes
+
+
+# ---- Comparison ----
+
+def _changed_boxes(tile_mask, tile):
+    ys, xs = np.nonzero(tile_mask)
+    return [(int(x) * tile, int(y) * tile, tile, tile) for y, x in zip(ys, xs)]
+
+
+def compare(path, store, name=None, masks=(), threshold=DEFAULT_THRESHOLD, max_diff=DEFAULT_MAX_DIFF,
+            update=False, diff_dir=None):
+    """Compare one screenshot with its baseline (or store it with update=True)"""
+    started = time.perf_counter()
+    name = name or baseline_name(path)
+    digest = file_digest(path)
+    base = store.get(name)
+
+    def result(status, q, diff_ratio=0.0, diff_pixels=0, changed_tiles=0, tiles=0, boxes=(), message=""):
+        return Comparison(name, path, status, diff_ratio, diff_pixels, changed_tiles, tiles, list(boxes), q,
+                          time.perf_counter() - started, message)
+
+    if base is not None and not update and base["digest"] == digest:
+        return result("identical", None, message="same file")
+
+    pixels = read_png(path)
+    tile = base["tile"] if base is not None else DEFAULT_TILE
+    q = quality(pixels, tile)
+    if q.blank:
+        return result("blank", q, message=f"{q.dominant:.1%} one colour, {q.content_tiles:.1%} tiles with content")
+    if update or base is None:
+        masks = list(masks) or (base["masks"] if base else [])
+        store.put(name, path, pixels, masks, tile, digest)
+        return result("updated" if update else "new", q, message="baseline stored")
+
+    if base["entropy"] - q.entropy > ENTROPY_DROP:
+        return result("low_entropy", q, message=f"entropy {q.entropy:.2f} bits, baseline {base['entropy']:.2f}")
+    if list(pixels.shape) != base["shape"]:
+        return result("size_changed", q, message=f"{pixels.shape[1]}x{pixels.shape[0]}, "
+                                                 f"baseline {base['shape'][1]}x{base['shape'][0]}")
+
+    mask = mask_array(pixels.shape, list(base["masks"]) + list(masks))
+    mask_tiles = _tile_view(mask, tile)
+    fully_masked = mask_tiles.all(axis=(2, 3))
+    hashes = tile_hashes(pixels, tile)
+    changed = (hashes != base["hashes"]) & ~fully_masked
+    if not changed.any():
+        return result("match", q, tiles=hashes.size, message="all unmasked tiles identical")
+
+    ys, xs = np.nonzero(changed)
+    current = _tile_view(pixels, tile)[ys, xs]
+    baseline_pixels = store.pixels(name)
+    previous = _tile_view(baseline_pixels, tile)[ys, xs]
+    different = perceptual_delta(current, previous) > MAX_YIQ_DELTA * threshold ** 2
+    different &= ~mask_tiles[ys, xs]
+    per_tile = different.sum(axis=(1, 2))
+    diff_pixels = int(per_tile.sum())
+    unmasked = pixels.shape[0] * pixels.shape[1] - int(mask.sum())
+    diff_ratio = diff_pixels / max(unmasked, 1)
+    tiles_with_diff = np.zeros_like(changed)
+    tiles_with_diff[ys, xs] = per_tile > 0
+    status = "changed" if diff_ratio > max_diff else "match"
+
+    if diff_dir and diff_pixels:
+        os.makedirs(diff_dir, exist_ok=True)
+        overlay = (pixels // 3 + 170).astype(np.uint8)  # faded screenshot
+        full = np.zeros(changed.shape + (tile, tile), bool)
+        full[ys, xs] = different
+        full = full.swapaxes(1, 2).reshape(changed.shape[0] * tile, changed.shape[1] * tile)
+        overlay[full[:pixels.shape[0], :pixels.shape[1]]] = (220, 20, 60)
+        write_png(os.path.join(diff_dir, f"{name}.diff.png"), overlay)
+
+    return result(status, q, diff_ratio, diff_pixels, int(tiles_with_diff.sum()), hashes.size,
+                  _changed_boxes(tiles_with_diff, tile),
+                  f"{int(changed.sum())} tile(s) hashed differently, {int(tiles_with_diff.sum())} perceptibly")
+
+
+def _compare_job(job):
+    path, root, name, masks, threshold, max_diff, update, diff_dir = job
+    try:
+        return compare(path, BaselineStore(root), name, masks, threshold, max_diff, update, diff_dir)
+    except (OSError, ValueError, zlib.error) as e:
+        return Comparison(name or baseline_name(path), path, "error", 0.0, 0, 0, 0, [], None, 0.0,
+                          f"{type(e).__name__}: {e}")
+
+
+def compare_many(paths, store, names=None, mask_file=None, masks=(), threshold=DEFAULT_THRESHOLD,
+                 max_diff=DEFAULT_MAX_DIFF, update=False, diff_dir=None, workers=None):
+    """compare() every screenshot, in worker processes; results in input order"""
+    mask_file = mask_file or {}
+    jobs = []
+    for i, path in enumerate(paths):
+        name = names[i] if names else baseline_name(path)
+        jobs.append((path, store.root, name, masks_for(name, mask_file, masks), threshold, max_diff,
+                     update, diff_dir))
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    if workers <= 1:
+        return [_compare_job(job) for job in jobs]
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(_compare_job, jobs))
+
+
+def passed(comparison):
+    return comparison.status not in FAILING and comparison.status != "error"
+
+
+# ---- CLI ----
+
+def parse_rect(value):
+    parts = [float(p) for p in value.split(",")]
+    if len(parts) != 4:
+        raise argparse.ArgumentTypeError("mask is x,y,width,height")
+    return tuple(parts)
+
+
+def serializable(comparison):
+    record = comparison._asdict()
+    record["quality"] = comparison.quality._asdict() if comparison.quality else None
+    return record
+
+
+def print_report(results, elapsed):
+    print("=" * 80)
+    print(f"VISUAL REGRESSION: {len(results)} screenshot(s) in {elapsed:.2f}s "
+          f"({elapsed / max(len(results), 1) * 1000:.0f} ms each)")
+    print("=" * 80)
+    for c in results:
+        mark = "✓" if passed(c) else "✗"
+        detail = f"{c.diff_ratio:.3%} differ, " if c.status in ("changed", "match") and c.diff_pixels else ""
+        print(f"  {mark} {c.name:<40} {c.status:<12} {detail}{c.message} ({c.seconds * 1000:.0f} ms)")
+        if c.status == "changed":
+            for x, y, w, h in c.boxes[:5]:
+                print(f"      changed tile at x={x} y={y} ({w}x{h})")
+            if len(c.boxes) > 5:
+                print(f"      ... and {len(c.boxes) - 5} more tile(s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare screenshots against stored baselines")
+    parser.add_argument("screenshots", nargs="+", help="PNG files")
+    parser.add_argument("--store", default=DEFAULT_STORE, help="baseline directory")
+    parser.add_argument("--name", help="baseline name for a single screenshot (default: file name)")
+    parser.add_argument("--update", action="store_true", help="store the screenshots as the new baselines")
+    parser.add_argument("--mask", type=parse_rect, action="append", default=[], metavar="X,Y,W,H",
+                        help="ignore this rectangle (repeatable; stored with --update)")
+    parser.add_argument("--mask-file", help='JSON {"<name glob>": [[x, y, w, h], ...]}')
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="per-pixel colour distance 0-1")
+    parser.add_argument("--max-diff", type=float, default=DEFAULT_MAX_DIFF, help="fraction of pixels that may differ")
+    parser.add_argument("--diff-dir", help="write <name>.diff.png highlighting differing pixels")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--json", dest="json_path", help="write the results to this file")
+    args = parser.parse_args(argv)
+    if args.name and len(args.screenshots) > 1:
+        parser.error("--name needs exactly one screenshot")
+
+    store = BaselineStore(args.store)
+    started = time.perf_counter()
+    results = compare_many(args.screenshots, store, [args.name] if args.name else None,
+                           load_mask_file(args.mask_file), args.mask, args.threshold, args.max_diff,
+                           args.update, args.diff_dir, args.workers)
+    elapsed = time.perf_counter() - started
+    print_report(results, elapsed)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump([serializable(c) for c in results], f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+    all_passed = all(passed(c) for c in results)
+    print(f"\n{'✓ No visual regressions' if all_passed else '✗ Visual regressions found'}")
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
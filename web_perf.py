@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Web performance capture for the Goals Tracker deployments.
+
+For each deployment this loads the auth screen, logs in with the demo
+account and opens every NavBar tab, and records per screen:
+
+  - Navigation Timing (TTFB, DOMContentLoaded, load) for the initial load
+  - first-paint / first-contentful-paint and LCP
+  - long tasks and Total Blocking Time (sum of the time past 50 ms)
+  - performance.memory (JS heap)
+  - per-resource transfer / encoded / decoded sizes
+
+Results are merged into a JSON file keyed by deployment URL and git SHA,
+and checked against budgets; any exceeded budget fails the run. Every
+screen's metrics are also recorded in the perf_store.py history.
+
+Usage:
+    python3 web_perf.py https://qdfizkumoiq9.space.minimax.io --budgets budgets.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from browser_pool import BrowserPool
+from perf_store import add_store_arguments, git_sha, metric_samples, record_samples
+from readiness import NAV_TABS, demo_login, goto_ready, open_tab
+
+RESULTS_PATH = "perf_results.json"
+LONG_TASK_THRESHOLD_MS = 50
+
+# Budgets apply to every screen unless overridden under "screens": {"<screen>": {...}}
+DEFAULT_BUDGETS = {
+    "fcp_ms": 2500,
+    "lcp_ms": 4000,
+    "tbt_ms": 600,
+    "js_heap_used_mb": 100,
+    "transfer_kb": 2500,
+}
+
+# Installed before page scripts so buffered LCP and long tasks are not missed
+PERF_OBSERVER_JS = """
+(() => {
+  if (window.__perf) return;
+  const perf = window.__perf = { lcp: null, longTasks: [] };
+  try {
+    new PerformanceObserver(list => {
+      const entries = list.getEntries();
+      const last = entries[entries.length - 1];
+      if (last) perf.lcp = { startTime: last.startTime, size: last.size, element: last.element ? last.element.tagName : null };
+    }).observe({ type: 'largest-contentful-paint', buffered: true });
+  } catch (e) {}
+  try {
+    new PerformanceObserver(list => {
+      for (const entry of list.getEntries()) perf.longTasks.push({ startTime: entry.startTime, duration: entry.duration });
+    }).observe({ type: 'longtask', buffered: true });
+  } catch (e) {}
+})();
+"""
+
+# Navigation Timing only fills loadEventEnd (and load_ms with it) once the `load` handlers have run
+LOAD_DONE_JS = "() => { const nav = performance.getEntriesByType('navigation')[0]; return !nav || nav.loadEventEnd > 0; }"
+
+# Collects everything that happened after `since` (ms since navigation start)
+COLLECT_JS = """
+(since) => {
+  const perf = window.__perf || { lcp: null, longTasks: [] };
+  const nav = performance.getEntriesByType('navigation')[0];
+  const paints = {};
+  for (const p of performance.getEntriesByType('paint')) paints[p.name] = p.startTime;
+  const resources = performance.getEntriesByType('resource')
+    .filter(r => r.startTime >= since)
+    .map(r => ({
+      name: r.name,
+      type: r.initiatorType,
+      transfer_size: r.transferSize,
+      encoded_size: r.encodedBodySize,
+      decoded_size: r.decodedBodySize,
+      duration_ms: r.duration,
+    }));
+  const memory = performance.memory
+    ? { used: performance.memory.usedJSHeapSize, total: performance.memory.totalJSHeapSize, limit: performance.memory.jsHeapSizeLimit }
+    : null;
+  return {
+    now: performance.now(),
+    navigation: nav ? {
+      ttfb_ms: nav.responseStart - nav.startTime,
+      dom_content_loaded_ms: nav.domContentLoadedEventEnd - nav.startTime,
+      load_ms: nav.loadEventEnd - nav.startTime,
+      transfer_size: nav.transferSize,
+    } : null,
+    paints: paints,
+    lcp: perf.lcp,
+    long_tasks: perf.longTasks.filter(t => t.startTime >= since),
+    memory: memory,
+    resources: resources,
+  };
+}
+"""
+
+
+def summarize(raw, interaction_ms=None, initial=False):
+    """Reduce a COLLECT_JS snapshot to the per-screen metrics checked against budgets"""
+    long_tasks = raw["long_tasks"]
+    metrics = {
+        "long_tasks": len(long_tasks),
+        "tbt_ms": sum(max(0.0, t["duration"] - LONG_TASK_THRESHOLD_MS) for t in long_tasks),
+        "requests": len(raw["resources"]),
+        "transfer_kb": sum(r["transfer_size"] or 0 for r in raw["resources"]) / 1024,
+        "decoded_kb": sum(r["decoded_size"] or 0 for r in raw["resources"]) / 1024,
+    }
+    if raw["memory"]:
+        metrics["js_heap_used_mb"] = raw["memory"]["used"] / (1024 * 1024)
+        metrics["js_heap_total_mb"] = raw["memory"]["total"] / (1024 * 1024)
+    if initial:
+        metrics["fcp_ms"] = raw["paints"].get("first-contentful-paint")
+        metrics["fp_ms"] = raw["paints"].get("first-paint")
+        metrics["lcp_ms"] = raw["lcp"]["startTime"] if raw["lcp"] else None
+        if raw["navigation"]:
+            metrics.update(raw["navigation"])
+            metrics["transfer_kb"] += (raw["navigation"]["transfer_size"] or 0) / 1024
+    if interaction_ms is not None:
+        metrics["interaction_ms"] = interaction_ms
+    return {"metrics": metrics, "resources": raw["resources"]}
+
+
+async def snapshot(page, since):
+    return await page.evaluate(COLLECT_JS, since)
+
+
+async def measure_deployment(pool, url):
+    """Walk auth screen -> demo login -> every NavBar tab, collecting metrics per screen"""
+    screens = {}
+    async with pool.page(url) as run:
+        page = run.page
+        await page.add_init_script(PERF_OBSERVER_JS)
+        _, ready = await goto_ready(page, url)
+        # the auth screen usually renders before `load`; the initial snapshot needs the full navigation timing
+        await page.wait_for_function(LOAD_DONE_JS)
+        raw = await snapshot(page, 0)
+        screens["auth"] = summarize(raw, initial=True)
+        screens["auth"]["metrics"].update(ready)
+
+        since = raw["now"]
+        login = await demo_login(page)
+        raw = await snapshot(page, since)
+        screens["diary"] = summarize(raw, interaction_ms=login["time_to_logged_in_ms"])
+        screens["diary"]["metrics"].update(login)
+
+        for label, screen in NAV_TABS.items():
+            if screen == "diary":
+                continue
+            since = raw["now"]
+            tab_ms = await open_tab(page, label)
+            raw = await snapshot(page, since)
+            screens[screen] = summarize(raw, interaction_ms=tab_ms)
+
+        errors = list(run.errors)
+    return {"screens": screens, "page_errors": errors}
+
+
+def check_budgets(record, budgets):
+    """Return human-readable violations for every metric over its budget"""
+    violations = []
+    defaults = {k: v for k, v in budgets.items() if k != "screens"}
+    for screen, data in record["screens"].items():
+        limits = dict(defaults)
+        limits.update(budgets.get("screens", {}).get(screen, {}))
+        for metric, limit in limits.items():
+            value = data["metrics"].get(metric)
+            if value is not None and value > limit:
+                violations.append(f"{screen}.{metric} = {value:.1f} > {limit}")
+    return violations
+
+
+def save_results(results, path=RESULTS_PATH):
+    """Merge records into {deployment_url: {git_sha: record}}"""
+    stored = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            stored = json.load(f)
+    for record in results:
+        stored.setdefault(record["deployment"], {})[record["git_sha"]] = record
+    with open(path, "w") as f:
+        json.dump(stored, f, indent=2)
+
+
+async def run_all(urls, sha, workers):
+    # precise-memory-info makes performance.memory report exact (unbucketed) heap sizes
+    async with BrowserPool(workers=workers, launch_args=["--enable-precise-memory-info"]) as pool:
+        async def one(url):
+            started = time.time()
+            try:
+                data = await measure_deployment(pool, url)
+            except Exception as e:
+                data = {"screens": {}, "page_errors": [], "error": f"{type(e).__name__}: {e}"}
+            data.update({"deployment": url, "git_sha": sha, "timestamp": started})
+            return data
+        return await asyncio.gather(*(one(url) for url in urls))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Capture web performance metrics per deployment")
+    parser.add_argument("urls", nargs="+", help="deployment URLs")
+    parser.add_argument("--budgets", help="JSON file with budgets (see DEFAULT_BUDGETS)")
+    parser.add_argument("--sha", default=None, help="git SHA to key results by (default: HEAD)")
+    parser.add_argument("--output", default=RESULTS_PATH, help="results JSON file")
+    parser.add_argument("--workers", type=int, default=4)
+    add_store_arguments(parser)
+    args = parser.parse_args(argv)
+
+    budgets = dict(DEFAULT_BUDGETS)
+    if args.budgets:
+        with open(args.budgets) as f:
+            budgets.update(json.load(f))
+
+    sha = args.sha or git_sha()
+    results = asyncio.run(run_all(args.urls, sha, args.workers))
+    save_results(results, args.output)
+
+    all_passed = True
+    for record in results:
+        print("\n" + "=" * 80)
+        print(f"{record['deployment']} @ {sha}")
+        print("=" * 80)
+        if record.get("error"):
+            print(f"  ✗ {record['error']}")
+            all_passed = False
+            continue
+        for screen, data in record["screens"].items():
+            m = data["metrics"]
+            heap = f"{m['js_heap_used_mb']:.1f} MB" if "js_heap_used_mb" in m else "n/a"
+            print(f"  {screen:<11} tbt={m['tbt_ms']:.0f}ms long_tasks={m['long_tasks']} "
+                  f"transfer={m['transfer_kb']:.0f}KB requests={m['requests']} heap={heap}")
+            if "fcp_ms" in m:
+                print(f"  {'':<11} fcp={m['fcp_ms'] or 0:.0f}ms lcp={m['lcp_ms'] or 0:.0f}ms "
+                      f"ttfb={m.get('ttfb_ms', 0):.0f}ms load={m.get('load_ms', 0):.0f}ms")
+        samples = [sample for screen, data in record["screens"].items()
+                   for sample in metric_samples(screen, data["metrics"])]
+        record_samples(args, "web_perf", record["deployment"], samples, sha)
+        violations = check_budgets(record, budgets)
+        for violation in violations:
+            print(f"  ✗ Budget exceeded: {violation}")
+        if violations or record["page_errors"]:
+            all_passed = False
+        else:
+            print("  ✓ Within budget")
+
+    print(f"\nResults written to {args.output}")
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)